@@ -0,0 +1,42 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from tests.unit import test
+from xrally_kubernetes.common import utils
+
+
+class UtilsTestCase(test.TestCase):
+
+    def test_percentile(self):
+        points = [1, 2, 3, 4, 5]
+        self.assertEqual(1, utils.percentile(points, 0))
+        self.assertEqual(3, utils.percentile(points, 0.5))
+        self.assertEqual(5, utils.percentile(points, 1))
+        self.assertEqual(4.6, utils.percentile(points, 0.9))
+        self.assertIsNone(utils.percentile([], 0.5))
+
+    def test_latency_stats(self):
+        self.assertEqual([1, 3, 4.6, 4.8, 4.96, 5, 3.0, 5],
+                         [round(v, 2) for v in
+                          utils.latency_stats([5, 4, 3, 2, 1])])
+        self.assertEqual([None] * 7 + [0], utils.latency_stats([]))
+
+    def test_time_series(self):
+        self.assertEqual(
+            [[0, 2], [1, 0], [2, 1]],
+            utils.time_series([10.1, 10.9, 12.5], start=10))
+        self.assertEqual(
+            [[2, 1]],
+            utils.time_series([12.5], start=10, step=2))
+        self.assertEqual([], utils.time_series([], start=10))
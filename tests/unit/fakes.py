@@ -0,0 +1,54 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+
+def pod(name, uid=None, node=None, phase="Running", ready=False,
+        deletion_timestamp=None):
+    """Return fake pod object as it's received by watch handlers."""
+    fake = mock.MagicMock()
+    fake.metadata.name = name
+    fake.metadata.uid = uid
+    fake.metadata.deletion_timestamp = deletion_timestamp
+    fake.spec.node_name = node
+    fake.status.phase = phase
+    fake.status.conditions = [
+        mock.MagicMock(type="Ready", status="True" if ready else "False")]
+    return fake
+
+
+class FakeWatch(object):
+    """Fake watch method of client, which delivers events on waits.
+
+    Each wait of a watcher delivers the next batch of events to its handler
+    and returns the predicate result. The last created watcher is kept in
+    `watcher` attribute.
+    """
+
+    def __init__(self, client, batches):
+        self.batches = batches
+        self.watcher = None
+        client.watch.side_effect = self
+
+    def __call__(self, kind, handler, **kwargs):
+        def wait(predicate, timeout=None):
+            for event_type, obj, received_at in (
+                    self.batches.pop(0) if self.batches else []):
+                handler(event_type, obj, received_at)
+            return predicate()
+
+        self.watcher = mock.MagicMock()
+        self.watcher.wait.side_effect = wait
+        return self.watcher
@@ -0,0 +1,103 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import copy
+
+import mock
+
+from tests.unit import test
+from xrally_kubernetes.tasks.contexts import local_pv_pool
+
+
+class LocalPVPoolTestCase(test.TestCase):
+
+    def test_acquire_and_release(self):
+        pool = local_pv_pool.LocalPVPool()
+        pool.add("pv1")
+        pool.add("pv2")
+        context = copy.deepcopy({"local_pv_pool": pool})
+
+        self.assertIs(pool, context["local_pv_pool"])
+        self.assertEqual("pv1", pool.acquire(timeout=0))
+        self.assertEqual("pv2", pool.acquire(timeout=0))
+        self.assertIsNone(pool.acquire(timeout=0))
+        pool.release("pv1")
+        self.assertEqual("pv1", pool.acquire(timeout=0))
+        self.assertEqual(["pv1", "pv2"], pool.names)
+
+
+class LocalPVPoolContextTestCase(test.TestCase):
+
+    def setUp(self):
+        super(LocalPVPoolContextTestCase, self).setUp()
+
+        from xrally_kubernetes import service as k8s_service
+
+        p_mock_client = mock.patch.object(k8s_service, "Kubernetes")
+        self.client_cls = p_mock_client.start()
+        self.client = self.client_cls.return_value
+        self.client.clone.return_value = self.client
+        self.addCleanup(p_mock_client.stop)
+
+        self.pv = {
+            "size": "1Gi",
+            "volume_mode": "Filesystem",
+            "local_path": "/var/tmp",
+            "access_modes": ["ReadWriteOnce"],
+            "node_affinity": {"stub": "stub"}
+        }
+        self.ctx = local_pv_pool.LocalPVPoolContext(dict(
+            env={"platforms": {"kubernetes": {}}},
+            kubernetes={"storageclass": "local"},
+            config={"local_pv_pool": {"count": 2,
+                                      "persistent_volume": self.pv}},
+            task={"uuid": "task"},
+            owner_id="owner"
+        ))
+        self.ctx.generate_random_name = mock.MagicMock(
+            side_effect=["pv1", "pv2"])
+
+    def test_create(self):
+        self.ctx.setup()
+
+        pool = self.ctx.context["kubernetes"]["local_pv_pool"]
+        self.assertEqual(["pv1", "pv2"], sorted(pool.names))
+        self.assertEqual(set(["pv1", "pv2"]),
+                         set([pool.acquire(timeout=0),
+                              pool.acquire(timeout=0)]))
+        self.client.create_local_pv.assert_has_calls([
+            mock.call(name, storage_class="local", size="1Gi",
+                      volume_mode="Filesystem", local_path="/var/tmp",
+                      access_modes=["ReadWriteOnce"],
+                      node_affinity={"stub": "stub"}, status_wait=True)
+            for name in ("pv1", "pv2")], any_order=True)
+
+    def test_create_failed(self):
+        self.client.create_local_pv.side_effect = [None, Exception("Test")]
+
+        self.assertRaises(Exception, self.ctx.setup)
+        self.assertEqual(
+            1, len(self.ctx.context["kubernetes"]["local_pv_pool"].names))
+
+    def test_delete(self):
+        pool = local_pv_pool.LocalPVPool()
+        pool.add("pv1")
+        pool.add("pv2")
+        self.ctx.context["kubernetes"]["local_pv_pool"] = pool
+
+        self.ctx.cleanup()
+
+        self.client.delete_local_pv.assert_has_calls([
+            mock.call("pv1", status_wait=True),
+            mock.call("pv2", status_wait=True)], any_order=True)
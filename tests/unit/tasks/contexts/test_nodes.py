@@ -0,0 +1,63 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes.tasks.contexts import nodes
+
+
+class NodesContextTestCase(test.TestCase):
+
+    def setUp(self):
+        super(NodesContextTestCase, self).setUp()
+
+        from xrally_kubernetes import service as k8s_service
+
+        p_mock_client = mock.patch.object(k8s_service, "Kubernetes")
+        self.client_cls = p_mock_client.start()
+        self.client = self.client_cls.return_value
+        self.addCleanup(p_mock_client.stop)
+
+    def _get_ctx(self, config):
+        return nodes.NodesContext(dict(
+            env={"platforms": {"kubernetes": {}}},
+            config={"nodes": config}
+        ))
+
+    def test_setup(self):
+        self.client.list_nodes.return_value = ["node-b", "node-a", "node-b"]
+        ctx = self._get_ctx({"node_labels": {"role": "worker"}})
+
+        ctx.setup()
+
+        self.client.list_nodes.assert_called_once_with({"role": "worker"})
+        self.assertEqual(["node-a", "node-b"],
+                         ctx.context["kubernetes"]["nodes"])
+
+    def test_setup_all_nodes(self):
+        self.client.list_nodes.return_value = ["node-a"]
+        ctx = self._get_ctx({})
+
+        ctx.setup()
+
+        self.client.list_nodes.assert_called_once_with(None)
+        self.assertEqual(["node-a"], ctx.context["kubernetes"]["nodes"])
+
+    def test_setup_no_nodes(self):
+        self.client.list_nodes.return_value = []
+        ctx = self._get_ctx({"node_labels": {"role": "none"}})
+
+        self.assertRaises(exceptions.ContextSetupFailure, ctx.setup)
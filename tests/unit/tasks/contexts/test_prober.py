@@ -0,0 +1,59 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from tests.unit import test
+from xrally_kubernetes.tasks.contexts import prober
+
+
+class ProberContextTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ProberContextTestCase, self).setUp()
+
+        from xrally_kubernetes import service as k8s_service
+
+        p_mock_client = mock.patch.object(k8s_service, "Kubernetes")
+        self.client_cls = p_mock_client.start()
+        self.client = self.client_cls.return_value
+        self.addCleanup(p_mock_client.stop)
+
+        self.ctx = prober.ProberContext(dict(
+            env={"platforms": {"kubernetes": {}}},
+            kubernetes={"namespaces": ["ns1", "ns2"]}
+        ))
+
+    def test_create(self):
+        self.client_cls.reset_mock()
+        self.client.create_pod.side_effect = ["prober1", "prober2"]
+
+        self.ctx.setup()
+
+        self.assertEqual({"ns1": "prober1", "ns2": "prober2"},
+                         self.ctx.context["kubernetes"]["probers"])
+        self.client.create_pod.assert_has_calls([
+            mock.call("appropriate/curl:edge", namespace=ns,
+                      command=prober.ProberContext.COMMAND,
+                      labels={"app": "xrally-prober"}, status_wait=True)
+            for ns in ("ns1", "ns2")])
+
+    def test_delete(self):
+        self.client_cls.reset_mock()
+        self.ctx.context["kubernetes"]["probers"] = {"ns1": "prober1"}
+
+        self.ctx.cleanup()
+
+        self.client.delete_pod.assert_called_once_with(
+            "prober1", namespace="ns1", status_wait=False)
@@ -114,6 +114,8 @@ class CreateRolloutAndDeleteReplicaSetTestCase(test.TestCase):
             replicas=2,
             command=["ls"],
             resources=None,
+            max_surge=None,
+            max_unavailable=None,
             status_wait=True
         )
         self.client.rollout_deployment.assert_called_once_with(
@@ -143,6 +145,8 @@ class CreateRolloutAndDeleteReplicaSetTestCase(test.TestCase):
             replicas=2,
             command=None,
             resources=None,
+            max_surge=None,
+            max_unavailable=None,
             status_wait=True
         )
         self.assertEqual(0, self.client.rollout_deployment.call_count)
@@ -163,6 +167,8 @@ class CreateRolloutAndDeleteReplicaSetTestCase(test.TestCase):
             replicas=2,
             command=None,
             resources=None,
+            max_surge=None,
+            max_unavailable=None,
             status_wait=True
         )
         self.client.rollout_deployment.assert_called_once_with(
@@ -189,6 +195,50 @@ class CreateRolloutAndDeleteReplicaSetTestCase(test.TestCase):
             replicas=2,
             command=None,
             resources=None,
+            max_surge=None,
+            max_unavailable=None,
             status_wait=True
         )
         self.client.rollout_deployment.assert_called_once()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.deployments.time")
+    def test_rollout_progression(self, mock_time):
+        mock_time.time.return_value = 10.0
+        self.client.create_deployment.return_value = "test"
+        self.scenario.add_output = mock.MagicMock()
+
+        def deployment(updated, ready, available):
+            resp = mock.MagicMock()
+            resp.status.updated_replicas = updated
+            resp.status.ready_replicas = ready
+            resp.status.available_replicas = available
+            return resp
+
+        def rollout(*args, **kwargs):
+            handler = self.client.watch.call_args[1]["handler"]
+            handler("ADDED", deployment(2, 2, 2), 9.0)
+            handler("MODIFIED", deployment(1, 2, 2), 11.0)
+            handler("MODIFIED", deployment(2, 3, 2), 12.5)
+            handler("MODIFIED", deployment(2, 2, 2), 13.0)
+
+        self.client.rollout_deployment.side_effect = rollout
+
+        self.scenario.run("test/image", 2, changes={"image": "test/image2"},
+                          max_surge=1, max_unavailable=0)
+
+        self.client.create_deployment.assert_called_once_with(
+            namespace="ns", env=None, image="test/image", replicas=2,
+            command=None, resources=None, max_surge=1, max_unavailable=0,
+            status_wait=True)
+        self.client.watch.assert_called_once_with(
+            "deployment", handler=mock.ANY, namespace="ns",
+            field_selector="metadata.name=test")
+        self.client.watch.return_value.stop.assert_called_once_with()
+        output = self.scenario.add_output.call_args[1]["complete"]
+        self.assertEqual("Replicas of 2 during the rollout with maxSurge 1 "
+                         "and maxUnavailable 0", output["description"])
+        self.assertEqual(
+            [["updated", [[0, 2], [1.0, 1], [2.5, 2], [3.0, 2]]],
+             ["ready", [[0, 2], [1.0, 2], [2.5, 3], [3.0, 2]]],
+             ["available", [[0, 2], [1.0, 2], [2.5, 2], [3.0, 2]]]],
+            output["data"])
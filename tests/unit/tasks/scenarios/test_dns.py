@@ -0,0 +1,130 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import itertools
+
+from kubernetes.client import rest
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import dns
+
+
+class ResolveServiceNamesTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ResolveServiceNamesTestCase, self).setUp()
+        self.scenario = dns.ResolveServiceNames()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin",
+                "probers": {"ns": "prober"}
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["svc1", "svc2"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.resp = self.client.exec_stream.return_value
+        self.resp.is_open.return_value = True
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.dns.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 0.5)
+        self.resp.readline_stdout.side_effect = [
+            "xrally:query kubernetes.default.svc.cluster.local ok 1500",
+            None,
+            "xrally:query kubernetes.default.svc.cluster.local fail 5000000",
+            "xrally:query kubernetes.default.svc.cluster.local ok 2500",
+            "xrally:ready",
+            "xrally:resolved svc1.ns.svc.cluster.local",
+            "noise",
+            "xrally:resolved svc2.ns.svc.cluster.local",
+            "xrally:done"]
+
+        self.scenario.run(lookups=3, parallel=2, services=2)
+
+        command = self.client.exec_stream.call_args[1]["command"]
+        self.assertEqual(["/bin/sh", "-c"], command[:2])
+        self.assertIn("-lt 3 ];", command[2])
+        self.assertIn("-lt 2 ];", command[2])
+        self.assertIn("for n in kubernetes.default.svc.cluster.local;",
+                      command[2])
+        self.assertIn("p=\"svc1.ns.svc.cluster.local "
+                      "svc2.ns.svc.cluster.local\"", command[2])
+        self.assertIn("date +%s%N", command[2])
+        self.assertLess(command[2].index("ready\"; read s;"),
+                        command[2].index("p=\"svc1"))
+        self.client.exec_stream.assert_called_once_with(
+            "prober", namespace="ns", command=command, stdin=True)
+        self.client.create_service.assert_has_calls([
+            mock.call(name, namespace="ns", port=80, protocol="TCP",
+                      type="ClusterIP") for name in ("svc1", "svc2")])
+        self.resp.write_stdin.assert_called_once_with("start\n")
+        self.resp.close.assert_called_once_with()
+        self.assertEqual(
+            set(["svc1", "svc2"]),
+            set(c[0][0] for c in self.client.delete_service.call_args_list))
+        self.scenario.add_latency_output.assert_called_once_with(
+            "DNS resolution latency",
+            [("kubernetes.default.svc.cluster.local", [0.0015, 0.0025]),
+             ("new service create to resolvable", [1.5, 2.5])],
+            description="3 queries, 1 failed, 2 parallel bursts")
+        self.scenario.add_output.assert_called_once_with(additive={
+            "title": "DNS query errors",
+            "description": mock.ANY,
+            "chart_plugin": "Lines",
+            "data": [["errors", 100.0 / 3]],
+            "label": "Percent",
+            "axis_label": "Iteration"})
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.dns.time")
+    def test_run_timeout(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1.0)
+        self.resp.readline_stdout.return_value = None
+
+        self.assertRaises(exceptions.TimeoutException, self.scenario.run,
+                          names=["kube-dns.kube-system.svc.cluster.local"],
+                          services=1, timeout=3)
+
+        self.resp.close.assert_called_once_with()
+        self.client.create_service.assert_not_called()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.dns.time")
+    def test_run_create_failed(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 0.5)
+        self.resp.readline_stdout.side_effect = ["xrally:ready"]
+        self.client.create_service.side_effect = [
+            None, rest.ApiException(status=500)]
+        self.client.delete_service.side_effect = [
+            None, rest.ApiException(status=404)]
+
+        self.assertRaises(rest.ApiException, self.scenario.run, services=2)
+
+        self.resp.close.assert_called_once_with()
+        self.resp.write_stdin.assert_not_called()
+        self.assertEqual(
+            ["svc1", "svc2"],
+            sorted(c[0][0] for c in self.client.delete_service.call_args_list))
+
+    def test_run_invalid_name(self):
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run, names=["a;rm -rf /"])
+        self.client.exec_stream.assert_not_called()
@@ -0,0 +1,182 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from kubernetes.client import rest
+import mock
+from rally import exceptions
+
+from tests.unit import fakes
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import drain
+
+
+class DrainTrackerTestCase(test.TestCase):
+
+    def test_on_pod_event(self):
+        tracker = drain.DrainTracker()
+        tracker.on_pod_event("ADDED",
+                             fakes.pod("p0", uid="u0", node="n0"), 1.0)
+        tracker.on_pod_event("ADDED",
+                             fakes.pod("p1", uid="u1", node="n1"), 1.0)
+        self.assertEqual({"u0": "p0"}, tracker.pods_on("n0"))
+
+        tracker.node = "n0"
+        tracker.expected = 2
+        tracker.victims.add("u0")
+        tracker.on_pod_event(
+            "ADDED", fakes.pod("p2", uid="u2", node="n1", phase="Pending"),
+            2.0)
+        self.assertIsNone(tracker.rescheduled_at)
+        tracker.on_pod_event("DELETED",
+                             fakes.pod("p0", uid="u0", node="n0"), 2.5)
+        tracker.on_pod_event("MODIFIED",
+                             fakes.pod("p2", uid="u2", node="n1"), 3.0)
+        self.assertEqual(3.0, tracker.rescheduled_at)
+        self.assertEqual({"u1": 1.0, "u0": 1.0, "u2": 3.0},
+                         tracker.running_at)
+
+
+class DrainNodeAndReschedulePodsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(DrainNodeAndReschedulePodsTestCase, self).setUp()
+        self.scenario = drain.DrainNodeAndReschedulePods()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["label", "pdb"])
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_atomic_action = mock.MagicMock()
+        self.client.create_deployment.return_value = "dep"
+        self.client.create_pdb.return_value = "pdb"
+        self.client.list_nodes.return_value = ["n0", "n1"]
+
+    def _initial(self):
+        return [("ADDED", fakes.pod("p0", uid="u0", node="n0"), 5.0),
+                ("ADDED", fakes.pod("p1", uid="u1", node="n0"), 5.0),
+                ("ADDED", fakes.pod("p2", uid="u2", node="n1"), 5.0)]
+
+    @mock.patch("rally.common.utils.interruptable_sleep")
+    @mock.patch("xrally_kubernetes.tasks.scenarios.drain.time")
+    def test_run(self, mock_time, mock_sleep):
+        mock_time.time.return_value = 10.0
+        self.client.evict_pod.side_effect = [
+            None, rest.ApiException(status=429), None]
+        self.watch = fakes.FakeWatch(self.client, [
+            self._initial(),
+            [("DELETED", fakes.pod("p0", uid="u0", node="n0"), 10.5),
+             ("ADDED", fakes.pod("p3", uid="u3", node="n1"), 11.0),
+             ("DELETED", fakes.pod("p1", uid="u1", node="n0"), 11.5),
+             ("ADDED",
+              fakes.pod("p4", uid="u4", node="n1", phase="Pending"), 12.0),
+             ("MODIFIED", fakes.pod("p4", uid="u4", node="n1"), 14.0)]])
+
+        self.scenario.run("test/image", replicas=3, min_available=2,
+                          workers=1, retry_interval=2)
+
+        self.client.create_deployment.assert_called_once_with(
+            namespace="ns", replicas=3, image="test/image", command=None,
+            labels={"drain": "label"})
+        self.client.create_pdb.assert_called_once_with(
+            "pdb", namespace="ns", labels={"drain": "label"},
+            min_available=2, max_unavailable=None)
+        self.client.watch.assert_called_once_with(
+            "pod", handler=mock.ANY, namespace="ns",
+            label_selector="drain=label")
+        self.client.list_nodes.assert_called_once_with(None)
+        self.client.cordon_node.assert_called_once_with("n0")
+        self.assertEqual([mock.call("p0", namespace="ns"),
+                          mock.call("p1", namespace="ns"),
+                          mock.call("p1", namespace="ns")],
+                         self.client.evict_pod.call_args_list)
+        mock_sleep.assert_called_once_with(2)
+        self.scenario.add_atomic_action.assert_called_once_with(
+            "kubernetes.drain_node", 10.0, 14.0)
+        self.client.uncordon_node.assert_called_once_with("n0")
+        self.watch.watcher.stop.assert_called_once_with()
+        self.client.delete_pdb.assert_called_once_with("pdb", namespace="ns")
+        self.client.delete_deployment.assert_called_once_with(
+            "dep", namespace="ns")
+
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Node drain latency",
+            [("eviction accepted", [0.0, 0.0]),
+             ("eviction blocked by budget", [0.0]),
+             ("replacement Running", [1.0, 4.0]),
+             ("all pods Running elsewhere", [4.0])],
+            description="2 pods evicted from node n0, 1 evictions blocked "
+                        "by disruption budget")
+        data = self.scenario.add_output.call_args[1]["additive"]["data"]
+        self.assertEqual([["evicted pods", 2], ["blocked retries", 1]],
+                         data)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.drain.time")
+    def test_run_eviction_failed(self, mock_time):
+        mock_time.time.return_value = 10.0
+        self.client.evict_pod.side_effect = [
+            None, rest.ApiException(status=500)]
+        self.watch = fakes.FakeWatch(self.client, [self._initial()])
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", replicas=3, workers=1)
+
+        self.assertFalse(self.client.create_pdb.called)
+        self.assertFalse(self.scenario.add_atomic_action.called)
+        self.client.uncordon_node.assert_called_once_with("n0")
+        self.watch.watcher.stop.assert_called_once_with()
+        self.assertFalse(self.client.delete_pdb.called)
+        self.client.delete_deployment.assert_called_once_with(
+            "dep", namespace="ns")
+
+    @mock.patch("rally.common.utils.interruptable_sleep")
+    @mock.patch("xrally_kubernetes.tasks.scenarios.drain.time")
+    def test_run_eviction_blocked(self, mock_time, mock_sleep):
+        mock_time.time.side_effect = [10.0, 10.0, 10.0, 10.0, 10.5]
+        self.client.evict_pod.side_effect = rest.ApiException(status=429)
+        self.client.list_nodes.return_value = ["n1"]
+        self.watch = fakes.FakeWatch(self.client, [self._initial()])
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", replicas=3, max_unavailable=0,
+                          node_labels={"role": "worker"}, retry_interval=1,
+                          eviction_timeout=1)
+
+        self.client.list_nodes.assert_called_once_with({"role": "worker"})
+        self.client.cordon_node.assert_called_once_with("n1")
+        self.client.evict_pod.assert_called_once_with("p2", namespace="ns")
+        self.assertFalse(mock_sleep.called)
+        self.client.uncordon_node.assert_called_once_with("n1")
+        self.client.delete_pdb.assert_called_once_with("pdb", namespace="ns")
+
+    def test_run_no_pods_on_nodes(self):
+        self.client.list_nodes.return_value = ["n2"]
+        self.watch = fakes.FakeWatch(self.client, [self._initial()])
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", replicas=3)
+
+        self.assertFalse(self.client.cordon_node.called)
+        self.assertFalse(self.client.evict_pod.called)
+        self.watch.watcher.stop.assert_called_once_with()
+        self.client.delete_deployment.assert_called_once_with(
+            "dep", namespace="ns")
@@ -15,6 +15,7 @@
 import mock
 
 from kubernetes.client import rest
+from rally import exceptions
 
 from tests.unit import test
 from xrally_kubernetes.tasks.scenarios import jobs
@@ -44,6 +45,10 @@ class CreateAndDeleteJobTestCase(test.TestCase):
             namespace="ns",
             image="test/image",
             command=["ls"],
+            completions=None,
+            parallelism=None,
+            completion_mode=None,
+            ttl_seconds_after_finished=None,
             status_wait=True
         )
         self.client.delete_job.assert_called_once_with(
@@ -63,6 +68,10 @@ class CreateAndDeleteJobTestCase(test.TestCase):
             namespace="ns",
             image="test/image",
             command=["ls"],
+            completions=None,
+            parallelism=None,
+            completion_mode=None,
+            ttl_seconds_after_finished=None,
             status_wait=True
         )
         self.assertEqual(0, self.client.delete_job.call_count)
@@ -79,5 +88,143 @@ class CreateAndDeleteJobTestCase(test.TestCase):
             command=["ls"],
             namespace="ns",
             image="test/image",
+            completions=None,
+            parallelism=None,
+            completion_mode=None,
+            ttl_seconds_after_finished=None,
             status_wait=True
         )
+
+    def test_deleted_by_ttl(self):
+        self.client.create_job.return_value = "test"
+        self.client.delete_job.side_effect = [
+            rest.ApiException(status=404, reason="Not found")
+        ]
+
+        self.scenario.run("test/image", ["ls"], ttl_seconds_after_finished=0)
+
+        self.client.delete_job.assert_called_once_with(
+            "test",
+            namespace="ns",
+            status_wait=True
+        )
+
+    def test_delete_not_found(self):
+        self.client.create_job.return_value = "test"
+        self.client.delete_job.side_effect = [
+            rest.ApiException(status=404, reason="Not found")
+        ]
+
+        self.assertRaises(rest.ApiException, self.scenario.run, "test/image",
+                          ["ls"])
+
+
+class CreateAndDeleteJobsBatchTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateAndDeleteJobsBatchTestCase, self).setUp()
+        self.scenario = jobs.CreateAndDeleteJobsBatch()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["batch", "job-0", "job-1"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+    @staticmethod
+    def _job(name, active=None, succeeded=None, condition=None):
+        job = mock.MagicMock()
+        job.metadata.name = name
+        job.status.active = active
+        job.status.succeeded = succeeded
+        job.status.failed = None
+        job.status.conditions = []
+        if condition:
+            job.status.conditions = [mock.MagicMock(
+                type=condition, status="True", message="msg")]
+        return job
+
+    def _mock_watch(self, events, finished=True):
+        watcher = self.client.watch.return_value
+
+        def wait(predicate):
+            handler = self.client.watch.call_args[1]["handler"]
+            for event in events:
+                handler(*event)
+            return finished and predicate()
+
+        watcher.wait.side_effect = wait
+        return watcher
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.jobs.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = [9, 10, 11]
+        watcher = self._mock_watch([
+            ("ADDED", self._job("job-0"), 12),
+            ("MODIFIED", self._job("job-0", active=2), 13),
+            ("MODIFIED", self._job("job-1", active=1), 14),
+            ("MODIFIED", self._job("job-0", active=1, succeeded=1), 15),
+            ("MODIFIED", self._job("job-0", succeeded=2,
+                                   condition="Complete"), 16),
+            ("MODIFIED", self._job("job-1", succeeded=2,
+                                   condition="Complete"), 17),
+            ("DELETED", self._job("job-1"), 18),
+        ])
+
+        self.scenario.run("test/image", ["ls"], jobs=2, completions=2,
+                          parallelism=2, completion_mode="Indexed",
+                          workers=1)
+
+        self.client.watch.assert_called_once_with(
+            "job", handler=self.scenario._on_job_event, namespace="ns",
+            label_selector="batch=batch")
+        self.assertEqual(2, self.client.create_job.call_count)
+        self.client.create_job.assert_any_call(
+            namespace="ns", image="test/image", command=["ls"],
+            name="job-0", completions=2, parallelism=2,
+            completion_mode="Indexed", ttl_seconds_after_finished=None,
+            labels={"batch": "batch"}, status_wait=False)
+        watcher.stop.assert_called_once_with()
+        self.client.delete_jobs.assert_called_once_with(
+            "ns", labels={"batch": "batch"})
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Jobs latency",
+            [("kubernetes.job_time_to_first_pod", [3, 3]),
+             ("kubernetes.job_time_to_complete", [6, 6])])
+        self.assertEqual([15, 16, 17, 17], self.scenario._completions)
+        additive = self.scenario.add_output.call_args_list[0][1]["additive"]
+        self.assertEqual([["pods completions per second", 0.5],
+                          ["jobs completions per second", 0.25]],
+                         additive["data"])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.jobs.time")
+    def test_run_failed_job(self, mock_time):
+        mock_time.time.side_effect = [9, 10, 11]
+        self._mock_watch([
+            ("MODIFIED", self._job("job-0", succeeded=1,
+                                   condition="Complete"), 12),
+            ("MODIFIED", self._job("job-1", condition="Failed"), 13),
+        ])
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", ["ls"], jobs=2, workers=1)
+        self.client.delete_jobs.assert_called_once_with(
+            "ns", labels={"batch": "batch"})
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.jobs.time")
+    def test_run_timeout(self, mock_time):
+        mock_time.time.side_effect = [9, 10, 11]
+        self._mock_watch([], finished=False)
+
+        self.assertRaises(exceptions.TimeoutException, self.scenario.run,
+                          "test/image", ["ls"], jobs=2, workers=1)
+        self.client.delete_jobs.assert_called_once_with(
+            "ns", labels={"batch": "batch"})
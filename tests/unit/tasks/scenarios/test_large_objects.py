@@ -0,0 +1,111 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import base64
+
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import large_objects
+
+
+class PayloadTestCase(test.TestCase):
+
+    def test__payload(self):
+        configmap = large_objects._payload(10, 0, "configmap")
+        secret = large_objects._payload(10, 0, "secret")
+
+        self.assertEqual(10, len(configmap["payload"]))
+        self.assertEqual(10, len(base64.b64decode(secret["payload"])))
+        self.assertIs(configmap, large_objects._payload(10, 0, "configmap"))
+        self.assertNotEqual(configmap,
+                            large_objects._payload(10, 1, "configmap"))
+
+
+class CreateUpdateReadAndDeleteLargeObjectsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateUpdateReadAndDeleteLargeObjectsTestCase, self).setUp()
+        self.scenario = large_objects.CreateUpdateReadAndDeleteLargeObjects()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["large", "cm-0", "cm-1", "s-0", "s-1"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.large_objects._payload")
+    @mock.patch("xrally_kubernetes.tasks.scenarios.large_objects.time")
+    def test_run(self, mock_time, mock__payload):
+        # each operation: start, two objects, finish
+        configmap_times = [0, 0, 1, 1, 2, 2]
+        secret_times = [0, 0, 2, 2, 4, 4]
+        mock_time.time.side_effect = (configmap_times * 3 +
+                                      secret_times * 3)
+
+        self.scenario.run(size=1048576, count=2, workers=1)
+
+        mock__payload.assert_has_calls(
+            [mock.call(1048576, 0, "configmap"),
+             mock.call(1048576, 1, "configmap"),
+             mock.call(1048576, 0, "secret"),
+             mock.call(1048576, 1, "secret")])
+        self.client.create_configmap.assert_any_call(
+            "cm-0", namespace="ns", data=mock__payload.return_value,
+            labels={"large": "large"})
+        self.client.patch_configmap.assert_any_call(
+            "cm-1", namespace="ns", data=mock__payload.return_value)
+        self.client.create_opaque_secret.assert_any_call(
+            "s-0", namespace="ns", data=mock__payload.return_value,
+            labels={"large": "large"})
+        self.client.patch_secret.assert_any_call(
+            "s-1", namespace="ns", data=mock__payload.return_value)
+        self.client.read_raw.assert_any_call("secret", namespace="ns",
+                                             name="s-0")
+        self.client.delete_configmaps.assert_called_once_with(
+            "ns", labels={"large": "large"})
+        self.client.delete_secrets.assert_called_once_with(
+            "ns", labels={"large": "large"})
+
+        latencies = self.scenario.add_latency_output.call_args[0][1]
+        self.assertEqual(("configmap create", [1, 1]), latencies[0])
+        self.assertEqual(("secret create", [2, 2]), latencies[1])
+        throughput = self.scenario.add_output.call_args_list[0][1][
+            "additive"]["data"]
+        self.assertEqual([["configmap create", 1.0],
+                          ["secret create", 0.5]], throughput[:2])
+        paired = self.scenario.add_output.call_args_list[1][1]["complete"]
+        self.assertEqual([["create", 1, 2, 2.0], ["update", 1, 2, 2.0],
+                          ["read", 1, 2, 2.0]], paired["data"]["rows"])
+
+    def test_run_single_kind(self):
+        self.scenario.run(size=10, count=2, kinds=["secret"], workers=1)
+
+        self.assertFalse(self.client.create_configmap.called)
+        self.assertFalse(self.client.delete_configmaps.called)
+        self.assertEqual(1, self.scenario.add_output.call_count)
+
+    def test_run_unknown_kind(self):
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run, size=10, count=2,
+                          kinds=["pod"])
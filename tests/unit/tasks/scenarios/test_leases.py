@@ -0,0 +1,127 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from kubernetes.client import rest
+
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import leases
+
+
+class CreateRenewAndDeleteNodeLeasesTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateRenewAndDeleteNodeLeasesTestCase, self).setUp()
+        self.scenario = leases.CreateRenewAndDeleteNodeLeases()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["app", "lease-0", "lease-1", "lease-2"])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.leases.time")
+    def test__renew(self, mock_time):
+        # schedule: lease-0 at 0, lease-1 at 5; renewals take 1 second
+        mock_time.time.side_effect = [
+            0,          # now
+            0, 0, 1,    # lease-0 renewal
+            1, 5, 6,    # lease-1 renewal
+            10, 10, 10  # lease-0 renewal fails
+        ]
+        stop_event = mock.Mock()
+        stop_event.is_set.return_value = False
+        stop_event.wait.return_value = False
+        self.client.renew_lease.side_effect = [
+            None, None, rest.ApiException(status=500)]
+
+        latencies, finished, missed, errors = self.scenario._renew(
+            ["lease-0", "lease-1"], "ns", renew_interval=10,
+            lease_duration=4, deadline=11, stop_event=stop_event)
+
+        self.assertEqual([1, 1], latencies)
+        self.assertEqual([1, 6], finished)
+        self.assertEqual([6, 10], missed)
+        self.assertEqual([10], errors)
+        stop_event.wait.assert_called_once_with(4)
+        self.client.renew_lease.assert_has_calls(
+            [mock.call("lease-0", namespace="ns", holder="lease-0"),
+             mock.call("lease-1", namespace="ns", holder="lease-1"),
+             mock.call("lease-0", namespace="ns", holder="lease-0")])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.leases.time")
+    def test__renew_failing(self, mock_time):
+        # lease-0 renewals fail at 10 and 20, the lease expires at 4
+        mock_time.time.side_effect = [
+            0,           # now
+            10, 10, 10,  # failed renewal before the next one is due
+            20, 20, 20,  # failed renewal, already counted
+            30, 30, 31   # late successful renewal, already counted
+        ]
+        stop_event = mock.Mock()
+        stop_event.is_set.return_value = False
+        stop_event.wait.return_value = False
+        self.client.renew_lease.side_effect = [
+            rest.ApiException(status=500), rest.ApiException(status=500),
+            None]
+
+        latencies, finished, missed, errors = self.scenario._renew(
+            ["lease-0"], "ns", renew_interval=10, lease_duration=4,
+            deadline=21, stop_event=stop_event)
+
+        self.assertEqual([1], latencies)
+        self.assertEqual([10], missed)
+        self.assertEqual([10, 20], errors)
+
+    def test_run(self):
+        self.scenario._renew = mock.MagicMock(
+            side_effect=[([0.1], [1.0], [], []), ([0.3], [2.0], [2.0], [])])
+
+        self.scenario.run(3, renew_interval=1, duration=1, threads=2)
+
+        self.assertEqual(
+            [mock.call("lease-%s" % i, namespace="ns", holder="lease-%s" % i,
+                       lease_duration=40, labels={"app": "app"})
+             for i in range(3)],
+            self.client.create_lease.call_args_list)
+        self.assertEqual(
+            [["lease-0", "lease-2"], ["lease-1"]],
+            [c[0][0] for c in self.scenario._renew.call_args_list])
+        self.client.delete_leases.assert_called_once_with(
+            "ns", labels={"app": "app"})
+
+        table = self.scenario._output["complete"][0]
+        self.assertEqual("Table", table["chart_plugin"])
+        self.assertEqual(2, table["data"]["rows"][0][-1])
+        self.assertIn("1 missed deadlines", table["description"])
+        self.assertEqual(
+            [["median", 0.2], ["95%ile", 0.29], ["99%ile", 0.298]],
+            [[k, round(v, 3)] for k, v in
+             self.scenario._output["additive"][0]["data"]])
+
+    def test_run_create_failed(self):
+        self.client.create_lease.side_effect = rest.ApiException(status=500)
+        self.scenario._renew = mock.MagicMock()
+
+        self.assertRaises(rest.ApiException, self.scenario.run, 3)
+        self.assertFalse(self.scenario._renew.called)
+        self.client.delete_leases.assert_called_once_with(
+            "ns", labels={"app": "app"})
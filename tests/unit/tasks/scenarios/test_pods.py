@@ -14,9 +14,11 @@
 
 import datetime
 import mock
+import threading
 import time
 
 from kubernetes.client import rest
+from rally import exceptions
 
 from tests.unit import test
 from xrally_kubernetes.tasks.scenarios import pods
@@ -114,6 +116,8 @@ class CreateAndDeletePodTestCase(test.TestCase):
             "test/image",
             namespace="ns",
             command=["ls"],
+            node_name=None,
+            node_selector=None,
             status_wait=True
         )
         self.client.get_pod.assert_called_once()
@@ -152,6 +156,8 @@ class CreateAndDeletePodTestCase(test.TestCase):
             "test/image",
             command=None,
             namespace="ns",
+            node_name=None,
+            node_selector=None,
             status_wait=True
         )
         self.assertEqual(0, self.client.delete_pod.call_count)
@@ -170,9 +176,237 @@ class CreateAndDeletePodTestCase(test.TestCase):
             "test/image",
             command=None,
             namespace="ns",
+            node_name=None,
+            node_selector=None,
             status_wait=True
         )
         self.client.get_pod.assert_called_once_with(
             "test",
             namespace="ns"
         )
+
+    def test_create_and_delete_with_node_selector(self):
+        resp = mock.MagicMock()
+        resp.status.conditions = []
+        self.client.create_pod.return_value = "test"
+        self.client.get_pod.return_value = resp
+
+        self.scenario.run("test/image", node_selector={"disk": "ssd"})
+
+        self.client.create_pod.assert_called_once_with(
+            "test/image",
+            namespace="ns",
+            command=None,
+            node_name=None,
+            node_selector={"disk": "ssd"},
+            status_wait=True
+        )
+
+
+class CreateAndDeletePodOnNodesTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateAndDeletePodOnNodesTestCase, self).setUp()
+        self.scenario = pods.CreateAndDeletePodOnNodes()
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 4,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            return_value="test")
+        self.scenario.add_atomic_action = mock.MagicMock()
+
+    def _mock_watch(self, ready=True):
+        pod = mock.MagicMock()
+        pod.status.conditions = [
+            mock.MagicMock(type="Ready", status="True" if ready else "False")]
+
+        def watch(kind, handler, **kwargs):
+            def wait(predicate):
+                handler("MODIFIED", pod, 13.5)
+                return predicate()
+
+            self.watcher = mock.MagicMock()
+            self.watcher.wait.side_effect = wait
+            return self.watcher
+
+        self.client.watch.side_effect = watch
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.pods.time")
+    def test_create_and_delete_success(self, mock_time):
+        mock_time.time.return_value = 10.0
+        self._mock_watch()
+        self.client.list_nodes.return_value = ["node-c", "node-a", "node-b"]
+
+        self.scenario.run("test/image", node_labels={"role": "worker"})
+
+        self.client.list_nodes.assert_called_once_with({"role": "worker"})
+        self.client.watch.assert_called_once_with(
+            "pod", handler=mock.ANY, namespace="ns",
+            field_selector="metadata.name=test")
+        self.client.create_pod.assert_called_once_with(
+            "test/image",
+            name="test",
+            namespace="ns",
+            command=None,
+            node_name="node-a",
+            status_wait=False
+        )
+        self.watcher.stop.assert_called_once_with()
+        self.client.delete_pod.assert_called_once_with(
+            "test",
+            namespace="ns",
+            status_wait=True
+        )
+        self.scenario.add_atomic_action.assert_called_once_with(
+            "kubernetes.pod_startup_on_node", 10.0, 13.5)
+        self.assertEqual([{
+            "title": "Pod startup time per node",
+            "description": "Time from pod create request to its readiness "
+                           "on each node",
+            "chart_plugin": "StatsTable",
+            "data": [["node-a", 3.5]]
+        }], self.scenario._output["additive"])
+
+    def test_create_and_delete_nodes_context(self):
+        self._mock_watch()
+        self.scenario.context["kubernetes"]["nodes"] = ["node-a", "node-b"]
+
+        self.scenario.run("test/image")
+
+        self.assertFalse(self.client.list_nodes.called)
+        self.assertEqual(
+            "node-b", self.client.create_pod.call_args[1]["node_name"])
+
+    def test_create_and_delete_nodes_context_with_labels(self):
+        self.scenario.context["kubernetes"]["nodes"] = ["node-a"]
+
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run, "test/image",
+                          node_labels={"role": "worker"})
+        self.assertFalse(self.client.create_pod.called)
+
+    def test_create_and_delete_no_wait(self):
+        self.client.list_nodes.return_value = ["node-a"]
+
+        self.scenario.run("test/image", status_wait=False)
+
+        self.assertFalse(self.client.watch.called)
+        self.assertEqual([], self.scenario._output["additive"])
+        self.assertFalse(self.scenario.add_atomic_action.called)
+        self.client.delete_pod.assert_called_once_with(
+            "test",
+            namespace="ns",
+            status_wait=False
+        )
+
+    def test_create_and_delete_not_ready(self):
+        self._mock_watch(ready=False)
+        self.client.list_nodes.return_value = ["node-a"]
+
+        self.assertRaises(exceptions.TimeoutException, self.scenario.run,
+                          "test/image")
+
+        self.watcher.stop.assert_called_once_with()
+        self.assertFalse(self.scenario.add_atomic_action.called)
+
+    def test_no_nodes(self):
+        self.client.list_nodes.return_value = []
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", node_labels={"role": "none"})
+        self.assertFalse(self.client.create_pod.called)
+
+
+class CreateAndDeletePodsAtRateTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateAndDeletePodsAtRateTestCase, self).setUp()
+        self.scenario = pods.CreateAndDeletePodsAtRate()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.names = ("pod-%s" % i for i in range(1000))
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=lambda: next(self.names))
+
+    def _pod(self, name, ready=True):
+        pod = mock.MagicMock()
+        pod.metadata.name = name
+        pod.status.conditions = [
+            mock.MagicMock(type="Ready", status="True" if ready else "False")]
+        return pod
+
+    def test_run(self):
+        watcher = mock.MagicMock()
+        watcher.lock = threading.Condition()
+
+        def watch(kind, handler, **kwargs):
+            def emit(event_type, name, ready=True):
+                with watcher.lock:
+                    handler(event_type, self._pod(name, ready), time.time())
+
+            self.client.create_pod.side_effect = (
+                lambda image, name, **kw: (emit("ADDED", name, False),
+                                           emit("MODIFIED", name)))
+            self.client.delete_pod.side_effect = (
+                lambda name, **kw: emit("DELETED", name))
+            return watcher
+
+        self.client.watch.side_effect = watch
+
+        self.scenario.run("test/image", window=2, rate=200, duration=0.05)
+
+        self.client.watch.assert_called_once_with(
+            "pod", handler=self.scenario._on_pod_event, namespace="ns",
+            label_selector="churn=pod-0")
+        watcher.stop.assert_called_once_with()
+        created = self.client.create_pod.call_count
+        self.assertGreater(created, 2)
+        self.client.create_pod.assert_any_call(
+            "test/image", name="pod-1", namespace="ns", command=None,
+            labels={"churn": "pod-0"}, status_wait=False)
+        self.assertEqual(created - 2, self.client.delete_pod.call_count)
+        # NOTE: each request is issued by its own clone
+        self.assertEqual(created * 2 - 2, self.client.clone.call_count)
+        self.client.delete_pod.assert_any_call("pod-1", namespace="ns",
+                                               status_wait=False)
+        self.client.delete_pods.assert_called_once_with(
+            "ns", labels={"churn": "pod-0"})
+
+        table = self.scenario._output["complete"][0]
+        self.assertEqual(
+            [created, created - 2],
+            [row[-1] for row in table["data"]["rows"]])
+        self.assertIn("0 errors", table["description"])
+        self.assertEqual(
+            ["Pods churn latency", "Pods churn",
+             "Pod creation latency over time", "Pods churn errors"],
+            [o["title"] for o in self.scenario._output["complete"]])
+
+    def test_run_create_failed(self):
+        watcher = mock.MagicMock()
+        watcher.lock = threading.Condition()
+        self.client.watch.return_value = watcher
+        self.client.create_pod.side_effect = rest.ApiException(status=500)
+
+        self.scenario.run("test/image", window=2, rate=100, duration=0.02)
+
+        self.assertFalse(self.client.delete_pod.called)
+        self.client.delete_pods.assert_called_once_with(
+            "ns", labels={"churn": "pod-0"})
+        table = self.scenario._output["complete"][0]
+        self.assertIn("%s errors" % self.client.create_pod.call_count,
+                      table["description"])
@@ -0,0 +1,211 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import reads
+
+
+class ReadObjectsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ReadObjectsTestCase, self).setUp()
+        self.scenario = reads.ReadObjects()
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+    @staticmethod
+    def _body(items=(), continue_token=None):
+        metadata = {"resourceVersion": "42"}
+        if continue_token:
+            metadata["continue"] = continue_token
+        return json.dumps(
+            {"metadata": metadata,
+             "items": [{"metadata": {"name": n, "namespace": "ns"}}
+                       for n in items]}).encode()
+
+    def test_run_default_variants(self):
+        self.client.read_raw.return_value = b"{}"
+
+        self.scenario.run(requests=1, label_selector="app=test")
+
+        self.assertEqual(
+            [mock.call("pod", namespace="ns", output="json",
+                       label_selector="app=test"),
+             mock.call("pod", namespace="ns", output="json",
+                       label_selector="app=test", resource_version="0"),
+             mock.call("pod", namespace="ns", output="json",
+                       label_selector="app=test", limit=500),
+             mock.call("pod", namespace="ns", output="metadata",
+                       label_selector="app=test", resource_version="0"),
+             mock.call("pod", namespace="ns", output="table",
+                       label_selector="app=test", resource_version="0")],
+            self.client.read_raw.call_args_list)
+        latencies = self.scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([v["name"] for v in reads.DEFAULT_VARIANTS],
+                         [name for name, _ in latencies])
+        sizes = self.scenario.add_output.call_args_list[2][1]["additive"]
+        self.assertEqual(["quorum_list", 2 / 1024.0], sizes["data"][0])
+
+    def test_run_pages_exact_and_get(self):
+        pages = [self._body(["a", "b"]),
+                 self._body(["a"], continue_token="t1"),
+                 self._body(["b"])]
+        self.client.read_raw.side_effect = lambda *a, **kw: (
+            pages.pop(0) if pages else b"{}")
+
+        self.scenario.run(
+            kind="node", requests=3, field_selector="spec.unschedulable=false",
+            variants=[{"name": "exact", "resource_version": "exact",
+                       "limit": 1, "field_selector": None},
+                      {"name": "get", "verb": "get", "output": "table"}])
+
+        self.assertEqual(
+            [mock.call("node", namespace=None, output="metadata",
+                       field_selector="spec.unschedulable=false"),
+             mock.call("node", namespace=None, output="json", limit=1,
+                       resource_version="42",
+                       resource_version_match="Exact"),
+             mock.call("node", namespace=None, output="json", limit=1,
+                       _continue="t1")],
+            self.client.read_raw.call_args_list[:3])
+        self.assertEqual(
+            [mock.call("node", namespace="ns", name="a", output="table"),
+             mock.call("node", namespace="ns", name="b", output="table"),
+             mock.call("node", namespace="ns", name="a", output="table")],
+            self.client.read_raw.call_args_list[-3:])
+        rps = self.scenario.add_output.call_args_list[0][1]["additive"]
+        self.assertEqual(["exact", "get"], [n for n, _ in rps["data"]])
+
+    def test_run_all_namespaces(self):
+        self.client.read_raw.return_value = b"{}"
+
+        self.scenario.run(kind="configmap", all_namespaces=True, requests=1,
+                          variants=[{"name": "quorum"}])
+
+        self.client.read_raw.assert_called_once_with(
+            "configmap", namespace=None, output="json")
+
+    def test_run_nothing_to_get(self):
+        self.client.read_raw.return_value = self._body()
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          variants=[{"name": "get", "verb": "get"}])
+
+    def test_run_invalid(self):
+        for variants in ([{"verb": "list"}],
+                         [{"name": "a", "page": 1}],
+                         [{"name": "a", "verb": "watch"}],
+                         [{"name": "a", "resource_version": "1"}],
+                         [{"name": "a", "output": "yaml"}],
+                         [{"name": "a", "verb": "get", "limit": 1}]):
+            self.assertRaises(exceptions.InvalidArgumentsException,
+                              self.scenario.run, variants=variants)
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run, kind="unknown")
+        self.assertFalse(self.client.read_raw.called)
+
+    def test_run_exact_unsupported(self):
+        self.client.supports_list_argument.return_value = False
+
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run,
+                          variants=[{"name": "exact",
+                                     "resource_version": "exact"}])
+
+        self.client.supports_list_argument.assert_called_once_with(
+            "pod", argument="resource_version_match")
+        self.assertFalse(self.client.read_raw.called)
+
+
+class ListObjectsScalingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ListObjectsScalingTestCase, self).setUp()
+        self.scenario = reads.ListObjectsScaling()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["scaling"] + ["obj-%s" % i for i in range(3)])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.reads.time")
+    def test_run_configmaps(self, mock_time):
+        mock_time.time.side_effect = [0, 1, 1, 1.5, 10, 12, 12, 13]
+        self.client.read_raw.side_effect = [b"x" * 1024, b"x" * 2048]
+
+        self.scenario.run([3, 1], data_size=2, resource_version="0",
+                          lists=1, workers=1)
+
+        self.assertEqual(3, self.client.create_configmap.call_count)
+        self.client.create_configmap.assert_any_call(
+            "obj-0", namespace="ns", data={"data": "xx"},
+            labels={"scaling": "scaling"})
+        self.assertEqual(
+            [mock.call("configmap", namespace="ns",
+                       label_selector="scaling=scaling",
+                       resource_version="0")] * 2,
+            self.client.read_raw.call_args_list)
+        self.client.deserialize.assert_called_with(
+            b"x" * 2048, model="V1ConfigMapList")
+        self.client.delete_configmaps.assert_called_once_with(
+            "ns", labels={"scaling": "scaling"})
+        self.scenario.add_latency_output.assert_called_once_with(
+            "LIST latency by number of objects",
+            [("list 1 configmaps", [1]), ("decode 1 configmaps", [0.5]),
+             ("list 3 configmaps", [2]), ("decode 3 configmaps", [1])],
+            description="LIST request latency and client decode time")
+        size = self.scenario.add_output.call_args_list[1][1]["complete"]
+        self.assertEqual([["response size", [[1, 1 / 1024.0],
+                                             [3, 2 / 1024.0]]]],
+                         size["data"])
+
+    def test_run_pods(self):
+        self.client.read_raw.return_value = b"{}"
+        self.client.create_pod.side_effect = [None, Exception("error")]
+
+        self.assertRaises(Exception, self.scenario.run, [2], kind="pod",
+                          image="test/image", workers=1)
+
+        self.client.create_pod.assert_any_call(
+            "test/image", name="obj-0", namespace="ns", command=None,
+            labels={"scaling": "scaling"}, status_wait=False)
+        self.client.delete_pods.assert_called_once_with(
+            "ns", labels={"scaling": "scaling"})
+
+    def test_run_pods_without_image(self):
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run, [2], kind="pod")
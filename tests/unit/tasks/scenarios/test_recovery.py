@@ -0,0 +1,105 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+from rally import exceptions
+
+from tests.unit import fakes
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import recovery
+
+
+class CreateKillPodsAndDeleteControllerTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateKillPodsAndDeleteControllerTestCase, self).setUp()
+        self.scenario = recovery.CreateKillPodsAndDeleteController()
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["label", "killed"])
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.scenario.add_atomic_action = mock.MagicMock()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.recovery.random")
+    @mock.patch("xrally_kubernetes.tasks.scenarios.recovery.time")
+    def test_run_statefulset(self, mock_time, mock_random):
+        mock_time.time.return_value = 10.0
+        mock_random.sample.side_effect = lambda pods, k: pods[-k:]
+        self.client.create_statefulset.return_value = "set"
+        self.watch = fakes.FakeWatch(self.client, [
+            [("ADDED", fakes.pod("set-0", uid="u0", ready=True), 5.0),
+             ("ADDED", fakes.pod("set-1", uid="u1", ready=True), 5.0),
+             ("ADDED", fakes.pod("set-2", uid="u2", ready=True), 5.0)],
+            [("DELETED", fakes.pod("set-1", uid="u1", ready=True), 10.5),
+             ("DELETED", fakes.pod("set-2", uid="u2", ready=True), 10.5),
+             ("ADDED", fakes.pod("set-1", uid="u3"), 11.0),
+             ("MODIFIED", fakes.pod("set-1", uid="u3", ready=True), 13.0),
+             ("ADDED", fakes.pod("set-2", uid="u4"), 14.0),
+             ("MODIFIED", fakes.pod("set-2", uid="u4", ready=True), 16.0)]])
+
+        self.scenario.run("test/image", "StatefulSet", replicas=3,
+                          kill_fraction=0.5)
+
+        self.client.create_statefulset.assert_called_once_with(
+            namespace="ns", replicas=3, image="test/image", command=None,
+            labels={"recovery": "label"})
+        self.client.watch.assert_called_once_with(
+            "pod", handler=mock.ANY, namespace="ns",
+            label_selector="recovery=label")
+        mock_random.sample.assert_called_once_with(["u0", "u1", "u2"], 2)
+        self.assertEqual(
+            [mock.call(name, namespace="ns", labels={"killed": "killed"})
+             for name in ("set-1", "set-2")],
+            self.client.label_pod.call_args_list)
+        self.client.delete_pods.assert_called_once_with(
+            "ns", labels={"killed": "killed"}, grace_period_seconds=0)
+        self.scenario.add_atomic_action.assert_called_once_with(
+            "kubernetes.recover_killed_pods", 10.0, 16.0)
+        self.watch.watcher.stop.assert_called_once_with()
+        self.client.delete_statefulset.assert_called_once_with(
+            "set", namespace="ns")
+        title, rows = self.scenario.add_latency_output.call_args[0]
+        self.assertEqual("StatefulSet recovery latency", title)
+        self.assertEqual([("replacement created", [1.0, 4.0]),
+                          ("replacement ready", [3.0, 6.0]),
+                          ("all replicas ready", [6.0])], rows)
+
+    def test_run_daemonset_timeout(self):
+        self.client.create_daemonset.return_value = ("ds", "app")
+        self.client.list_nodes.return_value = ["node1", "node2"]
+        self.watch = fakes.FakeWatch(self.client, [
+            [("ADDED", fakes.pod("ds-a", uid="u0", ready=True), 5.0),
+             ("ADDED", fakes.pod("ds-b", uid="u1", ready=True), 5.0)]])
+
+        self.assertRaises(exceptions.TimeoutException, self.scenario.run,
+                          "test/image", "DaemonSet", kill_fraction=0.1)
+
+        self.client.watch.assert_called_once_with(
+            "pod", handler=mock.ANY, namespace="ns",
+            label_selector="app=app")
+        self.assertEqual(1, self.client.label_pod.call_count)
+        self.client.delete_pods.assert_called_once_with(
+            "ns", labels={"killed": "killed"}, grace_period_seconds=0)
+        self.watch.watcher.stop.assert_called_once_with()
+        self.client.delete_daemonset.assert_called_once_with(
+            "ds", namespace="ns")
+        self.assertFalse(self.scenario.add_latency_output.called)
@@ -0,0 +1,119 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+import mock
+from rally import exceptions
+
+from tests.unit import fakes
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import scaling
+
+
+class StepScalingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(StepScalingTestCase, self).setUp()
+        self.client = mock.MagicMock()
+        self.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+
+    def _scenario(self, cls, batches):
+        """Make scenario, its watchers deliver a batch of events per wait."""
+        scenario = cls(self.context)
+        scenario.client = self.client
+        scenario.generate_random_name = mock.MagicMock(return_value="label")
+        scenario.add_output = mock.MagicMock()
+        scenario.add_latency_output = mock.MagicMock()
+        self.watch = fakes.FakeWatch(self.client, batches)
+        return scenario
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.scaling.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 10.0)
+        self.client.create_replicaset.return_value = "rs"
+        scenario = self._scenario(scaling.CreateStepScaleAndDeleteReplicaSet, [
+            [("ADDED", fakes.pod("a"), 11.0),
+             ("MODIFIED", fakes.pod("a", ready=True), 12.0)],
+            [("ADDED", fakes.pod("b"), 21.0),
+             ("ADDED", fakes.pod("c"), 21.0),
+             ("MODIFIED", fakes.pod("c", ready=True), 23.0),
+             ("MODIFIED", fakes.pod("b", ready=True), 24.0)],
+            [("MODIFIED", fakes.pod("b", ready=True), 31.0),
+             ("MODIFIED", fakes.pod("b", ready=True,
+                                    deletion_timestamp="now"), 32.0),
+             ("MODIFIED", fakes.pod("c", ready=True,
+                                    deletion_timestamp="now"), 35.0),
+             ("MODIFIED", fakes.pod("b", deletion_timestamp="now"), 36.0),
+             ("DELETED", fakes.pod("b"), 38.0),
+             ("DELETED", fakes.pod("c"), 39.0)]])
+
+        scenario.run("test/image", 1, steps=[3, 1, 1])
+
+        self.client.watch.assert_called_once_with(
+            "pod", handler=mock.ANY, namespace="ns",
+            label_selector="scaling=label")
+        self.client.create_replicaset.assert_called_once_with(
+            namespace="ns", replicas=1, image="test/image", command=None,
+            labels={"scaling": "label"}, status_wait=False)
+        self.assertEqual(
+            [mock.call("rs", namespace="ns", replicas=r, status_wait=False)
+             for r in (3, 1, 1)],
+            self.client.scale_replicaset.call_args_list)
+        self.client.delete_replicaset.assert_called_once_with(
+            "rs", namespace="ns", status_wait=False)
+        self.client.delete_pods.assert_called_once_with(
+            "ns", labels={"scaling": "label"})
+        self.watch.watcher.stop.assert_called_once_with()
+        rows = scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([("step 0: 0 to 1 replicas", [2.0]),
+                          ("step 1: 1 to 3 replicas", [3.0, 4.0]),
+                          ("step 2: 3 to 1 replicas", [2.0, 5.0]),
+                          ("step 3: 1 to 1 replicas", [])], rows)
+        data = scenario.add_output.call_args[1]["complete"]["data"]
+        self.assertEqual(
+            [["time to target", [[0, 2.0], [1, 4.0], [2, 5.0], [3, 0.0]]],
+             ["median per pod", [[0, 2.0], [1, 3.5], [2, 3.5]]],
+             ["95%ile per pod", [[0, 2.0], [1, 3.95], [2, 4.85]]]], data)
+
+    def test_run_timeout(self):
+        self.client.create_rc.return_value = "rc"
+        scenario = self._scenario(scaling.CreateStepScaleAndDeleteRC, [])
+
+        self.assertRaises(exceptions.TimeoutException, scenario.run,
+                          "test/image", 2, steps=[4])
+
+        self.assertFalse(self.client.scale_rc.called)
+        self.client.delete_rc.assert_called_once_with(
+            "rc", namespace="ns", status_wait=False)
+        self.watch.watcher.stop.assert_called_once_with()
+        self.assertFalse(scenario.add_output.called)
+
+    def test_run_create_failed(self):
+        self.client.create_statefulset.side_effect = [Exception("Test")]
+        scenario = self._scenario(
+            scaling.CreateStepScaleAndDeleteStatefulSet, [])
+
+        self.assertRaises(Exception, scenario.run, "test/image", 2,
+                          steps=[4])
+
+        self.assertFalse(self.client.delete_statefulset.called)
+        self.assertFalse(self.client.delete_pods.called)
+        self.watch.watcher.stop.assert_called_once_with()
@@ -12,7 +12,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
+
+from kubernetes.client import rest
 import mock
+from rally import exceptions
 
 from tests.unit import test
 from xrally_kubernetes.tasks.scenarios import services
@@ -35,17 +39,31 @@ class PodWithClusterIPSvcTestCase(test.TestCase):
         self.scenario.generate_random_name = mock.MagicMock()
         self.scenario.generate_random_name.return_value = "testapp"
 
-    def test_create_and_delete_success_no_custom_endpoints(self):
-        addr = mock.MagicMock()
-        addr.ip = "10.0.0.5"
-        port = mock.MagicMock()
-        port.port = "3030"
-        subset = mock.MagicMock()
-        subset.addresses = [addr]
-        subset.ports = [port]
-        resp = mock.MagicMock()
-        resp.subsets = [subset]
-        self.client.get_endpoints.return_value = resp
+    def _mock_watch(self, ready=True):
+        pod = mock.MagicMock()
+        pod.status.pod_ip = "10.0.0.5"
+        pod.status.conditions = [mock.MagicMock(type="Ready", status="True")]
+        endpoint_slice = mock.MagicMock()
+        endpoint_slice.metadata.labels = {services.SERVICE_NAME_LABEL: "test"}
+        endpoint_slice.endpoints = [mock.MagicMock(
+            addresses=["10.0.0.5"], conditions=mock.MagicMock(ready=ready))]
+        endpoint_slice.ports = [mock.MagicMock(port=3030)]
+        self.watchers = []
+
+        def watch(kind, handler, namespace, label_selector, lock=None):
+            watcher = mock.MagicMock()
+            watcher.wait.side_effect = lambda predicate: predicate()
+            handler("ADDED", pod if kind == "pod" else endpoint_slice,
+                    10.0 if kind == "pod" else 10.5)
+            self.watchers.append(watcher)
+            return watcher
+
+        self.client.watch.side_effect = watch
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_create_and_delete_success_no_custom_endpoints(self, mock_time):
+        mock_time.time.return_value = 9.0
+        self._mock_watch()
         self.client.create_pod.return_value = "test"
 
         self.scenario.run(
@@ -74,10 +92,23 @@ class PodWithClusterIPSvcTestCase(test.TestCase):
             type="ClusterIP",
             labels={"app": "testapp"}
         )
-        self.client.get_endpoints.assert_called_once_with(
-            "test",
-            namespace="ns"
-        )
+        self.client.watch.assert_has_calls([
+            mock.call("pod", handler=mock.ANY, namespace="ns",
+                      label_selector="app=testapp"),
+            mock.call("endpointslice", handler=mock.ANY, namespace="ns",
+                      lock=self.watchers[0].lock,
+                      label_selector="kubernetes.io/service-name=test")])
+        calls = [c[0] for c in self.client.method_calls]
+        self.assertLess(calls.index("watch"), calls.index("create_pod"))
+        for watcher in self.watchers:
+            watcher.stop.assert_called_once_with()
+        self.assertEqual(
+            [{"name": "kubernetes.wait_for_endpoint_slice",
+              "children": [], "started_at": mock.ANY,
+              "finished_at": mock.ANY},
+             {"name": "kubernetes.pod_ready_to_endpoint",
+              "children": [], "started_at": 10.0, "finished_at": 10.5}],
+            self.scenario.atomic_actions())
         self.client.create_job.assert_called_once_with(
             name="test",
             namespace="ns",
@@ -168,6 +199,97 @@ class PodWithClusterIPSvcTestCase(test.TestCase):
             status_wait=True
         )
 
+    @mock.patch("rally.common.utils.interruptable_sleep")
+    def test_create_and_delete_with_prober(self, mock_sleep):
+        self._mock_watch()
+        self.scenario.context["kubernetes"]["probers"] = {"ns": "prober"}
+        self.scenario.add_output = mock.MagicMock()
+        self.client.create_pod.return_value = "test"
+        svc = mock.MagicMock()
+        svc.spec.cluster_ip = "10.96.0.10"
+        self.client.get_service.return_value = svc
+        self.client.probe_url.side_effect = [(0, 0.0), (200, 0.002)]
+
+        self.scenario.run(
+            "test/image",
+            port=80,
+            protocol="TCP",
+            request_timeout=3
+        )
+
+        self.client.probe_url.assert_called_with(
+            "prober",
+            namespace="ns",
+            url="http://10.96.0.10:80/",
+            request_timeout=3
+        )
+        self.assertEqual(2, self.client.probe_url.call_count)
+        self.client.create_job.assert_not_called()
+        self.client.get_endpoints.assert_not_called()
+        self.scenario.add_output.assert_called_once_with(additive={
+            "title": "ClusterIP service request",
+            "description": mock.ANY,
+            "chart_plugin": "Lines",
+            "data": [["request duration (sec)", 0.002], ["attempts", 2]],
+            "label": "Value",
+            "axis_label": "Iteration"})
+        self.client.delete_service.assert_called_once_with(
+            "test",
+            namespace="ns"
+        )
+        self.client.delete_pod.assert_called_once_with(
+            "test",
+            namespace="ns",
+            status_wait=True
+        )
+
+    @mock.patch("rally.common.utils.interruptable_sleep")
+    def test_create_and_delete_with_prober_custom_endpoints(self, mock_sleep):
+        self.scenario.context["kubernetes"]["probers"] = {"ns": "prober"}
+        self.scenario.add_output = mock.MagicMock()
+        resp = mock.MagicMock()
+        resp.status.pod_ip = "192.168.0.3"
+        self.client.get_pod.return_value = resp
+        self.client.create_pod.return_value = "test"
+        self.client.probe_url.return_value = (0, 0.0)
+
+        self.assertRaises(
+            exceptions.RallyException,
+            self.scenario.run,
+            "test/image",
+            port=80,
+            protocol="TCP",
+            custom_endpoint=True
+        )
+
+        self.client.create_endpoints.assert_called_once_with(
+            "test",
+            namespace="ns",
+            ip="192.168.0.3",
+            port=80
+        )
+        self.client.watch.assert_not_called()
+        self.client.create_job.assert_not_called()
+        self.client.delete_service.assert_not_called()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_create_and_delete_endpoints_timeout(self, mock_time):
+        mock_time.time.return_value = 9.0
+        self._mock_watch(ready=False)
+        self.client.create_pod.return_value = "test"
+
+        self.assertRaises(
+            exceptions.TimeoutException,
+            self.scenario.run,
+            "test/image",
+            port=80,
+            protocol="TCP"
+        )
+
+        for watcher in self.watchers:
+            watcher.stop.assert_called_once_with()
+        self.client.create_job.assert_not_called()
+
 
 class PodWithNodePortServiceTestCase(test.TestCase):
 
@@ -193,14 +315,16 @@ class PodWithNodePortServiceTestCase(test.TestCase):
         self.scenario.generate_random_name = mock.MagicMock()
         self.scenario.generate_random_name.return_value = "testapp"
 
-    @mock.patch("requests.get")
-    def test_create_and_delete_success(self, mock_requests):
+    @mock.patch("requests.Session")
+    def test_create_and_delete_success(self, mock_session):
+        session = mock_session.return_value
         port = mock.MagicMock()
         port.node_port = 30403
         svc = mock.MagicMock()
         svc.spec.ports = [port]
         self.client.get_service.return_value = svc
         self.client.create_pod.return_value = "test"
+        self.scenario.add_output = mock.MagicMock()
 
         self.scenario.run(
             "test/image",
@@ -231,7 +355,8 @@ class PodWithNodePortServiceTestCase(test.TestCase):
             "test",
             namespace="ns"
         )
-        mock_requests.assert_called_once_with("http://127.0.0.1:30403/")
+        session.get.assert_called_once_with("http://127.0.0.1:30403/")
+        session.mount.assert_called_once_with("http://", mock.ANY)
         self.client.delete_service.assert_called_once_with(
             "test",
             namespace="ns"
@@ -241,3 +366,314 @@ class PodWithNodePortServiceTestCase(test.TestCase):
             namespace="ns",
             status_wait=True
         )
+        table = self.scenario.add_output.call_args_list[0][1]["complete"]
+        self.assertEqual(
+            [["127.0.0.1", "http://127.0.0.1:30403/", mock.ANY, 1, ""]],
+            table["data"]["rows"])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    @mock.patch("rally.common.utils.interruptable_sleep")
+    @mock.patch("requests.Session")
+    def test_create_and_delete_all_nodes(self, mock_session, mock_sleep,
+                                         mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 0.5)
+        session = mock_session.return_value
+        urls = []
+
+        def get(url, **kwargs):
+            urls.append(url)
+            if urls.count(url) == 1 and url.startswith("http://10.0.0.2"):
+                raise services.requests.ConnectionError("refused")
+
+        session.get.side_effect = get
+        svc = mock.MagicMock()
+        svc.spec.ports = [mock.MagicMock(node_port=30403)]
+        self.client.get_service.return_value = svc
+        self.client.create_pod.return_value = "test"
+        self.client.list_node_addresses.return_value = {
+            "node1": "10.0.0.1", "node2": "10.0.0.2"}
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+        self.scenario.run("test/image", port=80, protocol="TCP",
+                          all_nodes=True, requests_per_node=2, workers=1,
+                          request_timeout=3)
+
+        self.client.list_node_addresses.assert_called_once_with(
+            address_type="InternalIP")
+        self.assertEqual(3, urls.count("http://10.0.0.1:30403/"))
+        self.assertEqual(4, urls.count("http://10.0.0.2:30403/"))
+        session.get.assert_called_with("http://10.0.0.2:30403/", timeout=3)
+        mock_sleep.assert_called_once_with(0.1)
+        rows = self.scenario.add_output.call_args_list[0][1]["complete"][
+            "data"]["rows"]
+        self.assertEqual(
+            [["node1", "http://10.0.0.1:30403/", 0.5, 1, ""],
+             ["node2", "http://10.0.0.2:30403/", 3.5, 2, ""]], rows)
+        self.assertEqual(
+            [["median", 2.0], ["max", 3.5]],
+            self.scenario.add_output.call_args_list[1][1]["additive"][
+                "data"])
+        self.scenario.add_latency_output.assert_called_once_with(
+            "NodePort steady-state request latency",
+            [("all nodes", [0.5, 0.5, 0.5, 0.5]),
+             ("node1", [0.5, 0.5]),
+             ("node2", [0.5, 0.5])])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    @mock.patch("rally.common.utils.interruptable_sleep")
+    @mock.patch("requests.Session")
+    def test_create_and_delete_unreachable(self, mock_session, mock_sleep,
+                                           mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1000.0)
+        session = mock_session.return_value
+        session.get.side_effect = services.requests.ConnectionError("nope")
+        svc = mock.MagicMock()
+        svc.spec.ports = [mock.MagicMock(node_port=30403)]
+        self.client.get_service.return_value = svc
+        self.client.create_pod.return_value = "test"
+        self.scenario.add_output = mock.MagicMock()
+
+        ex = self.assertRaises(exceptions.RallyException, self.scenario.run,
+                               "test/image", port=80, protocol="TCP",
+                               node_addresses=["10.0.0.1"])
+
+        self.assertIn("1 of 1 nodes: 10.0.0.1: nope", str(ex))
+        self.client.delete_service.assert_called_once_with(
+            "test",
+            namespace="ns"
+        )
+
+
+class ServiceWithBackendsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ServiceWithBackendsTestCase, self).setUp()
+        self.scenario = services.ServiceWithBackends()
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["backend", "svc1", "svc2"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.client.create_replicaset.return_value = "rs"
+
+    def _mock_watch(self, backends):
+        pods, slices = [], []
+        for i in range(backends):
+            pod = mock.MagicMock()
+            pod.status.pod_ip = "10.0.0.%s" % i
+            pod.status.conditions = [
+                mock.MagicMock(type="Ready", status="True")]
+            pods.append((pod, 10.0 + i))
+        for service in ("svc1", "svc2"):
+            endpoint_slice = mock.MagicMock()
+            endpoint_slice.metadata.labels = {
+                services.SERVICE_NAME_LABEL: service}
+            endpoint_slice.endpoints = [
+                mock.MagicMock(addresses=["10.0.0.%s" % i],
+                               conditions=mock.MagicMock(ready=True))
+                for i in range(backends)]
+            slices.append((endpoint_slice, 13.0))
+        self.watchers = []
+
+        def watch(kind, handler, namespace, label_selector, lock=None):
+            watcher = mock.MagicMock()
+            watcher.wait.side_effect = lambda predicate: predicate()
+            for obj, received_at in (pods if kind == "pod" else slices):
+                handler("ADDED", obj, received_at)
+            self.watchers.append(watcher)
+            return watcher
+
+        self.client.watch.side_effect = watch
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_run(self, mock_time):
+        mock_time.time.return_value = 9.0
+        self._mock_watch(backends=2)
+
+        self.scenario.run("test/image", backends=2, services=2,
+                          command=["sleep", "3600"])
+
+        self.client.watch.assert_has_calls([
+            mock.call("pod", handler=mock.ANY, namespace="ns",
+                      label_selector="backend=backend"),
+            mock.call("endpointslice", handler=mock.ANY, namespace="ns",
+                      lock=self.watchers[0].lock,
+                      label_selector="kubernetes.io/service-name in "
+                                     "(svc1,svc2)")])
+        self.client.create_service.assert_has_calls([
+            mock.call(name, namespace="ns", port=80, protocol="TCP",
+                      type="ClusterIP", labels={"backend": "backend"})
+            for name in ("svc1", "svc2")])
+        self.client.create_replicaset.assert_called_once_with(
+            namespace="ns", replicas=2, image="test/image",
+            command=["sleep", "3600"], labels={"backend": "backend"},
+            status_wait=False)
+        for watcher in self.watchers:
+            watcher.stop.assert_called_once_with()
+        self.client.delete_service.assert_has_calls([
+            mock.call("svc1", namespace="ns"),
+            mock.call("svc2", namespace="ns")], any_order=True)
+        self.client.delete_replicaset.assert_called_once_with(
+            "rs", namespace="ns", status_wait=False)
+
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Pod ready to endpoint latency",
+            [("kubernetes.pod_ready_to_endpoint", [3.0, 2.0, 3.0, 2.0])],
+            description="2 services with 2 backends")
+        throughput = self.scenario.add_output.call_args_list[0][1]
+        self.assertEqual([["endpoints per second", 4 / 3.0]],
+                         throughput["additive"]["data"])
+        series = self.scenario.add_output.call_args_list[1][1]
+        self.assertEqual([["ready pods", [[1.0, 1], [2.0, 1]]],
+                          ["published endpoints", [[4.0, 4]]]],
+                         series["complete"]["data"])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_run_timeout(self, mock_time):
+        mock_time.time.return_value = 9.0
+        self._mock_watch(backends=1)
+
+        self.assertRaises(exceptions.TimeoutException,
+                          self.scenario.run, "test/image", backends=2,
+                          services=2)
+
+        self.client.delete_replicaset.assert_called_once_with(
+            "rs", namespace="ns", status_wait=False)
+        self.scenario.add_output.assert_not_called()
+
+
+class ServiceReachabilityScalingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ServiceReachabilityScalingTestCase, self).setUp()
+        self.scenario = services.ServiceReachabilityScaling()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin",
+                "probers": {"ns": "prober"}
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["s1", "p1", "s2", "p2"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.client.create_pod.return_value = "backend"
+        self.client.get_pod.return_value.status.pod_ip = "10.0.0.5"
+        self.client.get_service.return_value.spec.cluster_ip = "10.96.0.1"
+
+    @staticmethod
+    def _stream(lines):
+        resp = mock.MagicMock()
+        resp.is_open.return_value = True
+        resp.readline_stdout.side_effect = lines
+        return resp
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 0.5)
+        streams = [
+            self._stream(["xrally:start 1000000000", "",
+                          "xrally:probe 1000000000 000",
+                          "xrally:probe 1500000000 200"]),
+            self._stream(["xrally:start 1000000000",
+                          "xrally:probe 1000000000 404"])]
+        self.client.exec_stream.side_effect = streams
+
+        self.scenario.run("test/image", checkpoints=[2, 1], probes=1,
+                          request_timeout=2)
+
+        self.client.create_pod.assert_called_once_with(
+            image="test/image", namespace="ns", command=None, port=80,
+            protocol="TCP", status_wait=True)
+        self.client.create_service.assert_has_calls(
+            [mock.call(name, namespace="ns", port=80, protocol="TCP",
+                       type="ClusterIP")
+             for name in ("s1", "p1", "s2", "p2")])
+        self.client.create_endpoints.assert_has_calls(
+            [mock.call(name, namespace="ns", ip="10.0.0.5", port=80)
+             for name in ("s1", "p1", "s2", "p2")])
+        self.client.exec_stream.assert_called_with(
+            "prober", namespace="ns", command=["/bin/sh", "-c", mock.ANY])
+        script = self.client.exec_stream.call_args[1]["command"][2]
+        self.assertIn("--max-time 2 http://10.96.0.1:80/", script)
+        self.assertIn("sleep 0.1", script)
+        for resp in streams:
+            resp.close.assert_called_once_with()
+        self.assertEqual(
+            set(["s1", "p1", "s2", "p2"]),
+            set(c[0][0] for c in self.client.delete_service.call_args_list))
+        self.client.delete_pod.assert_called_once_with(
+            "backend", namespace="ns", status_wait=False)
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Service create to reachable latency",
+            [("1 services", [1.5]), ("2 services", [1.0])],
+            description="Unreachable probe services: 0 at 1 services, "
+                        "0 at 2 services")
+        self.scenario.add_output.assert_called_once_with(complete={
+            "title": "Service reachability scaling",
+            "description": mock.ANY,
+            "chart_plugin": "Lines",
+            "data": [["median", [[1, 1.5], [2, 1.0]]],
+                     ["max", [[1, 1.5], [2, 1.0]]]],
+            "label": "Seconds",
+            "axis_label": "Number of services"})
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_run_unreachable(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1000.0)
+        resp = self._stream(["xrally:start 1000000000"])
+        self.client.exec_stream.return_value = resp
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", checkpoints=[1], probes=1)
+
+        resp.close.assert_called_once_with()
+        self.client.delete_service.assert_has_calls(
+            [mock.call("p1", namespace="ns"),
+             mock.call("s1", namespace="ns")])
+        self.client.delete_pod.assert_called_once_with(
+            "backend", namespace="ns", status_wait=False)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.services.time")
+    def test_run_stream_closed(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 0.5)
+        resp = self._stream(["xrally:start 1000000000",
+                             "xrally:probe 1000000000 000"])
+        resp.is_open.side_effect = [True, True, False]
+        self.client.exec_stream.return_value = resp
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", checkpoints=[1], probes=1)
+
+        resp.close.assert_called_once_with()
+
+    def test_run_create_failed(self):
+        self.scenario.generate_random_name.side_effect = ["s1", "s2", "s3"]
+        self.client.create_endpoints.side_effect = [
+            None, rest.ApiException(status=500), None]
+        self.client.delete_endpoints.side_effect = [
+            None, rest.ApiException(status=404), None]
+
+        self.assertRaises(rest.ApiException, self.scenario.run,
+                          "test/image", checkpoints=[3], workers=1)
+
+        self.assertFalse(self.client.exec_stream.called)
+        self.assertEqual(
+            ["s1", "s2", "s3"],
+            sorted(c[0][0] for c in self.client.delete_service.call_args_list))
+        self.client.delete_pod.assert_called_once_with(
+            "backend", namespace="ns", status_wait=False)
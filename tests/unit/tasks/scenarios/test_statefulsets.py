@@ -12,10 +12,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import itertools
+
 import mock
 
 from kubernetes.client import rest
+from rally import exceptions
 
+from tests.unit import fakes
 from tests.unit import test
 from xrally_kubernetes.tasks.scenarios import statefulsets
 
@@ -199,3 +203,97 @@ class CreateScaleAndDeleteStatefulSetTestCase(test.TestCase):
             status_wait=True
         )
         self.assertEqual(2, self.client.scale_statefulset.call_count)
+
+
+class CreateAndDeleteStatefulSetWithTimelineTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateAndDeleteStatefulSetWithTimelineTestCase, self).setUp()
+        self.scenario = statefulsets.CreateAndDeleteStatefulSetWithTimeline()
+        self.client = mock.MagicMock()
+        self.client.create_statefulset.return_value = "set"
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            return_value="label")
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.statefulsets.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 10.0)
+        self.watch = fakes.FakeWatch(self.client, [
+            [("ADDED", fakes.pod("set-0"), 11.0),
+             ("MODIFIED", fakes.pod("set-0", node="node"), 12.0),
+             ("MODIFIED", fakes.pod("set-0", node="node", ready=True), 15.0),
+             ("ADDED", fakes.pod("set-1"), 16.0),
+             ("MODIFIED", fakes.pod("set-1", node="node"), 18.0),
+             ("MODIFIED", fakes.pod("set-1", node="node", ready=True), 20.0)],
+            [("ADDED", fakes.pod("set-2", node="node"), 21.0),
+             ("MODIFIED", fakes.pod("set-2", node="node", ready=True), 24.0)]])
+        template = {"mount_path": "/data", "size": "1Gi"}
+
+        self.scenario.run("test/image", 2, scale_replicas=3,
+                          volume_claim_template=template)
+
+        self.client.watch.assert_called_once_with(
+            "pod", handler=mock.ANY, namespace="ns",
+            label_selector="statefulset=label")
+        self.client.create_statefulset.assert_called_once_with(
+            namespace="ns", replicas=2, image="test/image", command=None,
+            labels={"statefulset": "label"}, pod_management_policy=None,
+            volume_claim_template=template, status_wait=False)
+        self.client.scale_statefulset.assert_called_once_with(
+            "set", namespace="ns", replicas=3, status_wait=False)
+        self.client.delete_statefulset.assert_called_once_with(
+            "set", namespace="ns", status_wait=True)
+        self.client.delete_pvcs.assert_called_once_with(
+            "ns", labels={"statefulset": "label"})
+        self.watch.watcher.stop.assert_called_once_with()
+        rows = self.scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([("created to scheduled", [1.0, 2.0]),
+                          ("scheduled to ready", [3.0, 2.0]),
+                          ("ready to next ordinal created", [1.0]),
+                          ("created to scheduled, scaled", [0.0]),
+                          ("scheduled to ready, scaled", [3.0]),
+                          ("ready to next ordinal created, scaled", []),
+                          ("scale to last ordinal ready", [4.0])], rows)
+        data = self.scenario.add_output.call_args[1]["complete"]["data"]
+        self.assertEqual(
+            [["waiting for creation", [[0, 1.0], [1, 6.0], [2, 11.0]]],
+             ["created to scheduled", [[0, 1.0], [1, 2.0], [2, 0.0]]],
+             ["scheduled to ready", [[0, 3.0], [1, 2.0], [2, 3.0]]]], data)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.statefulsets.time")
+    def test_run_parallel_scale_down(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 10.0)
+        self.watch = fakes.FakeWatch(self.client, [
+            [("ADDED", fakes.pod("set-0", node="node"), 11.0),
+             ("ADDED", fakes.pod("set-1", node="node"), 11.0),
+             ("MODIFIED", fakes.pod("set-1", node="node", ready=True), 13.0),
+             ("MODIFIED", fakes.pod("set-0", node="node", ready=True), 14.0)],
+            [("DELETED", fakes.pod("set-1", node="node", ready=True), 21.0)]])
+
+        self.scenario.run("test/image", 2, scale_replicas=1,
+                          pod_management_policy="Parallel")
+
+        self.assertFalse(self.client.delete_pvcs.called)
+        rows = self.scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([("created to scheduled", [0.0, 0.0]),
+                          ("scheduled to ready", [3.0, 2.0])], rows)
+
+    def test_run_timeout(self):
+        self.watch = fakes.FakeWatch(self.client, [])
+
+        self.assertRaises(exceptions.TimeoutException, self.scenario.run,
+                          "test/image", 2)
+        self.client.delete_statefulset.assert_called_once_with(
+            "set", namespace="ns", status_wait=True)
+        self.watch.watcher.stop.assert_called_once_with()
+        self.assertFalse(self.scenario.add_output.called)
@@ -0,0 +1,184 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import itertools
+
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios import streams
+
+
+class StreamsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(StreamsTestCase, self).setUp()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.client.create_pod.return_value = "pod"
+        self.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+
+    def _scenario(self, cls):
+        scenario = cls()
+        scenario.client = self.client
+        scenario.context = self.context
+        scenario.add_output = mock.MagicMock()
+        scenario.add_latency_output = mock.MagicMock()
+        return scenario
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.streams.time")
+    def test_exec_streams_throughput(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1.0)
+        resp = self.client.exec_stream.return_value
+        resp.is_open.return_value = True
+        resp.read_stdout.side_effect = ["x" * 100, "", "x" * 50] * 10
+        scenario = self._scenario(streams.ExecStreamsThroughput)
+
+        scenario.run("busybox", streams=1, duration=5, line_size=10,
+                     lines_per_second=4)
+
+        self.client.create_pod.assert_called_once_with(
+            "busybox", namespace="ns",
+            command=["/bin/sh", "-c", streams.IDLE], status_wait=True)
+        command = self.client.exec_stream.call_args[1]["command"]
+        self.assertEqual(["/bin/sh", "-c"], command[:2])
+        self.assertIn("head -c 10 /dev/zero", command[2])
+        self.assertIn("sleep 0.25;", command[2])
+        # NOTE: opened at 11, reads until 16, chunks are received at 13
+        #   and 16
+        self.assertEqual(3, resp.read_stdout.call_count)
+        resp.close.assert_called_once_with()
+        self.client.delete_pod.assert_called_once_with(
+            "pod", namespace="ns", status_wait=False)
+        title, rows = scenario.add_latency_output.call_args[0]
+        self.assertEqual("Exec streams latency", title)
+        self.assertEqual([("session setup", [1.0]),
+                          ("time to first byte", [3.0]),
+                          ("read gap", [3.0])], rows)
+        data = scenario.add_output.call_args[1]["additive"]["data"]
+        self.assertEqual([["total", 50.0], ["min per stream", 50.0],
+                          ["median per stream", 50.0]], data)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.streams.time")
+    def test_log_streams_throughput(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1.0)
+        resp = self.client.log_stream.return_value
+        resp.readinto.side_effect = [64, 36, 0]
+        scenario = self._scenario(streams.LogStreamsThroughput)
+
+        scenario.run("busybox", streams=1, duration=10, buffer_size=64)
+
+        self.client.log_stream.assert_called_once_with(
+            "pod", namespace="ns", tail_lines=0, request_timeout=10)
+        self.assertEqual(3, resp.readinto.call_count)
+        bufs = [c[0][0] for c in resp.readinto.call_args_list]
+        self.assertEqual(bytearray(64), bufs[0])
+        # NOTE: the same buffer is reused by all reads of the stream
+        self.assertTrue(all(buf is bufs[0] for buf in bufs))
+        self.assertEqual([mock.call.close(), mock.call.release_conn()],
+                         [c for c in resp.mock_calls
+                          if c[0] in ("close", "release_conn")])
+        self.client.delete_pod.assert_called_once_with(
+            "pod", namespace="ns", status_wait=False)
+        rows = scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([("session setup", [1.0]),
+                          ("time to first byte", [3.0]),
+                          ("read gap", [2.0])], rows)
+        data = scenario.add_output.call_args[1]["additive"]["data"]
+        # NOTE: 100 bytes from the first chunk till the deadline at 21
+        self.assertEqual(["total", 12.5], data[0])
+
+    def test_log_streams_throughput_line_buffer(self):
+        resp = self.client.log_stream.return_value
+        resp.readinto.return_value = 0
+        scenario = self._scenario(streams.LogStreamsThroughput)
+
+        scenario.run("busybox", streams=1, duration=10, line_size=10)
+
+        self.assertEqual(bytearray(11), resp.readinto.call_args[0][0])
+
+    def test_log_streams_throughput_failed(self):
+        self.client.log_stream.side_effect = [Exception("Forbidden")]
+        scenario = self._scenario(streams.LogStreamsThroughput)
+
+        e = self.assertRaises(exceptions.RallyException, scenario.run,
+                              "busybox", streams=1, duration=1)
+
+        self.assertEqual("1 of 1 log streams failed: Forbidden",
+                         e.format_message())
+        self.client.delete_pod.assert_called_once_with(
+            "pod", namespace="ns", status_wait=False)
+        rows = scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([("session setup", []),
+                          ("time to first byte", []),
+                          ("read gap", [])], rows)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.streams.time")
+    def test_port_forward_throughput(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1.0)
+        session = self.client.port_forward.return_value
+        sock = session.socket.return_value
+        sock.recv_into.side_effect = lambda buf, size: size
+        scenario = self._scenario(streams.PortForwardThroughput)
+
+        scenario.run("alpine/socat", concurrency=[1], round_trips=2,
+                     message_size=8, bulk_size=100, buffer_size=64)
+
+        self.client.create_pod.assert_called_once_with(
+            "alpine/socat", namespace="ns",
+            command=["socat", "TCP-LISTEN:8080,fork,reuseaddr", "EXEC:cat"],
+            port=8080, protocol="TCP", status_wait=True)
+        self.client.port_forward.assert_called_once_with(
+            "pod", namespace="ns", ports=[8080])
+        session.socket.assert_called_once_with(8080)
+        sock.settimeout.assert_called_once_with(10)
+        self.assertEqual([mock.call(b"x" * 8)] * 3,
+                         sock.sendall.call_args_list[:3])
+        self.assertEqual([64, 36], [len(c[0][0]) for c in
+                                    sock.sendall.call_args_list[3:]])
+        session.close.assert_called_once_with()
+        self.client.delete_pod.assert_called_once_with(
+            "pod", namespace="ns", status_wait=False)
+        rows = scenario.add_latency_output.call_args[0][1]
+        self.assertEqual([("setup, 1 sessions", [1.0]),
+                          ("first round trip, 1 sessions", [1.0]),
+                          ("round trip, 1 sessions", [1.0, 1.0])], rows)
+        data = scenario.add_output.call_args[1]["complete"]["data"]
+        self.assertEqual([["total", [[1, 100.0]]],
+                          ["median per session", [[1, 100.0]]]], data)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.streams.time")
+    def test_port_forward_throughput_closed(self, mock_time):
+        mock_time.time.side_effect = itertools.count(10.0, 1.0)
+        session = self.client.port_forward.return_value
+        session.error.return_value = None
+        session.socket.return_value.recv_into.return_value = 0
+        scenario = self._scenario(streams.PortForwardThroughput)
+
+        e = self.assertRaises(exceptions.RallyException, scenario.run,
+                              "alpine/socat", concurrency=[2], bulk_size=0)
+
+        self.assertEqual("2 port-forward sessions failed: Port-forward "
+                         "connection is closed by server", e.format_message())
+        self.assertEqual(2, session.close.call_count)
+        self.client.delete_pod.assert_called_once_with(
+            "pod", namespace="ns", status_wait=False)
+        self.assertFalse(scenario.add_output.called)
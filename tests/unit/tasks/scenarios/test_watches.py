@@ -0,0 +1,155 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+import mock
+
+from tests.unit import test
+from xrally_kubernetes import service
+from xrally_kubernetes.tasks.scenarios import watches
+
+
+class WatchEventsFanOutTestCase(test.TestCase):
+
+    def setUp(self):
+        super(WatchEventsFanOutTestCase, self).setUp()
+        self.scenario = watches.WatchEventsFanOut()
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["fanout", "sync", "cm-0", "cm-1"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.watchers = []
+        self.client.watch.side_effect = self._watch
+
+    def _watch(self, kind, handler, **kwargs):
+        watcher = mock.Mock(error=None, relists=len(self.watchers))
+        delays = [1.0, 2.0] if self.watchers else [0.5]
+
+        def wait(predicate, timeout):
+            for name, written_at in list(self.scenario._writes) + [
+                    self.scenario._sync_key]:
+                obj = mock.Mock()
+                obj.metadata.name = name
+                obj.metadata.annotations = {
+                    watches.WatchEventsFanOut.ANNOTATION: written_at}
+                received_at = float(written_at)
+                if (name, written_at) != self.scenario._sync_key:
+                    received_at += delays.pop(0)
+                handler("MODIFIED", obj, received_at)
+                handler("MODIFIED", obj, received_at + 10)
+            return predicate()
+
+        watcher.wait.side_effect = wait
+        self.watchers.append(watcher)
+        return watcher
+
+    def test_writers(self):
+        for kind in watches.WRITERS:
+            self.assertIn(kind, service.Kubernetes.LIST_METHODS)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.watches.time")
+    def test_run(self, mock_time):
+        # NOTE: the last call is the end of delivery
+        mock_time.time.side_effect = [100.0] * 12 + [102.0]
+        mock_time.process_time.side_effect = [5.0, 6.5]
+
+        self.scenario.run(watchers=2, writes=2, rate=2, workers=1)
+
+        self.assertEqual(
+            [mock.call("configmap", handler=mock.ANY, timeout_seconds=60,
+                       namespace="ns", label_selector="fanout=fanout")] * 2,
+            self.client.watch.call_args_list)
+        self.client.create_configmap.assert_any_call(
+            "sync", namespace="ns", data={}, labels={"fanout": "fanout"},
+            annotations={"xrally.kubernetes/written-at": "100.000000"})
+        self.client.create_configmap.assert_any_call(
+            "cm-1", namespace="ns", data={}, labels={"fanout": "fanout"},
+            annotations={"xrally.kubernetes/written-at": "100.000000"})
+        mock_time.sleep.assert_called_once_with(0.5)
+        for watcher in self.watchers:
+            watcher.stop.assert_called_once_with()
+        self.client.delete_configmaps.assert_called_once_with(
+            "ns", labels={"fanout": "fanout"})
+
+        # the first watcher lost an event
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Watch events delivery latency",
+            [("kubernetes.watch_event_delivery", [0.5, 1.0, 2.0])],
+            description="2 watchers, 2 writes at 2 writes/s, 0 dropped "
+                        "watches, 1 lagged watches, 1 relists, 1 "
+                        "undelivered events, 0 write errors, client CPU "
+                        "load 0.75 of one core, the latency is "
+                        "client-bound if it's close to 1")
+        self.assertEqual(2, self.client.clone.call_count)
+        by_watcher = self.scenario.add_output.call_args_list[1][1]["complete"]
+        self.assertEqual([["median", [[0, 0.5], [1, 1.5]]],
+                          ["99%ile", [[0, 0.5], [1, 1.99]]]],
+                         by_watcher["data"])
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.watches.time")
+    def test_run_patch_all_namespaces(self, mock_time):
+        mock_time.time.side_effect = itertools.count(100)
+        mock_time.process_time.return_value = 1.0
+        self.client.patch_configmap.side_effect = [Exception("error"), None]
+
+        self.scenario.run(watchers=1, writes=2, rate=2, mode="patch",
+                          label_selector=False, all_namespaces=True,
+                          watch_timeout=5, workers=1)
+
+        self.client.watch.assert_called_once_with(
+            "configmap", handler=mock.ANY, timeout_seconds=5)
+        self.assertEqual(2, self.client.patch_configmap.call_count)
+        self.client.patch_configmap.assert_called_with(
+            "sync", namespace="ns",
+            annotations={"xrally.kubernetes/written-at": mock.ANY})
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Watch events delivery latency",
+            [("kubernetes.watch_event_delivery", [0.5])],
+            description="1 watchers, 2 writes at 2 writes/s, 0 dropped "
+                        "watches, 0 lagged watches, 0 relists, 0 "
+                        "undelivered events, 1 write errors, client CPU "
+                        "load 0.00 of one core, the latency is "
+                        "client-bound if it's close to 1")
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.watches.time")
+    def test_run_secrets(self, mock_time):
+        mock_time.time.side_effect = itertools.count(100)
+        mock_time.process_time.return_value = 1.0
+
+        self.scenario.run(watchers=1, writes=1, rate=1, kind="secret",
+                          workers=1)
+
+        self.client.watch.assert_called_once_with(
+            "secret", handler=mock.ANY, timeout_seconds=60, namespace="ns",
+            label_selector="fanout=fanout")
+        self.client.create_opaque_secret.assert_any_call(
+            "sync", namespace="ns", data={}, labels={"fanout": "fanout"},
+            annotations={"xrally.kubernetes/written-at": mock.ANY})
+        self.client.create_opaque_secret.assert_any_call(
+            "cm-0", namespace="ns", data={}, labels={"fanout": "fanout"},
+            annotations={"xrally.kubernetes/written-at": mock.ANY})
+        self.assertFalse(self.client.create_configmap.called)
+        self.client.delete_secrets.assert_called_once_with(
+            "ns", labels={"fanout": "fanout"})
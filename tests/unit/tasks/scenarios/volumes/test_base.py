@@ -0,0 +1,175 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes import service
+from xrally_kubernetes.tasks.scenarios.volumes import base
+
+
+FIO_OUTPUT = json.dumps({
+    "fio version": "fio-3.33",
+    "jobs": [{
+        "jobname": "xrally",
+        "read": {"io_bytes": 1048576, "bw_bytes": 2097152, "bw": 2048,
+                 "iops": 512.0,
+                 "clat_ns": {"mean": 1500000.0,
+                             "percentile": {"99.000000": 4000000}}},
+        "write": {"io_bytes": 0, "bw_bytes": 0, "iops": 0.0}
+    }]
+})
+
+
+class IOParsersTestCase(test.TestCase):
+
+    def test_parse_dd_output(self):
+        self.assertEqual(
+            {"bandwidth": 1048576.0, "iops": 256.0, "latency": 1 / 256.0,
+             "latency_p99": None},
+            base.parse_dd_output("256+0 records in\n256+0 records out\n"
+                                 "1048576 bytes (1.0MB) copied, 1.000000 "
+                                 "seconds, 1.0MB/s", 4096))
+
+    def test_parse_dd_output_no_summary(self):
+        self.assertIsNone(base.parse_dd_output("dd: unknown operand", 4096))
+        self.assertIsNone(base.parse_dd_output(
+            "0 bytes copied, 0 s, 0 B/s", 4096))
+
+    def test_parse_fio_output(self):
+        self.assertEqual(
+            {"read": {"bandwidth": 2097152, "iops": 512.0,
+                      "latency": 0.0015, "latency_p99": 0.004}},
+            base.parse_fio_output("fio: some warning\n" + FIO_OUTPUT + "\n"))
+
+    def test_parse_fio_output_old_format(self):
+        output = json.dumps({"jobs": [{"write": {"io_bytes": 1, "bw": 4,
+                                                 "iops": 1.0}}]})
+        self.assertEqual(
+            {"write": {"bandwidth": 4096, "iops": 1.0, "latency": 0.0,
+                       "latency_p99": None}},
+            base.parse_fio_output(output))
+
+    def test_parse_fio_output_invalid(self):
+        self.assertIsNone(base.parse_fio_output(""))
+        self.assertIsNone(base.parse_fio_output("fio: not found"))
+
+
+class PodWithVolumeBaseScenarioTestCase(test.TestCase):
+
+    def setUp(self):
+        super(PodWithVolumeBaseScenarioTestCase, self).setUp()
+        context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario = base.PodWithVolumeBaseScenario(context)
+        self.client = mock.MagicMock()
+        self.client.create_pod.return_value = "name"
+        self.scenario.client = self.client
+        self.scenario.add_output = mock.MagicMock()
+
+    def test_run_fio_benchmark(self):
+        self.client.exec_command.side_effect = [
+            service.ExecResult(0, None, FIO_OUTPUT),
+            service.ExecResult(0, None, "")]
+
+        self.scenario.run("test/image", name="name", mount_path="/data",
+                          check_cmd=["ls", "/data"],
+                          io_benchmark={"tool": "fio", "rw": "randread",
+                                        "direct": True, "runtime": 30,
+                                        "timeout": 60},
+                          volume_type="local PV")
+
+        self.client.check_volume_pod.assert_called_once_with(
+            "name", namespace="ns", check_cmd=["ls", "/data"],
+            error_regexp=None, shell_session=True)
+
+        command = self.client.exec_command.call_args_list[0][1]["command"]
+        self.assertEqual(
+            "fio --name=xrally --filename=/data/xrally-io --rw=randread "
+            "--bs=4096 --size=67108864 --iodepth=1 --ioengine=psync "
+            "--direct=1 --runtime=30 --time_based --output-format=json "
+            "--output=/tmp/xrally-fio.json && tr -d '\\n' < "
+            "/tmp/xrally-fio.json && echo", command)
+        self.assertEqual(60, self.client.exec_command.call_args_list[0][1][
+            "timeout"])
+        outputs = [c[1]["additive"] for c in
+                   self.scenario.add_output.call_args_list]
+        self.assertEqual("local PV I/O bandwidth", outputs[0]["title"])
+        self.assertEqual([["read", 2.0]], outputs[0]["data"])
+        self.assertEqual([["read", 512.0]], outputs[1]["data"])
+        self.assertEqual([["read mean", 1.5], ["read 99%ile", 4.0]],
+                         outputs[2]["data"])
+        self.assertEqual("randread by fio, 4096 bytes blocks",
+                         outputs[0]["description"])
+        self.client.delete_pod.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
+
+    def test_run_fio_benchmark_unparsed(self):
+        self.client.exec_command.return_value = service.ExecResult(
+            0, None, "garbage")
+
+        self.assertRaises(exceptions.RallyException, self.scenario.run,
+                          "test/image", mount_path="/data",
+                          io_benchmark={"tool": "fio"})
+        self.client.exec_command.assert_called_with(
+            "name", namespace="ns", command="rm -f /data/xrally-io")
+
+    def test_run_fio_benchmark_quoted(self):
+        self.client.exec_command.return_value = service.ExecResult(
+            0, None, FIO_OUTPUT)
+
+        self.scenario.run("test/image", mount_path="/data",
+                          io_benchmark={"tool": "fio", "rw": "read; reboot",
+                                        "ioengine": "$(reboot)",
+                                        "iodepth": "1 2", "runtime": "`x`"})
+
+        command = self.client.exec_command.call_args_list[0][1]["command"]
+        self.assertIn("--rw='read; reboot' --bs=4096 --size=67108864 "
+                      "--iodepth='1 2' --ioengine='$(reboot)' --direct=0 "
+                      "--runtime='`x`' --time_based ", command)
+
+    def test_run_dd_benchmark_direct(self):
+        self.client.exec_command.return_value = service.ExecResult(
+            0, None, "4096 bytes (4.1 kB) copied, 0.5 s, 8.2 kB/s")
+
+        self.scenario.run("test/image", mount_path="/data",
+                          io_benchmark={"size": 4096, "direct": True})
+
+        self.client.exec_command.assert_has_calls([
+            mock.call("name", namespace="ns",
+                      command="dd if=/dev/zero of=/data/xrally-io bs=4096 "
+                              "count=1 conv=fsync oflag=direct",
+                      timeout=None),
+            mock.call("name", namespace="ns",
+                      command="dd if=/data/xrally-io of=/dev/null bs=4096 "
+                              "iflag=direct", timeout=None)])
+
+    def test_run_check_without_shell_session(self):
+        self.scenario.run("test/image", name="name", check_cmd=["ls"],
+                          shell_session=False)
+
+        self.client.check_volume_pod.assert_called_once_with(
+            "name", namespace="ns", check_cmd=["ls"], error_regexp=None,
+            shell_session=False)
+        self.assertFalse(self.client.exec_command.called)
+        self.client.delete_pod.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
@@ -15,6 +15,7 @@
 import mock
 
 from kubernetes.client import rest
+from rally import exceptions
 
 from tests.unit import test
 from xrally_kubernetes.tasks.scenarios.volumes import configmap
@@ -171,7 +172,8 @@ class CreateCheckAndDeleteConfigMapVolumeTestCase(test.TestCase):
             "name",
             namespace="ns",
             check_cmd=["ls"],
-            error_regexp=None
+            error_regexp=None,
+            shell_session=True
         )
         self.client.delete_pod.assert_called_once_with(
             "name",
@@ -225,3 +227,80 @@ class CreateCheckAndDeleteConfigMapVolumeTestCase(test.TestCase):
         )
         self.client.check_volume_pod.assert_called_once()
         self.client.delete_pod.assert_called_once()
+
+
+class CreateUpdateAndDeleteConfigMapVolumeTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateUpdateAndDeleteConfigMapVolumeTestCase, self).setUp()
+        context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario = configmap.CreateUpdateAndDeletePodWithConfigMapVolume(
+            context)
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["name", "v0", "v1", "v2"])
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.client.create_pod.return_value = "name"
+        self.resp = self.client.exec_stream.return_value
+        self.resp.is_open.return_value = True
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.volumes.base.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = [
+            0, 0, 0, 1,               # initial content
+            10, 10, 10, 10, 10, 12,   # first update
+            20, 20, 20, 25            # second update
+        ]
+        self.resp.readline_stdout.side_effect = [
+            None, "xrally:v0", "", "xrally:v0\n", "xrally:v1", "xrally:v2"]
+
+        self.scenario.run("test/image", mount_path="/opt/check", updates=2,
+                          command=["sleep", "3600"], poll_interval=0.5)
+
+        self.client.create_configmap.assert_called_once_with(
+            "name", namespace="ns", data={"xrally-token": "v0"})
+        self.client.create_pod.assert_called_once_with(
+            "test/image",
+            name="name",
+            volume={
+                "mount_path": [{"mountPath": "/opt/check", "name": "name"}],
+                "volume": [{"name": "name", "configMap": {"name": "name"}}]
+            },
+            namespace="ns",
+            command=["sleep", "3600"],
+            status_wait=True
+        )
+        command = self.client.exec_stream.call_args[1]["command"]
+        self.assertIn("cat /opt/check/xrally-token", command[2])
+        self.assertIn("sleep 0.5", command[2])
+        self.assertEqual(
+            [mock.call("name", namespace="ns", data={"xrally-token": "v1"}),
+             mock.call("name", namespace="ns", data={"xrally-token": "v2"})],
+            self.client.patch_configmap.call_args_list)
+        self.resp.close.assert_called_once_with()
+        self.client.delete_pod.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
+        self.client.delete_configmap.assert_called_once_with(
+            "name", namespace="ns")
+        self.scenario.add_latency_output.assert_called_once_with(
+            "Volume update propagation",
+            [("kubernetes.propagate_volume_update", [2, 5])],
+            description=mock.ANY)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.volumes.base.time")
+    def test_run_timeout(self, mock_time):
+        mock_time.time.side_effect = [0, 1, 5]
+        self.resp.readline_stdout.return_value = "xrally:"
+
+        self.assertRaises(exceptions.TimeoutException, self.scenario.run,
+                          "test/image", mount_path="/opt/check", timeout=5)
+
+        self.resp.close.assert_called_once_with()
+        self.assertFalse(self.client.delete_pod.called)
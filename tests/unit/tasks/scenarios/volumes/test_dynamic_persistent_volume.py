@@ -0,0 +1,205 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import itertools
+
+import mock
+from rally import exceptions
+
+from tests.unit import test
+from xrally_kubernetes.tasks.scenarios.volumes import dynamic_persistent_volume
+
+
+def _claim(name, phase, volume_name=None):
+    claim = mock.MagicMock()
+    claim.metadata.name = name
+    claim.status.phase = phase
+    claim.spec.volume_name = volume_name
+    return claim
+
+
+def _pod(name, node_name, phase):
+    pod = mock.MagicMock()
+    pod.metadata.name = name
+    pod.spec.node_name = node_name
+    pod.status.phase = phase
+    return pod
+
+
+def _volume(name, claim, phase):
+    volume = mock.MagicMock()
+    volume.metadata.name = name
+    volume.spec.claim_ref.name = claim
+    volume.status.phase = phase
+    return volume
+
+
+class CreateAndDeletePodsWithDynamicPVCsTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateAndDeletePodsWithDynamicPVCsTestCase, self).setUp()
+        self.scenario = (
+            dynamic_persistent_volume.CreateAndDeletePodsWithDynamicPVCs())
+        self.client = mock.MagicMock()
+        self.client.clone.return_value = self.client
+        self.scenario.client = self.client
+        self.scenario.context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["set", "c1", "c2"])
+        self.scenario.add_output = mock.MagicMock()
+        self.scenario.add_latency_output = mock.MagicMock()
+
+    def _mock_watch(self, events):
+        """Deliver the next batch of events of the kind on each wait."""
+        self.watchers = {}
+
+        def watch(kind, handler, **kwargs):
+            watcher = mock.MagicMock()
+
+            def wait(predicate, timeout=None):
+                batches = events[kind]
+                for event_type, obj, received_at in (
+                        batches.pop(0) if batches else []):
+                    handler(event_type, obj, received_at)
+                return predicate()
+
+            watcher.wait.side_effect = wait
+            self.watchers[kind] = watcher
+            return watcher
+
+        self.client.watch.side_effect = watch
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.volumes."
+                "dynamic_persistent_volume.time")
+    def test_run(self, mock_time):
+        mock_time.time.side_effect = itertools.count(0.0, 1.0)
+        self._mock_watch({
+            "persistentvolumeclaim": [[
+                ("MODIFIED", _claim("c1", "Bound", "pv1"), 5.0),
+                ("MODIFIED", _claim("c2", "Bound", "pv2"), 7.0)]],
+            "pod": [
+                [("MODIFIED", _pod("c1", "node", "Pending"), 5.0),
+                 ("MODIFIED", _pod("c2", "node", "Pending"), 6.0),
+                 ("MODIFIED", _pod("c2", "node", "Running"), 7.0),
+                 ("MODIFIED", _pod("c1", "node", "Running"), 8.0)],
+                [("DELETED", _pod("c1", "node", "Running"), 9.0),
+                 ("DELETED", _pod("c2", "node", "Running"), 9.0)]],
+            "persistentvolume": [[
+                ("MODIFIED", _volume("pv2", "c2", "Released"), 6.0),
+                ("MODIFIED", _volume("other", "x", "Released"), 6.0),
+                ("DELETED", _volume("pv1", "c1", "Released"), 10.0)]]})
+
+        self.scenario.run("standard", "test/image", claims=2,
+                          command=["sleep", "3600"], workers=1)
+
+        self.client.watch.assert_has_calls([
+            mock.call("persistentvolumeclaim", handler=mock.ANY,
+                      namespace="ns", label_selector="claims=set"),
+            mock.call("pod", handler=mock.ANY, namespace="ns",
+                      label_selector="claims=set"),
+            mock.call("persistentvolume", handler=mock.ANY)])
+        self.client.create_pvc.assert_has_calls([
+            mock.call(name, namespace="ns", storage_class="standard",
+                      access_modes=["ReadWriteOnce"], size="1Gi",
+                      volume_mode=None, labels={"claims": "set"})
+            for name in ("c1", "c2")])
+        self.client.create_pod.assert_has_calls([
+            mock.call("test/image", namespace="ns", name=name,
+                      command=["sleep", "3600"],
+                      volume={"mount_path": [{"mountPath": "/data",
+                                              "name": "data"}],
+                              "volume": [{"name": "data",
+                                          "persistentVolumeClaim": {
+                                              "claimName": name}}]},
+                      labels={"claims": "set"}, status_wait=False)
+            for name in ("c1", "c2")])
+        self.client.delete_pod.assert_has_calls([
+            mock.call(name, namespace="ns", status_wait=False)
+            for name in ("c1", "c2")])
+        self.client.delete_pvc.assert_has_calls([
+            mock.call(name, namespace="ns") for name in ("c1", "c2")])
+        for watcher in self.watchers.values():
+            watcher.stop.assert_called_once_with()
+        rows = self.scenario.add_latency_output.call_args[0][1]
+        self.assertEqual(
+            [("provision (create to Bound)", [4.0, 5.0]),
+             ("attach and mount (Scheduled to Running)", [3.0, 1.0]),
+             ("reclaim (claim delete to volume released)", [7.0, 2.0])],
+            rows)
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.volumes."
+                "dynamic_persistent_volume.time")
+    def test_run_not_bound(self, mock_time):
+        mock_time.time.side_effect = itertools.count(0.0, 1.0)
+        self._mock_watch({"persistentvolumeclaim": [], "pod": [],
+                          "persistentvolume": []})
+        self.client.create_pod.side_effect = [None, Exception("Quota")]
+
+        self.assertRaises(Exception, self.scenario.run, "standard",
+                          "test/image", claims=2, workers=1)
+
+        self.client.delete_pod.assert_called_once_with(
+            "c1", namespace="ns", status_wait=False)
+        self.client.delete_pvc.assert_has_calls([
+            mock.call(name, namespace="ns") for name in ("c1", "c2")])
+        for watcher in self.watchers.values():
+            watcher.stop.assert_called_once_with()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.volumes."
+                "dynamic_persistent_volume.time")
+    def test_run_pods_not_deleted(self, mock_time):
+        mock_time.time.side_effect = itertools.count(0.0, 1.0)
+        self._mock_watch({
+            "persistentvolumeclaim": [[
+                ("MODIFIED", _claim("c1", "Bound", "pv1"), 5.0)]],
+            "pod": [[("MODIFIED", _pod("c1", "node", "Running"), 6.0)]],
+            "persistentvolume": []})
+        self.scenario.generate_random_name.side_effect = ["set", "c1"]
+
+        ex = self.assertRaises(exceptions.TimeoutException,
+                               self.scenario.run, "standard", "test/image")
+
+        self.assertIn("0 of 1 pods deleted", str(ex))
+        self.client.delete_pvc.assert_called_once_with("c1", namespace="ns")
+        self.watchers["persistentvolume"].wait.assert_not_called()
+        self.scenario.add_latency_output.assert_not_called()
+
+    @mock.patch("xrally_kubernetes.tasks.scenarios.volumes."
+                "dynamic_persistent_volume.time")
+    def test_run_not_reclaimed(self, mock_time):
+        mock_time.time.side_effect = itertools.count(0.0, 1.0)
+        self._mock_watch({
+            "persistentvolumeclaim": [[
+                ("MODIFIED", _claim("c1", "Bound", "pv1"), 5.0)]],
+            "pod": [[("MODIFIED", _pod("c1", "node", "Running"), 6.0)],
+                    [("DELETED", _pod("c1", "node", "Running"), 7.0)]],
+            "persistentvolume": []})
+        self.scenario.generate_random_name.side_effect = ["set", "c1"]
+
+        ex = self.assertRaises(exceptions.TimeoutException,
+                               self.scenario.run, "standard", "test/image",
+                               volume_mode="Block")
+
+        volume = self.client.create_pod.call_args[1]["volume"]
+        self.assertEqual([], volume["mount_path"])
+        self.assertEqual([{"devicePath": "/data", "name": "data"}],
+                         volume["devices"])
+        self.assertIn("0 of 1 volumes reclaimed", str(ex))
+        self.assertTrue(self.scenario.add_latency_output.called)
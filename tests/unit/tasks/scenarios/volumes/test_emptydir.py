@@ -15,8 +15,10 @@
 import mock
 
 from kubernetes.client import rest
+from rally import exceptions
 
 from tests.unit import test
+from xrally_kubernetes import service
 from xrally_kubernetes.tasks.scenarios.volumes import emptydir
 
 
@@ -157,7 +159,8 @@ class CreateCheckAndDeleteEmptyDirVolumeTestCase(test.TestCase):
             "name",
             namespace="ns",
             check_cmd=["ls"],
-            error_regexp=None
+            error_regexp=None,
+            shell_session=True
         )
         self.client.delete_pod.assert_called_once_with(
             "name",
@@ -205,3 +208,79 @@ class CreateCheckAndDeleteEmptyDirVolumeTestCase(test.TestCase):
         )
         self.client.check_volume_pod.assert_called_once()
         self.client.delete_pod.assert_called_once()
+
+
+class CreateBenchmarkAndDeleteEmptyDirVolumeTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateBenchmarkAndDeleteEmptyDirVolumeTestCase, self).setUp()
+        context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario = emptydir.CreateAndDeletePodWithEmptyDirVolume(context)
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.generate_random_name = mock.MagicMock()
+        self.scenario.generate_random_name.return_value = "name"
+        self.scenario.add_output = mock.MagicMock()
+
+    def test_create_benchmark_and_delete_memory_medium(self):
+        self.client.create_pod.return_value = "name"
+        self.client.exec_command.side_effect = [
+            service.ExecResult(0, None, "2048+0 records in\n2048+0 records "
+                                        "out\n8388608 bytes (8.0MB) copied, "
+                                        "0.5 seconds, 16.0MB/s"),
+            service.ExecResult(0, None, "8388608 bytes (8.4 MB, 8.0 MiB) "
+                                        "copied, 0.25 s, 34 MB/s"),
+            service.ExecResult(0, None, "")]
+
+        self.scenario.run("test/image", mount_path="/opt/check",
+                          medium="Memory",
+                          io_benchmark={"size": 8388608, "block_size": 4096})
+
+        volume = self.client.create_pod.call_args[1]["volume"]
+        self.assertEqual({"medium": "Memory"},
+                         volume["volume"][0]["emptyDir"])
+        self.client.exec_command.assert_has_calls([
+            mock.call("name", namespace="ns",
+                      command="dd if=/dev/zero of=/opt/check/xrally-io "
+                              "bs=4096 count=2048 conv=fsync", timeout=None),
+            mock.call("name", namespace="ns",
+                      command="dd if=/opt/check/xrally-io of=/dev/null "
+                              "bs=4096", timeout=None),
+            mock.call("name", namespace="ns",
+                      command="rm -f /opt/check/xrally-io")])
+        outputs = [c[1]["additive"] for c in
+                   self.scenario.add_output.call_args_list]
+        self.assertEqual(["emptyDir (Memory) I/O bandwidth",
+                          "emptyDir (Memory) I/O IOPS",
+                          "emptyDir (Memory) I/O latency"],
+                         [o["title"] for o in outputs])
+        self.assertEqual([["read", 32.0], ["write", 16.0]],
+                         outputs[0]["data"])
+        self.assertEqual([["read", 8192.0], ["write", 4096.0]],
+                         outputs[1]["data"])
+        self.client.delete_pod.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
+
+    def test_create_benchmark_failed(self):
+        self.client.create_pod.return_value = "name"
+        self.client.exec_command.return_value = service.ExecResult(
+            1, None, "dd: can't open '/opt/check/xrally-io': Read-only")
+
+        e = self.assertRaises(exceptions.RallyException, self.scenario.run,
+                              "test/image", mount_path="/opt/check",
+                              io_benchmark={"tool": "dd"})
+        self.assertIn("Read-only", e.format_message())
+        self.assertEqual(0, self.client.delete_pod.call_count)
+
+    def test_unknown_tool(self):
+        self.assertRaises(exceptions.InvalidArgumentsException,
+                          self.scenario.run, "test/image",
+                          mount_path="/opt/check",
+                          io_benchmark={"tool": "bonnie"})
+        self.assertEqual(0, self.client.create_pod.call_count)
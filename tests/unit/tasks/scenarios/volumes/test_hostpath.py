@@ -171,7 +171,8 @@ class CreateCheckAndDeleteHostPathVolumeTestCase(test.TestCase):
             "name",
             namespace="ns",
             check_cmd=["ls"],
-            error_regexp=None
+            error_regexp=None,
+            shell_session=True
         )
         self.client.delete_pod.assert_called_once_with(
             "name",
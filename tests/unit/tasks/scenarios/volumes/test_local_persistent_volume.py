@@ -15,8 +15,10 @@
 import mock
 
 from kubernetes.client import rest
+from rally import exceptions
 
 from tests.unit import test
+from xrally_kubernetes.tasks.contexts import local_pv_pool
 from xrally_kubernetes.tasks.scenarios.volumes import local_persistent_volume
 
 
@@ -346,7 +348,8 @@ class CreateCheckAndDeleteLocalPVVolumeTestCase(test.TestCase):
             "name",
             namespace="ns",
             check_cmd=["ls", "/opt/check"],
-            error_regexp="No such file"
+            error_regexp="No such file",
+            shell_session=True
         )
         self.client.delete_pod.assert_called_once_with(
             "name",
@@ -516,3 +519,118 @@ class CreateCheckAndDeleteLocalPVVolumeTestCase(test.TestCase):
         ]
         self.assertRaises(rest.ApiException, self.scenario.run, **kwargs)
         self.client.check_volume_pod.assert_called_once()
+
+    def test_create_and_delete_with_pool(self):
+        pool = local_pv_pool.LocalPVPool()
+        pool.add("pv1")
+        pool.add("pv2")
+        self.assertEqual("pv1", pool.acquire(timeout=0))
+        self.scenario.context["kubernetes"]["local_pv_pool"] = pool
+        self.client.create_pod.return_value = "name"
+
+        self.scenario.run(
+            "test/image",
+            mount_path="/opt/check",
+            persistent_volume_claim={
+                "size": "1Gi",
+                "access_modes": ["ReadWriteOnly"]
+            },
+            status_wait=False
+        )
+
+        self.assertFalse(self.client.create_local_pv.called)
+        self.client.create_local_pvc.assert_called_once_with(
+            "name",
+            namespace="ns",
+            storage_class="local",
+            access_modes=["ReadWriteOnly"],
+            size="1Gi",
+            volume_name="pv2"
+        )
+        self.client.get_local_pv.assert_called_once_with("pv2")
+        self.client.delete_local_pvc.assert_called_once_with(
+            "name",
+            namespace="ns",
+            status_wait=True
+        )
+        self.client.release_local_pv.assert_called_once_with("pv2")
+        self.assertFalse(self.client.delete_local_pv.called)
+        self.assertEqual("pv2", pool.acquire(timeout=0))
+        self.assertIsNone(pool.acquire(timeout=0))
+
+    def test_create_pod_failed_with_pool(self):
+        pool = local_pv_pool.LocalPVPool()
+        pool.add("pv1")
+        self.scenario.context["kubernetes"]["local_pv_pool"] = pool
+        self.client.create_pod.side_effect = [
+            rest.ApiException(status=500, reason="Test")]
+        self.client.delete_pod.side_effect = [
+            rest.ApiException(status=404, reason="Not found")]
+
+        self.assertRaises(
+            rest.ApiException, self.scenario.run,
+            "test/image",
+            mount_path="/opt/check",
+            persistent_volume_claim={
+                "size": "1Gi",
+                "access_modes": ["ReadWriteOnly"]
+            }
+        )
+
+        self.client.delete_pod.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
+        self.client.delete_local_pvc.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
+        self.client.release_local_pv.assert_called_once_with("pv1")
+        self.assertEqual("pv1", pool.acquire(timeout=0))
+
+    def test_create_pod_failed_with_pool_cleanup_failed(self):
+        pool = local_pv_pool.LocalPVPool()
+        pool.add("pv1")
+        self.scenario.context["kubernetes"]["local_pv_pool"] = pool
+        self.client.create_pod.side_effect = [
+            rest.ApiException(status=500, reason="Test")]
+        self.client.delete_local_pvc.side_effect = [
+            rest.ApiException(status=500, reason="Test")]
+
+        self.assertRaises(
+            rest.ApiException, self.scenario.run,
+            "test/image",
+            mount_path="/opt/check",
+            persistent_volume_claim={
+                "size": "1Gi",
+                "access_modes": ["ReadWriteOnly"]
+            }
+        )
+
+        self.assertFalse(self.client.release_local_pv.called)
+        self.assertIsNone(pool.acquire(timeout=0))
+
+    def test_create_with_exhausted_pool(self):
+        pool = mock.MagicMock()
+        pool.acquire.return_value = None
+        self.scenario.context["kubernetes"]["local_pv_pool"] = pool
+
+        self.assertRaises(
+            exceptions.TimeoutException, self.scenario.run,
+            "test/image",
+            mount_path="/opt/check",
+            persistent_volume_claim={
+                "size": "1Gi",
+                "access_modes": ["ReadWriteOnly"]
+            }
+        )
+        pool.acquire.assert_called_once_with(timeout=mock.ANY)
+        self.assertFalse(self.client.create_local_pvc.called)
+
+    def test_create_without_persistent_volume(self):
+        self.assertRaises(
+            exceptions.InvalidArgumentsException, self.scenario.run,
+            "test/image",
+            mount_path="/opt/check",
+            persistent_volume_claim={
+                "size": "1Gi",
+                "access_modes": ["ReadWriteOnly"]
+            }
+        )
+        self.assertFalse(self.client.create_local_pvc.called)
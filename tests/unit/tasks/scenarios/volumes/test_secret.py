@@ -163,7 +163,8 @@ class CreateCheckAndDeleteSecretVolumeTestCase(test.TestCase):
             "name",
             namespace="ns",
             check_cmd=["ls"],
-            error_regexp=None
+            error_regexp=None,
+            shell_session=True
         )
         self.client.delete_pod.assert_called_once_with(
             "name",
@@ -213,3 +214,46 @@ class CreateCheckAndDeleteSecretVolumeTestCase(test.TestCase):
         )
         self.client.check_volume_pod.assert_called_once()
         self.client.delete_pod.assert_called_once()
+
+
+class CreateUpdateAndDeleteSecretVolumeTestCase(test.TestCase):
+
+    def setUp(self):
+        super(CreateUpdateAndDeleteSecretVolumeTestCase, self).setUp()
+        context = {
+            "iteration": 1,
+            "kubernetes": {
+                "namespaces": ["ns"],
+                "namespace_choice_method": "round_robin"
+            }
+        }
+        self.scenario = secret.CreateUpdateAndDeletePodWithSecretVolume(
+            context)
+        self.client = mock.MagicMock()
+        self.scenario.client = self.client
+        self.scenario.generate_random_name = mock.MagicMock(
+            side_effect=["name", "v0", "v1"])
+        self.scenario.add_latency_output = mock.MagicMock()
+        self.client.create_pod.return_value = "name"
+        self.resp = self.client.exec_stream.return_value
+        self.resp.is_open.return_value = True
+
+    def test_run(self):
+        self.resp.readline_stdout.side_effect = ["xrally:v0", "xrally:v1"]
+
+        self.scenario.run("test/image", mount_path="/opt/check", updates=1)
+
+        self.client.create_opaque_secret.assert_called_once_with(
+            "name", namespace="ns", data={"xrally-token": "djA="})
+        volume = self.client.create_pod.call_args[1]["volume"]
+        self.assertEqual([{"name": "name", "secret": {"secretName": "name"}}],
+                         volume["volume"])
+        self.client.patch_secret.assert_called_once_with(
+            "name", namespace="ns", data={"xrally-token": "djE="})
+        self.resp.close.assert_called_once_with()
+        self.client.delete_pod.assert_called_once_with(
+            "name", namespace="ns", status_wait=True)
+        self.client.delete_secret.assert_called_once_with(
+            "name", namespace="ns")
+        latencies = self.scenario.add_latency_output.call_args[0][1]
+        self.assertEqual(1, len(latencies[0][1]))
@@ -115,3 +115,121 @@ class MapKeysParameterValidatorTestCase(test.TestCase):
             None, None)
         self.assertEqual("Parameter 'testarg' contains unallowed keys: test3, "
                          "test4", str(ex))
+
+
+class IndexedJobCompletionsValidatorTestCase(test.TestCase):
+    def test_validate(self):
+        validator = validators.IndexedJobCompletionsValidator()
+        for args in ({}, {"completion_mode": "NonIndexed"},
+                     {"completion_mode": "Indexed", "completions": 3}):
+            self.assertIsNone(
+                validator.validate(None, {"args": args}, None, None))
+
+        msg = self.assertRaises(
+            validators.validation.ValidationError,
+            validator.validate, None, {"args": {"completion_mode": "Indexed"}},
+            None, None)
+        self.assertEqual("'completions' parameter is required for Indexed "
+                         "completion mode", str(msg))
+
+
+class NumberListValidatorTestCase(test.TestCase):
+    def test_validate(self):
+        validator = validators.NumberListValidator("steps", minval=0,
+                                                   integer_only=True)
+        self.assertIsNone(
+            validator.validate(None, {"args": {"steps": [0, 3]}}, None, None))
+        self.assertIsNone(validators.NumberListValidator("steps").validate(
+            None, {"args": {"steps": [-1, 0.5]}}, None, None))
+
+        for steps, msg in (
+                (None, "'steps' parameter should be a non-empty list, "
+                       "found None"),
+                ([], "'steps' parameter should be a non-empty list, "
+                     "found []"),
+                ([1, -1], "'steps' parameter contains -1, which is not an "
+                          "integer >= 0"),
+                ([1, 1.5], "'steps' parameter contains 1.5, which is not an "
+                           "integer >= 0"),
+                ([True], "'steps' parameter contains True, which is not an "
+                         "integer >= 0")):
+            ex = self.assertRaises(
+                validators.validation.ValidationError, validator.validate,
+                None, {"args": {"steps": steps}}, None, None)
+            self.assertEqual(msg, str(ex))
+
+
+class IOBenchmarkValidatorTestCase(test.TestCase):
+    def test_validate(self):
+        validator = validators.IOBenchmarkValidator()
+        for args in ({}, {"io_benchmark": None},
+                     {"io_benchmark": {"tool": "fio", "rw": "randread",
+                                       "ioengine": "libaio", "iodepth": 16,
+                                       "block_size": 4096, "size": 1024,
+                                       "runtime": 30, "timeout": 0.5}}):
+            self.assertIsNone(
+                validator.validate(None, {"args": args}, None, None))
+
+    def test_validate_enum(self):
+        validator = validators.IOBenchmarkValidator()
+        msg = self.assertRaises(
+            validators.validation.ValidationError,
+            validator.validate, None,
+            {"args": {"io_benchmark": {"rw": "read; reboot"}}}, None, None)
+        self.assertEqual(
+            "'rw' of 'io_benchmark' parameter is read; reboot, it should be "
+            "one of: read, write, randread, randwrite, rw, readwrite, randrw",
+            str(msg))
+
+    def test_validate_integers(self):
+        validator = validators.IOBenchmarkValidator()
+        for value in ("1 2", 0, 1.5, True):
+            msg = self.assertRaises(
+                validators.validation.ValidationError,
+                validator.validate, None,
+                {"args": {"io_benchmark": {"iodepth": value}}}, None, None)
+            self.assertEqual(
+                "'iodepth' of 'io_benchmark' parameter is %s, it should be "
+                "a positive integer" % value, str(msg))
+
+        msg = self.assertRaises(
+            validators.validation.ValidationError,
+            validator.validate, None,
+            {"args": {"io_benchmark": {"timeout": "1"}}}, None, None)
+        self.assertEqual("'timeout' of 'io_benchmark' parameter is 1, it "
+                         "should be a positive number", str(msg))
+
+
+class SingleProcessRunnerValidatorTestCase(test.TestCase):
+    def test_validate(self):
+        validator = validators.SingleProcessRunnerValidator(
+            contexts=["local_pv_pool"])
+        pool = {"local_pv_pool": {}}
+        for config in (
+                {"contexts": {}, "runner_type": "rps",
+                 "runner": {"rps": 5}},
+                {"contexts": pool, "runner_type": "serial", "runner": {}},
+                {"contexts": pool, "runner_type": "rps",
+                 "runner": {"rps": 5, "max_cpu_count": 1}},
+                {"contexts": pool, "runner_type": "constant",
+                 "runner": {"times": 5}},
+                {"contexts": pool,
+                 "runner": {"type": "constant", "concurrency": 1}}):
+            self.assertIsNone(validator.validate(None, config, None, None))
+
+    def test_validate_failed(self):
+        validator = validators.SingleProcessRunnerValidator(
+            contexts=["local_pv_pool"])
+        for runner_type, runner in (("constant", {"concurrency": 2}),
+                                    ("rps", {"rps": 5}),
+                                    ("rps", {"rps": 5, "max_cpu_count": 2})):
+            msg = self.assertRaises(
+                validators.validation.ValidationError,
+                validator.validate, None,
+                {"contexts": {"local_pv_pool": {}},
+                 "runner_type": runner_type, "runner": runner},
+                None, None)
+            self.assertEqual(
+                "local_pv_pool context requires a single runner process, "
+                "use serial runner or set max_cpu_count of the runner to 1",
+                str(msg))
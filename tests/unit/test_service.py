@@ -533,6 +533,60 @@ class PodTestCase(KubernetesServiceTestCase):
             namespace="ns"
         )
 
+    def test_create_pod_with_node(self):
+        self.k8s_client.generate_random_name = mock.MagicMock()
+        self.k8s_client.generate_random_name.return_value = "name"
+        self.k8s_client.create_pod(
+            image="test/image",
+            namespace="ns",
+            node_name="node-1",
+            node_selector={"disk": "ssd"},
+            status_wait=False)
+
+        expected = {
+            "apiVersion": "v1",
+            "kind": "Pod",
+            "metadata": {
+                "name": "name",
+                "labels": {
+                    "role": "name"
+                }
+            },
+            "spec": {
+                "nodeName": "node-1",
+                "nodeSelector": {"disk": "ssd"},
+                "containers": [
+                    {
+                        "name": "name",
+                        "image": "test/image"
+                    }
+                ]
+            }
+        }
+        self.client.create_namespaced_pod.assert_called_once_with(
+            body=expected,
+            namespace="ns"
+        )
+
+    def test_create_pod_with_block_device(self):
+        self.k8s_client.create_pod(
+            image="test/image",
+            namespace="ns",
+            name="name",
+            volume={
+                "mount_path": [],
+                "devices": [{"devicePath": "/dev/xvda", "name": "data"}],
+                "volume": [{"name": "data",
+                            "persistentVolumeClaim": {"claimName": "c"}}]
+            },
+            status_wait=False)
+
+        body = self.client.create_namespaced_pod.call_args[1]["body"]
+        container = body["spec"]["containers"][0]
+        self.assertNotIn("volumeMounts", container)
+        self.assertEqual([{"devicePath": "/dev/xvda", "name": "data"}],
+                         container["volumeDevices"])
+
     def test_create_pod_with_incorrect_command(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -815,6 +869,22 @@ class ReplicationControllerTestCase(KubernetesServiceTestCase):
                 namespace="ns"
             ))
 
+    def test_create_replication_controller_with_labels(self):
+        self.k8s_client.generate_random_name = mock.MagicMock()
+        self.k8s_client.generate_random_name.return_value = "name"
+        self.k8s_client.create_rc(
+            image="test/image",
+            replicas=2,
+            namespace="ns",
+            labels={"scaling": "test"},
+            status_wait=False)
+
+        body = self.client.create_namespaced_replication_controller.call_args[
+            1]["body"]
+        self.assertEqual({"app": "name", "scaling": "test"},
+                         body["spec"]["template"]["metadata"]["labels"])
+        self.assertEqual({"app": "name"}, body["spec"]["selector"])
+
     def test_create_replication_controller_with_command(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -991,6 +1061,16 @@ class ReplicationControllerTestCase(KubernetesServiceTestCase):
             self.client.read_namespaced_replication_controller.call_count
         )
 
+    def test_scale_replication_controller(self):
+        self.k8s_client.scale_rc("test", namespace="ns", replicas=3,
+                                 status_wait=False)
+
+        (self.client.patch_namespaced_replication_controller_scale
+            .assert_called_once_with(name="test", namespace="ns",
+                                     body={"spec": {"replicas": 3}}))
+        self.assertFalse(
+            self.client.patch_namespaced_replication_controller.called)
+
     def test_delete_replication_controller(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -1209,6 +1289,22 @@ class ReplicaSetServiceTestCase(KubernetesServiceTestCase):
                 namespace="ns"
             ))
 
+    def test_create_replicaset_with_labels(self):
+        self.k8s_client.generate_random_name = mock.MagicMock()
+        self.k8s_client.generate_random_name.return_value = "name"
+        self.k8s_client.create_replicaset(
+            image="test/image",
+            replicas=2,
+            namespace="ns",
+            labels={"backend": "test"},
+            status_wait=False)
+
+        body = self.client.create_namespaced_replica_set.call_args[1]["body"]
+        self.assertEqual({"app": "name", "backend": "test"},
+                         body["spec"]["template"]["metadata"]["labels"])
+        self.assertEqual({"app": "name"},
+                         body["spec"]["selector"]["matchLabels"])
+
     def test_create_replicaset_with_incorrect_command(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -1335,6 +1431,14 @@ class ReplicaSetServiceTestCase(KubernetesServiceTestCase):
             self.client.read_namespaced_replica_set.call_count
         )
 
+    def test_scale_replicaset(self):
+        self.k8s_client.scale_replicaset("test", namespace="ns", replicas=3,
+                                         status_wait=False)
+
+        self.client.patch_namespaced_replica_set_scale.assert_called_once_with(
+            "test", namespace="ns", body={"spec": {"replicas": 3}})
+        self.assertFalse(self.client.patch_namespaced_replica_set.called)
+
     def test_delete_replicaset(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -1506,64 +1610,233 @@ class PodWithVolumeTestCase(KubernetesServiceTestCase):
             namespace="ns"
         )
 
-    def test_check_volume_pod_success(self):
-        self.config_cls.reset_mock()
-        self.api_cls.reset_mock()
-        self.client_cls.reset_mock()
-
-        api = mock.MagicMock()
-        api.api_client.request = mock.MagicMock()
-        self.client.connect_get_namespaced_pod_exec.__self__ = mock.MagicMock()
-        self.client.connect_get_namespaced_pod_exec.__self__.return_value = api
-        self.client.connect_get_namespaced_pod_exec.return_value = (
-            "for success")
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_success(self, mock_stream):
+        CONF.set_override("status_poll_interval", 1, "kubernetes")
+        self.addCleanup(CONF.set_override, "status_poll_interval", 0,
+                        "kubernetes")
+        resp = mock_stream.return_value
+        resp.is_open.return_value = True
+        resp.read_stdout.side_effect = ["for succ", "", "ess\n__xrally_",
+                                        "exec_1__ 0\n"]
 
         self.assertIsNone(self.k8s_client.check_volume_pod(
             "name",
             namespace="ns",
-            check_cmd="check",
-            error_regexp="nope"
+            check_cmd=["ls", "/opt/check dir"],
+            error_regexp="nope",
+            shell_session=True
         ))
 
-    def test_check_volume_pod_exec_failed(self):
-        self.config_cls.reset_mock()
-        self.api_cls.reset_mock()
-        self.client_cls.reset_mock()
+        mock_stream.assert_called_once_with(
+            self.client.connect_get_namespaced_pod_exec,
+            "name",
+            namespace="ns",
+            command=["/bin/sh"],
+            stderr=True, stdin=True,
+            stdout=True, tty=False,
+            _preload_content=False
+        )
+        resp.write_stdin.assert_called_once_with(
+            "{ ls '/opt/check dir'\n} 2>&1; "
+            "printf '\\n%s %s\\n' __xrally_exec_1__ $?\n")
+
+        # the session is reused by the next check and closed with the pod
+        resp.read_stdout.side_effect = ["__xrally_exec_2__ 0\n"]
+        self.k8s_client.check_volume_pod("name", namespace="ns",
+                                         check_cmd="check")
+        self.assertEqual(1, mock_stream.call_count)
+        resp.write_stdin.assert_called_with(
+            "{ check\n} 2>&1; printf '\\n%s %s\\n' __xrally_exec_2__ $?\n")
+        self.k8s_client.delete_pod("name", namespace="ns",
+                                   status_wait=False)
+        resp.close.assert_called_once_with()
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_exec_failed(self, mock_stream):
+        CONF.set_override("status_poll_interval", 1, "kubernetes")
+        self.addCleanup(CONF.set_override, "status_poll_interval", 0,
+                        "kubernetes")
+        resp = mock_stream.return_value
+        resp.is_open.return_value = True
+        resp.read_stdout.side_effect = [
+            "sh: check: not found\n__xrally_exec_1__ 127\n"]
 
-        api = mock.MagicMock()
-        api.api_client.request = mock.MagicMock()
-        self.client.connect_get_namespaced_pod_exec.__self__ = mock.MagicMock()
-        self.client.connect_get_namespaced_pod_exec.__self__.return_value = api
-        self.client.connect_get_namespaced_pod_exec.return_value = (
-            "exec failed: command not found")
+        ex = self.assertRaises(
+            rally_exc.RallyException,
+            self.k8s_client.check_volume_pod,
+            "name",
+            namespace="ns",
+            check_cmd="check",
+            error_regexp="nope",
+            shell_session=True
+        )
+        self.assertIn("sh: check: not found", str(ex))
 
-        self.assertRaises(
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_exec_error_regexp(self, mock_stream):
+        CONF.set_override("status_poll_interval", 1, "kubernetes")
+        self.addCleanup(CONF.set_override, "status_poll_interval", 0,
+                        "kubernetes")
+        resp = mock_stream.return_value
+        resp.is_open.return_value = True
+        resp.read_stdout.side_effect = [
+            "fine\nnope, error", " response\nfine\n__xrally_exec_1__ 0\n"]
+
+        ex = self.assertRaises(
             rally_exc.RallyException,
             self.k8s_client.check_volume_pod,
             "name",
             namespace="ns",
             check_cmd="check",
-            error_regexp="nope"
+            error_regexp="nope",
+            shell_session=True
         )
+        self.assertIn("nope, error response", str(ex))
 
-    def test_check_volume_pod_exec_error_regexp(self):
-        self.config_cls.reset_mock()
-        self.api_cls.reset_mock()
-        self.client_cls.reset_mock()
-        api = mock.MagicMock()
-        api.api_client.request = mock.MagicMock()
-        self.client.connect_get_namespaced_pod_exec.__self__ = mock.MagicMock()
-        self.client.connect_get_namespaced_pod_exec.__self__.return_value = api
-        self.client.connect_get_namespaced_pod_exec.return_value = (
-            "nope, error response")
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_timeout(self, mock_stream):
+        resp = mock_stream.return_value
+        resp.is_open.side_effect = [True, False, False]
+        resp.read_stdout.return_value = ""
 
         self.assertRaises(
+            rally_exc.TimeoutException,
+            self.k8s_client.check_volume_pod,
+            "name",
+            namespace="ns",
+            check_cmd="check",
+            shell_session=True
+        )
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_no_trailing_newline(self, mock_stream):
+        CONF.set_override("status_poll_interval", 1, "kubernetes")
+        self.addCleanup(CONF.set_override, "status_poll_interval", 0,
+                        "kubernetes")
+        resp = mock_stream.return_value
+        resp.is_open.return_value = True
+        resp.read_stdout.side_effect = [
+            "no newline\n__xrally_exec_1__ 1\n"]
+
+        ex = self.assertRaises(
             rally_exc.RallyException,
             self.k8s_client.check_volume_pod,
             "name",
             namespace="ns",
             check_cmd="check",
-            error_regexp="nope"
+            shell_session=True
+        )
+        self.assertIn("error: no newline", str(ex))
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_direct(self, mock_stream):
+        mock_stream.return_value = "fine"
+
+        self.assertIsNone(self.k8s_client.check_volume_pod(
+            "name", namespace="ns", check_cmd="ls '/opt/check dir'",
+            error_regexp="nope", shell_session=False))
+
+        mock_stream.assert_called_once_with(
+            self.client.connect_get_namespaced_pod_exec,
+            "name",
+            namespace="ns",
+            command=["ls", "/opt/check dir"],
+            stderr=True, stdin=False,
+            stdout=True, tty=False
+        )
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_check_volume_pod_direct_failed(self, mock_stream):
+        for resp, regexp in (("exec failed: not found", None),
+                             ("nope, error", "nope")):
+            mock_stream.return_value = resp
+            ex = self.assertRaises(
+                rally_exc.RallyException,
+                self.k8s_client.check_volume_pod,
+                "name",
+                namespace="ns",
+                check_cmd=["check"],
+                error_regexp=regexp,
+                shell_session=False
+            )
+            self.assertIn(resp, str(ex))
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_exec_session_reopen(self, mock_stream):
+        closed = mock.MagicMock()
+        closed.is_open.return_value = False
+        mock_stream.side_effect = [closed, mock.MagicMock()]
+
+        first = self.k8s_client.exec_session("name", namespace="ns")
+        second = self.k8s_client.exec_session("name", namespace="ns")
+
+        self.assertIsNot(first, second)
+        self.assertEqual(2, mock_stream.call_count)
+        self.k8s_client.close_exec_session("name", namespace="ns")
+        self.k8s_client.close_exec_session("name", namespace="ns")
+
+    def test_exec_command(self):
+        self.k8s_client.exec_session = mock.MagicMock()
+
+        result = self.k8s_client.exec_command("name", namespace="ns",
+                                              command="df", timeout=5)
+
+        session = self.k8s_client.exec_session.return_value
+        self.assertEqual(session.run.return_value, result)
+        self.k8s_client.exec_session.assert_called_once_with(
+            "name", namespace="ns")
+        session.run.assert_called_once_with("df", timeout=5)
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_exec_stream(self, mock_stream):
+        resp = self.k8s_client.exec_stream("name", namespace="ns",
+                                           command=["sh"])
+
+        self.assertEqual(mock_stream.return_value, resp)
+        mock_stream.assert_called_once_with(
+            self.client.connect_get_namespaced_pod_exec,
+            "name",
+            namespace="ns",
+            command=["sh"],
+            stderr=True, stdin=False,
+            stdout=True, tty=False,
+            _preload_content=False
+        )
+
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_exec_stream_stdin(self, mock_stream):
+        self.k8s_client.exec_stream("name", namespace="ns", command=["sh"],
+                                    stdin=True)
+
+        self.assertTrue(mock_stream.call_args[1]["stdin"])
+
+    @mock.patch("xrally_kubernetes.service.portforward")
+    def test_port_forward(self, mock_portforward):
+        session = self.k8s_client.port_forward("name", namespace="ns",
+                                               ports=[80, 8080])
+
+        self.assertEqual(mock_portforward.return_value, session)
+        mock_portforward.assert_called_once_with(
+            self.client.connect_get_namespaced_pod_portforward,
+            "name",
+            "ns",
+            ports="80,8080"
+        )
+
+    def test_log_stream(self):
+        resp = self.k8s_client.log_stream("name", namespace="ns",
+                                          tail_lines=0, request_timeout=5)
+
+        self.assertEqual(self.client.read_namespaced_pod_log.return_value,
+                         resp)
+        self.client.read_namespaced_pod_log.assert_called_once_with(
+            "name",
+            namespace="ns",
+            follow=True,
+            _preload_content=False,
+            tail_lines=0,
+            _request_timeout=5
         )
 
     def test_create_pod_emptydir_volume(self):
@@ -2124,6 +2397,88 @@ class DeploymentServiceTestCase(KubernetesServiceTestCase):
             self.client.read_namespaced_deployment_status.call_count
         )
 
+    def test_create_deployment_with_rolling_update(self):
+        self.k8s_client.create_deployment(
+            image="test/image",
+            namespace="ns",
+            replicas=2,
+            labels={"chaos": "test"},
+            max_surge="50%",
+            max_unavailable=0,
+            status_wait=False
+        )
+
+        body = self.client.create_namespaced_deployment.call_args[1]["body"]
+        self.assertEqual("test", body["spec"]["template"]["metadata"][
+            "labels"]["chaos"])
+        self.assertEqual({"type": "RollingUpdate",
+                          "rollingUpdate": {"maxSurge": "50%",
+                                            "maxUnavailable": 0}},
+                         body["spec"]["strategy"])
+
+    def _deployment(self, generation, observed_generation, updated,
+                    available, replicas=2, total=None):
+        resp = mock.MagicMock()
+        resp.metadata.generation = generation
+        resp.spec.replicas = replicas
+        resp.status.observed_generation = observed_generation
+        resp.status.updated_replicas = updated
+        resp.status.available_replicas = available
+        resp.status.replicas = replicas if total is None else total
+        return resp
+
+    def test_is_rollout_complete(self):
+        self.assertTrue(service.is_rollout_complete(
+            self._deployment(2, 2, 2, 2)))
+        # NOTE: the new generation isn't observed by the controller yet,
+        #   while the old replicaSet is still fully available
+        self.assertFalse(service.is_rollout_complete(
+            self._deployment(2, 1, 2, 2)))
+        self.assertFalse(service.is_rollout_complete(
+            self._deployment(1, 1, 2, 2), generation=2))
+        self.assertFalse(service.is_rollout_complete(
+            self._deployment(2, 2, 2, 2, total=3)))
+        self.assertFalse(service.is_rollout_complete(
+            self._deployment(2, 2, 1, 2)))
+        self.assertFalse(service.is_rollout_complete(
+            self._deployment(2, 2, 2, None)))
+        self.assertFalse(service.is_rollout_complete(
+            self._deployment(2, None, None, None)))
+
+    def test_rollout_deployment(self):
+        CONF.set_override("status_total_retries", 4, "kubernetes")
+        self.client.patch_namespaced_deployment.return_value = (
+            self._deployment(2, 1, 2, 2))
+        # NOTE: the first read is for patching
+        self.client.read_namespaced_deployment_status.side_effect = [
+            self._deployment(1, 1, 2, 2), self._deployment(1, 1, 2, 2),
+            self._deployment(2, 1, 2, 2),
+            self._deployment(2, 2, 1, 2, total=3),
+            self._deployment(2, 2, 2, 2)]
+
+        generation = self.k8s_client.rollout_deployment(
+            "test", namespace="ns", changes={"image": "test/image2"},
+            replicas=2)
+
+        self.assertEqual(2, generation)
+        self.client.patch_namespaced_deployment.assert_called_once_with(
+            name="test", namespace="ns", body=mock.ANY)
+        self.assertEqual(
+            5, self.client.read_namespaced_deployment_status.call_count)
+
+    def test_rollout_deployment_timeout(self):
+        CONF.set_override("status_total_retries", 2, "kubernetes")
+        self.client.patch_namespaced_deployment.return_value = (
+            self._deployment(2, 1, 2, 2))
+        self.client.read_namespaced_deployment_status.return_value = (
+            self._deployment(2, 1, 2, 2))
+
+        self.assertRaises(
+            rally_exc.TimeoutException,
+            self.k8s_client.rollout_deployment,
+            "test", namespace="ns", changes={"image": "test/image2"},
+            replicas=2)
+
     def test_delete_deployment(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -2301,6 +2656,106 @@ class JobServiceTestCase(KubernetesServiceTestCase):
             namespace="ns"
         )
 
+    def test_create_indexed_job(self):
+        self.k8s_client.create_job(
+            name="name",
+            image="test/image",
+            command=["ls"],
+            namespace="ns",
+            completions=3,
+            parallelism=2,
+            completion_mode="Indexed",
+            ttl_seconds_after_finished=0,
+            labels={"batch": "b"},
+            status_wait=False)
+
+        body = self.client.create_namespaced_job.call_args[1]["body"]
+        self.assertEqual({"name": "name", "labels": {"batch": "b"}},
+                         body["metadata"])
+        self.assertEqual(3, body["spec"]["completions"])
+        self.assertEqual(2, body["spec"]["parallelism"])
+        self.assertEqual("Indexed", body["spec"]["completionMode"])
+        self.assertEqual(0, body["spec"]["ttlSecondsAfterFinished"])
+
+    def test_create_and_wait_job_completions(self):
+        CONF.set_override("status_total_retries", 3, "kubernetes")
+
+        resps = [mock.MagicMock(), mock.MagicMock()]
+        resps[0].status.succeeded = 1
+        resps[1].status.succeeded = 2
+        self.client.read_namespaced_job.side_effect = resps
+
+        self.k8s_client.create_job(
+            name="name",
+            image="test/image",
+            namespace="ns",
+            command=["ls"],
+            completions=2,
+            status_wait=True
+        )
+
+        self.assertEqual(2, self.client.read_namespaced_job.call_count)
+
+    def test_create_and_wait_job_failed(self):
+        resp = mock.MagicMock()
+        resp.status.succeeded = None
+        resp.status.conditions = [mock.MagicMock(
+            type="Failed", status="True", message="BackoffLimitExceeded")]
+        self.client.read_namespaced_job.return_value = resp
+
+        ex = self.assertRaises(
+            rally_exc.RallyException,
+            self.k8s_client.create_job,
+            name="name",
+            image="test/image",
+            namespace="ns",
+            command=["false"],
+            status_wait=True
+        )
+
+        self.assertEqual("Job name failed: BackoffLimitExceeded", str(ex))
+        self.client.read_namespaced_job.assert_called_once()
+
+    def test_create_and_wait_job_removed_by_ttl(self):
+        self.client.read_namespaced_job.side_effect = [
+            rest.ApiException(status=404, reason="Not found")
+        ]
+
+        self.k8s_client.create_job(
+            name="name",
+            image="test/image",
+            namespace="ns",
+            command=["ls"],
+            ttl_seconds_after_finished=0,
+            status_wait=True
+        )
+
+        self.client.read_namespaced_job.assert_called_once()
+
+    def test_create_and_wait_job_not_found(self):
+        self.client.read_namespaced_job.side_effect = [
+            rest.ApiException(status=404, reason="Not found")
+        ]
+
+        self.assertRaises(
+            rest.ApiException,
+            self.k8s_client.create_job,
+            name="name",
+            image="test/image",
+            namespace="ns",
+            command=["ls"],
+            status_wait=True
+        )
+
+    def test_delete_jobs(self):
+        self.k8s_client.delete_jobs("ns", labels={"batch": "b"})
+
+        self.client.delete_collection_namespaced_job.assert_called_once_with(
+            "ns",
+            label_selector="batch=b",
+            propagation_policy="Background"
+        )
+
     def test_create_and_wait_job_fail_create(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -2522,6 +2977,37 @@ class StatefulSetServiceTestCase(KubernetesServiceTestCase):
                 namespace="ns"
             ))
 
+    def test_create_statefulset_with_volume_claim_template(self):
+        self.k8s_client.generate_random_name = mock.MagicMock()
+        self.k8s_client.generate_random_name.return_value = "name"
+        self.k8s_client.create_statefulset(
+            image="test/image",
+            replicas=2,
+            namespace="ns",
+            labels={"statefulset": "test"},
+            pod_management_policy="Parallel",
+            volume_claim_template={"mount_path": "/data", "size": "1Gi",
+                                   "storage_class": "standard"},
+            status_wait=False)
+
+        body = self.client.create_namespaced_stateful_set.call_args[1][
+            "body"]
+        self.assertEqual({"app": "name", "statefulset": "test"},
+                         body["spec"]["selector"]["matchLabels"])
+        self.assertEqual({"app": "name", "statefulset": "test"},
+                         body["spec"]["template"]["metadata"]["labels"])
+        self.assertEqual("Parallel", body["spec"]["podManagementPolicy"])
+        self.assertEqual(
+            [{"name": "data", "mountPath": "/data"}],
+            body["spec"]["template"]["spec"]["containers"][0][
+                "volumeMounts"])
+        self.assertEqual(
+            [{"metadata": {"name": "data"},
+              "spec": {"accessModes": ["ReadWriteOnce"],
+                       "resources": {"requests": {"storage": "1Gi"}},
+                       "storageClassName": "standard"}}],
+            body["spec"]["volumeClaimTemplates"])
+
     def test_create_statefulset_with_command(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -2703,6 +3189,15 @@ class StatefulSetServiceTestCase(KubernetesServiceTestCase):
             self.client.read_namespaced_stateful_set.call_count
         )
 
+    def test_scale_statefulset(self):
+        self.k8s_client.scale_statefulset("test", namespace="ns", replicas=3,
+                                          status_wait=False)
+
+        (self.client.patch_namespaced_stateful_set_scale
+            .assert_called_once_with("test", namespace="ns",
+                                     body={"spec": {"replicas": 3}}))
+        self.assertFalse(self.client.patch_namespaced_stateful_set.called)
+
     def test_delete_statefulset(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -2964,6 +3459,41 @@ class KubernetesServicesServiceTestCase(KubernetesServiceTestCase):
             body=mock.ANY
         )
 
+    @mock.patch("xrally_kubernetes.service.stream")
+    def test_probe_url(self, mock_stream):
+        mock_stream.return_value = "200 0.001234"
+
+        resp = self.k8s_client.probe_url("prober", namespace="ns",
+                                         url="http://10.0.0.1:80/",
+                                         request_timeout=5)
+
+        self.assertEqual((200, 0.001234), resp)
+        mock_stream.assert_called_once_with(
+            self.client.connect_get_namespaced_pod_exec,
+            "prober",
+            namespace="ns",
+            command=["curl", "-s", "-o", "/dev/null",
+                     "-w", "%{http_code} %{time_total}",
+                     "--max-time", "5", "http://10.0.0.1:80/"],
+            stderr=True, stdin=False,
+            stdout=True, tty=False
+        )
+
+        mock_stream.return_value = "000 0,000000"
+        self.assertEqual(
+            (0, 0.0),
+            self.k8s_client.probe_url("prober", namespace="ns",
+                                      url="http://10.0.0.1:80/"))
+
+        mock_stream.return_value = "exec failed"
+        self.assertRaises(
+            rally_exc.RallyException,
+            self.k8s_client.probe_url,
+            "prober",
+            namespace="ns",
+            url="http://10.0.0.1:80/"
+        )
+
 
 class PodWithLocalPVVolumeTestCase(KubernetesServiceTestCase):
 
@@ -3095,6 +3625,75 @@ class PodWithLocalPVVolumeTestCase(KubernetesServiceTestCase):
             body=expected
         )
 
+    def test_create_local_pvc_with_volume_name(self):
+        self.k8s_client.create_local_pvc(
+            "name",
+            namespace="ns",
+            storage_class="local",
+            access_modes=["ReadWriteOnce"],
+            size="1Gi",
+            volume_name="pv"
+        )
+
+        body = self.client.create_namespaced_persistent_volume_claim.\
+            call_args[1]["body"]
+        self.assertEqual("pv", body["spec"]["volumeName"])
+
+    def test_release_local_pv(self):
+        self.k8s_client.release_local_pv("pv")
+
+        self.client.patch_persistent_volume.assert_called_once_with(
+            "pv", body={"spec": {"claimRef": None}})
+
+    def test_create_pvc(self):
+        name = self.k8s_client.create_pvc(
+            "name",
+            namespace="ns",
+            storage_class="standard",
+            access_modes=["ReadWriteOnce"],
+            size="1Gi",
+            volume_mode="Block",
+            labels={"app": "test"}
+        )
+
+        self.assertEqual("name", name)
+        self.client.create_namespaced_persistent_volume_claim.\
+            assert_called_once_with(
+                namespace="ns",
+                body={
+                    "kind": "PersistentVolumeClaim",
+                    "apiVersion": "v1",
+                    "metadata": {
+                        "name": "name",
+                        "labels": {"role": "name", "app": "test"}
+                    },
+                    "spec": {
+                        "resources": {"requests": {"storage": "1Gi"}},
+                        "accessModes": ["ReadWriteOnce"],
+                        "storageClassName": "standard",
+                        "volumeMode": "Block"
+                    }
+                }
+            )
+
+    def test_delete_pvc(self):
+        from kubernetes import client as k8s_config
+
+        self.k8s_client.delete_pvc("name", namespace="ns")
+
+        self.client.delete_namespaced_persistent_volume_claim.\
+            assert_called_once_with(
+                name="name",
+                namespace="ns",
+                body=k8s_config.V1DeleteOptions()
+            )
+
+    def test_delete_pvcs(self):
+        self.k8s_client.delete_pvcs("ns", labels={"app": "test"})
+
+        (self.client.delete_collection_namespaced_persistent_volume_claim
+            .assert_called_once_with("ns", label_selector="app=test"))
+
     def test_create_pod_local_pv_volume(self):
         self.config_cls.reset_mock()
         self.api_cls.reset_mock()
@@ -3591,3 +4190,498 @@ class DaemonSetServiceTestCase(KubernetesServiceTestCase):
             label_selector="app=testapp"
         )
         self.client_v1.list_node.assert_called_once()
+
+
+class ConfigMapServiceTestCase(KubernetesServiceTestCase):
+
+    def test_create_configmap(self):
+        self.k8s_client.create_configmap("cm", namespace="ns",
+                                         data={"k": "v"},
+                                         labels={"app": "test"},
+                                         annotations={"a": "1"})
+
+        self.client.create_namespaced_config_map.assert_called_once_with(
+            namespace="ns",
+            body={
+                "apiVersion": "v1",
+                "kind": "ConfigMap",
+                "metadata": {
+                    "name": "cm",
+                    "labels": {"app": "test"},
+                    "annotations": {"a": "1"}
+                },
+                "data": {"k": "v"}
+            }
+        )
+
+    def test_patch_configmap(self):
+        self.k8s_client.patch_configmap("cm", namespace="ns",
+                                        annotations={"a": "2"})
+        self.client.patch_namespaced_config_map.assert_called_once_with(
+            "cm", namespace="ns",
+            body={"metadata": {"annotations": {"a": "2"}}}
+        )
+
+        self.client.patch_namespaced_config_map.reset_mock()
+        self.k8s_client.patch_configmap("cm", namespace="ns",
+                                        data={"k": "v2"})
+        self.client.patch_namespaced_config_map.assert_called_once_with(
+            "cm", namespace="ns", body={"data": {"k": "v2"}}
+        )
+
+    def test_delete_configmaps(self):
+        self.k8s_client.delete_configmaps("ns", labels={"app": "test"})
+
+        (self.client.delete_collection_namespaced_config_map
+            .assert_called_once_with("ns", label_selector="app=test"))
+
+
+class SecretServiceTestCase(KubernetesServiceTestCase):
+
+    def test_create_opaque_secret(self):
+        self.k8s_client.create_opaque_secret("s", namespace="ns",
+                                             data={"k": "dg=="},
+                                             labels={"app": "test"})
+
+        self.client.create_namespaced_secret.assert_called_once_with(
+            namespace="ns",
+            body={
+                "apiVersion": "v1",
+                "kind": "Secret",
+                "type": "Opaque",
+                "metadata": {
+                    "name": "s",
+                    "labels": {"app": "test"}
+                },
+                "data": {"k": "dg=="}
+            }
+        )
+
+    def test_patch_secret(self):
+        self.k8s_client.patch_secret("s", namespace="ns", data={"k": "dw=="})
+
+        self.client.patch_namespaced_secret.assert_called_once_with(
+            "s", namespace="ns", body={"data": {"k": "dw=="}})
+
+    def test_create_opaque_secret_with_annotations(self):
+        self.k8s_client.create_opaque_secret("s", namespace="ns", data={},
+                                             annotations={"a": "b"})
+
+        body = self.client.create_namespaced_secret.call_args[1]["body"]
+        self.assertEqual({"name": "s", "annotations": {"a": "b"}},
+                         body["metadata"])
+
+    def test_patch_secret_annotations(self):
+        self.k8s_client.patch_secret("s", namespace="ns",
+                                     annotations={"a": "b"})
+
+        self.client.patch_namespaced_secret.assert_called_once_with(
+            "s", namespace="ns",
+            body={"metadata": {"annotations": {"a": "b"}}})
+
+    def test_delete_secrets(self):
+        self.k8s_client.delete_secrets("ns", labels={"app": "test"})
+
+        (self.client.delete_collection_namespaced_secret
+            .assert_called_once_with("ns", label_selector="app=test"))
+
+
+class LeaseServiceTestCase(KubernetesServiceTestCase):
+
+    def setUp(self):
+        super(LeaseServiceTestCase, self).setUp()
+
+        from kubernetes.client.api import coordination_v1_api
+
+        p_mock_client = mock.patch.object(coordination_v1_api,
+                                          "CoordinationV1Api")
+        self.client_cls = p_mock_client.start()
+        self.client = self.client_cls.return_value
+        self.addCleanup(p_mock_client.stop)
+
+    @mock.patch("xrally_kubernetes.service._micro_time")
+    def test_create_lease(self, mock__micro_time):
+        mock__micro_time.return_value = "2019-01-01T00:00:00.000000Z"
+
+        self.k8s_client.create_lease("name", namespace="ns", holder="node",
+                                     lease_duration=40,
+                                     labels={"app": "test"})
+
+        expected = {
+            "apiVersion": "coordination.k8s.io/v1",
+            "kind": "Lease",
+            "metadata": {
+                "name": "name",
+                "labels": {"app": "test"}
+            },
+            "spec": {
+                "holderIdentity": "node",
+                "leaseDurationSeconds": 40,
+                "renewTime": "2019-01-01T00:00:00.000000Z"
+            }
+        }
+        self.client.create_namespaced_lease.assert_called_once_with(
+            body=expected,
+            namespace="ns"
+        )
+
+    @mock.patch("xrally_kubernetes.service._micro_time")
+    def test_renew_lease(self, mock__micro_time):
+        mock__micro_time.return_value = "2019-01-01T00:00:00.000000Z"
+
+        self.k8s_client.renew_lease("name", namespace="ns", holder="node")
+
+        self.client.patch_namespaced_lease.assert_called_once_with(
+            "name",
+            namespace="ns",
+            body={"spec": {"holderIdentity": "node",
+                           "renewTime": "2019-01-01T00:00:00.000000Z"}}
+        )
+        self.assertEqual([], self.k8s_client._atomic_actions)
+
+    def test_delete_leases(self):
+        self.k8s_client.delete_leases("ns", labels={"b": "2", "a": "1"})
+
+        self.client.delete_collection_namespaced_lease.assert_called_once_with(
+            "ns",
+            label_selector="a=1,b=2"
+        )
+
+    def test_clone(self):
+        cloned = self.k8s_client.clone()
+
+        self.assertIs(self.k8s_client.v1_coordination, cloned.v1_coordination)
+        cloned.delete_leases("ns", labels={"a": "1"})
+        self.assertEqual([], self.k8s_client._atomic_actions)
+        self.assertEqual(["kubernetes.delete_leases"],
+                         [a["name"] for a in cloned._atomic_actions])
+
+
+class NodeDrainServiceTestCase(KubernetesServiceTestCase):
+
+    def setUp(self):
+        super(NodeDrainServiceTestCase, self).setUp()
+
+        from kubernetes.client.api import policy_v1_api
+
+        p_mock_policy = mock.patch.object(policy_v1_api, "PolicyV1Api")
+        self.policy = p_mock_policy.start().return_value
+        self.addCleanup(p_mock_policy.stop)
+
+    def test_cordon_and_uncordon_node(self):
+        self.k8s_client.cordon_node("node1")
+        self.k8s_client.uncordon_node("node1")
+
+        self.assertEqual(
+            [mock.call("node1", body={"spec": {"unschedulable": True}}),
+             mock.call("node1", body={"spec": {"unschedulable": False}})],
+            self.client.patch_node.call_args_list)
+
+    def test_evict_pod(self):
+        from kubernetes import client as k8s_config
+
+        self.k8s_client.evict_pod("pod", namespace="ns")
+
+        self.client.create_namespaced_pod_eviction.assert_called_once_with(
+            "pod", namespace="ns",
+            body=k8s_config.V1Eviction(
+                metadata=k8s_config.V1ObjectMeta(name="pod", namespace="ns")))
+
+    def test_create_pdb(self):
+        name = self.k8s_client.create_pdb("pdb", namespace="ns",
+                                          labels={"app": "test"},
+                                          max_unavailable=1)
+
+        self.assertEqual("pdb", name)
+        (self.policy.create_namespaced_pod_disruption_budget
+            .assert_called_once_with(
+                namespace="ns",
+                body={"apiVersion": "policy/v1",
+                      "kind": "PodDisruptionBudget",
+                      "metadata": {"name": "pdb"},
+                      "spec": {"selector": {"matchLabels": {"app": "test"}},
+                               "maxUnavailable": 1}}))
+
+    def test_delete_pdb(self):
+        from kubernetes import client as k8s_config
+
+        self.k8s_client.delete_pdb("pdb", namespace="ns")
+
+        (self.policy.delete_namespaced_pod_disruption_budget
+            .assert_called_once_with("pdb", namespace="ns",
+                                     body=k8s_config.V1DeleteOptions()))
+
+
+class WatchTestCase(KubernetesServiceTestCase):
+
+    def test_is_pod_ready(self):
+        pod = mock.MagicMock()
+        pod.status.conditions = [mock.MagicMock(type="PodScheduled",
+                                                status="True"),
+                                 mock.MagicMock(type="Ready", status="False")]
+        self.assertFalse(service.is_pod_ready(pod))
+        pod.status.conditions[1].status = "True"
+        self.assertTrue(service.is_pod_ready(pod))
+        pod.status.conditions = None
+        self.assertFalse(service.is_pod_ready(pod))
+
+    def test_list_node_addresses(self):
+        def node(name, addresses):
+            n = mock.MagicMock()
+            n.metadata.name = name
+            n.status.addresses = [mock.MagicMock(type=t, address=a)
+                                  for t, a in addresses]
+            return n
+
+        self.client.list_node.return_value.items = [
+            node("node1", [("Hostname", "node1"),
+                           ("InternalIP", "10.0.0.1")]),
+            node("node2", [("ExternalIP", "1.1.1.2")]),
+            node("node3", [])]
+
+        self.assertEqual({"node1": "10.0.0.1"},
+                         self.k8s_client.list_node_addresses())
+        self.client.list_node.assert_called_once_with()
+        self.assertEqual(
+            {"node2": "1.1.1.2"},
+            self.k8s_client.list_node_addresses(address_type="ExternalIP",
+                                                node_labels={"a": "b"}))
+        self.client.list_node.assert_called_with(label_selector="a=b")
+
+    def test_ready_endpoint_addresses(self):
+        endpoint_slice = mock.MagicMock()
+        endpoint_slice.endpoints = [
+            mock.MagicMock(addresses=["10.0.0.1"],
+                           conditions=mock.MagicMock(ready=True)),
+            mock.MagicMock(addresses=["10.0.0.2"],
+                           conditions=mock.MagicMock(ready=False)),
+            mock.MagicMock(addresses=["10.0.0.3"],
+                           conditions=mock.MagicMock(ready=None)),
+            mock.MagicMock(addresses=["10.0.0.4"], conditions=None)]
+        self.assertEqual(["10.0.0.1", "10.0.0.3", "10.0.0.4"],
+                         service.ready_endpoint_addresses(endpoint_slice))
+        endpoint_slice.endpoints = None
+        self.assertEqual([], service.ready_endpoint_addresses(endpoint_slice))
+
+    def test_get_list_method(self):
+        self.assertEqual(self.client.list_namespaced_pod,
+                         self.k8s_client.get_list_method("pod"))
+        self.assertEqual(
+            self.client.list_pod_for_all_namespaces,
+            self.k8s_client.get_list_method("pod", namespaced=False))
+        self.assertEqual(self.client.list_node,
+                         self.k8s_client.get_list_method("node"))
+        self.assertEqual(
+            self.k8s_client.v1_discovery.list_namespaced_endpoint_slice,
+            self.k8s_client.get_list_method("endpointslice"))
+        self.assertRaises(rally_exc.InvalidArgumentsException,
+                          self.k8s_client.get_list_method, "unknown")
+
+    def test_supports_list_argument(self):
+        self.client.list_namespaced_pod.__doc__ = (
+            ":param str resource_version: version\n"
+            ":param resource_version_match: match\n")
+        self.client.list_node.__doc__ = ":param str resource_version: v\n"
+
+        self.assertTrue(self.k8s_client.supports_list_argument(
+            "pod", argument="resource_version_match"))
+        self.assertFalse(self.k8s_client.supports_list_argument(
+            "node", argument="resource_version_match"))
+
+    @mock.patch("xrally_kubernetes.service.ResourceWatcher")
+    def test_watch(self, mock_resource_watcher):
+        handler = mock.Mock()
+
+        watcher = self.k8s_client.watch("pod", handler=handler, namespace="ns",
+                                        label_selector="app=test")
+
+        mock_resource_watcher.assert_called_once_with(
+            self.client.list_namespaced_pod, handler, lock=None,
+            namespace="ns", label_selector="app=test")
+        self.assertEqual(
+            mock_resource_watcher.return_value.start.return_value, watcher)
+
+        mock_resource_watcher.reset_mock()
+        lock = mock.Mock()
+        self.k8s_client.watch("node", handler=handler, namespace="ns",
+                              lock=lock)
+        mock_resource_watcher.assert_called_once_with(
+            self.client.list_node, handler, lock=lock)
+
+    def test_read_raw(self):
+        self.assertEqual({}, self.k8s_client._raw_apis)
+        self.api_cls.reset_mock()
+
+        data = self.k8s_client.read_raw("pod", namespace="ns",
+                                        output="table", limit=10)
+
+        self.api_cls.assert_called_once_with(
+            configuration=self.api.configuration,
+            header_name="Accept",
+            header_value=service.Kubernetes.OUTPUT_FORMATS["table"][0])
+        self.client_cls.assert_called_with(self.api_cls.return_value)
+        api = self.k8s_client._raw_apis[("v1_client", "table", False)]
+        api.list_namespaced_pod.assert_called_once_with(
+            _preload_content=False, namespace="ns", limit=10)
+        self.assertEqual(api.list_namespaced_pod.return_value.data, data)
+
+        self.k8s_client.read_raw("pod", output="table")
+        api.list_pod_for_all_namespaces.assert_called_once_with(
+            _preload_content=False)
+        self.assertEqual(1, self.api_cls.call_count)
+
+    def test_read_raw_get(self):
+        self.assertEqual({}, self.k8s_client._raw_apis)
+        self.api_cls.reset_mock()
+
+        self.k8s_client.read_raw("node", name="node-1", output="metadata")
+
+        self.api_cls.assert_called_once_with(
+            configuration=self.api.configuration,
+            header_name="Accept",
+            header_value=service.Kubernetes.OUTPUT_FORMATS["metadata"][1])
+        api = self.k8s_client._raw_apis[("v1_client", "metadata", True)]
+        api.read_node.assert_called_once_with("node-1",
+                                              _preload_content=False)
+
+        self.k8s_client.read_raw("pod", namespace="ns", name="pod-1")
+        api = self.k8s_client._raw_apis[("v1_client", "json", True)]
+        api.read_namespaced_pod.assert_called_once_with(
+            "pod-1", _preload_content=False, namespace="ns")
+
+    def test_read_raw_invalid(self):
+        self.assertRaises(rally_exc.InvalidArgumentsException,
+                          self.k8s_client.read_raw, "pod", output="yaml")
+        self.assertRaises(rally_exc.InvalidArgumentsException,
+                          self.k8s_client.read_raw, "pod", name="pod-1")
+        self.assertRaises(rally_exc.InvalidArgumentsException,
+                          self.k8s_client.read_raw, "unknown")
+
+    def test_deserialize(self):
+        def deserialize(response_text, response_type, content_type):
+            pass
+
+        self.api.deserialize = mock.create_autospec(deserialize)
+        self.assertEqual(
+            self.api.deserialize.return_value,
+            self.k8s_client.deserialize(b"{}", model="V1PodList"))
+        self.api.deserialize.assert_called_once_with(
+            b"{}", "V1PodList", "application/json")
+
+        self.api.deserialize = mock.create_autospec(
+            lambda response, response_type: None)
+        self.k8s_client.deserialize(b"{}", model="V1PodList")
+        self.api.deserialize.assert_called_once_with(
+            service._RawResponse(b"{}"), "V1PodList")
+
+    def test_label_pod(self):
+        self.k8s_client.label_pod("test", namespace="ns",
+                                  labels={"killed": "yes"})
+
+        self.client.patch_namespaced_pod.assert_called_once_with(
+            "test", namespace="ns",
+            body={"metadata": {"labels": {"killed": "yes"}}})
+
+    def test_delete_pods(self):
+        self.k8s_client.delete_pods("ns", labels={"app": "test"},
+                                    grace_period_seconds=0)
+
+        self.client.delete_collection_namespaced_pod.assert_called_once_with(
+            "ns",
+            label_selector="app=test",
+            grace_period_seconds=0
+        )
+
+
+class ResourceWatcherTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ResourceWatcherTestCase, self).setUp()
+        p_mock_watch = mock.patch("xrally_kubernetes.service.watch.Watch")
+        self.watch_cls = p_mock_watch.start()
+        self.addCleanup(p_mock_watch.stop)
+        self.list_method = mock.Mock(__name__="list_namespaced_pod")
+
+    def _event(self, event_type, name):
+        obj = mock.Mock()
+        obj.metadata.name = name
+        return {"type": event_type, "object": obj}
+
+    def test_watch(self):
+        events = []
+        watcher = service.ResourceWatcher(
+            self.list_method,
+            lambda t, o, ts: events.append((t, o.metadata.name)),
+            namespace="ns")
+
+        w1 = mock.Mock(resource_version="10")
+        w2 = mock.Mock(resource_version="20")
+        self.watch_cls.side_effect = [w1, w2]
+        w1.stream.return_value = [self._event("ADDED", "a")]
+
+        def stream(*args, **kwargs):
+            yield self._event("MODIFIED", "a")
+            watcher.stop()
+            yield self._event("DELETED", "a")
+
+        w2.stream.side_effect = stream
+
+        watcher._run()
+
+        self.assertEqual(
+            [("ADDED", "a"), ("MODIFIED", "a"), ("DELETED", "a")], events)
+        w1.stream.assert_called_once_with(
+            self.list_method, namespace="ns",
+            timeout_seconds=watcher.RECONNECT_TIMEOUT)
+        w2.stream.assert_called_once_with(
+            self.list_method, namespace="ns", resource_version="10",
+            timeout_seconds=watcher.RECONNECT_TIMEOUT)
+        w2.stop.assert_called_with()
+        self.assertEqual(0, watcher.relists)
+
+    def test_watch_relist_and_fail(self):
+        watcher = service.ResourceWatcher(self.list_method, mock.Mock())
+        w1 = mock.Mock(resource_version="10")
+        w1.stream.side_effect = rest.ApiException(status=410)
+        w2 = mock.Mock(resource_version="20")
+        w2.stream.side_effect = rest.ApiException(status=500)
+        self.watch_cls.side_effect = [w1, w2]
+
+        watcher._run()
+
+        self.assertEqual(1, watcher.relists)
+        self.assertEqual(500, watcher.error.status)
+        w2.stream.assert_called_once_with(
+            self.list_method, timeout_seconds=watcher.RECONNECT_TIMEOUT)
+        self.assertRaises(rest.ApiException, watcher.wait, lambda: False, 1)
+
+    def test_watch_timeout_and_stop(self):
+        watcher = service.ResourceWatcher(self.list_method, mock.Mock(),
+                                          timeout_seconds=60)
+        w = mock.Mock(resource_version="10")
+        self.watch_cls.return_value = w
+
+        def stream(*args, **kwargs):
+            watcher.stop()
+            raise ValueError("connection is shut down")
+
+        w.stream.side_effect = stream
+
+        watcher._run()
+
+        w.stream.assert_called_once_with(self.list_method, timeout_seconds=60)
+        w.stop.assert_called_once_with()
+        self.assertIsNone(watcher.error)
+
+    def test_wait(self):
+        watcher = service.ResourceWatcher(self.list_method, mock.Mock())
+
+        self.assertTrue(watcher.wait(lambda: True, 0))
+        self.assertFalse(watcher.wait(lambda: False, 0))
+
+    def test_shared_lock(self):
+        watcher = service.ResourceWatcher(self.list_method, mock.Mock())
+        other = service.ResourceWatcher(self.list_method, mock.Mock(),
+                                        lock=watcher.lock)
+
+        self.assertIs(watcher.lock, other.lock)
@@ -0,0 +1,63 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import math
+
+
+def percentile(points, percent):
+    """Calculate percentile of already sorted points.
+
+    :param points: sorted list of numbers
+    :param percent: float value from 0.0 to 1.0
+    :returns: interpolated percentile value or None for empty points
+    """
+    if not points:
+        return None
+    k = (len(points) - 1) * percent
+    f = math.floor(k)
+    c = math.ceil(k)
+    if f == c:
+        return points[int(k)]
+    return points[int(f)] * (c - k) + points[int(c)] * (k - f)
+
+
+def latency_stats(points):
+    """Make a list of min, median, 90, 95, 99 %iles, max, avg and count.
+
+    :param points: list of numbers, it is not modified
+    """
+    points = sorted(points)
+    if not points:
+        return [None] * 7 + [0]
+    return ([points[0]] +
+            [percentile(points, p) for p in (0.5, 0.9, 0.95, 0.99)] +
+            [points[-1], sum(points) / len(points), len(points)])
+
+
+def time_series(timestamps, start, step=1.0):
+    """Group timestamps into buckets of step seconds since start.
+
+    :param timestamps: iterable of timestamps
+    :param start: timestamp of the first bucket
+    :param step: bucket width in seconds
+    :returns: list of [seconds since start, number of timestamps] pairs
+    """
+    buckets = {}
+    for ts in timestamps:
+        idx = int((ts - start) // step)
+        buckets[idx] = buckets.get(idx, 0) + 1
+    if not buckets:
+        return []
+    return [[round(i * step, 3), buckets.get(i, 0)]
+            for i in range(min(buckets), max(buckets) + 1)]
@@ -11,18 +11,30 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import collections
+import copy
+import datetime
+import inspect
 import os
 import re
+import shlex
+import threading
+import time
 
 from kubernetes import client as k8s_config
 from kubernetes.client import api_client
 from kubernetes.client.api import apps_v1_api
 from kubernetes.client.api import batch_v1_api
+from kubernetes.client.api import coordination_v1_api
 from kubernetes.client.api import core_v1_api
+from kubernetes.client.api import discovery_v1_api
+from kubernetes.client.api import policy_v1_api
 from kubernetes.client.api import storage_v1_api
 from kubernetes.client.api import version_api
 from kubernetes.client import rest
+from kubernetes.stream import portforward
 from kubernetes.stream import stream
+from kubernetes import watch
 from rally.common import cfg
 from rally.common import logging
 from rally.common import utils as commonutils
@@ -107,6 +119,61 @@ def wait_for_ready_replicas(name, read_method, resource_type=None, **kwargs):
                 timeout=(retries_total * sleep_time))
 
 
+def is_rollout_complete(deployment, generation=None):
+    """Check that deployment rollout of the generation is complete.
+
+    Rollout is complete when the controller has observed the generation and
+    all replicas are updated and available and no old replicas are left,
+    so it can't be declared before the new replicaSet is even created.
+
+    :param deployment: V1Deployment object
+    :param generation: generation of the rollout, the current one if None
+    """
+    status = deployment.status
+    if status is None or status.observed_generation is None:
+        return False
+    generation = generation or deployment.metadata.generation
+    if (deployment.metadata.generation < generation or
+            status.observed_generation < deployment.metadata.generation):
+        return False
+    replicas = deployment.spec.replicas
+    return ((status.updated_replicas or 0) == replicas and
+            (status.replicas or 0) == replicas and
+            (status.available_replicas or 0) == replicas)
+
+
+def wait_for_rollout(name, read_method, resource_type=None, generation=None,
+                     **kwargs):
+    """Util method for polling status until rollout won't be complete.
+
+    :param name: resource name
+    :param read_method: method to poll
+    :param resource_type: resource type for extended exceptions
+    :param generation: generation of the rollout, the current one if None
+    :param kwargs: additional kwargs for read_method
+    """
+    sleep_time = CONF.kubernetes.status_poll_interval
+    retries_total = CONF.kubernetes.status_total_retries
+
+    commonutils.interruptable_sleep(CONF.kubernetes.start_prepoll_delay)
+
+    for i in range(retries_total):
+        resp = read_method(name=name, **kwargs)
+        if is_rollout_complete(resp, generation=generation):
+            return
+        commonutils.interruptable_sleep(sleep_time)
+    raise exceptions.TimeoutException(
+        desired_status="Rollout of generation %s complete" % (
+            generation or resp.metadata.generation),
+        resource_name=name,
+        resource_type=resource_type,
+        resource_id=resp.metadata.uid or "<no id>",
+        resource_status="%s updated, %s available of %s replicas" % (
+            resp.status.updated_replicas, resp.status.available_replicas,
+            resp.spec.replicas),
+        timeout=(retries_total * sleep_time))
+
+
 def wait_for_not_found(name, read_method, resource_type=None, **kwargs):
     """Util method for polling status while resource exists.
 
@@ -153,6 +220,234 @@ def wait_for_not_found(name, read_method, resource_type=None, **kwargs):
                 timeout=(retries_total * sleep_time))
 
 
+def is_pod_ready(pod):
+    """Check that pod has Ready condition with True status.
+
+    :param pod: V1Pod object
+    """
+    return any(c.type == "Ready" and c.status == "True"
+               for c in (pod.status and pod.status.conditions) or [])
+
+
+def ready_endpoint_addresses(endpoint_slice):
+    """Return addresses of ready endpoints of EndpointSlice.
+
+    Unknown readiness of an endpoint is interpreted as ready.
+
+    :param endpoint_slice: V1EndpointSlice object
+    """
+    addresses = []
+    for endpoint in endpoint_slice.endpoints or []:
+        if endpoint.conditions and endpoint.conditions.ready is False:
+            continue
+        addresses.extend(endpoint.addresses or [])
+    return addresses
+
+
+class ResourceWatcher(object):
+    """Watch resources in a background thread.
+
+    Each event is passed to `handler(event_type, obj, received_at)` under
+    watcher lock, so handler and waiters always see consistent state. When
+    the watch expires (410 Gone), resources are relisted and handler gets
+    ADDED events for all existing resources again, so it should be
+    idempotent.
+    """
+
+    # NOTE: server-side timeout of a single watch request. The watch is
+    #   resumed from the last resource version after it, so it only bounds
+    #   the time needed to stop the watcher.
+    RECONNECT_TIMEOUT = 5
+
+    def __init__(self, list_method, handler, lock=None, **kwargs):
+        """Init watcher.
+
+        :param list_method: kubernetes client method to list resources
+        :param handler: a callable to process events
+        :param lock: threading.Condition to share with other watchers, whose
+               handlers update the same state, a new one is created if None
+        :param kwargs: additional kwargs for list_method, e.g. namespace or
+               label_selector; timeout_seconds overrides RECONNECT_TIMEOUT
+        """
+        self._list_method = list_method
+        self._handler = handler
+        self._kwargs = kwargs
+        self._stopped = threading.Event()
+        self._watch = None
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self.lock = lock or threading.Condition()
+        self.relists = 0
+        self.error = None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        resource_version = None
+        while not self._stopped.is_set():
+            w = self._watch = watch.Watch()
+            kwargs = dict({"timeout_seconds": self.RECONNECT_TIMEOUT},
+                          **self._kwargs)
+            if resource_version:
+                kwargs["resource_version"] = resource_version
+            try:
+                for event in w.stream(self._list_method, **kwargs):
+                    received_at = time.time()
+                    with self.lock:
+                        self._handler(event["type"], event["object"],
+                                      received_at)
+                        self.lock.notify_all()
+                    if self._stopped.is_set():
+                        w.stop()
+                resource_version = w.resource_version
+            except rest.ApiException as ex:
+                if self._stopped.is_set():
+                    return
+                if ex.status != 410:
+                    self._fail(ex)
+                    return
+                LOG.debug("Watch of %s has expired, relisting."
+                          % self._list_method.__name__)
+                resource_version = None
+                self.relists += 1
+            except Exception as ex:
+                if not self._stopped.is_set():
+                    self._fail(ex)
+                return
+
+    def _fail(self, ex):
+        LOG.warning("Watch of %(method)s failed: %(ex)s"
+                    % {"method": self._list_method.__name__, "ex": ex})
+        with self.lock:
+            self.error = ex
+            self.lock.notify_all()
+
+    def wait(self, predicate, timeout=None):
+        """Wait until predicate becomes True.
+
+        :param predicate: a callable without arguments, it is called under
+               watcher lock after each event
+        :param timeout: timeout in seconds, the same as for status polling
+               if None
+        :returns: True if predicate became True and False on timeout
+        """
+        if timeout is None:
+            timeout = (CONF.kubernetes.status_total_retries *
+                       CONF.kubernetes.status_poll_interval)
+        deadline = time.time() + timeout
+        with self.lock:
+            while not predicate():
+                if self.error is not None:
+                    raise self.error
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False
+                self.lock.wait(remaining)
+        return True
+
+    def stop(self):
+        self._stopped.set()
+        if self._watch is not None:
+            self._watch.stop()
+
+
+_RawResponse = collections.namedtuple("RawResponse", ["data"])
+
+ExecResult = collections.namedtuple("ExecResult",
+                                    ["exit_code", "match", "output"])
+
+
+class ExecSession(object):
+    """Interactive shell in a pod, which runs commands one by one.
+
+    Commands are written to stdin of a single exec stream and each one is
+    followed by a unique sentinel with the exit code printed on a new line,
+    so the output of different commands is delimited without new exec
+    requests even if the output doesn't end with a newline.
+    The output is processed line by line as it arrives, only the last
+    lines are kept.
+    """
+
+    SENTINEL = "__xrally_exec_%s__"
+    TAIL_LINES = 10
+
+    def __init__(self, resp):
+        """Init session.
+
+        :param resp: open exec stream of a shell with stdin
+        """
+        self._resp = resp
+        self._count = 0
+
+    def is_open(self):
+        return self._resp.is_open()
+
+    def run(self, command, error_regexp=None, timeout=None):
+        """Run shell command and wait for its completion.
+
+        :param command: shell command string, stderr is merged into stdout
+        :param error_regexp: regexp to search in each line of output
+        :param timeout: timeout in seconds, the same as for status polling
+               if None
+        :returns: ExecResult with the exit code, the first line matched by
+                  error_regexp or None and the last lines of output
+        """
+        if timeout is None:
+            timeout = (CONF.kubernetes.status_total_retries *
+                       CONF.kubernetes.status_poll_interval)
+        self._count += 1
+        sentinel = self.SENTINEL % self._count
+        regexp = re.compile(error_regexp) if error_regexp else None
+        self._resp.write_stdin("{ %s\n} 2>&1; printf '\\n%%s %%s\\n' %s $?\n"
+                               % (command, sentinel))
+
+        deadline = time.time() + timeout
+        tail = collections.deque(maxlen=self.TAIL_LINES)
+        match = None
+        partial = ""
+        while self._resp.is_open():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            lines = (partial + self._resp.read_stdout(
+                timeout=min(remaining, 1))).split("\n")
+            partial = lines.pop()
+            for line in lines:
+                if line.startswith(sentinel + " "):
+                    # NOTE: drop the empty line of the newline printed
+                    #   before the sentinel if the output ended with one
+                    if tail and not tail[-1]:
+                        tail.pop()
+                    return ExecResult(int(line.split()[1]), match,
+                                      "\n".join(tail))
+                tail.append(line)
+                if match is None and regexp and regexp.search(line):
+                    match = line
+        raise exceptions.TimeoutException(
+            desired_status="Command completed",
+            resource_name=command,
+            resource_type="Exec session",
+            resource_id="<no id>",
+            resource_status="stream is %s" % (
+                "open" if self._resp.is_open() else "closed"),
+            timeout=timeout)
+
+    def close(self):
+        self._resp.close()
+
+
+def _micro_time():
+    """Return current time in kubernetes MicroTime format."""
+    return datetime.datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _label_selector(labels):
+    """Make label selector string from labels map."""
+    return ",".join("%s=%s" % (k, v) for k, v in sorted(labels.items()))
+
+
 class Kubernetes(service.Service):
     """A wrapper for python kubernetes client.
 
@@ -184,6 +479,200 @@ class Kubernetes(service.Service):
         self.v1_batch = batch_v1_api.BatchV1Api(api)
         self.v1_apps = apps_v1_api.AppsV1Api(api)
         self.v1_storage = storage_v1_api.StorageV1Api(api)
+        self.v1_coordination = coordination_v1_api.CoordinationV1Api(api)
+        self.v1_discovery = discovery_v1_api.DiscoveryV1Api(api)
+        self.v1_policy = policy_v1_api.PolicyV1Api(api)
+        # NOTE: API clients with custom Accept headers, see read_raw
+        self._raw_apis = {}
+        # NOTE: interactive shell sessions in pods, see exec_session
+        self._exec_sessions = {}
+        self._api_classes = {
+            "v1_client": core_v1_api.CoreV1Api,
+            "v1_batch": batch_v1_api.BatchV1Api,
+            "v1_apps": apps_v1_api.AppsV1Api,
+            "v1_coordination": coordination_v1_api.CoordinationV1Api,
+            "v1_discovery": discovery_v1_api.DiscoveryV1Api,
+            "v1_policy": policy_v1_api.PolicyV1Api
+        }
+
+    def clone(self):
+        """Return a copy of service which shares API clients, not atomics.
+
+        Atomic actions are not thread-safe, so helper threads should call
+        service methods of a clone, while the caller measures the whole
+        bulk operation by itself.
+        """
+        cloned = copy.copy(self)
+        cloned._atomic_actions = []
+        return cloned
+
+    # NOTE: map of resource kind to API client attribute and the names of
+    #   namespaced and cluster-wide list methods.
+    LIST_METHODS = {
+        "pod": ("v1_client", "list_namespaced_pod",
+                "list_pod_for_all_namespaces"),
+        "service": ("v1_client", "list_namespaced_service",
+                    "list_service_for_all_namespaces"),
+        "endpoints": ("v1_client", "list_namespaced_endpoints",
+                      "list_endpoints_for_all_namespaces"),
+        "configmap": ("v1_client", "list_namespaced_config_map",
+                      "list_config_map_for_all_namespaces"),
+        "secret": ("v1_client", "list_namespaced_secret",
+                   "list_secret_for_all_namespaces"),
+        "event": ("v1_client", "list_namespaced_event",
+                  "list_event_for_all_namespaces"),
+        "persistentvolumeclaim": (
+            "v1_client", "list_namespaced_persistent_volume_claim",
+            "list_persistent_volume_claim_for_all_namespaces"),
+        "replicationcontroller": (
+            "v1_client", "list_namespaced_replication_controller",
+            "list_replication_controller_for_all_namespaces"),
+        "namespace": ("v1_client", None, "list_namespace"),
+        "node": ("v1_client", None, "list_node"),
+        "persistentvolume": ("v1_client", None, "list_persistent_volume"),
+        "deployment": ("v1_apps", "list_namespaced_deployment",
+                       "list_deployment_for_all_namespaces"),
+        "replicaset": ("v1_apps", "list_namespaced_replica_set",
+                       "list_replica_set_for_all_namespaces"),
+        "statefulset": ("v1_apps", "list_namespaced_stateful_set",
+                        "list_stateful_set_for_all_namespaces"),
+        "daemonset": ("v1_apps", "list_namespaced_daemon_set",
+                      "list_daemon_set_for_all_namespaces"),
+        "job": ("v1_batch", "list_namespaced_job",
+                "list_job_for_all_namespaces"),
+        "lease": ("v1_coordination", "list_namespaced_lease",
+                  "list_lease_for_all_namespaces"),
+        "endpointslice": ("v1_discovery", "list_namespaced_endpoint_slice",
+                          "list_endpoint_slice_for_all_namespaces")
+    }
+
+    def get_list_method(self, kind, namespaced=True):
+        """Return kubernetes client method to list resources of some kind.
+
+        Namespaced list methods require `namespace` argument.
+
+        :param kind: resource kind, one of LIST_METHODS keys
+        :param namespaced: return namespaced list method if resources of the
+               kind are namespaced, cluster-wide one otherwise
+        """
+        if kind not in self.LIST_METHODS:
+            raise exceptions.InvalidArgumentsException(
+                message="Unsupported resource kind '%(kind)s', allowed kinds:"
+                        " %(kinds)s" % {"kind": kind,
+                                        "kinds": ", ".join(
+                                            sorted(self.LIST_METHODS))})
+        api, namespaced_method, cluster_wide_method = self.LIST_METHODS[kind]
+        api = getattr(self, api)
+        if namespaced and namespaced_method:
+            return getattr(api, namespaced_method)
+        return getattr(api, cluster_wide_method)
+
+    def supports_list_argument(self, kind, argument):
+        """Check that list method of the kind accepts the argument.
+
+        Generated methods of old kubernetes clients reject arguments added
+        in newer API versions, e.g. resource_version_match, so arguments are
+        looked up in docstrings of the methods.
+
+        :param kind: resource kind, one of LIST_METHODS keys
+        :param argument: argument name
+        """
+        doc = self.get_list_method(kind).__doc__ or ""
+        return re.search(r":param (\w+ )?%s:" % argument, doc) is not None
+
+    # NOTE: Accept headers of list and get requests for each output format.
+    #   The apiserver falls back to plain JSON if it can't convert objects.
+    OUTPUT_FORMATS = {
+        "json": ("application/json", "application/json"),
+        "metadata": ("application/json;as=PartialObjectMetadataList;"
+                     "g=meta.k8s.io;v=v1,application/json",
+                     "application/json;as=PartialObjectMetadata;"
+                     "g=meta.k8s.io;v=v1,application/json"),
+        "table": ("application/json;as=Table;g=meta.k8s.io;v=v1,"
+                  "application/json",
+                  "application/json;as=Table;g=meta.k8s.io;v=v1,"
+                  "application/json")
+    }
+
+    def read_raw(self, kind, namespace=None, name=None, output="json",
+                 **kwargs):
+        """List resources or get a single resource without deserialization.
+
+        Responses are not deserialized, so the method is cheap enough to
+        load apiserver read path and supports output formats which are not
+        known to kubernetes client models.
+
+        :param kind: resource kind, one of LIST_METHODS keys
+        :param namespace: namespace name or None to list resources of all
+               namespaces
+        :param name: name of resource to get, resources are listed if None
+        :param output: one of OUTPUT_FORMATS keys
+        :param kwargs: additional kwargs for list method, e.g. limit,
+               resource_version or label_selector
+        :returns: raw response body
+        """
+        self.get_list_method(kind)
+        if output not in self.OUTPUT_FORMATS:
+            raise exceptions.InvalidArgumentsException(
+                message="Unsupported output format '%(output)s', allowed "
+                        "formats: %(formats)s" % {
+                            "output": output,
+                            "formats": ", ".join(sorted(self.OUTPUT_FORMATS))})
+        attr, namespaced, cluster_wide = self.LIST_METHODS[kind]
+        if namespaced and namespace is not None:
+            method = namespaced
+            kwargs["namespace"] = namespace
+        elif namespaced and name is not None:
+            raise exceptions.InvalidArgumentsException(
+                message="Namespace is required to get %s" % kind)
+        else:
+            method = cluster_wide
+        args = ()
+        if name is not None:
+            method = method.replace("list_", "read_", 1)
+            args = (name,)
+
+        key = (attr, output, name is not None)
+        if key not in self._raw_apis:
+            api = api_client.ApiClient(
+                configuration=self.api.configuration,
+                header_name="Accept",
+                header_value=self.OUTPUT_FORMATS[output][name is not None])
+            self._raw_apis[key] = self._api_classes[attr](api)
+        resp = getattr(self._raw_apis[key], method)(
+            *args, _preload_content=False, **kwargs)
+        return resp.data
+
+    def deserialize(self, data, model):
+        """Deserialize raw response body to kubernetes client model.
+
+        :param data: raw response body, e.g. returned by read_raw
+        :param model: model name, e.g. V1PodList
+        """
+        if "content_type" in inspect.signature(
+                self.api.deserialize).parameters:
+            return self.api.deserialize(data, model, "application/json")
+        # NOTE: old kubernetes clients expect response object instead of data
+        return self.api.deserialize(_RawResponse(data), model)
+
+    def watch(self, kind, handler, namespace=None, lock=None, **kwargs):
+        """Start watching resources in a background thread.
+
+        :param kind: resource kind, one of LIST_METHODS keys
+        :param handler: a callable which accepts event type, resource object
+               and time when event was received
+        :param namespace: namespace name or None to watch all namespaces
+        :param lock: lock of another watcher to share, so handlers of both
+               watchers are serialized
+        :param kwargs: additional kwargs for list method, e.g. label_selector
+        :returns: started ResourceWatcher instance
+        """
+        list_method = self.get_list_method(kind,
+                                           namespaced=namespace is not None)
+        if namespace is not None and self.LIST_METHODS[kind][1]:
+            kwargs["namespace"] = namespace
+        return ResourceWatcher(list_method, handler, lock=lock,
+                               **kwargs).start()
 
     def get_version(self):
         return version_api.VersionApi(self.api).get_code().to_dict()
@@ -308,6 +797,63 @@ class Kubernetes(service.Service):
         self.v1_client.create_namespaced_secret(namespace=namespace,
                                                 body=secret_manifest)
 
+    @atomic.action_timer("kubernetes.create_opaque_secret")
+    def create_opaque_secret(self, name, namespace, data, labels=None,
+                             annotations=None):
+        """Create Opaque secret with data.
+
+        :param name: secret name
+        :param namespace: secret namespace
+        :param data: secret data, values should be base64 encoded
+        :param labels: secret labels
+        :param annotations: secret annotations
+        """
+        manifest = {
+            "apiVersion": "v1",
+            "kind": "Secret",
+            "type": "Opaque",
+            "metadata": {
+                "name": name
+            },
+            "data": data
+        }
+        if labels:
+            manifest["metadata"]["labels"] = labels
+        if annotations:
+            manifest["metadata"]["annotations"] = annotations
+        self.v1_client.create_namespaced_secret(namespace=namespace,
+                                                body=manifest)
+
+    @atomic.action_timer("kubernetes.patch_secret")
+    def patch_secret(self, name, namespace, data=None, annotations=None):
+        """Patch data and/or annotations of secret.
+
+        :param name: secret name
+        :param namespace: secret namespace
+        :param data: secret data keys to update, values should be base64
+               encoded
+        :param annotations: secret annotations to update
+        """
+        body = {}
+        if data is not None:
+            body["data"] = data
+        if annotations is not None:
+            body["metadata"] = {"annotations": annotations}
+        self.v1_client.patch_namespaced_secret(name, namespace=namespace,
+                                               body=body)
+
+    @atomic.action_timer("kubernetes.delete_secrets")
+    def delete_secrets(self, namespace, labels):
+        """Delete all secrets with specified labels.
+
+        :param namespace: secrets namespace
+        :param labels: map of labels, which secrets should have
+        """
+        self.v1_client.delete_collection_namespaced_secret(
+            namespace,
+            label_selector=_label_selector(labels)
+        )
+
     @atomic.action_timer("kubernetes.delete_secret")
     def delete_secret(self, name, namespace):
         """Delete secret.
@@ -344,18 +890,21 @@ class Kubernetes(service.Service):
     @atomic.action_timer("kubernetes.create_pod")
     def create_pod(self, image, namespace, command=None, volume=None,
                    port=None, protocol=None, labels=None, name=None,
-                   status_wait=True):
+                   node_name=None, node_selector=None, status_wait=True):
         """Create pod and wait until status phase won't be Running.
 
         :param image: pod's image
         :param namespace: chosen namespace to create pod into
         :param volume: a dict, which contains `mount_path` and `volume` keys
-               with parts of pod's manifest as values
+               with parts of pod's manifest as values and optional `devices`
+               key with container volumeDevices for block volumes
         :param name: pod's custom name
         :param port: integer that represents container port
         :param protocol: container port's protocol
         :param labels: additional labels for pod
         :param command: array of strings which represents container command
+        :param node_name: bind pod to the node directly, bypassing scheduler
+        :param node_selector: map of node labels for scheduling pod
         :param status_wait: wait pod for Running status
         """
         name = name or self.generate_random_name()
@@ -371,6 +920,8 @@ class Kubernetes(service.Service):
             container_spec["command"] = list(command)
         if volume and volume.get("mount_path"):
             container_spec["volumeMounts"] = volume["mount_path"]
+        if volume and volume.get("devices"):
+            container_spec["volumeDevices"] = volume["devices"]
         if port is not None and isinstance(port, int) and port > 0:
             container_spec["ports"] = [{"containerPort": port}]
             if protocol is not None:
@@ -397,6 +948,10 @@ class Kubernetes(service.Service):
             del manifest["spec"]["serviceAccountName"]
         if volume and volume.get("volume"):
             manifest["spec"]["volumes"] = volume["volume"]
+        if node_name:
+            manifest["spec"]["nodeName"] = node_name
+        if node_selector:
+            manifest["spec"]["nodeSelector"] = node_selector
 
         self.v1_client.create_namespaced_pod(body=manifest,
                                              namespace=namespace)
@@ -412,29 +967,164 @@ class Kubernetes(service.Service):
                                 volume=volume)
         return name
 
+    def exec_session(self, name, namespace):
+        """Return interactive shell session in pod, open it if needed.
+
+        Sessions are cached per pod and reused by all checks of the pod, so
+        each check doesn't cost a new exec request. The session is closed by
+        delete_pod or close_exec_session.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        """
+        session = self._exec_sessions.get((namespace, name))
+        if session is None or not session.is_open():
+            with atomic.ActionTimer(self, "kubernetes.open_exec_session"):
+                session = ExecSession(stream(
+                    self.v1_client.connect_get_namespaced_pod_exec,
+                    name,
+                    namespace=namespace,
+                    command=["/bin/sh"],
+                    stderr=True, stdin=True,
+                    stdout=True, tty=False,
+                    _preload_content=False
+                ))
+            self._exec_sessions[(namespace, name)] = session
+        return session
+
+    def close_exec_session(self, name, namespace):
+        """Close interactive shell session in pod if it's open.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        """
+        session = self._exec_sessions.pop((namespace, name), None)
+        if session is not None:
+            session.close()
+
+    def exec_command(self, name, namespace, command, timeout=None):
+        """Run shell command in pod's shell session.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        :param command: shell command string
+        :param timeout: max time to wait for the command in seconds
+        :returns: ExecResult with the exit code and the last lines of output
+        """
+        return self.exec_session(name, namespace=namespace).run(
+            command, timeout=timeout)
+
     @atomic.action_timer("kube.check_volume_pod_existence")
-    def check_volume_pod(self, name, namespace, check_cmd, error_regexp=None):
-        """Exec check_cmd in pod and get response.
+    def check_volume_pod(self, name, namespace, check_cmd, error_regexp=None,
+                         shell_session=True):
+        """Exec check_cmd in pod and check its output.
 
         :param name: pod's name
         :param namespace: pod's namespace
-        :param check_cmd: check_cmd as array of strings
+        :param check_cmd: check_cmd as array of strings or shell command
         :param error_regexp: error regexp to raise exception
+        :param shell_session: run check_cmd in pod's shell session, which is
+               reused by the next commands in the pod, instead of a new exec
+               request; False to exec check_cmd directly, e.g. if the pod
+               image has no `/bin/sh`
         """
-        resp = stream(
+        if not shell_session:
+            if not isinstance(check_cmd, (list, tuple)):
+                check_cmd = shlex.split(check_cmd)
+            resp = stream(
+                self.v1_client.connect_get_namespaced_pod_exec,
+                name,
+                namespace=namespace,
+                command=check_cmd,
+                stderr=True, stdin=False,
+                stdout=True, tty=False
+            )
+            match = re.search(error_regexp, resp) if error_regexp else None
+            if "exec failed" in resp or match is not None:
+                raise exceptions.RallyException(
+                    message="Check pod's volume exec failed with error: %s"
+                            % resp
+                )
+            return
+
+        if isinstance(check_cmd, (list, tuple)):
+            check_cmd = " ".join(shlex.quote(arg) for arg in check_cmd)
+        result = self.exec_session(name, namespace=namespace).run(
+            check_cmd, error_regexp=error_regexp)
+
+        if result.exit_code != 0 or result.match is not None:
+            raise exceptions.RallyException(
+                message="Check pod's volume exec failed with error: %s" % (
+                    result.match or result.output)
+            )
+
+    @atomic.action_timer("kubernetes.open_exec_stream")
+    def exec_stream(self, name, namespace, command, stdin=False):
+        """Start command in pod and return its open exec stream.
+
+        Output of the command can be read incrementally, e.g. by
+        readline_stdout method of the returned client. The caller should
+        close the stream.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        :param command: command as array of strings
+        :param stdin: attach stdin of the command, so the caller can write
+               to it by write_stdin method of the returned client
+        """
+        return stream(
             self.v1_client.connect_get_namespaced_pod_exec,
             name,
             namespace=namespace,
-            command=check_cmd,
-            stderr=True, stdin=False,
-            stdout=True, tty=False
+            command=command,
+            stderr=True, stdin=stdin,
+            stdout=True, tty=False,
+            _preload_content=False
         )
 
-        regexp = re.search(error_regexp, resp)
-        if "exec failed" in resp or (error_regexp and regexp is not None):
-            raise exceptions.RallyException(
-                message="Check pod's volume exec failed with error: %s" % resp
-            )
+    def log_stream(self, name, namespace, follow=True, tail_lines=None,
+                   request_timeout=None):
+        """Open pod's log and return the raw HTTP response.
+
+        The content isn't preloaded, so the log can be read incrementally
+        by read method of the response. The caller should release its
+        connection.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        :param follow: keep the stream open and follow new log lines
+        :param tail_lines: number of existing lines to return, all by default
+        :param request_timeout: timeout of a single read in seconds
+        """
+        kwargs = {}
+        if tail_lines is not None:
+            kwargs["tail_lines"] = tail_lines
+        if request_timeout:
+            kwargs["_request_timeout"] = request_timeout
+        return self.v1_client.read_namespaced_pod_log(
+            name,
+            namespace=namespace,
+            follow=follow,
+            _preload_content=False,
+            **kwargs
+        )
+
+    def port_forward(self, name, namespace, ports):
+        """Open port-forward session to pod and return it.
+
+        Each forwarded port is available as a local socket by socket method
+        of the returned session. The caller should close the session.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        :param ports: list of pod's ports to forward
+        """
+        return portforward(
+            self.v1_client.connect_get_namespaced_pod_portforward,
+            name,
+            namespace,
+            ports=",".join(str(port) for port in ports)
+        )
 
     @atomic.action_timer("kubernetes.delete_pod")
     def delete_pod(self, name, namespace, status_wait=True):
@@ -444,6 +1134,7 @@ class Kubernetes(service.Service):
         :param namespace: pod's namespace
         :param status_wait: wait pod for termination
         """
+        self.close_exec_session(name, namespace=namespace)
         self.v1_client.delete_namespaced_pod(
             name,
             namespace=namespace,
@@ -458,6 +1149,38 @@ class Kubernetes(service.Service):
                                    resource_type="Pod",
                                    namespace=namespace)
 
+    @atomic.action_timer("kubernetes.label_pod")
+    def label_pod(self, name, namespace, labels):
+        """Add labels to pod.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        :param labels: map of labels to add
+        """
+        self.v1_client.patch_namespaced_pod(
+            name,
+            namespace=namespace,
+            body={"metadata": {"labels": labels}}
+        )
+
+    @atomic.action_timer("kubernetes.delete_pods")
+    def delete_pods(self, namespace, labels, grace_period_seconds=None):
+        """Delete all pods with specified labels by one request.
+
+        :param namespace: pods namespace
+        :param labels: map of labels, which pods should have
+        :param grace_period_seconds: pods termination grace period, default
+               one is used if None
+        """
+        kwargs = {}
+        if grace_period_seconds is not None:
+            kwargs["grace_period_seconds"] = grace_period_seconds
+        self.v1_client.delete_collection_namespaced_pod(
+            namespace,
+            label_selector=_label_selector(labels),
+            **kwargs
+        )
+
     @atomic.action_timer("kubernetes.get_replication_controller")
     def get_rc(self, name, namespace):
         return self.v1_client.read_namespaced_replication_controller(
@@ -467,13 +1190,14 @@ class Kubernetes(service.Service):
 
     @atomic.action_timer("kubernetes.create_replication_controller")
     def create_rc(self, replicas, image, namespace, command=None,
-                  status_wait=True):
+                  labels=None, status_wait=True):
         """Create RC and wait until it won't be running.
 
         :param replicas: number of replicas
         :param image: image for each replica
         :param namespace: replication controller namespace
         :param command: array of strings representing container command
+        :param labels: additional labels for replication controller's pods
         :param status_wait: wait replication controller for actual running
                replicas
         """
@@ -516,6 +1240,8 @@ class Kubernetes(service.Service):
             }
         }
 
+        if labels:
+            manifest["spec"]["template"]["metadata"]["labels"].update(labels)
         if not self._spec.get("serviceaccounts"):
             del manifest["spec"]["template"]["spec"]["serviceAccountName"]
 
@@ -545,7 +1271,7 @@ class Kubernetes(service.Service):
         :param replicas: number of replicas replication controller scale to
         :returns True if scale successful and False otherwise
         """
-        self.v1_client.patch_namespaced_replication_controller(
+        self.v1_client.patch_namespaced_replication_controller_scale(
             name=name,
             namespace=namespace,
             body={"spec": {"replicas": replicas}}
@@ -593,13 +1319,14 @@ class Kubernetes(service.Service):
 
     @atomic.action_timer("kubernetes.create_replicaset")
     def create_replicaset(self, namespace, replicas, image, command=None,
-                          status_wait=True):
+                          labels=None, status_wait=True):
         """Create replicaset and wait until it won't be ready.
 
         :param namespace: replicaset namespace
         :param replicas: number of replicaset replicas
         :param image: container's template image
         :param command: container's template array of strings command
+        :param labels: additional labels for replicaset's pods
         :param status_wait: wait for readiness if True
         """
         app = self.generate_random_name()
@@ -646,6 +1373,8 @@ class Kubernetes(service.Service):
             }
         }
 
+        if labels:
+            manifest["spec"]["template"]["metadata"]["labels"].update(labels)
         if not self._spec.get("serviceaccounts"):
             del manifest["spec"]["template"]["spec"]["serviceAccountName"]
 
@@ -667,7 +1396,7 @@ class Kubernetes(service.Service):
 
     @atomic.action_timer("kubernetes.scale_replicaset")
     def scale_replicaset(self, name, namespace, replicas, status_wait=True):
-        self.v1_apps.patch_namespaced_replica_set(
+        self.v1_apps.patch_namespaced_replica_set_scale(
             name,
             namespace=namespace,
             body={"spec": {"replicas": replicas}}
@@ -713,7 +1442,9 @@ class Kubernetes(service.Service):
 
     @atomic.action_timer("kubernetes.create_deployment")
     def create_deployment(self, namespace, replicas, image, resources=None,
-                          env=None, command=None, status_wait=True):
+                          env=None, command=None, labels=None,
+                          max_surge=None, max_unavailable=None,
+                          status_wait=True):
         """Create deployment and wait until it won't be ready.
 
         :param namespace: deployment namespace
@@ -722,6 +1453,11 @@ class Kubernetes(service.Service):
         :param resources: container's template resources requirements
         :param env: container's template env variables array
         :param command: container's template array of strings command
+        :param labels: additional labels for deployment's pods
+        :param max_surge: rolling update maxSurge, number or percentage
+               string, default one is used if None
+        :param max_unavailable: rolling update maxUnavailable, number or
+               percentage string, default one is used if None
         :param status_wait: wait for readiness if True
         """
         app = self.generate_random_name()
@@ -778,6 +1514,16 @@ class Kubernetes(service.Service):
             }
         }
 
+        if labels:
+            manifest["spec"]["template"]["metadata"]["labels"].update(labels)
+        rolling_update = {}
+        if max_surge is not None:
+            rolling_update["maxSurge"] = max_surge
+        if max_unavailable is not None:
+            rolling_update["maxUnavailable"] = max_unavailable
+        if rolling_update:
+            manifest["spec"]["strategy"] = {"type": "RollingUpdate",
+                                            "rollingUpdate": rolling_update}
         if not self._spec.get("serviceaccounts"):
             del manifest["spec"]["template"]["spec"]["serviceAccountName"]
 
@@ -800,14 +1546,15 @@ class Kubernetes(service.Service):
     @atomic.action_timer("kubernetes.rollout_deployment")
     def rollout_deployment(self, name, namespace, changes, replicas,
                            status_wait=True):
-        """Patch deployment and optionally wait for status.
+        """Patch deployment and optionally wait for rollout completion.
 
         :param name: deployment name
         :param namespace: deployment namespace
         :param changes: map of changes, where could be image, env or resources
                requirements
         :param replicas: deployment replicas for status
-        :param status_wait: wait for status if True
+        :param status_wait: wait for rollout completion if True
+        :returns: generation of the deployment with the changes
         """
         deployment = self.get_deployment(name, namespace=namespace)
         if changes.get("image"):
@@ -825,20 +1572,23 @@ class Kubernetes(service.Service):
                         "exclusive keys: image, env, resources."
             )
 
-        self.v1_apps.patch_namespaced_deployment(
+        resp = self.v1_apps.patch_namespaced_deployment(
             name=name,
             namespace=namespace,
             body=deployment
         )
+        generation = resp.metadata.generation
         if status_wait:
             with atomic.ActionTimer(
                     self,
                     "kubernetes.wait_for_deployment_rollout"):
-                wait_for_ready_replicas(
+                wait_for_rollout(
                     name,
                     read_method=self.get_deployment,
                     resource_type="Deployment",
+                    generation=generation,
                     namespace=namespace)
+        return generation
 
     @atomic.action_timer("kubernetes.delete_deployment")
     def delete_deployment(self, name, namespace, status_wait=True):
@@ -863,12 +1613,15 @@ class Kubernetes(service.Service):
                                    replicas=True)
 
     @atomic.action_timer("kubernetes.create_configmap")
-    def create_configmap(self, name, namespace, data):
+    def create_configmap(self, name, namespace, data, labels=None,
+                         annotations=None):
         """Create configMap resource.
 
         :param name: configMap resource name
         :param namespace: configMap namespace
         :param data: configMap data
+        :param labels: configMap labels
+        :param annotations: configMap annotations
         """
         manifest = {
             "apiVersion": "v1",
@@ -878,9 +1631,30 @@ class Kubernetes(service.Service):
             },
             "data": data
         }
+        if labels:
+            manifest["metadata"]["labels"] = labels
+        if annotations:
+            manifest["metadata"]["annotations"] = annotations
         self.v1_client.create_namespaced_config_map(namespace=namespace,
                                                     body=manifest)
 
+    @atomic.action_timer("kubernetes.patch_configmap")
+    def patch_configmap(self, name, namespace, data=None, annotations=None):
+        """Patch data and/or annotations of configMap resource.
+
+        :param name: configMap name
+        :param namespace: configMap namespace
+        :param data: configMap data keys to update
+        :param annotations: configMap annotations to update
+        """
+        body = {}
+        if data is not None:
+            body["data"] = data
+        if annotations is not None:
+            body["metadata"] = {"annotations": annotations}
+        self.v1_client.patch_namespaced_config_map(name, namespace=namespace,
+                                                   body=body)
+
     @atomic.action_timer("kubernetes.delete_configmap")
     def delete_configmap(self, name, namespace):
         """Delete configMap resource.
@@ -894,12 +1668,26 @@ class Kubernetes(service.Service):
             body=k8s_config.V1DeleteOptions()
         )
 
+    @atomic.action_timer("kubernetes.delete_configmaps")
+    def delete_configmaps(self, namespace, labels):
+        """Delete all configMaps with specified labels.
+
+        :param namespace: configMaps namespace
+        :param labels: map of labels, which configMaps should have
+        """
+        self.v1_client.delete_collection_namespaced_config_map(
+            namespace,
+            label_selector=_label_selector(labels)
+        )
+
     @atomic.action_timer("kubernetes.get_job")
     def get_job(self, name, namespace, **kwargs):
         return self.v1_batch.read_namespaced_job(name, namespace=namespace)
 
     @atomic.action_timer("kubernetes.create_job")
     def create_job(self, namespace, image, command, name=None,
+                   completions=None, parallelism=None, completion_mode=None,
+                   ttl_seconds_after_finished=None, labels=None,
                    status_wait=True):
         """Create job and optionally wait for status.
 
@@ -907,7 +1695,15 @@ class Kubernetes(service.Service):
         :param image: job container's image
         :param command: job container's command
         :param name: job custom name
-        :param status_wait: wait for status if True
+        :param completions: number of pods which should succeed, 1 if None
+        :param parallelism: max number of pods running at the same time
+        :param completion_mode: NonIndexed or Indexed
+        :param ttl_seconds_after_finished: delete finished job after this
+               number of seconds, the job which is already removed while
+               waiting for status is considered as finished then
+        :param labels: job labels
+        :param status_wait: wait for status if True, fail once job gets
+               Failed condition
         :return: name
         """
         name = name or self.generate_random_name()
@@ -944,6 +1740,17 @@ class Kubernetes(service.Service):
 
         if not self._spec.get("serviceaccounts"):
             del manifest["spec"]["template"]["spec"]["serviceAccountName"]
+        if labels:
+            manifest["metadata"]["labels"] = labels
+        if completions is not None:
+            manifest["spec"]["completions"] = completions
+        if parallelism is not None:
+            manifest["spec"]["parallelism"] = parallelism
+        if completion_mode is not None:
+            manifest["spec"]["completionMode"] = completion_mode
+        if ttl_seconds_after_finished is not None:
+            manifest["spec"]["ttlSecondsAfterFinished"] = (
+                ttl_seconds_after_finished)
 
         self.v1_batch.create_namespaced_job(namespace=namespace, body=manifest)
 
@@ -955,19 +1762,34 @@ class Kubernetes(service.Service):
                 commonutils.interruptable_sleep(
                     CONF.kubernetes.start_prepoll_delay)
 
+                succeeded = completions or 1
                 i = 0
                 while i < retries_total:
-                    resp = self.get_job(name=name, namespace=namespace)
+                    try:
+                        resp = self.get_job(name=name, namespace=namespace)
+                    except rest.ApiException as ex:
+                        # NOTE: a finished job can be removed by TTL
+                        #  controller before it's polled
+                        if (ex.status == 404 and
+                                ttl_seconds_after_finished is not None):
+                            break
+                        raise
                     resp_id = resp.metadata.uid
                     current_status = resp.status.succeeded
-                    if current_status != 1:
+                    for condition in resp.status.conditions or []:
+                        if (condition.type == "Failed" and
+                                condition.status == "True"):
+                            raise exceptions.RallyException(
+                                message="Job %(name)s failed: %(msg)s" % {
+                                    "name": name, "msg": condition.message})
+                    if current_status != succeeded:
                         i += 1
                         commonutils.interruptable_sleep(sleep_time)
                     else:
                         break
                     if i == retries_total:
                         raise exceptions.TimeoutException(
-                            desired_status="1 succeeded",
+                            desired_status="%s succeeded" % succeeded,
                             resource_name=name,
                             resource_type="Job",
                             resource_id=resp_id or "<no id>",
@@ -998,6 +1820,19 @@ class Kubernetes(service.Service):
                                    namespace=namespace,
                                    active=True)
 
+    @atomic.action_timer("kubernetes.delete_jobs")
+    def delete_jobs(self, namespace, labels):
+        """Delete all jobs with specified labels together with their pods.
+
+        :param namespace: jobs namespace
+        :param labels: map of labels, which jobs should have
+        """
+        self.v1_batch.delete_collection_namespaced_job(
+            namespace,
+            label_selector=_label_selector(labels),
+            propagation_policy="Background"
+        )
+
     @atomic.action_timer("kubernetes.get_statefulset")
     def get_statefulset(self, name, namespace):
         return self.v1_apps.read_namespaced_stateful_set(
@@ -1007,13 +1842,21 @@ class Kubernetes(service.Service):
 
     @atomic.action_timer("kubernetes.create_statefulset")
     def create_statefulset(self, namespace, replicas, image, command=None,
-                           status_wait=True):
+                           labels=None, pod_management_policy=None,
+                           volume_claim_template=None, status_wait=True):
         """Create statefulset and optionally wait for ready replicas.
 
         :param namespace: statefulset namespace
         :param replicas: statefulset number of replicas
         :param image: container's template image
         :param command: container's template array of strings command
+        :param labels: additional labels of the selector, pods and claims
+        :param pod_management_policy: "OrderedReady" or "Parallel", default
+               one is used if None
+        :param volume_claim_template: a dict with `mount_path`, `size` and
+               optional `storage_class` and `access_modes` keys, each pod
+               gets own claim named data-<statefulset>-<ordinal> mounted to
+               `mount_path`
         :param status_wait: wait for ready replicas if True
         """
         app = self.generate_random_name()
@@ -1060,6 +1903,32 @@ class Kubernetes(service.Service):
             }
         }
 
+        if labels:
+            manifest["spec"]["selector"]["matchLabels"].update(labels)
+            manifest["spec"]["template"]["metadata"]["labels"].update(labels)
+        if pod_management_policy:
+            manifest["spec"]["podManagementPolicy"] = pod_management_policy
+        if volume_claim_template:
+            container_spec["volumeMounts"] = [{
+                "name": "data",
+                "mountPath": volume_claim_template["mount_path"]
+            }]
+            claim_spec = {
+                "accessModes": list(volume_claim_template.get(
+                    "access_modes", ["ReadWriteOnce"])),
+                "resources": {
+                    "requests": {
+                        "storage": volume_claim_template["size"]
+                    }
+                }
+            }
+            if volume_claim_template.get("storage_class"):
+                claim_spec["storageClassName"] = (
+                    volume_claim_template["storage_class"])
+            manifest["spec"]["volumeClaimTemplates"] = [{
+                "metadata": {"name": "data"},
+                "spec": claim_spec
+            }]
         if not self._spec.get("serviceaccounts"):
             del manifest["spec"]["template"]["spec"]["serviceAccountName"]
 
@@ -1088,7 +1957,7 @@ class Kubernetes(service.Service):
         :param replicas: statefulset replicas scale to
         :param status_wait: wait for ready scaling if True
         """
-        self.v1_apps.patch_namespaced_stateful_set(
+        self.v1_apps.patch_namespaced_stateful_set_scale(
             name,
             namespace=namespace,
             body={"spec": {"replicas": replicas}}
@@ -1144,6 +2013,105 @@ class Kubernetes(service.Service):
                     node_names.append(meta.name)
         return node_names
 
+    def list_node_addresses(self, address_type="InternalIP",
+                            node_labels=None):
+        """Return map of node names to their addresses of some type.
+
+        Nodes without address of the type are skipped.
+
+        :param address_type: node address type, e.g. InternalIP or ExternalIP
+        :param node_labels: map of labels, which nodes should have
+        """
+        kwargs = {}
+        if node_labels:
+            kwargs["label_selector"] = _label_selector(node_labels)
+        addresses = {}
+        for node in self.v1_client.list_node(**kwargs).items:
+            for address in (node.status and node.status.addresses) or []:
+                if address.type == address_type:
+                    addresses[node.metadata.name] = address.address
+                    break
+        return addresses
+
+    @atomic.action_timer("kubernetes.cordon_node")
+    def cordon_node(self, name):
+        """Mark node as unschedulable.
+
+        :param name: node name
+        """
+        self.v1_client.patch_node(name, body={"spec": {"unschedulable": True}})
+
+    @atomic.action_timer("kubernetes.uncordon_node")
+    def uncordon_node(self, name):
+        """Mark node as schedulable.
+
+        :param name: node name
+        """
+        self.v1_client.patch_node(name,
+                                  body={"spec": {"unschedulable": False}})
+
+    @atomic.action_timer("kubernetes.evict_pod")
+    def evict_pod(self, name, namespace):
+        """Evict pod through the Eviction API.
+
+        The API responds with 429 status if the eviction would violate a
+        PodDisruptionBudget, rest.ApiException is raised then.
+
+        :param name: pod's name
+        :param namespace: pod's namespace
+        """
+        self.v1_client.create_namespaced_pod_eviction(
+            name,
+            namespace=namespace,
+            body=k8s_config.V1Eviction(
+                metadata=k8s_config.V1ObjectMeta(name=name,
+                                                 namespace=namespace))
+        )
+
+    @atomic.action_timer("kubernetes.create_pod_disruption_budget")
+    def create_pdb(self, name, namespace, labels, min_available=None,
+                   max_unavailable=None):
+        """Create PodDisruptionBudget for pods with specified labels.
+
+        :param name: PodDisruptionBudget name
+        :param namespace: PodDisruptionBudget namespace
+        :param labels: map of labels, which pods should have
+        :param min_available: number or percentage string of pods, which
+               should stay available
+        :param max_unavailable: number or percentage string of pods, which
+               can be unavailable
+        """
+        manifest = {
+            "apiVersion": "policy/v1",
+            "kind": "PodDisruptionBudget",
+            "metadata": {
+                "name": name
+            },
+            "spec": {
+                "selector": {
+                    "matchLabels": labels
+                }
+            }
+        }
+        if min_available is not None:
+            manifest["spec"]["minAvailable"] = min_available
+        if max_unavailable is not None:
+            manifest["spec"]["maxUnavailable"] = max_unavailable
+
+        self.v1_policy.create_namespaced_pod_disruption_budget(
+            namespace=namespace,
+            body=manifest
+        )
+        return name
+
+    @atomic.action_timer("kubernetes.delete_pod_disruption_budget")
+    def delete_pdb(self, name, namespace):
+        self.v1_policy.delete_namespaced_pod_disruption_budget(
+            name,
+            namespace=namespace,
+            body=k8s_config.V1DeleteOptions()
+        )
+
     @atomic.action_timer("kubernetes.get_daemonset")
     def get_daemonset(self, name, namespace, **kwargs):
         return self.v1_apps.read_namespaced_daemon_set(
@@ -1333,6 +2301,38 @@ class Kubernetes(service.Service):
             namespace=namespace
         )
 
+    def probe_url(self, name, namespace, url, request_timeout=None):
+        """Request url by curl from prober pod.
+
+        :param name: prober pod's name
+        :param namespace: prober pod's namespace
+        :param url: url to request
+        :param request_timeout: curl max time of request in seconds
+        :returns: pair of HTTP code and request duration in seconds measured
+                  by curl inside the cluster, HTTP code is 0 if connection
+                  failed
+        """
+        command = ["curl", "-s", "-o", "/dev/null",
+                   "-w", "%{http_code} %{time_total}"]
+        if request_timeout:
+            command.extend(["--max-time", str(request_timeout)])
+        command.append(url)
+        resp = stream(
+            self.v1_client.connect_get_namespaced_pod_exec,
+            name,
+            namespace=namespace,
+            command=command,
+            stderr=True, stdin=False,
+            stdout=True, tty=False
+        )
+        match = re.search(r"(\d{3}) (\d+[.,]?\d*)\s*$", resp or "")
+        if match is None:
+            raise exceptions.RallyException(
+                message="Unable to parse curl output of prober %(name)s: "
+                        "%(resp)s" % {"name": name, "resp": resp})
+        return (int(match.group(1)),
+                float(match.group(2).replace(",", ".")))
+
     @atomic.action_timer("kubernetes.create_endpoints")
     def create_endpoints(self, name, namespace, ip, port):
         manifest = {
@@ -1459,6 +2459,21 @@ class Kubernetes(service.Service):
     def get_local_pv(self, name):
         return self.v1_client.read_persistent_volume(name)
 
+    @atomic.action_timer("kubernetes.release_local_persistent_volume")
+    def release_local_pv(self, name):
+        """Remove claim reference of released local PV to reuse it.
+
+        PVs with Retain reclaim policy stay Released after their claims are
+        deleted, the PV becomes Available again without the claim
+        reference.
+
+        :param name: local PV name
+        """
+        self.v1_client.patch_persistent_volume(
+            name,
+            body={"spec": {"claimRef": None}}
+        )
+
     @atomic.action_timer("kubernetes.delete_local_persistent_volume")
     def delete_local_pv(self, name, status_wait=True):
         """Delete local PV and optionally wait for not found it.
@@ -1482,7 +2497,7 @@ class Kubernetes(service.Service):
 
     @atomic.action_timer("kubernetes.create_local_persistent_volume_claim")
     def create_local_pvc(self, name, namespace, storage_class, access_modes,
-                         size):
+                         size, volume_name=None):
         """Create local persistent volume claim.
 
         :param name: local PVC name
@@ -1491,6 +2506,8 @@ class Kubernetes(service.Service):
         :param access_modes: array of strings - access modes (see kubernetes
                docs)
         :param size: PV size (see kubernetes docs)
+        :param volume_name: name of PV to bind the claim to, any matching PV
+               of storageClass is bound if None
         :return:
         """
         manifest = {
@@ -1509,6 +2526,8 @@ class Kubernetes(service.Service):
                 "storageClassName": storage_class
             }
         }
+        if volume_name:
+            manifest["spec"]["volumeName"] = volume_name
 
         self.v1_client.create_namespaced_persistent_volume_claim(
             namespace=namespace,
@@ -1543,3 +2562,124 @@ class Kubernetes(service.Service):
                                    namespace=namespace,
                                    read_method=self.get_local_pvc,
                                    resource_type="Persistent Volume Claim")
+
+    @atomic.action_timer("kubernetes.create_pvc")
+    def create_pvc(self, name, namespace, storage_class, access_modes, size,
+                   volume_mode=None, labels=None):
+        """Create persistent volume claim of any storageClass.
+
+        :param name: PVC name
+        :param namespace: PVC namespace
+        :param storage_class: name of existing storageClass
+        :param access_modes: array of strings - access modes (see kubernetes
+               docs)
+        :param size: requested storage size (see kubernetes docs)
+        :param volume_mode: "Filesystem" or "Block", storageClass default if
+               None
+        :param labels: additional labels for PVC
+        """
+        manifest = {
+            "kind": "PersistentVolumeClaim",
+            "apiVersion": "v1",
+            "metadata": {
+                "name": name,
+                "labels": {
+                    "role": name
+                }
+            },
+            "spec": {
+                "resources": {
+                    "requests": {
+                        "storage": size
+                    }
+                },
+                "accessModes": access_modes,
+                "storageClassName": storage_class
+            }
+        }
+        if volume_mode:
+            manifest["spec"]["volumeMode"] = volume_mode
+        if labels:
+            manifest["metadata"]["labels"].update(labels)
+
+        self.v1_client.create_namespaced_persistent_volume_claim(
+            namespace=namespace,
+            body=manifest
+        )
+        return name
+
+    @atomic.action_timer("kubernetes.delete_pvcs")
+    def delete_pvcs(self, namespace, labels):
+        """Delete all persistent volume claims with specified labels.
+
+        :param namespace: PVCs namespace
+        :param labels: map of labels, which PVCs should have
+        """
+        self.v1_client.delete_collection_namespaced_persistent_volume_claim(
+            namespace,
+            label_selector=_label_selector(labels)
+        )
+
+    @atomic.action_timer("kubernetes.delete_pvc")
+    def delete_pvc(self, name, namespace):
+        self.v1_client.delete_namespaced_persistent_volume_claim(
+            name=name,
+            namespace=namespace,
+            body=k8s_config.V1DeleteOptions()
+        )
+
+    @atomic.action_timer("kubernetes.create_lease")
+    def create_lease(self, name, namespace, holder, lease_duration,
+                     labels=None):
+        """Create coordination.k8s.io Lease like kubelet does for its node.
+
+        :param name: lease name
+        :param namespace: lease namespace
+        :param holder: lease holder identity
+        :param lease_duration: lease duration in seconds
+        :param labels: lease labels
+        """
+        manifest = {
+            "apiVersion": "coordination.k8s.io/v1",
+            "kind": "Lease",
+            "metadata": {
+                "name": name,
+                "labels": labels or {}
+            },
+            "spec": {
+                "holderIdentity": holder,
+                "leaseDurationSeconds": lease_duration,
+                "renewTime": _micro_time()
+            }
+        }
+        self.v1_coordination.create_namespaced_lease(namespace=namespace,
+                                                     body=manifest)
+
+    def renew_lease(self, name, namespace, holder):
+        """Patch lease renewTime.
+
+        It is not an atomic action, since it is designed to be called a lot
+        of times from many threads, so callers measure latency themselves.
+
+        :param name: lease name
+        :param namespace: lease namespace
+        :param holder: lease holder identity
+        """
+        self.v1_coordination.patch_namespaced_lease(
+            name,
+            namespace=namespace,
+            body={"spec": {"holderIdentity": holder,
+                           "renewTime": _micro_time()}}
+        )
+
+    @atomic.action_timer("kubernetes.delete_leases")
+    def delete_leases(self, namespace, labels):
+        """Delete all leases with specified labels.
+
+        :param namespace: leases namespace
+        :param labels: map of labels, which leases should have
+        """
+        self.v1_coordination.delete_collection_namespaced_lease(
+            namespace,
+            label_selector=_label_selector(labels)
+        )
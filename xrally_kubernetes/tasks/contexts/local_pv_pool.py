@@ -0,0 +1,140 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from concurrent import futures
+import queue
+
+from rally.task import atomic
+from rally.task import context
+
+from xrally_kubernetes.tasks import context as common_context
+
+
+class LocalPVPool(object):
+    """Free list of PVs of the pool shared by iterations.
+
+    Iterations take a free PV and return it when its claim is deleted, so
+    a PV is never used by two iterations at once.
+    """
+
+    def __init__(self):
+        self.names = []
+        self._free = queue.Queue()
+
+    def __deepcopy__(self, memo):
+        # NOTE: the runner deep copies the context for each iteration, all
+        #   the copies should share the same free list
+        return self
+
+    def add(self, name):
+        self.names.append(name)
+        self._free.put(name)
+
+    def acquire(self, timeout=None):
+        """Take a free PV, wait until other iteration returns one if needed.
+
+        :param timeout: max time to wait in seconds
+        :returns: PV name or None if there is no free PV in time
+        """
+        try:
+            return self._free.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def release(self, name):
+        self._free.put(name)
+
+
+@context.configure("local_pv_pool", order=1003, platform="kubernetes")
+class LocalPVPoolContext(common_context.BaseKubernetesContext):
+    """Context for creating a pool of local persistent volumes.
+
+    PVs are created in parallel before the workload, each iteration takes a
+    free PV of the pool for its claim and returns it at the end, so
+    iterations don't wait for PV creation and don't compete for the same
+    PV. If all PVs are in use, the iteration waits for a free one, so
+    `count` should be at least the runner concurrency. The free list is
+    kept in memory of the runner process, so the runner should use one
+    process, e.g. `max_cpu_count` 1, scenarios reject other runners by
+    single_process_runner validator. The `local_storageclass` context is
+    required.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "count": {
+                "type": "integer",
+                "minimum": 1
+            },
+            "persistent_volume": {
+                "type": "object",
+                "additionalProperties": False,
+                "properties": {
+                    "size": {"type": "string"},
+                    "volume_mode": {"type": "string"},
+                    "local_path": {"type": "string"},
+                    "access_modes": {
+                        "type": "array",
+                        "items": {"type": "string"}
+                    },
+                    "node_affinity": {"type": "object"}
+                },
+                "required": ["size", "volume_mode", "local_path",
+                             "access_modes", "node_affinity"]
+            },
+            "workers": {
+                "type": "integer",
+                "minimum": 1
+            }
+        },
+        "required": ["count", "persistent_volume"]
+    }
+
+    DEFAULT_CONFIG = {"workers": 10}
+
+    def _create(self, name):
+        pv = self.config["persistent_volume"]
+        self.client.clone().create_local_pv(
+            name,
+            storage_class=self.context["kubernetes"]["storageclass"],
+            size=pv["size"],
+            volume_mode=pv["volume_mode"],
+            local_path=pv["local_path"],
+            access_modes=list(pv["access_modes"]),
+            node_affinity=pv["node_affinity"],
+            status_wait=True
+        )
+        self.context["kubernetes"]["local_pv_pool"].add(name)
+
+    def _delete(self, name):
+        self.client.clone().delete_local_pv(name, status_wait=True)
+
+    def setup(self):
+        names = [self.generate_random_name()
+                 for _ in range(self.config["count"])]
+        self.context["kubernetes"]["local_pv_pool"] = LocalPVPool()
+        with atomic.ActionTimer(self, "kubernetes.create_local_pv_pool"):
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.config["workers"]) as executor:
+                list(executor.map(self._create, names))
+
+    def cleanup(self):
+        pool = self.context["kubernetes"].get("local_pv_pool")
+        with atomic.ActionTimer(self, "kubernetes.delete_local_pv_pool"):
+            with futures.ThreadPoolExecutor(
+                    max_workers=self.config["workers"]) as executor:
+                list(executor.map(self._delete,
+                                  pool.names if pool is not None else []))
@@ -0,0 +1,51 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from rally import exceptions
+from rally.task import context
+
+from xrally_kubernetes.tasks import context as common_context
+
+
+@context.configure("nodes", order=1001, platform="kubernetes")
+class NodesContext(common_context.BaseKubernetesContext):
+    """Context for listing nodes once for the whole workload.
+
+    Sorted names of nodes are saved to the context, so scenarios, which
+    spread pods over nodes, don't list them on each iteration.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "node_labels": {
+                "type": "object",
+                "additionalProperties": {"type": "string"}
+            }
+        }
+    }
+
+    def setup(self):
+        node_labels = self.config.get("node_labels")
+        nodes = sorted(set(self.client.list_nodes(
+            dict(node_labels) if node_labels else None)))
+        if not nodes:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="There are no nodes matching labels %s" % node_labels)
+        self.context["kubernetes"]["nodes"] = nodes
+
+    def cleanup(self):
+        pass
@@ -0,0 +1,59 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from rally.task import context
+
+from xrally_kubernetes.tasks import context as common_context
+
+
+@context.configure("prober", order=1002, platform="kubernetes")
+class ProberContext(common_context.BaseKubernetesContext):
+    """Context for creating long-lived prober pod in each namespace.
+
+    Scenarios exec curl in the prober pod of the chosen namespace to check
+    services from inside the cluster instead of starting a pod per check.
+    """
+
+    CONFIG_SCHEMA = {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {
+            "image": {
+                "type": "string"
+            }
+        }
+    }
+
+    DEFAULT_CONFIG = {"image": "appropriate/curl:edge"}
+
+    # NOTE: sleep in a loop, so the pod is terminated at once by TERM signal
+    COMMAND = ["sh", "-c", "trap exit TERM; while true; do sleep 1; done"]
+
+    def setup(self):
+        self.context["kubernetes"].setdefault("probers", {})
+        for namespace in self.context["kubernetes"].get("namespaces") or []:
+            name = self.client.create_pod(
+                self.config["image"],
+                namespace=namespace,
+                command=self.COMMAND,
+                labels={"app": "xrally-prober"},
+                status_wait=True
+            )
+            self.context["kubernetes"]["probers"][namespace] = name
+
+    def cleanup(self):
+        for namespace, name in self.context["kubernetes"].get(
+                "probers", {}).items():
+            self.client.delete_pod(name, namespace=namespace,
+                                   status_wait=False)
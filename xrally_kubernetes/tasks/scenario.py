@@ -15,12 +15,37 @@
 import random
 import string
 
+from rally.common import cfg
 from rally.common.plugin import plugin
 from rally.common import validation
+from rally import exceptions
 from rally.task import scenario
 
+from xrally_kubernetes.common import utils
 from xrally_kubernetes import service as k8s_service
 
+CONF = cfg.CONF
+
+
+def wait_for(watcher, predicate, name, resource_type, desired_status):
+    """Wait for predicate by watcher or raise TimeoutException.
+
+    :param watcher: ResourceWatcher instance
+    :param predicate: a callable checked under watcher lock
+    :param name: name of the resource for the error message
+    :param resource_type: type of the resource for the error message
+    :param desired_status: awaited state for the error message
+    """
+    if not watcher.wait(predicate):
+        raise exceptions.TimeoutException(
+            desired_status=desired_status,
+            resource_name=name,
+            resource_type=resource_type,
+            resource_id="<no id>",
+            resource_status="Not observed",
+            timeout=(CONF.kubernetes.status_total_retries *
+                     CONF.kubernetes.status_poll_interval))
+
 
 @validation.add_default("required_kubernetes_platform")
 @plugin.default_meta(inherit=False)
@@ -38,6 +63,46 @@ class BaseKubernetesScenario(scenario.Scenario):
             idx = idx % len(self.context["kubernetes"]["namespaces"])
             return self.context["kubernetes"]["namespaces"][idx]
 
+    def add_latency_output(self, title, latencies, description=""):
+        """Add complete output table with percentiles of latencies.
+
+        :param title: table title
+        :param latencies: list of pairs, where the first element is a row
+               name and the second one is a list of durations in seconds
+        :param description: table description
+        """
+        rows = []
+        for name, points in latencies:
+            stats = utils.latency_stats(points)
+            rows.append([name] +
+                        [round(v, 4) if v is not None else "n/a"
+                         for v in stats[:-1]] +
+                        [stats[-1]])
+        self.add_output(
+            complete={"title": title,
+                      "description": description,
+                      "chart_plugin": "Table",
+                      "data": {"cols": ["Action", "Min (sec)",
+                                        "Median (sec)", "90%ile (sec)",
+                                        "95%ile (sec)", "99%ile (sec)",
+                                        "Max (sec)", "Avg (sec)", "Count"],
+                               "rows": rows}})
+
+    def add_atomic_action(self, name, started_at, finished_at):
+        """Add atomic action measured without ActionTimer.
+
+        It's useful when the action is bounded by watch events, which are
+        received in background threads.
+
+        :param name: atomic action name
+        :param started_at: start timestamp
+        :param finished_at: finish timestamp
+        """
+        self._atomic_actions.append({"name": name,
+                                     "children": [],
+                                     "started_at": started_at,
+                                     "finished_at": finished_at})
+
     def __init__(self, context=None):
         super(BaseKubernetesScenario, self).__init__(context)
         self.context.setdefault("kubernetes", {})
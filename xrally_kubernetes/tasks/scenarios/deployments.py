@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 from rally.task import scenario
 from rally.task import validation
 
@@ -60,12 +62,26 @@ class CreateRolloutAndDeleteDeployment(common_scenario.BaseKubernetesScenario):
     """Kubernetes deployment rollout test.
 
     Create deployment, rollout deployment with some args and delete it then.
+    Replicas of the deployment are recorded by watch during the rollout to
+    show its progression.
     """
 
+    def _on_deployment_event(self, event_type, deployment, received_at):
+        if event_type == "DELETED" or deployment.status is None:
+            return
+        status = deployment.status
+        self._samples.append((received_at, status.updated_replicas or 0,
+                              status.ready_replicas or 0,
+                              status.available_replicas or 0))
+
     def run(self, image, replicas, changes, command=None,
-            env=None, resources=None, status_wait=True):
+            env=None, resources=None, max_surge=None, max_unavailable=None,
+            status_wait=True):
         """Create deployment, rollout with some changes and then delete it.
 
+        Rollout is complete when the new generation of the deployment is
+        observed and all its replicas are updated and available.
+
         :param image: deployment pod template image
         :param replicas: original number of replicas
         :param changes: map of changes, where could be image, env or resources
@@ -73,6 +89,10 @@ class CreateRolloutAndDeleteDeployment(common_scenario.BaseKubernetesScenario):
         :param resources: container's template resources requirements
         :param env: container's template env variables array
         :param command: array of strings representing container command
+        :param max_surge: rolling update maxSurge, number or percentage
+               string
+        :param max_unavailable: rolling update maxUnavailable, number or
+               percentage string
         :param status_wait: wait for full status if True
         """
         namespace = self.choose_namespace()
@@ -84,16 +104,48 @@ class CreateRolloutAndDeleteDeployment(common_scenario.BaseKubernetesScenario):
             command=command,
             env=env,
             resources=resources,
+            max_surge=max_surge,
+            max_unavailable=max_unavailable,
             status_wait=status_wait
         )
 
-        self.client.rollout_deployment(
-            name,
-            namespace=namespace,
-            replicas=replicas,
-            changes=changes,
-            status_wait=status_wait
-        )
+        self._samples = []
+        watcher = self.client.watch(
+            "deployment", handler=self._on_deployment_event,
+            namespace=namespace, field_selector="metadata.name=%s" % name)
+        try:
+            start = time.time()
+            self.client.rollout_deployment(
+                name,
+                namespace=namespace,
+                replicas=replicas,
+                changes=changes,
+                status_wait=status_wait
+            )
+        finally:
+            watcher.stop()
+
+        with watcher.lock:
+            # NOTE: the first event is the state before the rollout
+            samples = [(round(max(t - start, 0), 3), u, r, a)
+                       for t, u, r, a in self._samples]
+        data = [[series, [[sample[0], sample[i]] for sample in samples]]
+                for i, series in ((1, "updated"), (2, "ready"),
+                                  (3, "available"))]
+        strategy = {"replicas": replicas,
+                    "surge": "default" if max_surge is None else max_surge,
+                    "unavailable": ("default" if max_unavailable is None
+                                    else max_unavailable)}
+        self.add_output(
+            complete={"title": "Deployment rollout progression",
+                      "description": "Replicas of %(replicas)s during the "
+                                     "rollout with maxSurge %(surge)s and "
+                                     "maxUnavailable %(unavailable)s"
+                                     % strategy,
+                      "chart_plugin": "Lines",
+                      "data": data,
+                      "label": "Number of replicas",
+                      "axis_label": "Seconds since rollout start"})
 
         self.client.delete_deployment(
             name=name,
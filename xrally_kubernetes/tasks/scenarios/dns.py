@@ -0,0 +1,200 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import re
+import time
+
+from kubernetes.client import rest
+from rally import exceptions
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+@validation.add("required_contexts", contexts=["prober"])
+@validation.add("number", param_name="lookups", minval=0, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="parallel", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="services", minval=0, integer_only=True,
+                nullable=True)
+@scenario.configure("Kubernetes.resolve_service_names", platform="kubernetes")
+class ResolveServiceNames(common_scenario.BaseKubernetesScenario):
+    """Measure in-cluster DNS resolution latency and new services discovery.
+
+    The prober pod of the namespace is used as a resolver. A single shell
+    script is started in it by one exec call: it issues bursts of lookups
+    of existing names, then waits on its stdin until the services are
+    created and polls their names until they are resolvable. Polling only
+    starts after creation, so the negative responses for not yet existing
+    names aren't cached by DNS server. The script prints one line per
+    result and the lines are parsed as they arrive from the exec stream.
+    """
+
+    PREFIX = "xrally:"
+    NAME_RE = re.compile(r"^[a-z0-9]([a-z0-9.-]*[a-z0-9])?$")
+    SCRIPT = (
+        "q() { s=$(date +%%s%%N); "
+        "if nslookup $1 >/dev/null 2>&1; then r=ok; else r=fail; fi; "
+        "echo \"%(prefix)squery $1 $r $(( ($(date +%%s%%N) - s) / 1000 ))\"; "
+        "}; "
+        "b() { i=0; while [ $i -lt %(lookups)s ]; do "
+        "for n in %(names)s; do q $n; done; i=$((i + 1)); done; }; "
+        "j=0; while [ $j -lt %(parallel)s ]; do b & j=$((j + 1)); done; "
+        "wait; echo \"%(prefix)sready\"; read s; "
+        "p=\"%(fresh)s\"; while [ -n \"$p\" ]; do l=; for n in $p; do "
+        "if nslookup $n >/dev/null 2>&1; then "
+        "echo \"%(prefix)sresolved $n\"; else l=\"$l $n\"; fi; done; "
+        "p=$l; if [ -n \"$p\" ]; then sleep %(interval)s; fi; done; "
+        "echo \"%(prefix)sdone\"")
+
+    def _create_services(self, names, port):
+        # NOTE: the name is tracked before the request, so the service is
+        #   deleted even if creation fails after the service is stored.
+        for name in names:
+            self._created_at[name] = time.time()
+            self.client.clone().create_service(
+                name, namespace=self._namespace, port=port, protocol="TCP",
+                type="ClusterIP")
+
+    def _delete_services(self):
+        for name in self._created_at:
+            try:
+                self.client.clone().delete_service(
+                    name, namespace=self._namespace)
+            except rest.ApiException as e:
+                if e.status != 404:
+                    raise
+
+    def _read(self, resp, timeout):
+        """Parse lines of the script output until it's done or timeout.
+
+        :returns: True if the script is done
+        """
+        deadline = time.time() + timeout
+        while resp.is_open():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            line = resp.readline_stdout(timeout=min(remaining, 1))
+            if not line or not line.startswith(self.PREFIX):
+                continue
+            received_at = time.time()
+            fields = line[len(self.PREFIX):].split()
+            if fields[0] == "query" and len(fields) == 4:
+                self._queries.setdefault(fields[1], []).append(
+                    (fields[2] == "ok", int(fields[3]) / 1000000.0))
+            elif fields[0] == "ready":
+                with atomic.ActionTimer(self, "kubernetes.create_services"):
+                    self._create_services(sorted(self._fresh.values()),
+                                          port=self._port)
+                resp.write_stdin("start\n")
+            elif fields[0] == "resolved":
+                name = self._fresh.get(fields[1])
+                if name in self._created_at:
+                    self._resolved[name] = (received_at -
+                                            self._created_at[name])
+            elif fields[0] == "done":
+                return True
+        return False
+
+    def run(self, names=None, lookups=100, parallel=1, services=5, port=80,
+            cluster_domain="cluster.local", poll_interval=0.1, timeout=120):
+        """Resolve existing names and names of new services from prober pod.
+
+        :param names: list of fully qualified names to resolve, the name of
+               kubernetes API service by default
+        :param lookups: number of lookups of each name by each parallel
+               burst
+        :param parallel: number of concurrent bursts of lookups
+        :param services: number of services to create and wait to become
+               resolvable
+        :param port: port of created services
+        :param cluster_domain: cluster DNS domain
+        :param poll_interval: interval between checks of not yet resolvable
+               names in seconds, negative responses may be cached by DNS
+               server, so the interval should be small
+        :param timeout: max time to wait for the script in seconds
+        """
+        self._namespace = self.choose_namespace()
+        names = names or ["kubernetes.default.svc.%s" % cluster_domain]
+        for name in names:
+            if not self.NAME_RE.match(name):
+                raise exceptions.InvalidArgumentsException(
+                    message="Invalid DNS name '%s'" % name)
+        prober = self.context["kubernetes"]["probers"][self._namespace]
+        self._port = port
+        # NOTE: map of fully qualified names of new services to their names
+        self._fresh = dict(
+            ("%s.%s.svc.%s" % (name, self._namespace, cluster_domain), name)
+            for name in [self.generate_random_name()
+                         for _ in range(services)])
+        self._queries = {}
+        self._created_at = {}
+        self._resolved = {}
+
+        resp = self.client.exec_stream(
+            prober,
+            namespace=self._namespace,
+            command=["/bin/sh", "-c", self.SCRIPT % {
+                "prefix": self.PREFIX,
+                "lookups": lookups,
+                "parallel": parallel,
+                "names": " ".join(names),
+                "fresh": " ".join(sorted(self._fresh)),
+                "interval": poll_interval}],
+            stdin=True
+        )
+        try:
+            with atomic.ActionTimer(self, "kubernetes.resolve_names"):
+                done = self._read(resp, timeout)
+        finally:
+            resp.close()
+            self._delete_services()
+
+        rows = []
+        total = failed = 0
+        for name in names:
+            results = self._queries.get(name, [])
+            rows.append((name, [latency for ok, latency in results if ok]))
+            total += len(results)
+            failed += len([1 for ok, _ in results if not ok])
+        rows.append(("new service create to resolvable",
+                     list(self._resolved.values())))
+        self.add_latency_output(
+            "DNS resolution latency", rows,
+            description="%(total)s queries, %(failed)s failed, %(parallel)s "
+                        "parallel bursts" % {"total": total,
+                                             "failed": failed,
+                                             "parallel": parallel})
+        self.add_output(
+            additive={"title": "DNS query errors",
+                      "description": "Percent of failed lookups of existing "
+                                     "names",
+                      "chart_plugin": "Lines",
+                      "data": [["errors",
+                                100.0 * failed / total if total else 0]],
+                      "label": "Percent",
+                      "axis_label": "Iteration"})
+        if not done:
+            raise exceptions.TimeoutException(
+                desired_status="All services resolvable",
+                resource_name=prober,
+                resource_type="Resolver pod",
+                resource_id="<no id>",
+                resource_status="%s of %s services resolvable" % (
+                    len(self._resolved), services),
+                timeout=timeout)
@@ -0,0 +1,246 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import collections
+from concurrent import futures
+import time
+
+from kubernetes.client import rest
+from rally.common import logging
+from rally.common import utils as commonutils
+from rally import exceptions
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+LOG = logging.getLogger(__name__)
+
+
+class DrainTracker(object):
+    """Track pods of a workload while a node is drained.
+
+    Pods are keyed by uid. The handler records the time when the expected
+    number of pods, not counting evicted ones, was observed Running on other
+    nodes than the drained one for the first time.
+    """
+
+    def __init__(self):
+        # NOTE: uid -> (name, node name) of existing pod
+        self.live = {}
+        # NOTE: uid -> time when the pod was observed Running
+        self.running_at = {}
+        self.node = None
+        self.victims = set()
+        self.expected = None
+        self.rescheduled_at = None
+
+    def pods_on(self, node):
+        """Return map of uid to name of Running pods on the node."""
+        return dict((uid, name) for uid, (name, pod_node) in self.live.items()
+                    if pod_node == node and uid in self.running_at)
+
+    def running_elsewhere(self):
+        return [uid for uid, (_, node) in self.live.items()
+                if uid in self.running_at and node != self.node and
+                uid not in self.victims]
+
+    def on_pod_event(self, event_type, pod, received_at):
+        uid = pod.metadata.uid
+        if event_type == "DELETED":
+            self.live.pop(uid, None)
+        else:
+            self.live[uid] = (pod.metadata.name, pod.spec.node_name)
+            if pod.status and pod.status.phase == "Running":
+                self.running_at.setdefault(uid, received_at)
+        if (self.rescheduled_at is None and self.victims and
+                len(self.running_elsewhere()) >= self.expected):
+            self.rescheduled_at = received_at
+
+
+@validation.add("number", param_name="replicas", minval=1, integer_only=True)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="retry_interval", minval=0,
+                nullable=True)
+@validation.add("number", param_name="eviction_timeout", minval=0,
+                nullable=True)
+@scenario.configure("Kubernetes.drain_node_and_reschedule_pods",
+                    platform="kubernetes")
+class DrainNodeAndReschedulePods(common_scenario.BaseKubernetesScenario):
+    """Measure node drain by evictions and rescheduling of its pods.
+
+    Create deployment, cordon the node of the chosen ones which runs most of
+    its pods, evict them through the Eviction API and wait until the same
+    number of pods is Running on other nodes, uncordon the node and delete
+    deployment then. Evictions blocked by a PodDisruptionBudget are retried
+    until `eviction_timeout`. The scenario changes nodes of the cluster, so
+    it should be run with concurrency 1.
+    """
+
+    def _evict(self, name, retry_interval, eviction_timeout):
+        """Evict pod, retry while the eviction is blocked by budget.
+
+        :returns: dict with latencies of accepted and blocked eviction
+                  requests and error
+        """
+        client = self.client.clone()
+        result = {"accepted": [], "blocked": [], "error": None}
+        deadline = time.time() + eviction_timeout
+        while True:
+            started_at = time.time()
+            try:
+                client.evict_pod(name, namespace=self._namespace)
+            except rest.ApiException as e:
+                if e.status != 429:
+                    LOG.debug("Unable to evict pod %s: %s" % (name, e))
+                    result["error"] = e
+                    return result
+                result["blocked"].append(time.time() - started_at)
+                if time.time() + retry_interval > deadline:
+                    result["error"] = exceptions.TimeoutException(
+                        desired_status="Evicted",
+                        resource_name=name,
+                        resource_type="Pod",
+                        resource_id="<no id>",
+                        resource_status="Blocked by disruption budget",
+                        timeout=eviction_timeout)
+                    return result
+                commonutils.interruptable_sleep(retry_interval)
+            else:
+                result["accepted"].append(time.time() - started_at)
+                return result
+
+    def run(self, image, replicas, node_labels=None, command=None,
+            min_available=None, max_unavailable=None, workers=10,
+            retry_interval=1, eviction_timeout=300):
+        """Create deployment, drain node and delete deployment then.
+
+        :param image: deployment pod template image
+        :param replicas: number of deployment replicas
+        :param node_labels: map of labels of nodes to choose the drained
+               node from, all nodes are used if None
+        :param command: array of strings representing container command
+        :param min_available: create PodDisruptionBudget of deployment pods
+               with this minAvailable, number or percentage string
+        :param max_unavailable: create PodDisruptionBudget of deployment pods
+               with this maxUnavailable, number or percentage string
+        :param workers: number of threads which evict pods
+        :param retry_interval: seconds between retries of an eviction
+               blocked by PodDisruptionBudget
+        :param eviction_timeout: seconds to retry each blocked eviction
+        """
+        self._namespace = self.choose_namespace()
+        labels = {"drain": self.generate_random_name()}
+        tracker = DrainTracker()
+        pdb = None
+
+        name = self.client.create_deployment(
+            namespace=self._namespace,
+            replicas=replicas,
+            image=image,
+            command=command,
+            labels=labels
+        )
+        try:
+            if min_available is not None or max_unavailable is not None:
+                pdb = self.client.create_pdb(
+                    self.generate_random_name(),
+                    namespace=self._namespace,
+                    labels=labels,
+                    min_available=min_available,
+                    max_unavailable=max_unavailable)
+            watcher = self.client.watch(
+                "pod", handler=tracker.on_pod_event,
+                namespace=self._namespace,
+                label_selector="drain=%s" % labels["drain"])
+            try:
+                common_scenario.wait_for(
+                    watcher, lambda: len(tracker.running_at) >= replicas,
+                    name, resource_type="Deployment",
+                    desired_status="%s running pods" % replicas)
+                nodes = self.client.list_nodes(node_labels)
+                with watcher.lock:
+                    counts = collections.Counter(
+                        node for _, node in tracker.live.values()
+                        if node in nodes)
+                if not counts:
+                    raise exceptions.RallyException(
+                        message="No pods of deployment %s on nodes with "
+                                "labels %s" % (name, node_labels))
+                node = counts.most_common(1)[0][0]
+                self.client.cordon_node(node)
+                try:
+                    with watcher.lock:
+                        victims = tracker.pods_on(node)
+                        tracker.node = node
+                        tracker.expected = replicas
+                        tracker.victims.update(victims)
+                    started_at = time.time()
+                    with atomic.ActionTimer(self, "kubernetes.evict_pods"):
+                        with futures.ThreadPoolExecutor(
+                                max_workers=workers) as executor:
+                            results = list(executor.map(
+                                lambda n: self._evict(n, retry_interval,
+                                                      eviction_timeout),
+                                sorted(victims.values())))
+                    errors = [r["error"] for r in results if r["error"]]
+                    if errors:
+                        raise exceptions.RallyException(
+                            message="%s of %s evictions failed: %s" % (
+                                len(errors), len(results), errors[0]))
+                    common_scenario.wait_for(
+                        watcher, lambda: tracker.rescheduled_at is not None,
+                        name, resource_type="Deployment",
+                        desired_status="%s pods running on other nodes"
+                                       % replicas)
+                    self.add_atomic_action("kubernetes.drain_node",
+                                           started_at, tracker.rescheduled_at)
+                finally:
+                    self.client.uncordon_node(node)
+            finally:
+                watcher.stop()
+        finally:
+            if pdb:
+                self.client.delete_pdb(pdb, namespace=self._namespace)
+            self.client.delete_deployment(name, namespace=self._namespace)
+
+        with watcher.lock:
+            replacements = [t for uid, t in tracker.running_at.items()
+                            if t >= started_at]
+        blocked = sum(len(r["blocked"]) for r in results)
+        self.add_latency_output(
+            "Node drain latency",
+            [("eviction accepted",
+              [t for r in results for t in r["accepted"]]),
+             ("eviction blocked by budget",
+              [t for r in results for t in r["blocked"]]),
+             ("replacement Running", [t - started_at for t in replacements]),
+             ("all pods Running elsewhere",
+              [tracker.rescheduled_at - started_at])],
+            description="%(evicted)s pods evicted from node %(node)s, "
+                        "%(blocked)s evictions blocked by disruption "
+                        "budget" % {"evicted": len(victims), "node": node,
+                                    "blocked": blocked})
+        self.add_output(
+            additive={"title": "Node drain evictions",
+                      "description": "Number of evicted pods and retries "
+                                     "of evictions blocked by disruption "
+                                     "budget",
+                      "chart_plugin": "Lines",
+                      "data": [["evicted pods", len(victims)],
+                               ["blocked retries", blocked]],
+                      "label": "Number",
+                      "axis_label": "Iteration"})
@@ -12,19 +12,41 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from concurrent import futures
+import time
+
+from kubernetes.client import rest
+from rally.common import cfg
+from rally import exceptions
+from rally.task import atomic
 from rally.task import scenario
+from rally.task import validation
 
+from xrally_kubernetes.common import utils
 from xrally_kubernetes.tasks import scenario as common_scenario
 
+CONF = cfg.CONF
+
 
+@validation.add("enum", param_name="completion_mode",
+                values=["NonIndexed", "Indexed"], missed=True)
+@validation.add("indexed_job_completions")
 @scenario.configure("Kubernetes.create_and_delete_job", platform="kubernetes")
 class CreateAndDeleteJob(common_scenario.BaseKubernetesScenario):
 
-    def run(self, image, command, status_wait=True):
+    def run(self, image, command, completions=None, parallelism=None,
+            completion_mode=None, ttl_seconds_after_finished=None,
+            status_wait=True):
         """Create job, wait for success and delete then.
 
         :param image: job container's image
         :param command: job container's command
+        :param completions: number of pods which should succeed
+        :param parallelism: max number of job pods running at the same time
+        :param completion_mode: NonIndexed or Indexed
+        :param ttl_seconds_after_finished: delete finished job after this
+               number of seconds, the job which is already removed by TTL
+               controller is considered as deleted
         :param status_wait: wait for success if True
         """
         namespace = self.choose_namespace()
@@ -33,11 +55,160 @@ class CreateAndDeleteJob(common_scenario.BaseKubernetesScenario):
             namespace=namespace,
             image=image,
             command=command,
+            completions=completions,
+            parallelism=parallelism,
+            completion_mode=completion_mode,
+            ttl_seconds_after_finished=ttl_seconds_after_finished,
             status_wait=status_wait
         )
 
-        self.client.delete_job(
-            name,
-            namespace=namespace,
-            status_wait=status_wait
-        )
+        try:
+            self.client.delete_job(
+                name,
+                namespace=namespace,
+                status_wait=status_wait
+            )
+        except rest.ApiException as ex:
+            if ex.status != 404 or ttl_seconds_after_finished is None:
+                raise
+
+
+@validation.add("number", param_name="jobs", minval=1, integer_only=True)
+@validation.add("enum", param_name="completion_mode",
+                values=["NonIndexed", "Indexed"], missed=True)
+@validation.add("indexed_job_completions")
+@scenario.configure("Kubernetes.create_and_delete_jobs_batch",
+                    platform="kubernetes")
+class CreateAndDeleteJobsBatch(common_scenario.BaseKubernetesScenario):
+    """Measure job controller throughput with a batch of jobs.
+
+    Submit a number of jobs at once and track all of them by a single jobs
+    watch until they are complete.
+    """
+
+    def _on_job_event(self, event_type, job, received_at):
+        name = job.metadata.name
+        if event_type == "DELETED" or name not in self._created_at:
+            return
+        status = job.status
+        succeeded = status.succeeded or 0
+        if name not in self._started_at and (
+                status.active or succeeded or status.failed):
+            self._started_at[name] = received_at
+        if succeeded > self._succeeded.get(name, 0):
+            self._completions.extend(
+                [received_at] * (succeeded - self._succeeded.get(name, 0)))
+            self._succeeded[name] = succeeded
+        for condition in status.conditions or []:
+            if condition.status != "True":
+                continue
+            if condition.type == "Complete":
+                self._completed_at.setdefault(name, received_at)
+            elif condition.type == "Failed":
+                self._failed.setdefault(name, condition.message)
+
+    def run(self, image, command, jobs, completions=None, parallelism=None,
+            completion_mode=None, ttl_seconds_after_finished=None,
+            workers=10):
+        """Create a number of jobs, wait until all are complete, delete them.
+
+        :param image: job container's image
+        :param command: job container's command
+        :param jobs: number of jobs to create
+        :param completions: number of pods of each job which should succeed
+        :param parallelism: max number of pods of each job running at the
+               same time
+        :param completion_mode: NonIndexed or Indexed
+        :param ttl_seconds_after_finished: delete finished jobs after this
+               number of seconds
+        :param workers: number of threads which create jobs
+        """
+        namespace = self.choose_namespace()
+        labels = {"batch": self.generate_random_name()}
+        names = [self.generate_random_name() for _ in range(jobs)]
+        client = self.client.clone()
+        self._created_at, self._started_at, self._completed_at = {}, {}, {}
+        self._succeeded, self._failed = {}, {}
+        self._completions = []
+
+        def create_job(name):
+            self._created_at[name] = time.time()
+            client.create_job(
+                namespace=namespace,
+                image=image,
+                command=command,
+                name=name,
+                completions=completions,
+                parallelism=parallelism,
+                completion_mode=completion_mode,
+                ttl_seconds_after_finished=ttl_seconds_after_finished,
+                labels=labels,
+                status_wait=False
+            )
+
+        watcher = self.client.watch(
+            "job", handler=self._on_job_event, namespace=namespace,
+            label_selector="batch=%s" % labels["batch"])
+        start = time.time()
+        try:
+            with atomic.ActionTimer(self, "kubernetes.create_jobs"):
+                with futures.ThreadPoolExecutor(
+                        max_workers=workers) as executor:
+                    list(executor.map(create_job, names))
+            with atomic.ActionTimer(self, "kubernetes.wait_jobs_for_success"):
+                finished = watcher.wait(
+                    lambda: (len(self._completed_at) +
+                             len(self._failed) == jobs))
+        finally:
+            watcher.stop()
+            self.client.delete_jobs(namespace, labels=labels)
+
+        first_pod = [self._started_at[n] - t
+                     for n, t in self._created_at.items()
+                     if n in self._started_at]
+        complete = [self._completed_at[n] - t
+                    for n, t in self._created_at.items()
+                    if n in self._completed_at]
+        self.add_latency_output(
+            "Jobs latency", [("kubernetes.job_time_to_first_pod", first_pod),
+                             ("kubernetes.job_time_to_complete", complete)])
+        if self._completions:
+            elapsed = max(self._completions) - start
+            self.add_output(
+                additive={"title": "Job controller throughput",
+                          "description": "Pods completions and complete "
+                                         "jobs per second",
+                          "chart_plugin": "Lines",
+                          "data": [["pods completions per second",
+                                    len(self._completions) / elapsed],
+                                   ["jobs completions per second",
+                                    len(complete) / elapsed]],
+                          "label": "Per second",
+                          "axis_label": "Iteration"})
+        self.add_output(
+            complete={"title": "Jobs completions over time",
+                      "description": "Number of succeeded pods per second",
+                      "chart_plugin": "Lines",
+                      "data": [["pods completions",
+                                utils.time_series(self._completions, start)],
+                               ["jobs completions",
+                                utils.time_series(
+                                    self._completed_at.values(), start)]],
+                      "label": "Completions per second",
+                      "axis_label": "Seconds since start"})
+
+        if self._failed:
+            raise exceptions.RallyException(
+                message="%(count)s of %(jobs)s jobs failed: %(msg)s" % {
+                    "count": len(self._failed), "jobs": jobs,
+                    "msg": "; ".join(sorted(set(
+                        str(m) for m in self._failed.values())))})
+        if not finished:
+            raise exceptions.TimeoutException(
+                desired_status="%s jobs complete" % jobs,
+                resource_name=labels["batch"],
+                resource_type="Job",
+                resource_id="<no id>",
+                resource_status="%s jobs complete" % len(complete),
+                timeout=(CONF.kubernetes.status_total_retries *
+                         CONF.kubernetes.status_poll_interval))
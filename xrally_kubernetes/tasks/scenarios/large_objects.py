@@ -0,0 +1,182 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import base64
+from concurrent import futures
+import functools
+import os
+import time
+
+from rally import exceptions
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+@functools.lru_cache(maxsize=8)
+def _payload(size, generation, kind):
+    """Return object data of size bytes.
+
+    Payloads are cached, so megabyte strings are generated once per worker
+    process and reused by all iterations. Different generations have
+    different content, so updates are not no-op writes.
+
+    :param size: size of decoded data in bytes
+    :param generation: payload generation, 0 or 1
+    :param kind: configmap or secret, secret data is base64 encoded
+    """
+    raw = base64.b64encode(os.urandom(size))[:size]
+    if kind == "secret":
+        return {"payload": base64.b64encode(raw).decode()}
+    return {"payload": raw.decode()}
+
+
+@validation.add("number", param_name="size", minval=1, maxval=1048576,
+                integer_only=True)
+@validation.add("number", param_name="count", minval=1, integer_only=True)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
+@scenario.configure(
+    "Kubernetes.create_update_read_and_delete_large_objects",
+    platform="kubernetes")
+class CreateUpdateReadAndDeleteLargeObjects(
+        common_scenario.BaseKubernetesScenario):
+    """Measure etcd write path with large configMaps and secrets.
+
+    The same number of objects with payloads of the same size are written
+    for each kind one after another, so configMap and secret results are
+    paired and the cost of secrets encryption at rest is visible.
+    """
+
+    OPERATIONS = ("create", "update", "read")
+
+    def _timed(self, func, name):
+        started_at = time.time()
+        func(name)
+        return time.time() - started_at
+
+    def _write(self, kind, operation, names, workers):
+        """Run operation for all objects by workers threads.
+
+        :returns: latencies of operation and its duration
+        """
+        client = self.client.clone()
+        if operation == "create" and kind == "configmap":
+            data = _payload(self._size, 0, kind)
+
+            def func(name):
+                client.create_configmap(name, namespace=self._namespace,
+                                        data=data, labels=self._labels)
+        elif operation == "create":
+            data = _payload(self._size, 0, kind)
+
+            def func(name):
+                client.create_opaque_secret(name, namespace=self._namespace,
+                                            data=data, labels=self._labels)
+        elif operation == "update" and kind == "configmap":
+            data = _payload(self._size, 1, kind)
+
+            def func(name):
+                client.patch_configmap(name, namespace=self._namespace,
+                                       data=data)
+        elif operation == "update":
+            data = _payload(self._size, 1, kind)
+
+            def func(name):
+                client.patch_secret(name, namespace=self._namespace,
+                                    data=data)
+        else:
+            def func(name):
+                client.read_raw(kind, namespace=self._namespace, name=name)
+
+        started_at = time.time()
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(
+                functools.partial(self._timed, func), names))
+        return latencies, (time.time() - started_at) or 1e-6
+
+    def run(self, size, count, kinds=("configmap", "secret"), workers=4):
+        """Create, update, read and delete large objects of each kind.
+
+        :param size: size of object data in bytes, up to 1 MiB
+        :param count: number of objects of each kind
+        :param kinds: list of kinds to write, configmap and/or secret
+        :param workers: number of threads which write objects
+        """
+        unknown = set(kinds) - {"configmap", "secret"}
+        if unknown:
+            raise exceptions.InvalidArgumentsException(
+                message="Unsupported kinds: %s" % ", ".join(sorted(unknown)))
+        self._size = size
+        self._namespace = self.choose_namespace()
+        self._labels = {"large": self.generate_random_name()}
+
+        results = {}
+        try:
+            for kind in kinds:
+                names = [self.generate_random_name() for _ in range(count)]
+                for operation in self.OPERATIONS:
+                    with atomic.ActionTimer(
+                            self, "kubernetes.%s_%ss" % (operation, kind)):
+                        results[(kind, operation)] = self._write(
+                            kind, operation, names, workers)
+        finally:
+            if "configmap" in kinds:
+                self.client.delete_configmaps(self._namespace,
+                                              labels=self._labels)
+            if "secret" in kinds:
+                self.client.delete_secrets(self._namespace,
+                                           labels=self._labels)
+
+        self.add_latency_output(
+            "Large objects latency",
+            [("%s %s" % (kind, operation), results[(kind, operation)][0])
+             for operation in self.OPERATIONS for kind in kinds],
+            description="%(count)s objects of %(size)s bytes by %(workers)s "
+                        "workers" % {"count": count, "size": size,
+                                     "workers": workers})
+        self.add_output(
+            additive={"title": "Large objects throughput",
+                      "description": "Written or read payload per second",
+                      "chart_plugin": "Lines",
+                      "data": [["%s %s" % (kind, operation),
+                                count * size / results[(kind, operation)][1] /
+                                1024.0 / 1024.0]
+                               for operation in self.OPERATIONS
+                               for kind in kinds],
+                      "label": "MiB per second",
+                      "axis_label": "Iteration"})
+        if len(kinds) == 2:
+            rows = []
+            for operation in self.OPERATIONS:
+                medians = [utils.latency_stats(
+                    results[(kind, operation)][0])[1] for kind in kinds]
+                rows.append([operation] +
+                            [round(m, 4) for m in medians] +
+                            [round(medians[1] / medians[0], 2)
+                             if medians[0] else "n/a"])
+            self.add_output(
+                complete={"title": "Median latency of %s vs %s" % tuple(kinds),
+                          "description": "Ratio shows the cost of the "
+                                         "second kind relative to the first "
+                                         "one",
+                          "chart_plugin": "Table",
+                          "data": {"cols": ["Operation",
+                                            "%s (sec)" % kinds[0],
+                                            "%s (sec)" % kinds[1],
+                                            "Ratio"],
+                                   "rows": rows}})
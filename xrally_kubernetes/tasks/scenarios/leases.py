@@ -0,0 +1,177 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from concurrent import futures
+import heapq
+import threading
+import time
+
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+@validation.add("number", param_name="nodes", minval=1, integer_only=True)
+@validation.add("number", param_name="threads", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="renew_interval", minval=0.1,
+                nullable=True)
+@validation.add("number", param_name="duration", minval=1, nullable=True)
+@scenario.configure("Kubernetes.create_renew_and_delete_node_leases",
+                    platform="kubernetes")
+class CreateRenewAndDeleteNodeLeases(common_scenario.BaseKubernetesScenario):
+    """Simulate node heartbeats of a large cluster with Lease renewals.
+
+    Each fake node owns a coordination.k8s.io Lease which is renewed every
+    renew_interval seconds like kubelet does. All renewals are issued by a
+    small number of threads sharing one connection pool.
+    """
+
+    def _renew(self, leases, namespace, renew_interval, lease_duration,
+               deadline, stop_event):
+        """Renew leases according to their schedule until deadline.
+
+        :returns: tuple of latencies, finish timestamps, missed deadlines
+                  timestamps and errors timestamps
+        """
+        latencies, finished, missed, errors = [], [], [], []
+        now = time.time()
+        last_renew = dict((name, now) for name in leases)
+        # NOTE: leases which have already been counted as expired since their
+        #   last successful renewal
+        expired = set()
+        schedule = [(now + renew_interval * i / len(leases), name)
+                    for i, name in enumerate(leases)]
+        heapq.heapify(schedule)
+        while not stop_event.is_set():
+            due, name = heapq.heappop(schedule)
+            if due >= deadline:
+                break
+            delay = due - time.time()
+            if delay > 0 and stop_event.wait(delay):
+                break
+            started_at = time.time()
+            try:
+                self.client.renew_lease(name, namespace=namespace,
+                                        holder=name)
+            except Exception:
+                failed_at = time.time()
+                errors.append(failed_at)
+                if (name not in expired and
+                        failed_at - last_renew[name] > lease_duration):
+                    expired.add(name)
+                    missed.append(failed_at)
+            else:
+                finished_at = time.time()
+                latencies.append(finished_at - started_at)
+                finished.append(finished_at)
+                if (name not in expired and
+                        finished_at - last_renew[name] > lease_duration):
+                    missed.append(finished_at)
+                expired.discard(name)
+                last_renew[name] = finished_at
+            heapq.heappush(schedule, (due + renew_interval, name))
+        return latencies, finished, missed, errors
+
+    def run(self, nodes, renew_interval=10.0, lease_duration=40,
+            duration=60, threads=4):
+        """Create leases of fake nodes, renew them for a while, delete then.
+
+        :param nodes: number of fake nodes (leases) to simulate
+        :param renew_interval: seconds between renewals of a single lease,
+               kubelet renews its lease every 10 seconds by default
+        :param lease_duration: lease duration in seconds; a lease which isn't
+               renewed successfully within lease_duration after the previous
+               successful renewal is counted as a missed deadline once (node
+               would become NotReady), whether the renewal comes late or
+               keeps failing
+        :param duration: how long to renew leases in seconds
+        :param threads: number of threads which renew leases
+        """
+        namespace = self.choose_namespace()
+        labels = {"app": self.generate_random_name()}
+        leases = [self.generate_random_name() for _ in range(nodes)]
+
+        client = self.client.clone()
+        try:
+            with atomic.ActionTimer(self, "kubernetes.create_node_leases"):
+                with futures.ThreadPoolExecutor(
+                        max_workers=threads) as executor:
+                    list(executor.map(
+                        lambda name: client.create_lease(
+                            name, namespace=namespace, holder=name,
+                            lease_duration=lease_duration, labels=labels),
+                        leases))
+
+            stop_event = threading.Event()
+            start = time.time()
+            deadline = start + duration
+            with atomic.ActionTimer(self, "kubernetes.renew_node_leases"):
+                with futures.ThreadPoolExecutor(
+                        max_workers=threads) as executor:
+                    results = [
+                        executor.submit(self._renew, leases[i::threads],
+                                        namespace, renew_interval,
+                                        lease_duration, deadline, stop_event)
+                        for i in range(min(threads, nodes))]
+                    try:
+                        results = [r.result() for r in results]
+                    finally:
+                        stop_event.set()
+        finally:
+            # NOTE: leases are deleted by label, so the ones created before
+            #   a failure are deleted as well
+            self.client.delete_leases(namespace, labels=labels)
+
+        latencies, finished, missed, errors = [], [], [], []
+        for result in results:
+            latencies.extend(result[0])
+            finished.extend(result[1])
+            missed.extend(result[2])
+            errors.extend(result[3])
+
+        stats = utils.latency_stats(latencies)
+        self.add_output(
+            additive={"title": "Lease renewal latency",
+                      "description": "Percentiles of lease renewal latency "
+                                     "in each iteration",
+                      "chart_plugin": "Lines",
+                      "data": [["median", stats[1] or 0],
+                               ["95%ile", stats[3] or 0],
+                               ["99%ile", stats[4] or 0]],
+                      "label": "Seconds",
+                      "axis_label": "Iteration"})
+        self.add_latency_output(
+            "Lease renewal latency", [("kubernetes.renew_lease", latencies)],
+            description="%(nodes)s nodes renew leases every %(interval)s "
+                        "seconds, %(missed)s missed deadlines, %(errors)s "
+                        "errors" % {"nodes": nodes,
+                                    "interval": renew_interval,
+                                    "missed": len(missed),
+                                    "errors": len(errors)})
+        self.add_output(
+            complete={"title": "Lease renewals per second",
+                      "description": "Successful renewals, missed deadlines "
+                                     "and errors over time",
+                      "chart_plugin": "Lines",
+                      "data": [["renewals", utils.time_series(finished,
+                                                              start)],
+                               ["missed deadlines",
+                                utils.time_series(missed, start)],
+                               ["errors", utils.time_series(errors, start)]],
+                      "label": "Number per second",
+                      "axis_label": "Seconds since start"})
@@ -13,10 +13,16 @@
 # under the License.
 
 import collections
+from concurrent import futures
 import time
 
+from rally import exceptions
+from rally.task import atomic
 from rally.task import scenario
+from rally.task import validation
 
+from xrally_kubernetes.common import utils
+from xrally_kubernetes import service as k8s_service
 from xrally_kubernetes.tasks import scenario as common_scenario
 
 
@@ -82,12 +88,15 @@ class CreateAndDeletePod(common_scenario.BaseKubernetesScenario):
             data[state_map[e["name"]]] = [e["name"], duration]
         return data
 
-    def run(self, image, command=None, status_wait=True):
+    def run(self, image, command=None, node_name=None, node_selector=None,
+            status_wait=True):
         """Create pod, wait until it won't be running and then delete it.
 
         :param image: pod's image
         :param command: array of strings, pod's command. Could be None if
                image have entrypoint
+        :param node_name: bind pod to the node directly, bypassing scheduler
+        :param node_selector: map of node labels for scheduling pod
         :param status_wait: wait pod status after creation
         """
         namespace = self.choose_namespace()
@@ -96,6 +105,8 @@ class CreateAndDeletePod(common_scenario.BaseKubernetesScenario):
             image,
             namespace=namespace,
             command=command,
+            node_name=node_name,
+            node_selector=node_selector,
             status_wait=status_wait
         )
 
@@ -115,3 +126,257 @@ class CreateAndDeletePod(common_scenario.BaseKubernetesScenario):
             namespace=namespace,
             status_wait=status_wait
         )
+
+
+@scenario.configure(name="Kubernetes.create_and_delete_pod_on_nodes",
+                    platform="kubernetes")
+class CreateAndDeletePodOnNodes(common_scenario.BaseKubernetesScenario):
+    """Measure kubelet-only pod startup on each node of a chosen node set.
+
+    Pods are bound to nodes round-robin by iteration number with
+    spec.nodeName, so the scheduler is bypassed and startup time consists
+    of kubelet, container runtime and network plugin work only. Nodes are
+    taken from `nodes` context if it's used, otherwise they are listed on
+    each iteration.
+    """
+
+    def run(self, image, node_labels=None, command=None, status_wait=True):
+        """Create pod bound to the next node, wait for ready, delete then.
+
+        The pod is watched since its creation and the time from the create
+        request to the received event of its readiness is recorded as
+        `kubernetes.pod_startup_on_node` atomic action.
+
+        :param image: pod's image
+        :param node_labels: map of labels, by which nodes would be filtered,
+               it should be set in `nodes` context instead if it's used
+        :param command: array of strings, pod's command. Could be None if
+               image have entrypoint
+        :param status_wait: wait pod readiness after creation and pod
+               deletion, startup time isn't measured otherwise
+        """
+        namespace = self.choose_namespace()
+
+        nodes = self.context["kubernetes"].get("nodes")
+        if nodes is None:
+            nodes = sorted(set(self.client.list_nodes(node_labels)))
+        elif node_labels is not None:
+            raise exceptions.InvalidArgumentsException(
+                "'node_labels' argument can't be used with 'nodes' context, "
+                "set it in the context config instead")
+        if not nodes:
+            raise exceptions.RallyException(
+                message="There are no nodes matching labels %s" % node_labels)
+        node = nodes[(self.context["iteration"] - 1) % len(nodes)]
+
+        name = self.generate_random_name()
+        ready_at = []
+
+        def on_pod_event(event_type, pod, received_at):
+            if not ready_at and k8s_service.is_pod_ready(pod):
+                ready_at.append(received_at)
+
+        watcher = None
+        try:
+            if status_wait:
+                watcher = self.client.watch(
+                    "pod", handler=on_pod_event, namespace=namespace,
+                    field_selector="metadata.name=%s" % name)
+            created_at = time.time()
+            self.client.create_pod(
+                image,
+                name=name,
+                namespace=namespace,
+                command=command,
+                node_name=node,
+                status_wait=False
+            )
+            if watcher is not None:
+                common_scenario.wait_for(watcher, lambda: ready_at, name,
+                                         resource_type="Pod",
+                                         desired_status="Ready")
+        finally:
+            if watcher is not None:
+                watcher.stop()
+
+        if ready_at:
+            self.add_atomic_action("kubernetes.pod_startup_on_node",
+                                   created_at, ready_at[0])
+            self.add_output(
+                additive={"title": "Pod startup time per node",
+                          "description": "Time from pod create request to "
+                                         "its readiness on each node",
+                          "chart_plugin": "StatsTable",
+                          "data": [[node, ready_at[0] - created_at]]})
+
+        self.client.delete_pod(
+            name,
+            namespace=namespace,
+            status_wait=status_wait
+        )
+
+
+@validation.add("number", param_name="window", minval=1, integer_only=True)
+@validation.add("number", param_name="rate", minval=0.01)
+@validation.add("number", param_name="duration", minval=1)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
+@scenario.configure(name="Kubernetes.create_and_delete_pods_at_rate",
+                    platform="kubernetes")
+class CreateAndDeletePodsAtRate(common_scenario.BaseKubernetesScenario):
+    """Open-loop pod churn with a sliding window of live pods.
+
+    Pods are created at a fixed rate regardless of how fast the cluster
+    handles them. As soon as the number of ready pods exceeds the window,
+    the oldest ready pods are deleted. Pods state is tracked by a single
+    watch.
+    """
+
+    def _on_pod_event(self, event_type, pod, received_at):
+        name = pod.metadata.name
+        if event_type == "DELETED":
+            if name in self._deleting:
+                self._deleted_at[name] = received_at
+                self._deleting.discard(name)
+            if name in self._live:
+                self._live.remove(name)
+            return
+        if name in self._ready_at or not k8s_service.is_pod_ready(pod):
+            return
+        self._ready_at[name] = received_at
+        self._live.append(name)
+        while len(self._live) > self._window:
+            oldest = self._live.popleft()
+            self._deleting.add(oldest)
+            self._delete_requested_at[oldest] = time.time()
+            self._executor.submit(self._delete_pod, oldest)
+
+    def _create_pod(self, name):
+        # NOTE: atomics aren't thread-safe, so each request from the workers
+        #   is issued by its own clone
+        try:
+            self.client.clone().create_pod(
+                self._image,
+                name=name,
+                namespace=self._namespace,
+                command=self._command,
+                labels=self._labels,
+                status_wait=False
+            )
+        except Exception:
+            self._errors.append(time.time())
+            raise
+
+    def _delete_pod(self, name):
+        try:
+            self.client.clone().delete_pod(name, namespace=self._namespace,
+                                           status_wait=False)
+        except Exception:
+            self._errors.append(time.time())
+            raise
+
+    def run(self, image, window, rate, duration, command=None, workers=10):
+        """Create pods at rate, keep window of them alive and delete oldest.
+
+        :param image: pod's image
+        :param window: number of ready pods to keep alive
+        :param rate: pods creation rate, pods per second
+        :param duration: churn duration in seconds
+        :param command: array of strings, pod's command. Could be None if
+               image have entrypoint
+        :param workers: number of threads which issue create and delete
+               requests, it should be big enough to keep the rate
+        """
+        self._image = image
+        self._command = command
+        self._window = window
+        self._namespace = self.choose_namespace()
+        self._labels = {"churn": self.generate_random_name()}
+        self._live = collections.deque()
+        self._deleting = set()
+        self._created_at, self._ready_at = {}, {}
+        self._delete_requested_at, self._deleted_at = {}, {}
+        self._errors = []
+        samples = []
+
+        watcher = self.client.watch(
+            "pod", handler=self._on_pod_event, namespace=self._namespace,
+            label_selector="churn=%s" % self._labels["churn"])
+        start = time.time()
+        try:
+            with atomic.ActionTimer(self, "kubernetes.churn_pods"):
+                with futures.ThreadPoolExecutor(
+                        max_workers=workers) as self._executor:
+                    created = 0
+                    while True:
+                        now = time.time()
+                        if now - start >= duration:
+                            break
+                        if now - start >= len(samples):
+                            with watcher.lock:
+                                samples.append((now, len(self._live),
+                                                len(self._deleting)))
+                        if now - start >= created / float(rate):
+                            name = self.generate_random_name()
+                            self._created_at[name] = now
+                            self._executor.submit(self._create_pod, name)
+                            created += 1
+                            continue
+                        time.sleep(max(0, min(start + created / float(rate),
+                                              start + len(samples)) - now))
+                    with watcher.lock:
+                        # NOTE: stop deleting pods from the watch handler,
+                        #   the rest of them are deleted by one request
+                        self._window = float("inf")
+        finally:
+            watcher.stop()
+            self.client.delete_pods(self._namespace, labels=self._labels)
+
+        creation = [self._ready_at[n] - t
+                    for n, t in self._created_at.items()
+                    if n in self._ready_at]
+        deletion = [self._deleted_at[n] - t
+                    for n, t in self._delete_requested_at.items()
+                    if n in self._deleted_at]
+        self.add_latency_output(
+            "Pods churn latency",
+            [("kubernetes.create_pod_until_ready", creation),
+             ("kubernetes.delete_pod_until_gone", deletion)],
+            description="%(created)s pods created at %(rate)s pods/s with "
+                        "window of %(window)s pods, %(errors)s errors" % {
+                            "created": len(self._created_at), "rate": rate,
+                            "window": window, "errors": len(self._errors)})
+        self.add_output(
+            complete={"title": "Pods churn",
+                      "description": "Number of live (ready) pods and pods "
+                                     "waiting for deletion over time",
+                      "chart_plugin": "Lines",
+                      "data": [["live pods",
+                                [[round(t - start, 3), live]
+                                 for t, live, _ in samples]],
+                               ["deletion backlog",
+                                [[round(t - start, 3), backlog]
+                                 for t, _, backlog in samples]]],
+                      "label": "Pods",
+                      "axis_label": "Seconds since start"})
+        self.add_output(
+            complete={"title": "Pod creation latency over time",
+                      "description": "Time from create request to pod "
+                                     "readiness by the moment of readiness",
+                      "chart_plugin": "Lines",
+                      "data": [["create to ready",
+                                sorted([round(self._ready_at[n] - start, 3),
+                                        self._ready_at[n] - t]
+                                       for n, t in self._created_at.items()
+                                       if n in self._ready_at)]],
+                      "label": "Seconds",
+                      "axis_label": "Seconds since start"})
+        self.add_output(
+            complete={"title": "Pods churn errors",
+                      "description": "Number of failed create and delete "
+                                     "requests per second",
+                      "chart_plugin": "Lines",
+                      "data": [["errors",
+                                utils.time_series(self._errors, start)]],
+                      "label": "Errors per second",
+                      "axis_label": "Seconds since start"})
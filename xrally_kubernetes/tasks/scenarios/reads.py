@@ -0,0 +1,363 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from concurrent import futures
+import json
+import time
+
+from rally import exceptions
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes import service as k8s_service
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+DEFAULT_VARIANTS = [
+    {"name": "quorum_list"},
+    {"name": "cached_list", "resource_version": "0"},
+    {"name": "paged_quorum_list", "limit": 500},
+    {"name": "cached_metadata_list", "resource_version": "0",
+     "output": "metadata"},
+    {"name": "cached_table_list", "resource_version": "0", "output": "table"}
+]
+
+VARIANT_KEYS = ("name", "verb", "resource_version", "limit", "output",
+                "label_selector", "field_selector")
+
+
+def _validate_variant(variant):
+    msg = None
+    unknown = set(variant) - set(VARIANT_KEYS)
+    if "name" not in variant:
+        msg = "name is required"
+    elif unknown:
+        msg = "unknown keys %s" % ", ".join(sorted(unknown))
+    elif variant.get("verb", "list") not in ("list", "get"):
+        msg = "verb should be one of list, get"
+    elif variant.get("resource_version", "") not in ("", "0", "exact"):
+        msg = "resource_version should be one of '', '0', 'exact'"
+    elif (variant.get("output", "json") not in
+            k8s_service.Kubernetes.OUTPUT_FORMATS):
+        msg = "output should be one of %s" % ", ".join(
+            sorted(k8s_service.Kubernetes.OUTPUT_FORMATS))
+    elif variant.get("verb") == "get" and (
+            set(variant) & {"resource_version", "limit", "label_selector",
+                            "field_selector"}):
+        msg = "get supports only name and output"
+    if msg:
+        raise exceptions.InvalidArgumentsException(
+            message="Invalid read variant %(variant)s: %(msg)s" % {
+                "variant": variant, "msg": msg})
+
+
+@validation.add("number", param_name="requests", minval=1, integer_only=True,
+                nullable=True)
+@scenario.configure("Kubernetes.read_objects", platform="kubernetes")
+class ReadObjects(common_scenario.BaseKubernetesScenario):
+    """Load apiserver read path with different kinds of reads.
+
+    Each read variant is a LIST or GET request with its own resource
+    version semantics, page size, selectors and output format. For example,
+    comparing a quorum LIST (resource_version "") with a LIST served from
+    the watch cache (resource_version "0") shows the watch cache benefit.
+    """
+
+    def _selectors(self, variant):
+        selectors = {}
+        for key in ("label_selector", "field_selector"):
+            value = variant.get(key, self._selectors_defaults[key])
+            if value:
+                selectors[key] = value
+        return selectors
+
+    def _read(self, variant, i):
+        """Make a single read.
+
+        :returns: number of HTTP requests and number of received bytes
+        """
+        output = variant.get("output", "json")
+        if variant.get("verb") == "get":
+            namespace, name = self._objects[i % len(self._objects)]
+            data = self.client.read_raw(self._kind, namespace=namespace,
+                                        name=name, output=output)
+            return 1, len(data)
+
+        kwargs = self._selectors(variant)
+        limit = variant.get("limit")
+        if limit:
+            kwargs["limit"] = limit
+        resource_version = variant.get("resource_version", "")
+        if resource_version == "exact":
+            kwargs["resource_version"] = self._resource_version
+            kwargs["resource_version_match"] = "Exact"
+        elif resource_version:
+            kwargs["resource_version"] = resource_version
+
+        requests, size = 0, 0
+        while True:
+            data = self.client.read_raw(self._kind,
+                                        namespace=self._namespace,
+                                        output=output, **kwargs)
+            requests += 1
+            size += len(data)
+            token = limit and json.loads(data).get(
+                "metadata", {}).get("continue")
+            if not token:
+                return requests, size
+            # NOTE: continue token already contains resource version
+            kwargs = dict(self._selectors(variant), limit=limit)
+            kwargs["_continue"] = token
+
+    def run(self, kind="pod", variants=None, requests=10, namespace=None,
+            all_namespaces=False, label_selector=None, field_selector=None):
+        """Read resources with each variant and measure read performance.
+
+        :param kind: resource kind, e.g. pod, configmap, node
+        :param variants: list of read variants, each one is a dict with the
+               following keys:
+               name - variant name, required;
+               verb - list or get, defaults to list;
+               resource_version - "" for quorum read, "0" for read from
+               the watch cache or "exact" to list at the resource version
+               of the most recent quorum list, it requires a kubernetes
+               client with resource_version_match argument;
+               limit - page size, list all resources by one request if not
+               specified;
+               output - json, metadata (metadata-only objects) or table
+               (server-side printed columns), defaults to json;
+               label_selector and field_selector override the scenario
+               defaults.
+               GET requests go to resources found by a quorum list
+               round-robin. Defaults to quorum, cached, paged, metadata
+               and table lists
+        :param requests: number of reads of each variant
+        :param namespace: namespace of resources, a namespace of the
+               iteration is used if None
+        :param all_namespaces: list resources of all namespaces
+        :param label_selector: default label selector of list requests
+        :param field_selector: default field selector of list requests
+        """
+        variants = variants or DEFAULT_VARIANTS
+        for variant in variants:
+            _validate_variant(variant)
+        if kind not in k8s_service.Kubernetes.LIST_METHODS:
+            raise exceptions.InvalidArgumentsException(
+                message="Unsupported resource kind '%s'" % kind)
+        if (any(v.get("resource_version") == "exact" for v in variants) and
+                not self.client.supports_list_argument(
+                    kind, argument="resource_version_match")):
+            raise exceptions.InvalidArgumentsException(
+                message="resource_version 'exact' requires "
+                        "resource_version_match argument, which isn't "
+                        "supported by the installed kubernetes client")
+        self._kind = kind
+        self._namespace = None
+        if k8s_service.Kubernetes.LIST_METHODS[kind][1] and (
+                not all_namespaces):
+            self._namespace = namespace or self.choose_namespace()
+        self._selectors_defaults = {"label_selector": label_selector,
+                                    "field_selector": field_selector}
+
+        if any(v.get("verb") == "get" or v.get("resource_version") == "exact"
+               for v in variants):
+            with atomic.ActionTimer(self, "kubernetes.list_objects"):
+                body = json.loads(self.client.read_raw(
+                    kind, namespace=self._namespace, output="metadata",
+                    **self._selectors({})))
+            self._resource_version = body["metadata"]["resourceVersion"]
+            self._objects = [(obj["metadata"].get("namespace"),
+                              obj["metadata"]["name"])
+                             for obj in body.get("items") or []]
+            if (any(v.get("verb") == "get" for v in variants) and
+                    not self._objects):
+                raise exceptions.RallyException(
+                    message="There are no %s resources to get" % kind)
+
+        latencies, rps, throughput, sizes = [], [], [], []
+        for variant in variants:
+            points = []
+            total_requests, total_size = 0, 0
+            with atomic.ActionTimer(self, "kubernetes.%s" % variant["name"]):
+                start = time.time()
+                for i in range(requests):
+                    started_at = time.time()
+                    reqs, size = self._read(variant, i)
+                    points.append(time.time() - started_at)
+                    total_requests += reqs
+                    total_size += size
+                elapsed = (time.time() - start) or 1e-6
+            latencies.append((variant["name"], points))
+            rps.append([variant["name"], total_requests / elapsed])
+            throughput.append([variant["name"],
+                               total_size / elapsed / 1024.0 / 1024.0])
+            sizes.append([variant["name"], total_size / requests / 1024.0])
+
+        self.add_latency_output(
+            "Read latency", latencies,
+            description="Latency of a full read of %s resources, including "
+                        "all pages" % kind)
+        self.add_output(
+            additive={"title": "Read requests per second",
+                      "description": "HTTP requests per second, each page "
+                                     "is a separate request",
+                      "chart_plugin": "Lines",
+                      "data": rps,
+                      "label": "Requests per second",
+                      "axis_label": "Iteration"})
+        self.add_output(
+            additive={"title": "Read throughput",
+                      "description": "Size of received responses per second",
+                      "chart_plugin": "Lines",
+                      "data": throughput,
+                      "label": "MiB per second",
+                      "axis_label": "Iteration"})
+        self.add_output(
+            additive={"title": "Read response size",
+                      "description": "Average size of a full read, "
+                                     "including all pages",
+                      "chart_plugin": "Lines",
+                      "data": sizes,
+                      "label": "KiB",
+                      "axis_label": "Iteration"})
+
+
+@validation.add("enum", param_name="kind", values=["configmap", "pod"],
+                missed=True)
+@validation.add("number", param_name="lists", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
+@scenario.configure("Kubernetes.list_objects_scaling", platform="kubernetes")
+class ListObjectsScaling(common_scenario.BaseKubernetesScenario):
+    """Measure how LIST latency grows with number of objects in namespace.
+
+    Objects are created in bulk up to each checkpoint, then the namespace
+    is listed a few times. Objects are deleted by one delete-collection
+    request at the end.
+    """
+
+    MODELS = {"configmap": "V1ConfigMapList", "pod": "V1PodList"}
+
+    def _create(self, name):
+        # NOTE: atomics aren't thread-safe, so each request from the workers
+        #   is issued by its own clone
+        client = self.client.clone()
+        if self._kind == "configmap":
+            client.create_configmap(
+                name, namespace=self._namespace, data=self._data,
+                labels=self._labels)
+        else:
+            client.create_pod(
+                self._image, name=name, namespace=self._namespace,
+                command=self._command, labels=self._labels,
+                status_wait=False)
+
+    def run(self, checkpoints, kind="configmap", lists=3, image=None,
+            command=None, data_size=0, resource_version=None, workers=20):
+        """Create objects up to each checkpoint and list them.
+
+        :param checkpoints: list of numbers of objects to list at, e.g.
+               [1000, 5000, 20000]
+        :param kind: kind of objects, configmap or pod
+        :param lists: number of LIST requests at each checkpoint
+        :param image: pod's image, required for pods
+        :param command: array of strings, pod's command
+        :param data_size: size of configMap data in bytes
+        :param resource_version: resource version of LIST requests, "0" to
+               read from the watch cache, quorum read if None
+        :param workers: number of threads which create objects
+        """
+        if kind == "pod" and not image:
+            raise exceptions.InvalidArgumentsException(
+                message="image is required to create pods")
+        self._kind = kind
+        self._image = image
+        self._command = command
+        self._data = {"data": "x" * data_size} if data_size else {}
+        self._namespace = self.choose_namespace()
+        self._labels = {"scaling": self.generate_random_name()}
+        list_kwargs = {"label_selector": "scaling=%s" % self._labels[
+            "scaling"]}
+        if resource_version is not None:
+            list_kwargs["resource_version"] = resource_version
+
+        created = 0
+        results = []
+        try:
+            for checkpoint in sorted(checkpoints):
+                names = [self.generate_random_name()
+                         for _ in range(checkpoint - created)]
+                with atomic.ActionTimer(
+                        self, "kubernetes.create_%ss_up_to_%s" % (
+                            kind, checkpoint)):
+                    with futures.ThreadPoolExecutor(
+                            max_workers=workers) as executor:
+                        list(executor.map(self._create, names))
+                created = max(created, checkpoint)
+
+                latencies, decoding, size = [], [], 0
+                for _ in range(lists):
+                    started_at = time.time()
+                    data = self.client.read_raw(
+                        kind, namespace=self._namespace, **list_kwargs)
+                    latencies.append(time.time() - started_at)
+                    started_at = time.time()
+                    self.client.deserialize(data, model=self.MODELS[kind])
+                    decoding.append(time.time() - started_at)
+                    size = len(data)
+                results.append((created, latencies, decoding, size))
+        finally:
+            if kind == "configmap":
+                self.client.delete_configmaps(self._namespace,
+                                              labels=self._labels)
+            else:
+                self.client.delete_pods(self._namespace, labels=self._labels)
+
+        latency_output = []
+        for count, latencies, decoding, _size in results:
+            latency_output.append(("list %s %ss" % (count, kind), latencies))
+            latency_output.append(("decode %s %ss" % (count, kind),
+                                   decoding))
+        self.add_latency_output(
+            "LIST latency by number of objects", latency_output,
+            description="LIST request latency and client decode time")
+        stats = [(count, utils.latency_stats(latencies),
+                  utils.latency_stats(decoding), size)
+                 for count, latencies, decoding, size in results]
+        self.add_output(
+            complete={"title": "LIST latency scaling",
+                      "description": "LIST latency and client decode time "
+                                     "by number of %ss" % kind,
+                      "chart_plugin": "Lines",
+                      "data": [["median LIST latency",
+                                [[c, lat[1]] for c, lat, _, _ in stats]],
+                               ["95%ile LIST latency",
+                                [[c, lat[3]] for c, lat, _, _ in stats]],
+                               ["median decode time",
+                                [[c, dec[1]] for c, _, dec, _ in stats]]],
+                      "label": "Seconds",
+                      "axis_label": "Number of objects"})
+        self.add_output(
+            complete={"title": "LIST response size scaling",
+                      "description": "LIST response size by number of "
+                                     "%ss" % kind,
+                      "chart_plugin": "Lines",
+                      "data": [["response size",
+                                [[c, size / 1024.0 / 1024.0]
+                                 for c, _, _, size in stats]]],
+                      "label": "MiB",
+                      "axis_label": "Number of objects"})
@@ -0,0 +1,192 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import random
+import time
+
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes import service as k8s_service
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+class RecoveryTracker(object):
+    """Track pods of a controller to measure replacement of killed pods.
+
+    Pods are keyed by uid, so replacements of statefulset pods, which have
+    the same names, are tracked as new pods. The handler records the time
+    when the expected number of ready pods, not counting victims, was
+    observed for the first time.
+    """
+
+    def __init__(self):
+        # NOTE: uid -> name of existing pod
+        self.live = {}
+        # NOTE: uid -> time when the pod was observed
+        self.created_at = {}
+        # NOTE: uid -> time when the pod became ready
+        self.ready_at = {}
+        self.victims = set()
+        self.expected = None
+        self.recovered_at = None
+
+    def ready_pods(self):
+        """Return map of uid to name of ready pods, which aren't victims."""
+        return dict((uid, name) for uid, name in self.live.items()
+                    if uid in self.ready_at and uid not in self.victims)
+
+    def recovered(self):
+        return (self.expected is not None and
+                len(self.ready_pods()) >= self.expected)
+
+    def on_pod_event(self, event_type, pod, received_at):
+        uid = pod.metadata.uid
+        if event_type == "DELETED":
+            self.live.pop(uid, None)
+        else:
+            self.live[uid] = pod.metadata.name
+            self.created_at.setdefault(uid, received_at)
+            if k8s_service.is_pod_ready(pod):
+                self.ready_at.setdefault(uid, received_at)
+        if self.recovered_at is None and self.victims and self.recovered():
+            self.recovered_at = received_at
+
+
+@validation.add("enum", param_name="controller",
+                values=["Deployment", "ReplicaSet", "StatefulSet",
+                        "DaemonSet"])
+@validation.add("number", param_name="replicas", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="kill_fraction", minval=0, maxval=1)
+@scenario.configure(
+    name="Kubernetes.create_kill_pods_and_delete_controller",
+    platform="kubernetes")
+class CreateKillPodsAndDeleteController(
+        common_scenario.BaseKubernetesScenario):
+    """Measure recovery of controller after loss of its pods.
+
+    Create controller and wait until it's ready, kill a fraction of its pods
+    at once and measure time until replacements are ready, delete the
+    controller then.
+    """
+
+    def _create(self, controller, namespace, image, replicas, command,
+                labels):
+        """Create controller.
+
+        :returns: name, expected number of pods and labels of pods
+        """
+        if controller == "DaemonSet":
+            name, app = self.client.create_daemonset(
+                image=image,
+                namespace=namespace,
+                command=command
+            )
+            return name, len(self.client.list_nodes()), {"app": app}
+        create = {"Deployment": self.client.create_deployment,
+                  "ReplicaSet": self.client.create_replicaset,
+                  "StatefulSet": self.client.create_statefulset}[controller]
+        name = create(
+            namespace=namespace,
+            replicas=replicas,
+            image=image,
+            command=command,
+            labels=labels
+        )
+        return name, replicas, labels
+
+    def _delete(self, controller, name, namespace):
+        delete = {"Deployment": self.client.delete_deployment,
+                  "ReplicaSet": self.client.delete_replicaset,
+                  "StatefulSet": self.client.delete_statefulset,
+                  "DaemonSet": self.client.delete_daemonset}[controller]
+        delete(name, namespace=namespace)
+
+    def run(self, image, controller, replicas=3, kill_fraction=0.5,
+            command=None):
+        """Create controller, kill its pods, wait for recovery and delete.
+
+        Victims are labeled and deleted by one delete collection request
+        with zero grace period, so all of them are lost at once.
+
+        :param image: pod template image
+        :param controller: one of Deployment, ReplicaSet, StatefulSet or
+               DaemonSet
+        :param replicas: number of replicas, it's not used for DaemonSet,
+               which has a pod on each node
+        :param kill_fraction: fraction of pods to kill, at least one pod is
+               killed
+        :param command: array of strings representing container command
+        """
+        namespace = self.choose_namespace()
+        labels = {"recovery": self.generate_random_name()}
+        victims_labels = {"killed": self.generate_random_name()}
+
+        name, expected, labels = self._create(controller, namespace, image,
+                                              replicas, command, labels)
+        tracker = RecoveryTracker()
+        try:
+            watcher = self.client.watch(
+                "pod", handler=tracker.on_pod_event, namespace=namespace,
+                label_selector=",".join("%s=%s" % item
+                                        for item in sorted(labels.items())))
+            try:
+                # NOTE: wait for the initial list of ready pods
+                common_scenario.wait_for(
+                    watcher,
+                    lambda: len(tracker.ready_pods()) >= expected,
+                    name, resource_type=controller,
+                    desired_status="%s ready pods" % expected)
+                with watcher.lock:
+                    pods = tracker.ready_pods()
+                victims = random.sample(
+                    sorted(pods), max(1, int(round(kill_fraction * expected))))
+                for uid in victims:
+                    self.client.label_pod(pods[uid], namespace=namespace,
+                                          labels=victims_labels)
+                with watcher.lock:
+                    tracker.expected = expected
+                    tracker.victims.update(victims)
+                killed_at = time.time()
+                self.client.delete_pods(namespace, labels=victims_labels,
+                                        grace_period_seconds=0)
+                common_scenario.wait_for(
+                    watcher, lambda: tracker.recovered_at is not None,
+                    name, resource_type=controller,
+                    desired_status="%s ready pods" % expected)
+                self.add_atomic_action("kubernetes.recover_killed_pods",
+                                       killed_at, tracker.recovered_at)
+            finally:
+                watcher.stop()
+        finally:
+            self._delete(controller, name, namespace)
+
+        with watcher.lock:
+            replacements = [uid for uid, created_at
+                            in tracker.created_at.items()
+                            if created_at >= killed_at]
+            rows = [("replacement created",
+                     [tracker.created_at[uid] - killed_at
+                      for uid in replacements]),
+                    ("replacement ready",
+                     [tracker.ready_at[uid] - killed_at
+                      for uid in replacements if uid in tracker.ready_at]),
+                    ("all replicas ready",
+                     [tracker.recovered_at - killed_at])]
+        self.add_latency_output(
+            "%s recovery latency" % controller, rows,
+            description="Time since %(victims)s of %(expected)s pods were "
+                        "killed" % {"victims": len(victims),
+                                    "expected": expected})
@@ -0,0 +1,261 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+import time
+
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes import service as k8s_service
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+class ReplicasTracker(object):
+    """Track pods of a workload through scaling steps.
+
+    The handler records when each pod became ready or was removed during the
+    current step and the time when the step target was reached, i.e. the
+    number of existing pods is equal to the target and all of them are
+    ready. A pod is removed once it's marked for deletion, so termination
+    grace period of scaled down pods isn't included. Pods are keyed by name,
+    so a pod recreated with the same name is tracked as a new one.
+    """
+
+    def __init__(self):
+        # NOTE: existing pod name -> time when the pod was observed
+        self.live = {}
+        self.ready = set()
+        self.target = None
+        self.reached_at = None
+        # NOTE: times of pods readiness and removal during the step
+        self.ready_times = []
+        self.deleted_times = []
+
+    def reached(self):
+        return (self.target is not None and len(self.live) == self.target and
+                len(self.ready) == self.target)
+
+    def start_step(self, target, started_at):
+        self.target = target
+        self.ready_times = []
+        self.deleted_times = []
+        self.reached_at = started_at if self.reached() else None
+
+    def on_pod_event(self, event_type, pod, received_at):
+        name = pod.metadata.name
+        if event_type == "DELETED" or pod.metadata.deletion_timestamp:
+            if self.live.pop(name, None) is not None:
+                self.ready.discard(name)
+                self.deleted_times.append(received_at)
+        else:
+            self.live.setdefault(name, received_at)
+            if name not in self.ready and k8s_service.is_pod_ready(pod):
+                self.ready.add(name)
+                self.ready_times.append(received_at)
+        if self.reached_at is None and self.reached():
+            self.reached_at = received_at
+
+
+class StepScalingScenario(common_scenario.BaseKubernetesScenario):
+    """Base class of step scaling scenarios.
+
+    Subclasses define RESOURCE_TYPE of the workload and the next methods:
+    `_create(namespace, replicas, image, command, labels)` creates the
+    workload without waiting for its pods and returns its name,
+    `_scale(name, namespace, replicas)` sets the number of its replicas and
+    `_delete(name, namespace)` deletes it.
+    """
+
+    RESOURCE_TYPE = None
+
+    def _step(self, watcher, tracker, previous, target, action):
+        """Run the step action and wait until the target is reached.
+
+        :returns: time to the target and per-pod latencies since the step
+                  start, until pods readiness for scaling up and until pods
+                  are marked for deletion for scaling down
+        """
+        started_at = time.time()
+        with watcher.lock:
+            tracker.start_step(target, started_at)
+        action()
+        with atomic.ActionTimer(self, "kubernetes.wait_for_scaling_step"):
+            common_scenario.wait_for(
+                watcher, lambda: tracker.reached_at is not None, self._name,
+                resource_type=self.RESOURCE_TYPE,
+                desired_status="%s ready replicas" % target)
+        with watcher.lock:
+            times = (tracker.ready_times if target >= previous
+                     else tracker.deleted_times)
+            return (tracker.reached_at - started_at,
+                    [t - started_at for t in times])
+
+    def run(self, image, replicas, steps, command=None):
+        """Create workload, scale it through the steps and delete then.
+
+        :param image: pod template image
+        :param replicas: original number of replicas
+        :param steps: non-empty list of numbers of replicas to scale to one
+               by one, up or down, e.g. [10, 50, 10, 0]
+        :param command: array of strings representing container command
+        """
+        namespace = self.choose_namespace()
+        labels = {"scaling": self.generate_random_name()}
+        tracker = ReplicasTracker()
+        self._name = None
+        results = []
+
+        def create():
+            self._name = self._create(namespace, replicas, image, command,
+                                      labels)
+
+        watcher = self.client.watch(
+            "pod", handler=tracker.on_pod_event, namespace=namespace,
+            label_selector="scaling=%s" % labels["scaling"])
+        try:
+            results.append((0, replicas) + self._step(
+                watcher, tracker, 0, replicas, create))
+            previous = replicas
+            for target in steps:
+                results.append((previous, target) + self._step(
+                    watcher, tracker, previous, target,
+                    lambda: self._scale(self._name, namespace, target)))
+                previous = target
+        finally:
+            try:
+                if self._name is not None:
+                    self._delete(self._name, namespace)
+                    # NOTE: pods may be orphaned depending on the default
+                    #   deletion propagation of the kind
+                    self.client.delete_pods(namespace, labels=labels)
+            finally:
+                watcher.stop()
+
+        self.add_latency_output(
+            "%s step scaling latency" % self.RESOURCE_TYPE,
+            [("step %s: %s to %s replicas" % (i, previous, target), points)
+             for i, (previous, target, _, points) in enumerate(results)],
+            description="Time from the scale request until each pod is "
+                        "ready, or marked for deletion for scaling down")
+        per_pod = [utils.latency_stats(points)
+                   for _, _, _, points in results]
+        self.add_output(
+            complete={"title": "%s step scaling" % self.RESOURCE_TYPE,
+                      "description": "Time until all replicas of each step "
+                                     "are ready and per-pod latencies",
+                      "chart_plugin": "Lines",
+                      "data": [["time to target",
+                                [[i, round(r[2], 3)]
+                                 for i, r in enumerate(results)]],
+                               ["median per pod",
+                                [[i, round(s[1], 3)]
+                                 for i, s in enumerate(per_pod)
+                                 if s[1] is not None]],
+                               ["95%ile per pod",
+                                [[i, round(s[3], 3)]
+                                 for i, s in enumerate(per_pod)
+                                 if s[3] is not None]]],
+                      "label": "Seconds",
+                      "axis_label": "Step"})
+
+
+@validation.add("number", param_name="replicas", minval=0, integer_only=True)
+@validation.add("number_list", param_name="steps", minval=0,
+                integer_only=True)
+@scenario.configure(
+    name="Kubernetes.create_step_scale_and_delete_replication_controller",
+    platform="kubernetes")
+class CreateStepScaleAndDeleteRC(StepScalingScenario):
+    """Scale replication controller through steps of replicas."""
+
+    RESOURCE_TYPE = "Replication controller"
+
+    def _create(self, namespace, replicas, image, command, labels):
+        return self.client.create_rc(
+            namespace=namespace,
+            replicas=replicas,
+            image=image,
+            command=command,
+            labels=labels,
+            status_wait=False
+        )
+
+    def _scale(self, name, namespace, replicas):
+        self.client.scale_rc(name, namespace=namespace, replicas=replicas,
+                             status_wait=False)
+
+    def _delete(self, name, namespace):
+        self.client.delete_rc(name, namespace=namespace, status_wait=False)
+
+
+@validation.add("number", param_name="replicas", minval=0, integer_only=True)
+@validation.add("number_list", param_name="steps", minval=0,
+                integer_only=True)
+@scenario.configure(
+    name="Kubernetes.create_step_scale_and_delete_replicaset",
+    platform="kubernetes")
+class CreateStepScaleAndDeleteReplicaSet(StepScalingScenario):
+    """Scale replicaset through steps of replicas."""
+
+    RESOURCE_TYPE = "ReplicaSet"
+
+    def _create(self, namespace, replicas, image, command, labels):
+        return self.client.create_replicaset(
+            namespace=namespace,
+            replicas=replicas,
+            image=image,
+            command=command,
+            labels=labels,
+            status_wait=False
+        )
+
+    def _scale(self, name, namespace, replicas):
+        self.client.scale_replicaset(name, namespace=namespace,
+                                     replicas=replicas, status_wait=False)
+
+    def _delete(self, name, namespace):
+        self.client.delete_replicaset(name, namespace=namespace,
+                                      status_wait=False)
+
+
+@validation.add("number", param_name="replicas", minval=0, integer_only=True)
+@validation.add("number_list", param_name="steps", minval=0,
+                integer_only=True)
+@scenario.configure(
+    name="Kubernetes.create_step_scale_and_delete_statefulset",
+    platform="kubernetes")
+class CreateStepScaleAndDeleteStatefulSet(StepScalingScenario):
+    """Scale statefulset through steps of replicas."""
+
+    RESOURCE_TYPE = "StatefulSet"
+
+    def _create(self, namespace, replicas, image, command, labels):
+        return self.client.create_statefulset(
+            namespace=namespace,
+            replicas=replicas,
+            image=image,
+            command=command,
+            labels=labels,
+            status_wait=False
+        )
+
+    def _scale(self, name, namespace, replicas):
+        self.client.scale_statefulset(name, namespace=namespace,
+                                      replicas=replicas, status_wait=False)
+
+    def _delete(self, name, namespace):
+        self.client.delete_statefulset(name, namespace=namespace,
+                                       status_wait=False)
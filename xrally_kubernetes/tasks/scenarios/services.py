@@ -12,6 +12,10 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from concurrent import futures
+import time
+
+from kubernetes.client import rest
 import requests
 
 from rally.common import cfg
@@ -19,11 +23,67 @@ from rally.common import utils as commonutils
 from rally import exceptions
 from rally.task import atomic
 from rally.task import scenario
+from rally.task import validation
 
+from xrally_kubernetes.common import utils
+from xrally_kubernetes import service as k8s_service
 from xrally_kubernetes.tasks import scenario as common_scenario
 
 CONF = cfg.CONF
 
+SERVICE_NAME_LABEL = "kubernetes.io/service-name"
+
+
+class EndpointsTracker(object):
+    """Track pods readiness and their presence in EndpointSlices.
+
+    Handlers should be passed to pod and endpointSlice watchers, which share
+    one lock. Both record the time when the state was observed for the first
+    time. The pod watch should be started before pods creation, otherwise
+    the readiness time is the time of the initial list.
+    """
+
+    def __init__(self):
+        # NOTE: pod IP -> time when the pod became ready
+        self.ready_at = {}
+        # NOTE: (service name, IP) -> time when the ready endpoint appeared
+        self.present_at = {}
+        # NOTE: service name -> ports of the service EndpointSlices
+        self.ports = {}
+
+    def on_pod_event(self, event_type, pod, received_at):
+        if (event_type != "DELETED" and pod.status and pod.status.pod_ip and
+                k8s_service.is_pod_ready(pod)):
+            self.ready_at.setdefault(pod.status.pod_ip, received_at)
+
+    def on_endpoint_slice_event(self, event_type, endpoint_slice,
+                                received_at):
+        if event_type == "DELETED":
+            return
+        service = (endpoint_slice.metadata.labels or {}).get(
+            SERVICE_NAME_LABEL)
+        for address in k8s_service.ready_endpoint_addresses(endpoint_slice):
+            self.present_at.setdefault((service, address), received_at)
+        if endpoint_slice.ports:
+            self.ports[service] = [p.port for p in endpoint_slice.ports]
+
+    def latencies(self, not_before=None):
+        """Return pod ready to endpoint present latencies.
+
+        :param not_before: map of service name to time of its creation,
+               endpoints can't appear earlier, so it's used as the start if
+               a pod became ready before
+        """
+        not_before = not_before or {}
+        result = []
+        for (service, address), present_at in sorted(
+                self.present_at.items(), key=lambda x: x[1]):
+            if address in self.ready_at:
+                started_at = max(self.ready_at[address],
+                                 not_before.get(service, 0))
+                result.append((started_at, present_at))
+        return result
+
 
 @scenario.configure(
     "Kubernetes.create_check_and_delete_pod_with_cluster_ip_service",
@@ -31,14 +91,79 @@ CONF = cfg.CONF
 )
 class PodWithClusterIPSvc(common_scenario.BaseKubernetesScenario):
 
+    def _check_with_prober(self, prober, name, namespace, port,
+                           request_timeout=None):
+        """Request clusterIP service from prober pod until it responds."""
+        svc = self.client.get_service(name, namespace=namespace)
+        url = "http://%s:%s/" % (svc.spec.cluster_ip, port)
+
+        sleep_time = CONF.kubernetes.status_poll_interval
+        retries_total = CONF.kubernetes.status_total_retries
+        with atomic.ActionTimer(self, "kubernetes.request_cluster_ip_service"):
+            for attempt in range(1, retries_total + 1):
+                code, duration = self.client.probe_url(
+                    prober, namespace=namespace, url=url,
+                    request_timeout=request_timeout)
+                if code:
+                    break
+                commonutils.interruptable_sleep(sleep_time)
+            else:
+                raise exceptions.RallyException(
+                    message="Unable to get response from %(url)s by prober "
+                            "%(prober)s" % {"url": url, "prober": prober})
+
+        self.add_output(
+            additive={"title": "ClusterIP service request",
+                      "description": "Request duration measured by curl "
+                                     "in the prober pod and number of "
+                                     "attempts until the first response",
+                      "chart_plugin": "Lines",
+                      "data": [["request duration (sec)", duration],
+                               ["attempts", attempt]],
+                      "label": "Value",
+                      "axis_label": "Iteration"})
+
+    def _wait_for_endpoints(self, name, namespace, labels, created_at,
+                            tracker, pods, slices):
+        """Wait for the pod to appear in EndpointSlices of the service.
+
+        :returns: list of pod's IP and port pairs
+        """
+        with atomic.ActionTimer(self, "kubernetes.wait_for_endpoint_slice"):
+            common_scenario.wait_for(
+                slices, lambda: tracker.present_at, name,
+                resource_type="EndpointSlice",
+                desired_status="Ready endpoints")
+        with slices.lock:
+            addresses = [a for s, a in tracker.present_at]
+            ports = tracker.ports.get(name, [])
+        common_scenario.wait_for(
+            pods, lambda: all(a in tracker.ready_at for a in addresses),
+            labels["app"], resource_type="Pod", desired_status="Ready")
+        with pods.lock:
+            for started_at, finished_at in tracker.latencies(
+                    {name: created_at}):
+                self.add_atomic_action("kubernetes.pod_ready_to_endpoint",
+                                       started_at, finished_at)
+        return ["%s:%s" % (a, p) for a in addresses for p in ports]
+
     def run(self, image, port, protocol, command=None, custom_endpoint=False,
-            status_wait=True):
-        """Create pod and clusterIP svc, check with curl job, delete then.
+            status_wait=True, request_timeout=None):
+        """Create pod and clusterIP svc, check it, delete then.
 
         Create pod and clusterIP svc (optionally with custom endpoint), check
-        it with curl job and delete them all then.
+        it and delete them all then.
+
+        Without custom endpoint, the pod and EndpointSlices of the service
+        are watched, the time from the pod readiness (or the service
+        creation if the pod became ready earlier) to the moment its ready
+        endpoint is observed is recorded as
+        `kubernetes.pod_ready_to_endpoint` atomic action.
 
-        Better to specify `prepoll_delay` kubernetes config option.
+        If `prober` context is used, the service is requested by exec of curl
+        in the prober pod of the namespace, so only endpoints readiness and
+        the service request are measured. Otherwise the svc is checked by a
+        curl job.
 
         :param image: pod's image
         :param port: pod's container port and svc port integer
@@ -46,63 +171,86 @@ class PodWithClusterIPSvc(common_scenario.BaseKubernetesScenario):
         :param command: pod's array of strings representing command
         :param custom_endpoint: create custom endpoint if True
         :param status_wait: wait for pod status if True
+        :param request_timeout: check request timeout, used with prober only
         """
         namespace = self.choose_namespace()
         labels = {"app": self.generate_random_name()}
+        prober = self.context["kubernetes"].get("probers", {}).get(namespace)
+
+        watchers = []
+        try:
+            if not custom_endpoint:
+                # NOTE: the pod is watched since its creation, so the time of
+                #   its readiness isn't the time of the initial list
+                tracker = EndpointsTracker()
+                watchers.append(self.client.watch(
+                    "pod", handler=tracker.on_pod_event, namespace=namespace,
+                    label_selector="app=%s" % labels["app"]))
+
+            name = self.client.create_pod(
+                image=image,
+                namespace=namespace,
+                command=command,
+                port=port,
+                protocol=protocol,
+                labels=labels,
+                status_wait=status_wait
+            )
 
-        name = self.client.create_pod(
-            image=image,
-            namespace=namespace,
-            command=command,
-            port=port,
-            protocol=protocol,
-            labels=labels,
-            status_wait=status_wait
-        )
-
-        self.client.create_service(
-            name,
-            namespace=namespace,
-            port=port,
-            protocol=protocol,
-            type="ClusterIP",
-            labels=(None if custom_endpoint else labels)
-        )
-
-        commonutils.interruptable_sleep(CONF.kubernetes.start_prepoll_delay)
+            if not custom_endpoint:
+                watchers.append(self.client.watch(
+                    "endpointslice", handler=tracker.on_endpoint_slice_event,
+                    namespace=namespace, lock=watchers[0].lock,
+                    label_selector="%s=%s" % (SERVICE_NAME_LABEL, name)))
 
-        if custom_endpoint:
-            ip = self.client.get_pod(name, namespace=namespace).status.pod_ip
-            self.client.create_endpoints(
+            created_at = time.time()
+            self.client.create_service(
                 name,
                 namespace=namespace,
-                ip=ip,
-                port=port
+                port=port,
+                protocol=protocol,
+                type="ClusterIP",
+                labels=(None if custom_endpoint else labels)
             )
-            command = ["curl", "%s:%s" % (ip, port)]
+
+            if custom_endpoint:
+                ip = self.client.get_pod(name,
+                                         namespace=namespace).status.pod_ip
+                self.client.create_endpoints(
+                    name,
+                    namespace=namespace,
+                    ip=ip,
+                    port=port
+                )
+                command = ["curl", "%s:%s" % (ip, port)]
+            else:
+                command = ["curl"]
+                command.extend(self._wait_for_endpoints(
+                    name, namespace=namespace, labels=labels,
+                    created_at=created_at, tracker=tracker,
+                    pods=watchers[0], slices=watchers[1]))
+        finally:
+            for watcher in watchers:
+                watcher.stop()
+
+        if prober is not None:
+            self._check_with_prober(prober, name, namespace=namespace,
+                                    port=port,
+                                    request_timeout=request_timeout)
         else:
-            endpoints = self.client.get_endpoints(name, namespace=namespace)
-            ips = []
-            for subset in endpoints.subsets:
-                addrs = [addr.ip for addr in subset.addresses]
-                ports = [p.port for p in subset.ports]
-                ips.extend(["%s:%s" % (a, p) for a in addrs for p in ports])
-            command = ["curl"]
-            command.extend(ips)
-
-        self.client.create_job(
-            name=name,
-            namespace=namespace,
-            image="appropriate/curl:edge",
-            command=command,
-            status_wait=True
-        )
+            self.client.create_job(
+                name=name,
+                namespace=namespace,
+                image="appropriate/curl:edge",
+                command=command,
+                status_wait=True
+            )
 
-        self.client.delete_job(
-            name,
-            namespace=namespace,
-            status_wait=status_wait
-        )
+            self.client.delete_job(
+                name,
+                namespace=namespace,
+                status_wait=status_wait
+            )
 
         if custom_endpoint:
             self.client.delete_endpoints(name, namespace=namespace)
@@ -116,22 +264,94 @@ class PodWithClusterIPSvc(common_scenario.BaseKubernetesScenario):
         )
 
 
+@validation.add("number", param_name="requests_per_node", minval=0,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
 @scenario.configure(
     "Kubernetes.create_check_and_delete_pod_with_node_port_service",
     platform="kubernetes"
 )
 class PodWithNodePortService(common_scenario.BaseKubernetesScenario):
 
+    def _probe(self, session, url, created_at, requests_per_node,
+               request_timeout=None, probe_interval=0.1):
+        """Request url until the first response, then measure latency.
+
+        :returns: time from the service creation to the first response,
+                  number of attempts, list of steady-state latencies and the
+                  last error
+        """
+        kwargs = {}
+        if request_timeout:
+            kwargs["timeout"] = request_timeout
+        deadline = created_at + (CONF.kubernetes.status_total_retries *
+                                 CONF.kubernetes.status_poll_interval)
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                if time.time() >= deadline:
+                    return None, attempts, [], ex
+                commonutils.interruptable_sleep(probe_interval)
+            else:
+                first_success = time.time() - created_at
+                break
+
+        latencies = []
+        for _ in range(requests_per_node):
+            started_at = time.time()
+            try:
+                session.get(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                return first_success, attempts, latencies, ex
+            latencies.append(time.time() - started_at)
+        return first_success, attempts, latencies, None
+
+    def _targets(self, node_port, node_addresses=None, all_nodes=False,
+                 address_type="InternalIP"):
+        """Return map of probed targets to their urls."""
+        if node_addresses:
+            addresses = dict((a, a) for a in node_addresses)
+        elif all_nodes:
+            addresses = self.client.list_node_addresses(
+                address_type=address_type)
+        else:
+            server = self.context["env"]["platforms"]["kubernetes"]["server"]
+            host = server[server.index(":") + 3:server.rindex(":")]
+            addresses = {host: host}
+        return dict((target, "http://%s:%s/" % (address, node_port))
+                    for target, address in addresses.items())
+
     def run(self, image, port, protocol, request_timeout=None,
-            command=None, status_wait=True):
+            command=None, status_wait=True, node_addresses=None,
+            all_nodes=False, address_type="InternalIP", requests_per_node=0,
+            probe_interval=0.1, workers=None):
         """Create pod and nodePort svc, request pod by port and delete then.
 
+        All nodes are probed concurrently through a pooled HTTP session.
+        Time from the service creation to the first response is recorded
+        for each node, so kube-proxy programming lag across nodes becomes
+        visible, then `requests_per_node` requests measure steady-state
+        latency.
+
         :param image: pod's image
         :param port: pod's container port and svc port integer
         :param protocol: pod's container port and svc port protocol
         :param request_timeout: check request timeout
         :param command: pod's array of strings representing command
         :param status_wait: wait for pod status if True
+        :param node_addresses: list of node addresses to probe, the host of
+               kubernetes API server is probed by default
+        :param all_nodes: probe addresses of all nodes from the API if
+               node_addresses are not specified
+        :param address_type: type of node addresses to probe with all_nodes
+        :param requests_per_node: number of requests to each node after the
+               first response to measure steady-state latency
+        :param probe_interval: interval between failed attempts in seconds
+        :param workers: number of concurrent probes, one per node by default
         """
         namespace = self.choose_namespace()
         labels = {"app": self.generate_random_name()}
@@ -146,6 +366,7 @@ class PodWithNodePortService(common_scenario.BaseKubernetesScenario):
             status_wait=status_wait
         )
 
+        created_at = time.time()
         self.client.create_service(
             name,
             namespace=namespace,
@@ -155,45 +376,399 @@ class PodWithNodePortService(common_scenario.BaseKubernetesScenario):
             labels=labels
         )
 
-        svc = self.client.get_service(name, namespace=namespace)
-
-        node_port = svc.spec.ports[0].node_port
-
-        commonutils.interruptable_sleep(CONF.kubernetes.start_prepoll_delay)
-
-        with atomic.ActionTimer(self, "kubernetes.request_node_port_service"):
-            server = self.context["env"]["platforms"]["kubernetes"]["server"]
+        try:
+            svc = self.client.get_service(name, namespace=namespace)
+            targets = self._targets(svc.spec.ports[0].node_port,
+                                    node_addresses=node_addresses,
+                                    all_nodes=all_nodes,
+                                    address_type=address_type)
+            workers = workers or len(targets) or 1
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=len(targets) or 1, pool_maxsize=workers)
+            session.mount("http://", adapter)
+
+            with atomic.ActionTimer(self,
+                                    "kubernetes.request_node_port_service"):
+                with futures.ThreadPoolExecutor(
+                        max_workers=workers) as executor:
+                    probes = dict(
+                        (target, executor.submit(
+                            self._probe, session, url, created_at,
+                            requests_per_node,
+                            request_timeout=request_timeout,
+                            probe_interval=probe_interval))
+                        for target, url in targets.items())
+                results = dict((target, probe.result())
+                               for target, probe in probes.items())
+            session.close()
+        finally:
+            self.client.delete_service(name, namespace=namespace)
+            self.client.delete_pod(
+                name,
+                namespace=namespace,
+                status_wait=status_wait
+            )
 
-            sleep_time = CONF.kubernetes.status_poll_interval
-            retries_total = CONF.kubernetes.status_total_retries
-
-            i = 0
-            url = ("http" +
-                   server[server.index(":"):server.rindex(":") + 1] +
-                   str(node_port) + "/")
-            while i < retries_total:
-                try:
-                    kwargs = {}
-                    if request_timeout:
-                        kwargs["timeout"] = request_timeout
-                    requests.get(url, **kwargs)
-                except (requests.ConnectionError, requests.ReadTimeout) as ex:
-                    if i < retries_total:
-                        i += 1
-                        commonutils.interruptable_sleep(sleep_time)
-                    else:
-                        raise exceptions.RallyException(
-                            message="Unable to get response "
-                                    "from %(url)s: %(ex)s" % {
-                                        "url": url,
-                                        "ex": str(ex)
-                                    })
-                else:
-                    break
+        rows = []
+        for target in sorted(results):
+            first_success, attempts, latencies, error = results[target]
+            rows.append([target, targets[target],
+                         round(first_success, 4)
+                         if first_success is not None else "n/a",
+                         attempts, str(error) if error else ""])
+        self.add_output(
+            complete={"title": "NodePort reachability by node",
+                      "description": "Time from the service creation to "
+                                     "the first response from each node",
+                      "chart_plugin": "Table",
+                      "data": {"cols": ["Node", "URL",
+                                        "Time to first success (sec)",
+                                        "Attempts", "Error"],
+                               "rows": rows}})
+        first = [r[0] for r in results.values() if r[0] is not None]
+        if first:
+            stats = utils.latency_stats(first)
+            self.add_output(
+                additive={"title": "NodePort time to first success",
+                          "description": "Median and max of time to the "
+                                         "first response across nodes",
+                          "chart_plugin": "Lines",
+                          "data": [["median", stats[1]], ["max", stats[5]]],
+                          "label": "Seconds",
+                          "axis_label": "Iteration"})
+        if requests_per_node:
+            self.add_latency_output(
+                "NodePort steady-state request latency",
+                [("all nodes", [p for r in results.values() for p in r[2]])] +
+                [(target, results[target][2]) for target in sorted(results)])
+
+        failed = sorted(t for t, r in results.items() if r[3] is not None)
+        if failed:
+            raise exceptions.RallyException(
+                message="Unable to get response from %(count)s of "
+                        "%(total)s nodes: %(errors)s" % {
+                            "count": len(failed), "total": len(results),
+                            "errors": "; ".join(
+                                "%s: %s" % (t, results[t][3])
+                                for t in failed)})
+
+
+@validation.add("number", param_name="backends", minval=1, integer_only=True)
+@validation.add("number", param_name="services", minval=1, integer_only=True)
+@scenario.configure("Kubernetes.create_and_delete_service_with_backends",
+                    platform="kubernetes")
+class ServiceWithBackends(common_scenario.BaseKubernetesScenario):
+    """Measure endpoints controller throughput with many service backends.
+
+    Services are created first, then a replicaSet starts their backend pods,
+    so the endpoints controller publishes an endpoint of each service for
+    each pod as soon as the pod becomes ready.
+    """
+
+    def run(self, image, backends, services=1, port=80, protocol="TCP",
+            command=None):
+        """Create services and backend pods, wait for all endpoints.
+
+        :param image: backend pods image
+        :param backends: number of backend pods
+        :param services: number of services which select all backends
+        :param port: svc port integer
+        :param protocol: svc port protocol
+        :param command: backend pods array of strings command
+        """
+        namespace = self.choose_namespace()
+        labels = {"backend": self.generate_random_name()}
+        names = [self.generate_random_name() for _ in range(services)]
+        expected = services * backends
+
+        tracker = EndpointsTracker()
+        watchers = []
+        created_at = {}
+        replicaset = None
+        try:
+            watchers.append(self.client.watch(
+                "pod", handler=tracker.on_pod_event, namespace=namespace,
+                label_selector="backend=%s" % labels["backend"]))
+            watchers.append(self.client.watch(
+                "endpointslice", handler=tracker.on_endpoint_slice_event,
+                namespace=namespace, lock=watchers[0].lock,
+                label_selector="%s in (%s)" % (SERVICE_NAME_LABEL,
+                                               ",".join(names))))
+
+            with atomic.ActionTimer(self, "kubernetes.create_services"):
+                for name in names:
+                    created_at[name] = time.time()
+                    self.client.create_service(
+                        name,
+                        namespace=namespace,
+                        port=port,
+                        protocol=protocol,
+                        type="ClusterIP",
+                        labels=labels
+                    )
+            start = time.time()
+            replicaset = self.client.create_replicaset(
+                namespace=namespace,
+                replicas=backends,
+                image=image,
+                command=command,
+                labels=labels,
+                status_wait=False
+            )
+            with atomic.ActionTimer(self, "kubernetes.wait_for_endpoints"):
+                common_scenario.wait_for(
+                    watchers[1], lambda: len(tracker.present_at) >= expected,
+                    ",".join(names), resource_type="EndpointSlice",
+                    desired_status="%s ready endpoints" % expected)
+            with watchers[1].lock:
+                addresses = set(a for s, a in tracker.present_at)
+            common_scenario.wait_for(
+                watchers[0], lambda: addresses.issubset(tracker.ready_at),
+                replicaset, resource_type="Pod", desired_status="Ready")
+        finally:
+            for watcher in watchers:
+                watcher.stop()
+            for name in created_at:
+                self.client.delete_service(name, namespace=namespace)
+            if replicaset is not None:
+                self.client.delete_replicaset(replicaset,
+                                              namespace=namespace,
+                                              status_wait=False)
+
+        with watchers[0].lock:
+            latencies = tracker.latencies(created_at)
+            ready = list(tracker.ready_at.values())
+        published = [finished_at for _, finished_at in latencies]
+        duration = max(published) - min(ready) if published else 0
+        self.add_latency_output(
+            "Pod ready to endpoint latency",
+            [("kubernetes.pod_ready_to_endpoint",
+              [f - s for s, f in latencies])],
+            description="%(services)s services with %(backends)s backends" % {
+                "services": services, "backends": backends})
+        self.add_output(
+            additive={"title": "Endpoints controller throughput",
+                      "description": "Ready endpoints published per second "
+                                     "from the first ready pod to the last "
+                                     "published endpoint",
+                      "chart_plugin": "Lines",
+                      "data": [["endpoints per second",
+                                len(published) / duration if duration
+                                else 0]],
+                      "label": "Endpoints per second",
+                      "axis_label": "Iteration"})
+        self.add_output(
+            complete={"title": "Endpoints publishing",
+                      "description": "Number of pods became ready and "
+                                     "endpoints published per second",
+                      "chart_plugin": "Lines",
+                      "data": [["ready pods",
+                                utils.time_series(ready, start)],
+                               ["published endpoints",
+                                utils.time_series(published, start)]],
+                      "label": "Number per second",
+                      "axis_label": "Seconds since start"})
+
+
+@validation.add("required_contexts", contexts=["prober"])
+@validation.add("number", param_name="probes", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("number", param_name="request_timeout", minval=0.001,
+                nullable=True)
+@validation.add("number", param_name="probe_interval", minval=0,
+                nullable=True)
+@scenario.configure("Kubernetes.service_reachability_scaling",
+                    platform="kubernetes")
+class ServiceReachabilityScaling(common_scenario.BaseKubernetesScenario):
+    """Measure how service programming latency grows with number of services.
+
+    Services without selector and their endpoints, which point to a single
+    backend pod, are created in bulk up to each checkpoint. Then probe
+    services are created one by one and requested from the prober pod until
+    the first response, so the time from the creation to reachability shows
+    how kube-proxy (iptables or IPVS) programming scales.
+
+    Each probe service is requested by a curl loop started in the prober pod
+    by one exec call, which prints a line with the pod timestamp and HTTP
+    code of each request, the lines are parsed as they arrive.
+    """
+
+    PREFIX = "xrally:"
+    SCRIPT = (
+        "echo \"%(prefix)sstart $(date +%%s%%N)\"; "
+        "while :; do t=$(date +%%s%%N); "
+        "c=$(curl -s -o /dev/null -w '%%{http_code}' %(options)s %(url)s); "
+        "echo \"%(prefix)sprobe $t $c\"; "
+        "if [ \"$c\" != 000 ]; then break; fi; sleep %(interval)s; done")
+
+    def _create(self, name):
+        # NOTE: atomics aren't thread-safe, so each call from the workers
+        #   uses its own clone
+        client = self.client.clone()
+        client.create_service(name, namespace=self._namespace,
+                              port=self._port, protocol=self._protocol,
+                              type="ClusterIP")
+        client.create_endpoints(name, namespace=self._namespace,
+                                ip=self._backend_ip, port=self._port)
+
+    def _create_bulk(self, name):
+        # NOTE: the name is recorded before creation, so services created
+        #   partially or concurrently with a failed one are deleted too
+        self._created.append(name)
+        self._create(name)
+
+    def _delete(self, name):
+        client = self.client.clone()
+        for delete in (client.delete_endpoints, client.delete_service):
+            try:
+                delete(name, namespace=self._namespace)
+            except rest.ApiException as e:
+                if e.status != 404:
+                    raise
+
+    def _read(self, resp, started_at, deadline):
+        """Parse lines of the probe script until the first response.
+
+        The latency is the time from the creation to the start of the
+        script by the client clock plus the time from the start of the
+        script to the start of the first successful request by the pod
+        clock, so clocks skew doesn't matter.
+
+        :returns: time from the creation to the first response or None
+        """
+        opened_at = first = None
+        while resp.is_open():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            line = resp.readline_stdout(timeout=min(remaining, 1))
+            if not line or not line.startswith(self.PREFIX):
+                continue
+            fields = line[len(self.PREFIX):].split()
+            if fields[0] == "start" and len(fields) == 2:
+                opened_at, first = time.time(), int(fields[1])
+            elif (fields[0] == "probe" and len(fields) == 3 and
+                    opened_at is not None and fields[2] != "000"):
+                return (opened_at - started_at +
+                        (int(fields[1]) - first) / 1000000000.0)
+        return None
+
+    def _probe(self, prober, request_timeout, probe_interval):
+        """Create probe service and wait until it's reachable.
+
+        A single exec stream to the prober pod is used for all requests to
+        the service, so exec setup isn't included in each attempt.
+
+        :returns: time from the creation to the first response or None
+        """
+        name = self.generate_random_name()
+        started_at = time.time()
+        self._create(name)
+        try:
+            svc = self.client.clone().get_service(name,
+                                                  namespace=self._namespace)
+            deadline = started_at + (CONF.kubernetes.status_total_retries *
+                                     CONF.kubernetes.status_poll_interval)
+            resp = self.client.clone().exec_stream(
+                prober,
+                namespace=self._namespace,
+                command=["/bin/sh", "-c", self.SCRIPT % {
+                    "prefix": self.PREFIX,
+                    "options": ("--max-time %s" % request_timeout
+                                if request_timeout else ""),
+                    "url": "http://%s:%s/" % (svc.spec.cluster_ip,
+                                              self._port),
+                    "interval": probe_interval}])
+            try:
+                return self._read(resp, started_at, deadline)
+            finally:
+                resp.close()
+        finally:
+            self._delete(name)
+
+    def run(self, image, checkpoints, probes=3, port=80, protocol="TCP",
+            command=None, request_timeout=1, probe_interval=0.1, workers=20):
+        """Create services up to each checkpoint and probe new services.
+
+        :param image: backend pod's image
+        :param checkpoints: list of numbers of services to probe at, e.g.
+               [100, 1000, 5000]
+        :param probes: number of probe services at each checkpoint
+        :param port: backend pod's container port and svc port integer
+        :param protocol: backend pod's container port and svc port protocol
+        :param command: backend pod's array of strings command
+        :param request_timeout: timeout of a single probe request in seconds
+        :param probe_interval: interval between failed probes in seconds
+        :param workers: number of threads which create and delete services
+        """
+        self._namespace = self.choose_namespace()
+        self._port = port
+        self._protocol = protocol
+        self._created = []
+        prober = self.context["kubernetes"]["probers"][self._namespace]
 
-        self.client.delete_service(name, namespace=namespace)
-        self.client.delete_pod(
-            name,
-            namespace=namespace,
-            status_wait=status_wait
+        backend = self.client.create_pod(
+            image=image,
+            namespace=self._namespace,
+            command=command,
+            port=port,
+            protocol=protocol,
+            status_wait=True
         )
+        results = []
+        try:
+            self._backend_ip = self.client.get_pod(
+                backend, namespace=self._namespace).status.pod_ip
+            for checkpoint in sorted(checkpoints):
+                names = [self.generate_random_name()
+                         for _ in range(checkpoint - len(self._created))]
+                with atomic.ActionTimer(
+                        self, "kubernetes.create_services_up_to_%s"
+                              % checkpoint):
+                    with futures.ThreadPoolExecutor(
+                            max_workers=workers) as executor:
+                        list(executor.map(self._create_bulk, names))
+
+                latencies, unreachable = [], 0
+                for _ in range(probes):
+                    latency = self._probe(prober, request_timeout,
+                                          probe_interval)
+                    if latency is None:
+                        unreachable += 1
+                    else:
+                        latencies.append(latency)
+                results.append((len(self._created), latencies,
+                                unreachable))
+        finally:
+            with atomic.ActionTimer(self, "kubernetes.delete_services"):
+                with futures.ThreadPoolExecutor(
+                        max_workers=workers) as executor:
+                    list(executor.map(self._delete, self._created))
+            self.client.delete_pod(backend, namespace=self._namespace,
+                                   status_wait=False)
+
+        self.add_latency_output(
+            "Service create to reachable latency",
+            [("%s services" % count, latencies)
+             for count, latencies, _ in results],
+            description="Unreachable probe services: %s" % ", ".join(
+                "%s at %s services" % (u, c) for c, _, u in results))
+        stats = [(count, utils.latency_stats(latencies))
+                 for count, latencies, _ in results]
+        self.add_output(
+            complete={"title": "Service reachability scaling",
+                      "description": "Time from a service creation to the "
+                                     "first response by number of services",
+                      "chart_plugin": "Lines",
+                      "data": [["median", [[c, s[1]] for c, s in stats]],
+                               ["max", [[c, s[5]] for c, s in stats]]],
+                      "label": "Seconds",
+                      "axis_label": "Number of services"})
+        unreachable = sum(u for _, _, u in results)
+        if unreachable:
+            raise exceptions.RallyException(
+                message="%s probe services were not reachable in time"
+                        % unreachable)
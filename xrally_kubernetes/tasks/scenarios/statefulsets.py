@@ -12,11 +12,86 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
+from rally.task import atomic
 from rally.task import scenario
+from rally.task import validation
 
+from xrally_kubernetes import service as k8s_service
 from xrally_kubernetes.tasks import scenario as common_scenario
 
 
+class OrdinalsTracker(object):
+    """Track creation, scheduling and readiness of statefulset pods.
+
+    Pods are keyed by ordinal parsed from the name suffix, each state is
+    recorded at the time when it was observed for the first time.
+    """
+
+    def __init__(self):
+        # NOTE: ordinal -> time when the pod was observed
+        self.created_at = {}
+        # NOTE: ordinal -> time when the pod was bound to a node
+        self.scheduled_at = {}
+        # NOTE: ordinal -> time when the pod became ready
+        self.ready_at = {}
+        self.deleted = set()
+
+    def on_pod_event(self, event_type, pod, received_at):
+        ordinal = int(pod.metadata.name.rsplit("-", 1)[1])
+        if event_type == "DELETED":
+            self.deleted.add(ordinal)
+            return
+        self.created_at.setdefault(ordinal, received_at)
+        if pod.spec.node_name:
+            self.scheduled_at.setdefault(ordinal, received_at)
+        if k8s_service.is_pod_ready(pod):
+            self.ready_at.setdefault(ordinal, received_at)
+
+    def latencies(self, ordinals, cascade=True):
+        """Return latency rows of the given ordinals.
+
+        The cascade gap is the time from a pod readiness until the next
+        ordinal pod is created, it's the cost of OrderedReady policy.
+
+        :param ordinals: list of pods ordinals
+        :param cascade: add the cascade gap row if True
+        """
+        rows = [("created to scheduled", []), ("scheduled to ready", [])]
+        if cascade:
+            rows.append(("ready to next ordinal created", []))
+        for ordinal in ordinals:
+            if ordinal in self.scheduled_at:
+                rows[0][1].append(self.scheduled_at[ordinal] -
+                                  self.created_at[ordinal])
+            if ordinal in self.ready_at and ordinal in self.scheduled_at:
+                rows[1][1].append(self.ready_at[ordinal] -
+                                  self.scheduled_at[ordinal])
+            if cascade and ordinal in self.ready_at and (
+                    ordinal + 1 in ordinals and
+                    ordinal + 1 in self.created_at):
+                rows[2][1].append(self.created_at[ordinal + 1] -
+                                  self.ready_at[ordinal])
+        return rows
+
+    def timeline(self, ordinals, start):
+        """Return StackedArea data of per-ordinal phases since start."""
+        waiting, scheduling, starting = [], [], []
+        for ordinal in ordinals:
+            created = self.created_at.get(ordinal)
+            if created is None:
+                continue
+            scheduled = self.scheduled_at.get(ordinal, created)
+            ready = self.ready_at.get(ordinal, scheduled)
+            waiting.append([ordinal, round(created - start, 3)])
+            scheduling.append([ordinal, round(scheduled - created, 3)])
+            starting.append([ordinal, round(ready - scheduled, 3)])
+        return [["waiting for creation", waiting],
+                ["created to scheduled", scheduling],
+                ["scheduled to ready", starting]]
+
+
 @scenario.configure(name="Kubernetes.create_and_delete_statefulset",
                     platform="kubernetes")
 class CreateAndDeleteStatefulSet(common_scenario.BaseKubernetesScenario):
@@ -99,3 +174,130 @@ class CreateScaleAndDeleteStatefulSet(common_scenario.BaseKubernetesScenario):
             namespace=namespace,
             status_wait=status_wait
         )
+
+
+@validation.add("number", param_name="replicas", minval=1, integer_only=True)
+@validation.add("number", param_name="scale_replicas", minval=0,
+                integer_only=True, nullable=True)
+@validation.add("enum", param_name="pod_management_policy",
+                values=["OrderedReady", "Parallel"], missed=True)
+@validation.add("map_keys", param_name="volume_claim_template",
+                required=["mount_path", "size"],
+                allowed=["mount_path", "size", "storage_class",
+                         "access_modes"], missed=True)
+@scenario.configure(
+    name="Kubernetes.create_and_delete_statefulset_with_timeline",
+    platform="kubernetes")
+class CreateAndDeleteStatefulSetWithTimeline(
+        common_scenario.BaseKubernetesScenario):
+    """Kubernetes statefulset per-ordinal startup timeline test.
+
+    Create statefulset, track its pods by watch until all of them are ready,
+    optionally scale it and track new ordinals, delete statefulset and its
+    claims then. Timeline of each ordinal shows how pod startup and volumes
+    attach latency compound with OrderedReady policy.
+    """
+
+    def _wait(self, watcher, tracker, name, ordinals):
+        common_scenario.wait_for(
+            watcher, lambda: set(ordinals).issubset(tracker.ready_at),
+            name, resource_type="StatefulSet",
+            desired_status="%s ready pods" % len(ordinals))
+
+    def run(self, image, replicas, scale_replicas=None, command=None,
+            pod_management_policy=None, volume_claim_template=None):
+        """Create statefulset, optionally scale it and delete then.
+
+        :param image: statefulset pod template image
+        :param replicas: original number of replicas
+        :param scale_replicas: number of replicas to scale, scaling down
+               waits for deletion of pods
+        :param command: array of strings representing container command
+        :param pod_management_policy: "OrderedReady" or "Parallel", default
+               one is used if None
+        :param volume_claim_template: a dict with `mount_path`, `size` and
+               optional `storage_class` and `access_modes` keys to create a
+               claim for each pod
+        """
+        namespace = self.choose_namespace()
+        labels = {"statefulset": self.generate_random_name()}
+        tracker = OrdinalsTracker()
+        name = None
+
+        watcher = self.client.watch(
+            "pod", handler=tracker.on_pod_event, namespace=namespace,
+            label_selector="statefulset=%s" % labels["statefulset"])
+        try:
+            start = time.time()
+            name = self.client.create_statefulset(
+                namespace=namespace,
+                replicas=replicas,
+                image=image,
+                command=command,
+                labels=labels,
+                pod_management_policy=pod_management_policy,
+                volume_claim_template=volume_claim_template,
+                status_wait=False
+            )
+            ordinals = list(range(replicas))
+            with atomic.ActionTimer(self,
+                                    "kubernetes.wait_for_statefulset_pods"):
+                self._wait(watcher, tracker, name, ordinals)
+
+            scaled = []
+            if scale_replicas is not None:
+                scale_start = time.time()
+                self.client.scale_statefulset(
+                    name,
+                    namespace=namespace,
+                    replicas=scale_replicas,
+                    status_wait=False
+                )
+                with atomic.ActionTimer(
+                        self, "kubernetes.wait_for_scaled_statefulset_pods"):
+                    if scale_replicas >= replicas:
+                        scaled = list(range(replicas, scale_replicas))
+                        self._wait(watcher, tracker, name, scaled)
+                    else:
+                        common_scenario.wait_for(
+                            watcher,
+                            lambda: tracker.deleted.issuperset(
+                                range(scale_replicas, replicas)),
+                            name, resource_type="StatefulSet",
+                            desired_status="%s deleted pods" % (
+                                replicas - scale_replicas))
+        finally:
+            try:
+                if name is not None:
+                    self.client.delete_statefulset(
+                        name,
+                        namespace=namespace,
+                        status_wait=True
+                    )
+                if volume_claim_template:
+                    # NOTE: claims of volumeClaimTemplates outlive their
+                    #   statefulset, they are labeled by its selector
+                    self.client.delete_pvcs(namespace, labels=labels)
+            finally:
+                watcher.stop()
+
+        cascade = pod_management_policy != "Parallel"
+        rows = tracker.latencies(ordinals, cascade=cascade)
+        description = "%s replicas with %s policy" % (
+            replicas, pod_management_policy or "OrderedReady")
+        if scaled:
+            rows += [("%s, scaled" % row_name, points) for row_name, points
+                     in tracker.latencies(scaled, cascade=cascade)]
+            rows.append(("scale to last ordinal ready",
+                         [max(tracker.ready_at[o] for o in scaled) -
+                          scale_start]))
+        self.add_latency_output("StatefulSet pods startup latency", rows,
+                                description=description)
+        self.add_output(
+            complete={"title": "StatefulSet pods timeline",
+                      "description": "Phases of each ordinal pod since the "
+                                     "statefulset creation, %s" % description,
+                      "chart_plugin": "StackedArea",
+                      "data": tracker.timeline(ordinals + scaled, start),
+                      "label": "Seconds since start",
+                      "axis_label": "Pod ordinal"})
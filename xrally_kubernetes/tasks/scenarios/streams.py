@@ -0,0 +1,448 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from concurrent import futures
+import time
+
+from rally.common import logging
+from rally import exceptions
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+
+LOG = logging.getLogger(__name__)
+
+# NOTE: print a line of line_size bytes lines_per_second times per second
+EMITTER = ("l=$(head -c %(size)s /dev/zero | tr '\\0' x); "
+           "while true; do echo $l; sleep %(interval)s; done")
+
+# NOTE: sleep in a loop, so the pod is terminated at once by TERM signal
+IDLE = "trap exit TERM; while true; do sleep 1; done"
+
+
+class StreamsThroughputScenario(common_scenario.BaseKubernetesScenario):
+    """Base class for scenarios which read many streams of a pod at once.
+
+    Each stream is opened and read in its own thread with a clone of the
+    client. Only sizes and arrival times of the read chunks are kept, the
+    data is dropped at once, so the client is not the bottleneck.
+
+    Subclasses define KIND of streams and the next methods:
+    `_open(client, name, namespace, request_timeout)` opens a stream of the
+    pod by the client and returns it, `_read(stream, deadline, buf)` reads
+    the stream until deadline and returns list of pairs of a receive
+    timestamp and number of bytes, `_close(stream)` closes the stream. The
+    `buf` is a bytearray of buffer_size bytes allocated once per stream and
+    reused by all its reads, or None if buffer_size isn't set.
+    """
+
+    KIND = None
+
+    def _stream(self, name, namespace, duration, buffer_size,
+                request_timeout):
+        """Open the stream, read it for duration seconds and close it.
+
+        :returns: dict with setup latency, time to first byte, number of
+                  bytes, read gaps, reading window and error
+        """
+        client = self.client.clone()
+        result = {"setup": None, "first_byte": None, "bytes": 0, "gaps": [],
+                  "window": 0, "error": None}
+        started_at = time.time()
+        try:
+            stream = self._open(client, name, namespace, request_timeout)
+        except Exception as e:
+            LOG.debug("Unable to open %s stream: %s" % (self.KIND, e))
+            result["error"] = e
+            return result
+        opened_at = time.time()
+        result["setup"] = opened_at - started_at
+        buf = bytearray(buffer_size) if buffer_size else None
+        chunks = []
+        try:
+            chunks = self._read(stream, opened_at + duration, buf)
+        except Exception as e:
+            LOG.debug("%s stream has failed: %s" % (self.KIND, e))
+            result["error"] = e
+        finally:
+            self._close(stream)
+
+        if chunks:
+            result["first_byte"] = chunks[0][0] - started_at
+            result["bytes"] = sum(size for _, size in chunks)
+            result["gaps"] = [b[0] - a[0] for a, b in zip(chunks, chunks[1:])]
+            result["window"] = max(chunks[-1][0], opened_at + duration) - (
+                chunks[0][0])
+        return result
+
+    def _run(self, pod, namespace, streams, duration, buffer_size=None,
+             request_timeout=None):
+        with atomic.ActionTimer(self, "kubernetes.read_%s_streams"
+                                % self.KIND):
+            with futures.ThreadPoolExecutor(max_workers=streams) as executor:
+                results = list(executor.map(
+                    lambda _: self._stream(pod, namespace, duration,
+                                           buffer_size, request_timeout),
+                    range(streams)))
+
+        failed = [r["error"] for r in results if r["error"] is not None]
+        kind = self.KIND.capitalize()
+        self.add_latency_output(
+            "%s streams latency" % kind,
+            [("session setup",
+              [r["setup"] for r in results if r["setup"] is not None]),
+             ("time to first byte",
+              [r["first_byte"] for r in results
+               if r["first_byte"] is not None]),
+             ("read gap", [g for r in results for g in r["gaps"]])],
+            description="%(streams)s concurrent streams, %(failed)s failed"
+                        % {"streams": streams, "failed": len(failed)})
+        rates = [r["bytes"] / r["window"] for r in results if r["window"]]
+        stats = utils.latency_stats(rates)
+        self.add_output(
+            additive={"title": "%s streams throughput" % kind,
+                      "description": "Total read rate of all streams and "
+                                     "rate of the slowest and the median "
+                                     "stream",
+                      "chart_plugin": "Lines",
+                      "data": [["total", sum(rates)],
+                               ["min per stream", stats[0] or 0],
+                               ["median per stream", stats[1] or 0]],
+                      "label": "Bytes/s",
+                      "axis_label": "Iteration"})
+        if failed:
+            raise exceptions.RallyException(
+                message="%(count)s of %(total)s %(kind)s streams failed: "
+                        "%(error)s" % {"count": len(failed),
+                                       "total": streams,
+                                       "kind": self.KIND,
+                                       "error": failed[0]})
+
+
+@validation.add("number", param_name="streams", minval=1, integer_only=True)
+@validation.add("number", param_name="duration", minval=0)
+@validation.add("number", param_name="line_size", minval=1,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="lines_per_second", minval=1,
+                nullable=True)
+@scenario.configure("Kubernetes.exec_streams_throughput",
+                    platform="kubernetes")
+class ExecStreamsThroughput(StreamsThroughputScenario):
+    """Measure throughput of concurrent exec sessions of a long-lived pod.
+
+    Each session runs a command which prints lines at a configured rate,
+    the output goes through apiserver and kubelet as websocket frames.
+    """
+
+    KIND = "exec"
+
+    def _open(self, client, name, namespace, request_timeout):
+        return client.exec_stream(
+            name, namespace=namespace,
+            command=["/bin/sh", "-c", EMITTER % self._emitter])
+
+    def _read(self, stream, deadline, buf):
+        # NOTE: websocket frames are buffered by the exec client as they
+        #   are and can't be read into a buffer, so the scenario has no
+        #   buffer_size and buf is always None, each frame is dropped once
+        #   it's received
+        chunks = []
+        while stream.is_open():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            data = stream.read_stdout(timeout=min(remaining, 1))
+            if data:
+                chunks.append((time.time(), len(data)))
+        return chunks
+
+    def _close(self, stream):
+        stream.close()
+
+    def run(self, image, streams, duration=30, line_size=1024,
+            lines_per_second=10, command=None):
+        """Create pod, read concurrent exec sessions of it and delete it.
+
+        :param image: pod's image, it should have /bin/sh
+        :param streams: number of concurrent exec sessions
+        :param duration: time to read each session in seconds
+        :param line_size: size of the printed lines in bytes
+        :param lines_per_second: number of lines printed by each session
+               per second, the rate is approximate because of sleep
+               precision
+        :param command: pod's array of strings representing command, it
+               should keep the pod running
+        """
+        namespace = self.choose_namespace()
+        self._emitter = {"size": line_size,
+                         "interval": 1.0 / lines_per_second}
+        pod = self.client.create_pod(
+            image,
+            namespace=namespace,
+            command=command or ["/bin/sh", "-c", IDLE],
+            status_wait=True
+        )
+        try:
+            self._run(pod, namespace, streams, duration)
+        finally:
+            self.client.delete_pod(pod, namespace=namespace,
+                                   status_wait=False)
+
+
+@validation.add("number", param_name="streams", minval=1, integer_only=True)
+@validation.add("number", param_name="duration", minval=0)
+@validation.add("number", param_name="line_size", minval=1,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="lines_per_second", minval=1,
+                nullable=True)
+@validation.add("number", param_name="buffer_size", minval=1,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="request_timeout", minval=0,
+                nullable=True)
+@scenario.configure("Kubernetes.log_streams_throughput",
+                    platform="kubernetes")
+class LogStreamsThroughput(StreamsThroughputScenario):
+    """Measure throughput of concurrent followed log streams of a pod.
+
+    The pod prints lines at a configured rate, each stream follows its log
+    from the moment it's opened.
+    """
+
+    KIND = "log"
+
+    def _open(self, client, name, namespace, request_timeout):
+        return client.log_stream(name, namespace=namespace, tail_lines=0,
+                                 request_timeout=request_timeout)
+
+    def _read(self, stream, deadline, buf):
+        # NOTE: readinto returns when the whole buffer is filled or the
+        #   stream is over
+        chunks = []
+        while time.time() < deadline:
+            size = stream.readinto(buf)
+            if not size:
+                break
+            chunks.append((time.time(), size))
+        return chunks
+
+    def _close(self, stream):
+        # NOTE: the followed log is never read to the end, so the
+        #   connection should be closed, not returned to the pool with
+        #   unread data
+        stream.close()
+        stream.release_conn()
+
+    def run(self, image, streams, duration=30, line_size=1024,
+            lines_per_second=10, buffer_size=None, request_timeout=10):
+        """Create printing pod, follow its log by many streams, delete it.
+
+        :param image: pod's image, it should have /bin/sh
+        :param streams: number of concurrent log streams
+        :param duration: time to read each stream in seconds
+        :param line_size: size of the printed lines in bytes
+        :param lines_per_second: number of lines printed by the pod per
+               second, the rate is approximate because of sleep precision
+        :param buffer_size: size of the buffer of each stream in bytes, a
+               single read returns when the buffer is filled, so it's the
+               size of a printed line with newline by default to receive
+               lines as they are printed
+        :param request_timeout: timeout of a single read in seconds
+        """
+        namespace = self.choose_namespace()
+        pod = self.client.create_pod(
+            image,
+            namespace=namespace,
+            command=["/bin/sh", "-c", EMITTER % {
+                "size": line_size, "interval": 1.0 / lines_per_second}],
+            status_wait=True
+        )
+        try:
+            self._run(pod, namespace, streams, duration,
+                      buffer_size or line_size + 1, request_timeout)
+        finally:
+            self.client.delete_pod(pod, namespace=namespace,
+                                   status_wait=False)
+
+
+@validation.add("number", param_name="port", minval=1, maxval=65535,
+                integer_only=True)
+@validation.add("number", param_name="round_trips", minval=0,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="message_size", minval=1,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="bulk_size", minval=0,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="buffer_size", minval=1,
+                integer_only=True, nullable=True)
+@validation.add("number", param_name="request_timeout", minval=0,
+                nullable=True)
+@scenario.configure("Kubernetes.port_forward_throughput",
+                    platform="kubernetes")
+class PortForwardThroughput(common_scenario.BaseKubernetesScenario):
+    """Measure port-forward tunnels to an echo server in a pod.
+
+    Sessions are opened concurrently at each concurrency level. Each
+    session sends small messages one by one to measure round-trip latency,
+    then sends a bulk payload and reads its echo to measure throughput.
+    Data is sent and received through one fixed-size buffer per session.
+    """
+
+    def _recv(self, sock, buf, size):
+        """Receive exactly size bytes into buf, which is reused."""
+        view = memoryview(buf)
+        while size > 0:
+            received = sock.recv_into(view, min(size, len(buf)))
+            if not received:
+                raise exceptions.RallyException(
+                    message="Port-forward connection is closed by server")
+            size -= received
+
+    def _session(self, pod, namespace, port, round_trips, message_size,
+                 bulk_size, buffer_size, request_timeout):
+        """Open a port-forward session, send messages and bulk payload.
+
+        :returns: dict with setup latency, first and other round trips,
+                  bulk throughput and error
+        """
+        client = self.client.clone()
+        result = {"setup": None, "first": None, "round_trips": [],
+                  "throughput": None, "error": None}
+        started_at = time.time()
+        try:
+            session = client.port_forward(pod, namespace=namespace,
+                                          ports=[port])
+        except Exception as e:
+            LOG.debug("Unable to open port-forward session: %s" % e)
+            result["error"] = e
+            return result
+        try:
+            sock = session.socket(port)
+            sock.settimeout(request_timeout)
+            result["setup"] = time.time() - started_at
+            buf = bytearray(buffer_size)
+            message = b"x" * message_size
+            # NOTE: the first message makes kubelet connect to the pod's
+            #   port, so it's measured separately
+            for i in range(round_trips + 1):
+                sent_at = time.time()
+                sock.sendall(message)
+                self._recv(sock, buf, message_size)
+                if i:
+                    result["round_trips"].append(time.time() - sent_at)
+                else:
+                    result["first"] = time.time() - sent_at
+            if bulk_size:
+                chunk = memoryview(bytes(buffer_size))
+                sent_at = time.time()
+                for offset in range(0, bulk_size, buffer_size):
+                    sock.sendall(chunk[:min(buffer_size,
+                                            bulk_size - offset)])
+                self._recv(sock, buf, bulk_size)
+                result["throughput"] = bulk_size / (time.time() - sent_at)
+        except Exception as e:
+            LOG.debug("Port-forward session has failed: %s" % e)
+            result["error"] = session.error(port) or e
+        finally:
+            session.close()
+        return result
+
+    def run(self, image, concurrency, port=8080, command=None, round_trips=10,
+            message_size=64, bulk_size=10485760, buffer_size=65536,
+            request_timeout=10):
+        """Create echo server pod, forward its port by sessions, delete it.
+
+        :param image: pod's image
+        :param concurrency: list of numbers of concurrent sessions, e.g.
+               [1, 4, 16]
+        :param port: pod's container port of the echo server
+        :param command: pod's array of strings command which starts TCP
+               echo server on the port, socat is used by default
+        :param round_trips: number of messages to measure round-trip
+               latency by each session
+        :param message_size: size of messages in bytes
+        :param bulk_size: size of bulk payload in bytes
+        :param buffer_size: size of send and receive buffers in bytes
+        :param request_timeout: timeout of a single socket operation in
+               seconds
+        """
+        namespace = self.choose_namespace()
+        pod = self.client.create_pod(
+            image,
+            namespace=namespace,
+            command=command or ["socat", "TCP-LISTEN:%s,fork,reuseaddr" % port,
+                                "EXEC:cat"],
+            port=port,
+            protocol="TCP",
+            status_wait=True
+        )
+        levels = []
+        try:
+            for level in concurrency:
+                with atomic.ActionTimer(
+                        self, "kubernetes.port_forward_%s_sessions" % level):
+                    with futures.ThreadPoolExecutor(
+                            max_workers=level) as executor:
+                        results = list(executor.map(
+                            lambda _: self._session(
+                                pod, namespace, port, round_trips,
+                                message_size, bulk_size, buffer_size,
+                                request_timeout),
+                            range(level)))
+                levels.append((level, results))
+        finally:
+            self.client.delete_pod(pod, namespace=namespace,
+                                   status_wait=False)
+
+        rows = []
+        for level, results in levels:
+            for title, key in (("setup", "setup"),
+                               ("first round trip", "first")):
+                rows.append(("%s, %s sessions" % (title, level),
+                             [r[key] for r in results
+                              if r[key] is not None]))
+            rows.append(("round trip, %s sessions" % level,
+                         [p for r in results for p in r["round_trips"]]))
+        failed = [r["error"] for _, results in levels for r in results
+                  if r["error"] is not None]
+        self.add_latency_output(
+            "Port-forward latency", rows,
+            description="%(failed)s of %(total)s sessions failed" % {
+                "failed": len(failed),
+                "total": sum(len(results) for _, results in levels)})
+        if bulk_size:
+            stats = []
+            for level, results in levels:
+                rates = [r["throughput"] for r in results
+                         if r["throughput"] is not None]
+                stats.append((level, sum(rates),
+                              utils.latency_stats(rates)[1] or 0))
+            self.add_output(
+                complete={"title": "Port-forward bulk throughput",
+                          "description": "Total and median per session rate "
+                                         "of %s bytes echoed by each session"
+                                         % bulk_size,
+                          "chart_plugin": "Lines",
+                          "data": [["total", [[c, t] for c, t, _ in stats]],
+                                   ["median per session",
+                                    [[c, m] for c, _, m in stats]]],
+                          "label": "Bytes/s",
+                          "axis_label": "Concurrent sessions"})
+        if failed:
+            raise exceptions.RallyException(
+                message="%(count)s port-forward sessions failed: %(error)s"
+                        % {"count": len(failed), "error": failed[0]})
@@ -12,9 +12,75 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import json
+import posixpath
+import re
+import shlex
+import time
+
+from rally import exceptions
+from rally.task import atomic
+
 from xrally_kubernetes.tasks import scenario as common_scenario
 
 
+IO_BENCHMARK_KEYS = ["tool", "rw", "block_size", "size", "iodepth",
+                     "ioengine", "direct", "runtime", "timeout"]
+
+# NOTE: GNU dd prints "N bytes (...) copied, 0.05 s, 1.2 GB/s", busybox dd
+#   prints "N bytes (...) copied, 0.05 seconds, 1.2GB/s"
+DD_SUMMARY_RE = re.compile(r"^(\d+) bytes .* copied, ([\d.]+) ?s")
+
+
+def parse_dd_output(output, block_size):
+    """Parse transfer summary of dd.
+
+    :param output: dd output
+    :param block_size: size of dd blocks in bytes
+    :returns: dict with bandwidth in bytes per second, IOPS, mean latency
+              and None for 99th percentile latency in seconds or None if
+              there is no summary
+    """
+    for line in reversed(output.splitlines()):
+        match = DD_SUMMARY_RE.match(line.strip())
+        if match and float(match.group(2)) > 0:
+            size, seconds = int(match.group(1)), float(match.group(2))
+            ops = float(size) / block_size
+            return {"bandwidth": size / seconds,
+                    "iops": ops / seconds,
+                    "latency": seconds / ops,
+                    "latency_p99": None}
+    return None
+
+
+def parse_fio_output(output):
+    """Parse JSON output of fio printed as the last line.
+
+    :param output: fio output
+    :returns: dict of operation ("read" or "write") to dict with bandwidth
+              in bytes per second, IOPS, mean and 99th percentile completion
+              latency in seconds or None if the output isn't fio JSON
+    """
+    lines = [line for line in output.splitlines() if line.strip()]
+    try:
+        job = json.loads(lines[-1])["jobs"][0]
+    except (IndexError, KeyError, ValueError):
+        return None
+    results = {}
+    for op in ("read", "write"):
+        stats = job.get(op) or {}
+        if not stats.get("io_bytes"):
+            continue
+        clat = stats.get("clat_ns") or {}
+        p99 = (clat.get("percentile") or {}).get("99.000000")
+        results[op] = {
+            "bandwidth": stats.get("bw_bytes", stats.get("bw", 0) * 1024),
+            "iops": stats.get("iops", 0),
+            "latency": clat.get("mean", 0) / 1e9,
+            "latency_p99": p99 / 1e9 if p99 is not None else None}
+    return results or None
+
+
 class PodWithVolumeBaseScenario(common_scenario.BaseKubernetesScenario):
     """Base scenario plugin for all pod with volume scenarios."""
 
@@ -22,8 +88,110 @@ class PodWithVolumeBaseScenario(common_scenario.BaseKubernetesScenario):
         super(PodWithVolumeBaseScenario, self).__init__(context)
         self.namespace = self.choose_namespace()
 
+    FIO_CMD = ("fio --name=xrally --filename=%(path)s --rw=%(rw)s "
+               "--bs=%(block_size)s --size=%(size)s --iodepth=%(iodepth)s "
+               "--ioengine=%(ioengine)s --direct=%(direct)s %(runtime)s"
+               "--output-format=json --output=/tmp/xrally-fio.json && "
+               "tr -d '\\n' < /tmp/xrally-fio.json && echo")
+    DD_WRITE_CMD = ("dd if=/dev/zero of=%(path)s bs=%(block_size)s "
+                    "count=%(count)s conv=fsync%(dd_oflag)s")
+    # NOTE: the file has just been written, so without direct I/O it's read
+    #   from the page cache, not from the volume
+    DD_READ_CMD = "dd if=%(path)s of=/dev/null bs=%(block_size)s%(dd_iflag)s"
+
+    def _run_io(self, name, command, timeout):
+        with atomic.ActionTimer(self, "kubernetes.run_volume_io_benchmark"):
+            result = self.client.exec_command(name, namespace=self.namespace,
+                                              command=command,
+                                              timeout=timeout)
+        if result.exit_code != 0:
+            raise exceptions.RallyException(
+                message="Volume I/O benchmark failed with error: %s"
+                        % result.output)
+        return result.output
+
+    def _benchmark_volume(self, name, mount_path, io_benchmark, volume_type):
+        """Run I/O workload in the mounted volume and add its charts.
+
+        :param name: pod's name
+        :param mount_path: path of the volume in pod
+        :param io_benchmark: dict with workload parameters
+        :param volume_type: volume type to show in chart titles
+        """
+        tool = io_benchmark.get("tool", "dd")
+        # NOTE: the values are validated by io_benchmark validator, they are
+        #   quoted anyway since the command is run by shell
+        params = {
+            "path": shlex.quote(posixpath.join(mount_path, "xrally-io")),
+            "rw": shlex.quote(str(io_benchmark.get("rw", "randrw"))),
+            "block_size": int(io_benchmark.get("block_size", 4096)),
+            "size": int(io_benchmark.get("size", 64 * 1024 * 1024)),
+            "iodepth": shlex.quote(str(io_benchmark.get("iodepth", 1))),
+            "ioengine": shlex.quote(str(io_benchmark.get("ioengine",
+                                                         "psync"))),
+            "direct": int(bool(io_benchmark.get("direct", False))),
+            "runtime": ("--runtime=%s --time_based "
+                        % shlex.quote(str(io_benchmark["runtime"]))
+                        if io_benchmark.get("runtime") else "")}
+        params["count"] = max(params["size"] // params["block_size"], 1)
+        params["dd_oflag"] = " oflag=direct" if params["direct"] else ""
+        params["dd_iflag"] = " iflag=direct" if params["direct"] else ""
+        timeout = io_benchmark.get("timeout")
+
+        if tool == "fio":
+            output = self._run_io(name, self.FIO_CMD % params, timeout)
+            results = parse_fio_output(output)
+        else:
+            results = {}
+            for op, command in (("write", self.DD_WRITE_CMD),
+                                ("read", self.DD_READ_CMD)):
+                output = self._run_io(name, command % params, timeout)
+                results[op] = parse_dd_output(output, params["block_size"])
+                if results[op] is None:
+                    results = None
+                    break
+        self.client.exec_command(name, namespace=self.namespace,
+                                 command="rm -f %s" % params["path"])
+        if results is None:
+            raise exceptions.RallyException(
+                message="Unable to parse %s output: %s" % (tool, output))
+
+        ops = sorted(results)
+        workload = "%(rw)s by %(tool)s, %(block_size)s bytes blocks" % {
+            "rw": (io_benchmark.get("rw", "randrw") if tool == "fio" else
+                   "sequential write/read"),
+            "tool": tool,
+            "block_size": params["block_size"]}
+        for title, label, key, scale in (
+                ("bandwidth", "MiB/s", "bandwidth", 1.0 / 1024 / 1024),
+                ("IOPS", "IOPS", "iops", 1)):
+            self.add_output(
+                additive={"title": "%s I/O %s" % (volume_type, title),
+                          "description": workload,
+                          "chart_plugin": "Lines",
+                          "data": [[op, results[op][key] * scale]
+                                   for op in ops],
+                          "label": label,
+                          "axis_label": "Iteration"})
+        latencies = []
+        for op in ops:
+            latencies.append(["%s mean" % op, results[op]["latency"] * 1000])
+            if results[op]["latency_p99"] is not None:
+                latencies.append(["%s 99%%ile" % op,
+                                  results[op]["latency_p99"] * 1000])
+        self.add_output(
+            additive={"title": "%s I/O latency" % volume_type,
+                      "description": "Completion latency of a single I/O, "
+                                     "%s, dd reports the mean only" % workload,
+                      "chart_plugin": "Lines",
+                      "data": latencies,
+                      "label": "Milliseconds",
+                      "axis_label": "Iteration"})
+
     def run(self, image, name=None, check_cmd=None, command=None,
-            error_regexp=None, volume=None, status_wait=True):
+            error_regexp=None, volume=None, status_wait=True,
+            mount_path=None, io_benchmark=None, volume_type="Volume",
+            shell_session=True):
         """Super class for all kubernetes pod with volume scenarios.
 
         :param image: pod's image
@@ -35,7 +203,26 @@ class PodWithVolumeBaseScenario(common_scenario.BaseKubernetesScenario):
         :param volume: a dict, which contains `mount_path` and `volume` keys
                with parts of pod's manifest as values
         :param status_wait: wait for pod's status if True
+        :param mount_path: path to mount volume in pod, required by
+               io_benchmark
+        :param io_benchmark: a dict with I/O workload parameters, the
+               workload is run in the volume if it's specified, the next
+               keys are supported: `tool` ("dd" by default or "fio"), `rw`,
+               `block_size` and `size` in bytes, `iodepth`, `ioengine`,
+               `direct`, `runtime` and `timeout` in seconds; `rw`,
+               `iodepth`, `ioengine` and `runtime` are fio options, `direct`
+               bypasses the page cache by both tools
+        :param volume_type: volume type to show in I/O chart titles
+        :param shell_session: run check_cmd in the shell session of the pod,
+               which is reused by I/O benchmark, False to exec it directly
+               for images without `/bin/sh`
         """
+        if io_benchmark and io_benchmark.get("tool", "dd") not in ("dd",
+                                                                   "fio"):
+            raise exceptions.InvalidArgumentsException(
+                message="Unknown I/O benchmark tool '%s', 'dd' or 'fio' is "
+                        "expected" % io_benchmark["tool"])
+
         name = self.client.create_pod(
             image,
             name=name,
@@ -50,11 +237,117 @@ class PodWithVolumeBaseScenario(common_scenario.BaseKubernetesScenario):
                 name,
                 namespace=self.namespace,
                 check_cmd=check_cmd,
-                error_regexp=error_regexp
+                error_regexp=error_regexp,
+                shell_session=shell_session
             )
 
+        if io_benchmark:
+            self._benchmark_volume(name, mount_path, io_benchmark,
+                                   volume_type)
+
         self.client.delete_pod(
             name,
             namespace=self.namespace,
             status_wait=status_wait
         )
+
+
+class PodWithVolumeUpdateBaseScenario(PodWithVolumeBaseScenario):
+    """Base scenario plugin for volume update propagation scenarios.
+
+    A shell loop inside the pod prints the mounted file each time its
+    content changes, and its output is read from a single exec stream, so
+    updates are detected without repeated exec calls.
+    """
+
+    KEY = "xrally-token"
+    PREFIX = "xrally:"
+    WATCH_CMD = ("p=; while true; do v=$(cat %(path)s 2>/dev/null); "
+                 "if [ \"$v\" != \"$p\" ]; then echo \"%(prefix)s$v\"; "
+                 "p=$v; fi; sleep %(interval)s; done")
+
+    def _wait_content(self, resp, content, timeout):
+        """Read exec stream until content is printed.
+
+        :returns: time when content has been received
+        """
+        deadline = time.time() + timeout
+        while resp.is_open():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            line = resp.readline_stdout(timeout=min(remaining, 1))
+            if line and line.strip() == self.PREFIX + content:
+                return time.time()
+        raise exceptions.TimeoutException(
+            desired_status=content,
+            resource_name=self.KEY,
+            resource_type="Volume file",
+            resource_id="<no id>",
+            resource_status="stream is %s" % (
+                "open" if resp.is_open() else "closed"),
+            timeout=timeout)
+
+    def run(self, image, name, volume, mount_path, content, update,
+            updates=3, command=None, poll_interval=0.1, timeout=180):
+        """Create pod with volume, update volume source and delete pod.
+
+        :param image: pod's image, it should have sh, cat and sleep
+        :param name: pod's name, equals to volume name
+        :param volume: a dict, which contains `mount_path` and `volume` keys
+               with parts of pod's manifest as values
+        :param mount_path: path to mount volume in pod
+        :param content: initial content of KEY file in volume
+        :param update: a callable, which updates KEY file content in volume
+               source to its argument
+        :param updates: number of updates
+        :param command: array of strings representing container command,
+               container should keep running
+        :param poll_interval: interval of file checks inside pod
+        :param timeout: max time to wait for a single update in seconds
+        """
+        name = self.client.create_pod(
+            image,
+            name=name,
+            volume=volume,
+            namespace=self.namespace,
+            command=command,
+            status_wait=True
+        )
+
+        latencies = []
+        resp = self.client.exec_stream(
+            name,
+            namespace=self.namespace,
+            command=["/bin/sh", "-c", self.WATCH_CMD % {
+                "path": posixpath.join(mount_path, self.KEY),
+                "prefix": self.PREFIX,
+                "interval": poll_interval}]
+        )
+        try:
+            with atomic.ActionTimer(self, "kubernetes.wait_volume_content"):
+                self._wait_content(resp, content, timeout)
+            for i in range(updates):
+                content = self.generate_random_name()
+                with atomic.ActionTimer(
+                        self, "kubernetes.propagate_volume_update"):
+                    started_at = time.time()
+                    update(content)
+                    latencies.append(
+                        self._wait_content(resp, content, timeout) -
+                        started_at)
+        finally:
+            resp.close()
+
+        self.client.delete_pod(
+            name,
+            namespace=self.namespace,
+            status_wait=True
+        )
+
+        self.add_latency_output(
+            "Volume update propagation",
+            [("kubernetes.propagate_volume_update", latencies)],
+            description="Time from the update request until the mounted "
+                        "file has new content, checked every %s seconds" %
+                        poll_interval)
@@ -24,7 +24,8 @@ from xrally_kubernetes.tasks.scenarios.volumes import base
 class CreateAndDeletePodWithConfigMapVolume(base.PodWithVolumeBaseScenario):
 
     def run(self, image, mount_path, configmap_data, subpath=None,
-            check_cmd=None, error_regexp=None, command=None, status_wait=True):
+            check_cmd=None, error_regexp=None, command=None, status_wait=True,
+            shell_session=True):
         """Create pod with configMap volume, optionally check and delete then.
 
         Create pod with configMap volume, optionally wait for it's readiness,
@@ -38,6 +39,8 @@ class CreateAndDeletePodWithConfigMapVolume(base.PodWithVolumeBaseScenario):
         :param error_regexp: regexp string to search error in pod exec response
         :param command: array of strings representing container command
         :param status_wait: wait pod status for success if True
+        :param shell_session: run check_cmd in the shell session of the pod,
+               False to exec it directly for images without `/bin/sh`
         """
         name = self.generate_random_name()
 
@@ -73,7 +76,75 @@ class CreateAndDeletePodWithConfigMapVolume(base.PodWithVolumeBaseScenario):
             check_cmd=check_cmd,
             error_regexp=error_regexp,
             volume=volume,
-            status_wait=status_wait
+            status_wait=status_wait,
+            shell_session=shell_session
+        )
+
+        self.client.delete_configmap(name, namespace=self.namespace)
+
+
+@scenario.configure(
+    name="Kubernetes.create_update_and_delete_pod_with_configmap_volume",
+    platform="kubernetes"
+)
+class CreateUpdateAndDeletePodWithConfigMapVolume(
+        base.PodWithVolumeUpdateBaseScenario):
+
+    def run(self, image, mount_path, updates=3, command=None,
+            poll_interval=0.1, timeout=180):
+        """Measure configMap update propagation latency to mounted volume.
+
+        Create configMap and pod with it mounted as a volume, update
+        configMap a few times and measure time until the mounted file has
+        new content, delete pod and configMap then. Note, that volumes
+        mounted with subPath are never updated.
+
+        :param image: pod's image, it should have sh, cat and sleep
+        :param mount_path: path to mount volume in pod
+        :param updates: number of configMap updates
+        :param command: array of strings representing container command,
+               container should keep running
+        :param poll_interval: interval of file checks inside pod
+        :param timeout: max time to wait for a single update in seconds
+        """
+        name = self.generate_random_name()
+        content = self.generate_random_name()
+
+        self.client.create_configmap(
+            name,
+            namespace=self.namespace,
+            data={self.KEY: content}
+        )
+
+        volume = {
+            "mount_path": [
+                {
+                    "mountPath": mount_path,
+                    "name": name
+                }
+            ],
+            "volume": [
+                {
+                    "name": name,
+                    "configMap": {
+                        "name": name
+                    }
+                }
+            ]
+        }
+
+        super(CreateUpdateAndDeletePodWithConfigMapVolume, self).run(
+            image,
+            name=name,
+            volume=volume,
+            mount_path=mount_path,
+            content=content,
+            update=lambda new: self.client.patch_configmap(
+                name, namespace=self.namespace, data={self.KEY: new}),
+            updates=updates,
+            command=command,
+            poll_interval=poll_interval,
+            timeout=timeout
         )
 
         self.client.delete_configmap(name, namespace=self.namespace)
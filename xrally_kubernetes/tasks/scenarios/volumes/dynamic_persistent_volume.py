@@ -0,0 +1,295 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from concurrent import futures
+import time
+
+from rally.common import cfg
+from rally import exceptions
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+CONF = cfg.CONF
+
+
+class ClaimsTracker(object):
+    """Track claims binding, their pods and volumes reclaim by watches.
+
+    Each handler records the time when the state was observed for the
+    first time, only claims and pods of the `names` set are tracked.
+    """
+
+    def __init__(self, names):
+        self.names = set(names)
+        # NOTE: claim name -> time when the claim became Bound
+        self.bound_at = {}
+        # NOTE: claim name -> name of its bound volume
+        self.volumes = {}
+        # NOTE: pod name -> time when the pod was bound to a node
+        self.scheduled_at = {}
+        # NOTE: pod name -> time when the pod became Running
+        self.running_at = {}
+        self.pods_deleted = set()
+        # NOTE: volume name -> time when the volume was released or deleted
+        self.reclaimed_at = {}
+
+    def on_claim_event(self, event_type, claim, received_at):
+        name = claim.metadata.name
+        if event_type != "DELETED" and claim.status and (
+                claim.status.phase == "Bound"):
+            self.bound_at.setdefault(name, received_at)
+            if claim.spec.volume_name:
+                self.volumes[name] = claim.spec.volume_name
+
+    def on_pod_event(self, event_type, pod, received_at):
+        name = pod.metadata.name
+        if event_type == "DELETED":
+            self.pods_deleted.add(name)
+            return
+        if pod.spec.node_name:
+            self.scheduled_at.setdefault(name, received_at)
+        if pod.status and pod.status.phase == "Running":
+            self.running_at.setdefault(name, received_at)
+
+    def on_volume_event(self, event_type, volume, received_at):
+        claim_ref = volume.spec.claim_ref
+        if claim_ref is None or claim_ref.name not in self.names:
+            return
+        if event_type == "DELETED" or (
+                volume.status and volume.status.phase in ("Released",
+                                                          "Failed")):
+            self.reclaimed_at.setdefault(volume.metadata.name, received_at)
+
+
+@validation.add("number", param_name="claims", minval=1, integer_only=True)
+@validation.add("number", param_name="workers", minval=1, integer_only=True,
+                nullable=True)
+@validation.add("enum", param_name="volume_mode",
+                values=["Filesystem", "Block"], missed=True)
+@scenario.configure("Kubernetes.create_and_delete_pods_with_dynamic_pvcs",
+                    platform="kubernetes")
+class CreateAndDeletePodsWithDynamicPVCs(
+        common_scenario.BaseKubernetesScenario):
+    """Measure dynamic provisioning, attach and reclaim of volumes.
+
+    Claims of the given storageClass are created together with pods which
+    use them. Claims, pods and volumes are tracked by three watches, so
+    the cost of observing doesn't grow with the number of claims.
+    """
+
+    def _create(self, name):
+        client = self.client.clone()
+        self._created_at[name] = time.time()
+        client.create_pvc(
+            name,
+            namespace=self._namespace,
+            storage_class=self._storage_class,
+            access_modes=self._access_modes,
+            size=self._size,
+            volume_mode=self._volume_mode,
+            labels=self._labels
+        )
+        self._claims.append(name)
+        volume = {
+            "mount_path": [{"mountPath": self._mount_path,
+                            "name": "data"}],
+            "volume": [{"name": "data",
+                        "persistentVolumeClaim": {"claimName": name}}]
+        }
+        if self._volume_mode == "Block":
+            # NOTE: block volumes can't be mounted, they are exposed to the
+            #   container as a raw device at the mount path instead
+            volume["mount_path"] = []
+            volume["devices"] = [{"devicePath": self._mount_path,
+                                  "name": "data"}]
+        client.create_pod(
+            self._image,
+            namespace=self._namespace,
+            name=name,
+            command=self._command,
+            volume=volume,
+            labels=self._labels,
+            status_wait=False
+        )
+        self._pods.append(name)
+
+    def _delete_pod(self, name):
+        self.client.clone().delete_pod(name, namespace=self._namespace,
+                                       status_wait=False)
+
+    def _delete_claim(self, name):
+        client = self.client.clone()
+        self._deleted_at[name] = time.time()
+        client.delete_pvc(name, namespace=self._namespace)
+
+    def run(self, storage_class, image, claims=1, size="1Gi",
+            access_modes=None, volume_mode=None, mount_path="/data",
+            command=None, workers=10):
+        """Create claims with pods, wait for binding and delete them.
+
+        Provision latency is the time from the claim creation until it's
+        observed Bound, it includes pod scheduling for storageClasses with
+        WaitForFirstConsumer binding mode. Attach latency is the time from
+        the pod binding to a node until it's observed Running. Reclaim
+        latency is the time from the claim deletion until its volume is
+        deleted or released, depending on the reclaim policy.
+
+        :param storage_class: name of existing storageClass
+        :param image: pods image
+        :param claims: number of claims and pods
+        :param size: requested storage size of each claim
+        :param access_modes: claims access modes, ["ReadWriteOnce"] by
+               default
+        :param volume_mode: claims volume mode, storageClass default if None
+        :param mount_path: path to mount volume in pods, path of the device
+               for Block volume mode
+        :param command: pods array of strings command, it should keep pods
+               running
+        :param workers: number of threads which create and delete claims and
+               pods
+        """
+        self._namespace = self.choose_namespace()
+        self._storage_class = storage_class
+        self._image = image
+        self._size = size
+        self._access_modes = access_modes or ["ReadWriteOnce"]
+        self._volume_mode = volume_mode
+        self._mount_path = mount_path
+        self._command = command
+        self._labels = {"claims": self.generate_random_name()}
+        self._created_at = {}
+        self._deleted_at = {}
+        self._claims = []
+        self._pods = []
+        names = [self.generate_random_name() for _ in range(claims)]
+        tracker = ClaimsTracker(names)
+        selector = "claims=%s" % self._labels["claims"]
+
+        watchers = []
+        pods_deleted = reclaimed = False
+        try:
+            watchers.append(self.client.watch(
+                "persistentvolumeclaim", handler=tracker.on_claim_event,
+                namespace=self._namespace, label_selector=selector))
+            watchers.append(self.client.watch(
+                "pod", handler=tracker.on_pod_event,
+                namespace=self._namespace, label_selector=selector))
+            watchers.append(self.client.watch(
+                "persistentvolume", handler=tracker.on_volume_event))
+            claims_watcher, pods_watcher, volumes_watcher = watchers
+            start = time.time()
+            try:
+                with atomic.ActionTimer(
+                        self, "kubernetes.create_pvcs_and_pods"):
+                    with futures.ThreadPoolExecutor(
+                            max_workers=workers) as executor:
+                        list(executor.map(self._create, names))
+                with atomic.ActionTimer(self, "kubernetes.wait_for_pvcs"):
+                    common_scenario.wait_for(
+                        claims_watcher,
+                        lambda: len(tracker.bound_at) >= claims,
+                        self._labels["claims"],
+                        resource_type="Persistent Volume Claim",
+                        desired_status="Bound")
+                with atomic.ActionTimer(self, "kubernetes.wait_for_pods"):
+                    common_scenario.wait_for(
+                        pods_watcher,
+                        lambda: len(tracker.running_at) >= claims,
+                        self._labels["claims"], resource_type="Pod",
+                        desired_status="Running")
+            finally:
+                with atomic.ActionTimer(self, "kubernetes.delete_pods"):
+                    with futures.ThreadPoolExecutor(
+                            max_workers=workers) as executor:
+                        list(executor.map(self._delete_pod, self._pods))
+                    # NOTE: claims are protected until their pods are
+                    #   gone, so reclaim is measured after pods deletion
+                    pods_deleted = pods_watcher.wait(
+                        lambda: tracker.pods_deleted.issuperset(self._pods))
+                with atomic.ActionTimer(self, "kubernetes.delete_pvcs"):
+                    with futures.ThreadPoolExecutor(
+                            max_workers=workers) as executor:
+                        list(executor.map(self._delete_claim, self._claims))
+                with claims_watcher.lock:
+                    volumes = dict((v, c) for c, v in
+                                   tracker.volumes.items())
+                # NOTE: volumes aren't reclaimed while claims are protected
+                #   by remaining pods, so there is nothing to wait for then
+                if pods_deleted:
+                    with atomic.ActionTimer(self,
+                                            "kubernetes.wait_for_reclaim"):
+                        reclaimed = volumes_watcher.wait(
+                            lambda: set(volumes).issubset(
+                                tracker.reclaimed_at))
+        finally:
+            for watcher in watchers:
+                watcher.stop()
+
+        timeout = (CONF.kubernetes.status_total_retries *
+                   CONF.kubernetes.status_poll_interval)
+        if not pods_deleted:
+            with pods_watcher.lock:
+                deleted = len(tracker.pods_deleted.intersection(self._pods))
+            raise exceptions.TimeoutException(
+                desired_status="Deleted",
+                resource_name=self._labels["claims"],
+                resource_type="Pod",
+                resource_id="<no id>",
+                resource_status="%s of %s pods deleted" % (deleted,
+                                                           len(self._pods)),
+                timeout=timeout)
+
+        rows = [("provision (create to Bound)",
+                 [tracker.bound_at[n] - self._created_at[n]
+                  for n in names if n in tracker.bound_at]),
+                ("attach and mount (Scheduled to Running)",
+                 [tracker.running_at[n] - tracker.scheduled_at[n]
+                  for n in names if n in tracker.running_at and
+                  n in tracker.scheduled_at]),
+                ("reclaim (claim delete to volume released)",
+                 [tracker.reclaimed_at[v] - self._deleted_at[c]
+                  for v, c in volumes.items()
+                  if v in tracker.reclaimed_at])]
+        self.add_latency_output(
+            "Dynamic provisioning latency", rows,
+            description="%(claims)s claims of %(size)s of storageClass "
+                        "%(storage_class)s" % {
+                            "claims": claims, "size": size,
+                            "storage_class": storage_class})
+        self.add_output(
+            complete={"title": "Dynamic provisioning",
+                      "description": "Number of claims bound and pods "
+                                     "running per second",
+                      "chart_plugin": "Lines",
+                      "data": [["bound claims",
+                                utils.time_series(tracker.bound_at.values(),
+                                                  start)],
+                               ["running pods",
+                                utils.time_series(
+                                    tracker.running_at.values(), start)]],
+                      "label": "Number per second",
+                      "axis_label": "Seconds since start"})
+        if not reclaimed:
+            raise exceptions.TimeoutException(
+                desired_status="Released or deleted",
+                resource_name=self._labels["claims"],
+                resource_type="Persistent Volume",
+                resource_id="<no id>",
+                resource_status="%s of %s volumes reclaimed" % (
+                    len(tracker.reclaimed_at), len(volumes)),
+                timeout=timeout)
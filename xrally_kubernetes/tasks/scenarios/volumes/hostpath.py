@@ -21,6 +21,9 @@ from xrally_kubernetes.tasks.scenarios.volumes import base
 @validation.add("enum", param_name="volume_type",
                 values=["DirectoryOrCreate", "Directory", "FileOrCreate",
                         "File", "Socket", "CharDevice", "BlockDevice"])
+@validation.add("map_keys", param_name="io_benchmark",
+                allowed=base.IO_BENCHMARK_KEYS, missed=True)
+@validation.add("io_benchmark")
 @scenario.configure(
     name="Kubernetes.create_and_delete_pod_with_hostpath_volume",
     platform="kubernetes"
@@ -28,11 +31,13 @@ from xrally_kubernetes.tasks.scenarios.volumes import base
 class CreateAndDeletePodWithHostPathVolume(base.PodWithVolumeBaseScenario):
 
     def run(self, image, mount_path, volume_type, volume_path, check_cmd=None,
-            error_regexp=None, command=None, status_wait=True):
+            error_regexp=None, command=None, status_wait=True,
+            io_benchmark=None, shell_session=True):
         """Create pod with hostPath volume, optionally check and delete then.
 
         Create pod with hostPath volume, optionally wait for it's readiness,
-        check volume existence by check_cmd, if it defined and delete pod then.
+        check volume existence by check_cmd, if it defined, run I/O benchmark
+        in it, if it's defined and delete pod then.
 
         :param image: pod's image
         :param mount_path: path to mount volume in pod
@@ -42,6 +47,10 @@ class CreateAndDeletePodWithHostPathVolume(base.PodWithVolumeBaseScenario):
         :param error_regexp: regexp string to search error in pod exec response
         :param command: array of strings representing container command
         :param status_wait: wait pod status for success if True
+        :param io_benchmark: a dict with I/O workload parameters, see
+               PodWithVolumeBaseScenario.run
+        :param shell_session: run check_cmd in the shell session of the pod,
+               False to exec it directly for images without `/bin/sh`
         """
         name = self.generate_random_name()
 
@@ -70,5 +79,9 @@ class CreateAndDeletePodWithHostPathVolume(base.PodWithVolumeBaseScenario):
             check_cmd=check_cmd,
             error_regexp=error_regexp,
             volume=volume,
-            status_wait=status_wait
+            status_wait=status_wait,
+            mount_path=mount_path,
+            io_benchmark=io_benchmark,
+            shell_session=shell_session,
+            volume_type="hostPath"
         )
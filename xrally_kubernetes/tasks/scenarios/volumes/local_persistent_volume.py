@@ -12,109 +12,187 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+from kubernetes.client import rest
+from rally.common import cfg
+from rally.common import logging
+from rally import exceptions
 from rally.task import atomic
 from rally.task import scenario
 from rally.task import validation
 
 from xrally_kubernetes.tasks.scenarios.volumes import base
 
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
 
 @validation.add("map_keys", param_name="persistent_volume",
                 required=["size", "volume_mode", "local_path",
-                          "access_modes", "node_affinity"])
+                          "access_modes", "node_affinity"], missed=True)
 @validation.add("map_keys", param_name="persistent_volume_claim",
                 required=["size", "access_modes"])
+@validation.add("map_keys", param_name="io_benchmark",
+                allowed=base.IO_BENCHMARK_KEYS, missed=True)
+@validation.add("io_benchmark")
+@validation.add("single_process_runner", contexts=["local_pv_pool"])
 @scenario.configure(
     name="Kubernetes.create_and_delete_pod_with_local_persistent_volume",
     platform="kubernetes"
 )
 class CreateAndDeletePodWithLocalPVVolume(base.PodWithVolumeBaseScenario):
 
-    def run(self, image, mount_path, persistent_volume,
-            persistent_volume_claim, check_cmd=None, error_regexp=None,
-            command=None, status_wait=True):
+    def _return_pv(self, name, pv_name, pool):
+        """Delete pod and claim of a failed iteration, return PV to pool.
+
+        The PV is kept out of the pool if the claim can't be deleted, since
+        it may still be bound to the claim.
+        """
+        try:
+            for delete in (self.client.delete_pod,
+                           self.client.delete_local_pvc):
+                try:
+                    delete(name, namespace=self.namespace, status_wait=True)
+                except rest.ApiException as e:
+                    if e.status != 404:
+                        raise
+            self.client.release_local_pv(pv_name)
+        except Exception as e:
+            LOG.warning("Local PV %(pv)s isn't returned to the pool: %(e)s"
+                        % {"pv": pv_name, "e": e})
+            return
+        pool.release(pv_name)
+
+    def run(self, image, mount_path, persistent_volume_claim,
+            persistent_volume=None, check_cmd=None, error_regexp=None,
+            command=None, status_wait=True, io_benchmark=None,
+            shell_session=True):
         """Create pod with local PV, optionally check and delete then.
 
         Create pod with local persistent volume, optionally wait for it's
-        readiness, check volume existence by check_cmd, if it defined and
-        delete pod then.
+        readiness, check volume existence by check_cmd, if it defined, run
+        I/O benchmark in it, if it's defined and delete pod then.
+
+        If `local_pv_pool` context is used, the claim is bound to a free PV
+        taken from the pool instead of a new PV, and the PV is released and
+        returned to the pool at the end. If the iteration fails, its pod and
+        claim are deleted and the PV is returned to the pool too.
 
         :param image: pod's image
         :param mount_path: path to mount volume in pod
         :param persistent_volume: a dict with the next keys: `size`,
-               `volume_mode`, `local_path`, `access_modes`, `node_affinity`
+               `volume_mode`, `local_path`, `access_modes`, `node_affinity`;
+               it's not used with `local_pv_pool` context
         :param persistent_volume_claim: a dict with the next keys: `size` and
                `access_modes`
         :param check_cmd: check command to exec in pod; if None, then no check
         :param error_regexp: regexp string to search error in pod exec response
         :param command: array of strings representing container command
         :param status_wait: wait pod status for success if True
+        :param io_benchmark: a dict with I/O workload parameters, see
+               PodWithVolumeBaseScenario.run
+        :param shell_session: run check_cmd in the shell session of the pod,
+               False to exec it directly for images without `/bin/sh`
         """
         name = self.generate_random_name()
+        pool = self.context["kubernetes"].get("local_pv_pool")
+
+        if pool is not None:
+            timeout = (CONF.kubernetes.status_total_retries *
+                       CONF.kubernetes.status_poll_interval)
+            with atomic.ActionTimer(self, "kubernetes.acquire_local_pv"):
+                pv_name = pool.acquire(timeout=timeout)
+            if pv_name is None:
+                raise exceptions.TimeoutException(
+                    desired_status="Available",
+                    resource_name="local_pv_pool",
+                    resource_type="Persistent Volume",
+                    resource_id="<no id>",
+                    resource_status="All PVs of the pool are in use",
+                    timeout=timeout)
+        elif persistent_volume:
+            pv_name = self.client.create_local_pv(
+                name,
+                storage_class=self.context["kubernetes"]["storageclass"],
+                size=persistent_volume["size"],
+                volume_mode=persistent_volume["volume_mode"],
+                local_path=persistent_volume["local_path"],
+                access_modes=persistent_volume["access_modes"],
+                node_affinity=persistent_volume["node_affinity"],
+                status_wait=status_wait
+            )
+        else:
+            raise exceptions.InvalidArgumentsException(
+                message="'persistent_volume' argument is required without "
+                        "local_pv_pool context")
 
-        self.client.create_local_pv(
-            name,
-            storage_class=self.context["kubernetes"]["storageclass"],
-            size=persistent_volume["size"],
-            volume_mode=persistent_volume["volume_mode"],
-            local_path=persistent_volume["local_path"],
-            access_modes=persistent_volume["access_modes"],
-            node_affinity=persistent_volume["node_affinity"],
-            status_wait=status_wait
-        )
-
-        self.client.create_local_pvc(
-            name,
-            namespace=self.namespace,
-            storage_class=self.context["kubernetes"]["storageclass"],
-            access_modes=persistent_volume_claim["access_modes"],
-            size=persistent_volume_claim["size"]
-        )
-
-        volume = {
-            "mount_path": [
-                {
-                    "mountPath": mount_path,
-                    "name": name
-                }
-            ],
-            "volume": [
-                {
-                    "name": name,
-                    "persistentVolumeClaim": {
-                        "claimName": name
+        try:
+            self.client.create_local_pvc(
+                name,
+                namespace=self.namespace,
+                storage_class=self.context["kubernetes"]["storageclass"],
+                access_modes=persistent_volume_claim["access_modes"],
+                size=persistent_volume_claim["size"],
+                volume_name=pv_name if pool is not None else None
+            )
+
+            volume = {
+                "mount_path": [
+                    {
+                        "mountPath": mount_path,
+                        "name": name
+                    }
+                ],
+                "volume": [
+                    {
+                        "name": name,
+                        "persistentVolumeClaim": {
+                            "claimName": name
+                        }
                     }
-                }
-            ]
-        }
-
-        super(CreateAndDeletePodWithLocalPVVolume, self).run(
-            image,
-            name=name,
-            command=command,
-            check_cmd=check_cmd,
-            error_regexp=error_regexp,
-            volume=volume,
-            status_wait=status_wait
-        )
-
-        with atomic.ActionTimer(
-                self,
-                "kubernetes.check_persistent_volume_claim_status"):
-            resp = self.client.get_local_pvc(name, namespace=self.namespace)
-            self.assertNotEqual("Failed", resp.status.phase)
-        with atomic.ActionTimer(self,
-                                "kubernetes.check_persistent_volume_status"):
-            resp = self.client.get_local_pv(name)
-            self.assertNotEqual("Failed", resp.status.phase)
-
-        self.client.delete_local_pvc(
-            name,
-            namespace=self.namespace,
-            status_wait=status_wait
-        )
-
-        self.client.delete_local_pv(
-            name,
-            status_wait=status_wait
-        )
+                ]
+            }
+
+            super(CreateAndDeletePodWithLocalPVVolume, self).run(
+                image,
+                name=name,
+                command=command,
+                check_cmd=check_cmd,
+                error_regexp=error_regexp,
+                volume=volume,
+                status_wait=status_wait,
+                mount_path=mount_path,
+                io_benchmark=io_benchmark,
+                shell_session=shell_session,
+                volume_type="local PV"
+            )
+
+            with atomic.ActionTimer(
+                    self,
+                    "kubernetes.check_persistent_volume_claim_status"):
+                resp = self.client.get_local_pvc(name,
+                                                 namespace=self.namespace)
+                self.assertNotEqual("Failed", resp.status.phase)
+            with atomic.ActionTimer(
+                    self, "kubernetes.check_persistent_volume_status"):
+                resp = self.client.get_local_pv(pv_name)
+                self.assertNotEqual("Failed", resp.status.phase)
+
+            self.client.delete_local_pvc(
+                name,
+                namespace=self.namespace,
+                status_wait=status_wait or pool is not None
+            )
+            if pool is not None:
+                self.client.release_local_pv(pv_name)
+        except Exception:
+            if pool is not None:
+                self._return_pv(name, pv_name, pool)
+            raise
+
+        if pool is not None:
+            pool.release(pv_name)
+        else:
+            self.client.delete_local_pv(
+                name,
+                status_wait=status_wait
+            )
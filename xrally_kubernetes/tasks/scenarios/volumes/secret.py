@@ -12,6 +12,8 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import base64
+
 from rally.task import scenario
 
 from xrally_kubernetes.tasks.scenarios.volumes import base
@@ -24,7 +26,7 @@ from xrally_kubernetes.tasks.scenarios.volumes import base
 class CreateAndDeletePodWithSecretVolume(base.PodWithVolumeBaseScenario):
 
     def run(self, image, mount_path, check_cmd=None, error_regexp=None,
-            command=None, status_wait=True):
+            command=None, status_wait=True, shell_session=True):
         """Create pod with secret volume, optionally check and delete then.
 
         Create secret, create pod with secret volume, optionally wait for it's
@@ -37,6 +39,8 @@ class CreateAndDeletePodWithSecretVolume(base.PodWithVolumeBaseScenario):
         :param error_regexp: regexp string to search error in pod exec response
         :param command: array of strings representing container command
         :param status_wait: wait pod status for success if True
+        :param shell_session: run check_cmd in the shell session of the pod,
+               False to exec it directly for images without `/bin/sh`
         """
         name = self.generate_random_name()
 
@@ -66,7 +70,79 @@ class CreateAndDeletePodWithSecretVolume(base.PodWithVolumeBaseScenario):
             check_cmd=check_cmd,
             error_regexp=error_regexp,
             volume=volume,
-            status_wait=status_wait
+            status_wait=status_wait,
+            shell_session=shell_session
+        )
+
+        self.client.delete_secret(name, namespace=self.namespace)
+
+
+@scenario.configure(
+    name="Kubernetes.create_update_and_delete_pod_with_secret_volume",
+    platform="kubernetes"
+)
+class CreateUpdateAndDeletePodWithSecretVolume(
+        base.PodWithVolumeUpdateBaseScenario):
+
+    @staticmethod
+    def _encode(content):
+        return base64.b64encode(content.encode()).decode()
+
+    def run(self, image, mount_path, updates=3, command=None,
+            poll_interval=0.1, timeout=180):
+        """Measure secret update propagation latency to mounted volume.
+
+        Create secret and pod with it mounted as a volume, update secret a
+        few times and measure time until the mounted file has new content,
+        delete pod and secret then.
+
+        :param image: pod's image, it should have sh, cat and sleep
+        :param mount_path: path to mount volume in pod
+        :param updates: number of secret updates
+        :param command: array of strings representing container command,
+               container should keep running
+        :param poll_interval: interval of file checks inside pod
+        :param timeout: max time to wait for a single update in seconds
+        """
+        name = self.generate_random_name()
+        content = self.generate_random_name()
+
+        self.client.create_opaque_secret(
+            name,
+            namespace=self.namespace,
+            data={self.KEY: self._encode(content)}
+        )
+
+        volume = {
+            "mount_path": [
+                {
+                    "mountPath": mount_path,
+                    "name": name
+                }
+            ],
+            "volume": [
+                {
+                    "name": name,
+                    "secret": {
+                        "secretName": name
+                    }
+                }
+            ]
+        }
+
+        super(CreateUpdateAndDeletePodWithSecretVolume, self).run(
+            image,
+            name=name,
+            volume=volume,
+            mount_path=mount_path,
+            content=content,
+            update=lambda new: self.client.patch_secret(
+                name, namespace=self.namespace,
+                data={self.KEY: self._encode(new)}),
+            updates=updates,
+            command=command,
+            poll_interval=poll_interval,
+            timeout=timeout
         )
 
         self.client.delete_secret(name, namespace=self.namespace)
@@ -0,0 +1,252 @@
+# All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+
+from concurrent import futures
+import time
+
+from rally.common import logging
+from rally.task import atomic
+from rally.task import scenario
+from rally.task import validation
+
+from xrally_kubernetes.common import utils
+from xrally_kubernetes.tasks import scenario as common_scenario
+
+LOG = logging.getLogger(__name__)
+
+# NOTE: kinds of watched objects mapped to client methods which create, patch
+#   and delete them, each kind should have LIST methods in
+#   Kubernetes.LIST_METHODS, which are used by watches
+WRITERS = {
+    "configmap": ("create_configmap", "patch_configmap", "delete_configmaps"),
+    "secret": ("create_opaque_secret", "patch_secret", "delete_secrets")
+}
+
+
+@validation.add("number", param_name="watchers", minval=1, maxval=1000,
+                integer_only=True)
+@validation.add("number", param_name="writes", minval=1, integer_only=True)
+@validation.add("number", param_name="rate", minval=0.1, nullable=True)
+@validation.add("enum", param_name="mode", values=["create", "patch"],
+                missed=True)
+@validation.add("enum", param_name="kind", values=sorted(WRITERS),
+                missed=True)
+@scenario.configure("Kubernetes.watch_events_fan_out", platform="kubernetes")
+class WatchEventsFanOut(common_scenario.BaseKubernetesScenario):
+    """Measure watch events delivery latency with many concurrent watchers.
+
+    A writer creates or patches configMaps or secrets at a fixed rate, each
+    write carries its client timestamp in an annotation. Delivery latency is
+    the time from the write to the moment the event is received by a
+    watcher.
+
+    Watch streams are not multiplexed: each watcher is a thread of the
+    iteration process with its own HTTP connection, so the latency also
+    includes client-side GIL and scheduling contention, which grows with the
+    number of watchers. That's why watchers are limited to 1000 per
+    iteration and a single iteration can't load the apiserver with
+    thousands of watches, they should be spread over iterations by runner
+    concurrency, better in several processes. CPU load of the client process
+    during writes and delivery is reported, the numbers are client-bound if
+    it's close to one core.
+    """
+
+    ANNOTATION = "xrally.kubernetes/written-at"
+
+    def _make_handler(self, latencies, seen):
+        def handler(event_type, obj, received_at):
+            annotations = obj.metadata.annotations or {}
+            key = (obj.metadata.name, annotations.get(self.ANNOTATION))
+            if event_type == "DELETED" or key in seen:
+                return
+            if key == self._sync_key:
+                seen.add(key)
+            elif key in self._writes:
+                seen.add(key)
+                latencies.append(received_at - float(key[1]))
+        return handler
+
+    def _write(self, name, create):
+        key = (name, "%.6f" % time.time())
+        self._writes[key] = True
+        # NOTE: atomics aren't thread-safe, so each request from the workers
+        #   is issued by its own clone
+        client = self.client.clone()
+        create_method, patch_method, _ = WRITERS[self._kind]
+        try:
+            if create:
+                getattr(client, create_method)(
+                    name, namespace=self._namespace, data={},
+                    labels=self._labels,
+                    annotations={self.ANNOTATION: key[1]})
+            else:
+                getattr(client, patch_method)(
+                    name, namespace=self._namespace,
+                    annotations={self.ANNOTATION: key[1]})
+        except Exception:
+            del self._writes[key]
+            self._errors.append(time.time())
+            raise
+
+    @staticmethod
+    def _wait_all(watchers, predicates, timeout):
+        """Wait for predicates of all watchers during timeout.
+
+        :returns: list of watchers which did not succeed
+        """
+        deadline = time.time() + timeout
+        failed = []
+        for watcher, predicate in zip(watchers, predicates):
+            try:
+                ok = watcher.wait(predicate, max(0, deadline - time.time()))
+            except Exception as e:
+                LOG.debug("Watcher has failed: %s" % e)
+                ok = False
+            if not ok:
+                failed.append(watcher)
+        return failed
+
+    def run(self, watchers, writes, rate=10, mode="create", kind="configmap",
+            label_selector=True, all_namespaces=False, watch_timeout=60,
+            delivery_timeout=60, workers=10):
+        """Open watches, write objects and measure events delivery.
+
+        :param watchers: number of concurrent watches, each of them is
+               served by own thread
+        :param writes: number of writes
+        :param rate: writes per second
+        :param mode: "create" to create a new object by each write or
+               "patch" to patch annotation of a single object
+        :param kind: kind of written and watched objects, configmap or
+               secret
+        :param label_selector: watch only objects of the iteration by
+               label selector if True, otherwise watch all objects of the
+               kind in the namespace
+        :param all_namespaces: watch objects of all namespaces
+        :param watch_timeout: server-side timeout of a single watch request
+               in seconds, the watch is resumed from the last resource
+               version after it
+        :param delivery_timeout: how long to wait for events delivery to
+               all watchers after the last write in seconds
+        :param workers: number of threads which issue write requests
+        """
+        self._namespace = self.choose_namespace()
+        self._kind = kind
+        self._labels = {"fanout": self.generate_random_name()}
+        self._writes = {}
+        self._errors = []
+        sync_name = self.generate_random_name()
+        self._sync_key = None
+
+        kwargs = {"timeout_seconds": watch_timeout}
+        if not all_namespaces:
+            kwargs["namespace"] = self._namespace
+        if label_selector:
+            kwargs["label_selector"] = "fanout=%s" % self._labels["fanout"]
+        latencies = [[] for _ in range(watchers)]
+        seen = [set() for _ in range(watchers)]
+        started = []
+        try:
+            with atomic.ActionTimer(self, "kubernetes.start_watchers"):
+                for i in range(watchers):
+                    started.append(self.client.watch(
+                        kind,
+                        handler=self._make_handler(latencies[i], seen[i]),
+                        **kwargs))
+                # NOTE: the first object is used to make sure that all
+                #   watches are established before measurements
+                self._sync_key = (sync_name, "%.6f" % time.time())
+                getattr(self.client, WRITERS[kind][0])(
+                    sync_name, namespace=self._namespace, data={},
+                    labels=self._labels,
+                    annotations={self.ANNOTATION: self._sync_key[1]})
+                dropped = self._wait_all(
+                    started,
+                    [lambda s=s: self._sync_key in s for s in seen],
+                    delivery_timeout)
+
+            start = time.time()
+            cpu_start = time.process_time()
+            with atomic.ActionTimer(self, "kubernetes.write_%ss" % kind):
+                with futures.ThreadPoolExecutor(
+                        max_workers=workers) as executor:
+                    for i in range(writes):
+                        delay = start + i / float(rate) - time.time()
+                        if delay > 0:
+                            time.sleep(delay)
+                        if mode == "create":
+                            executor.submit(self._write,
+                                            self.generate_random_name(), True)
+                        else:
+                            executor.submit(self._write, sync_name, False)
+
+            with atomic.ActionTimer(self, "kubernetes.wait_events_delivery"):
+                lagged = self._wait_all(
+                    started,
+                    [lambda s=s: len(s) > len(self._writes) for s in seen],
+                    delivery_timeout)
+            elapsed = time.time() - start
+            cpu_load = ((time.process_time() - cpu_start) / elapsed
+                        if elapsed > 0 else 0)
+        finally:
+            for watcher in started:
+                watcher.stop()
+            getattr(self.client, WRITERS[kind][2])(self._namespace,
+                                                   labels=self._labels)
+
+        dropped = len(set(dropped) | set(w for w in started if w.error))
+        relists = sum(w.relists for w in started)
+        delivered = sum(len(points) for points in latencies)
+        undelivered = len(self._writes) * watchers - delivered
+        all_latencies = [p for points in latencies for p in points]
+        stats = utils.latency_stats(all_latencies)
+        self.add_output(
+            additive={"title": "Watch events delivery latency",
+                      "description": "Percentiles of write to event "
+                                     "delivery latency in each iteration",
+                      "chart_plugin": "Lines",
+                      "data": [["median", stats[1] or 0],
+                               ["95%ile", stats[3] or 0],
+                               ["99%ile", stats[4] or 0]],
+                      "label": "Seconds",
+                      "axis_label": "Iteration"})
+        self.add_latency_output(
+            "Watch events delivery latency",
+            [("kubernetes.watch_event_delivery", all_latencies)],
+            description="%(watchers)s watchers, %(writes)s writes at "
+                        "%(rate)s writes/s, %(dropped)s dropped watches, "
+                        "%(lagged)s lagged watches, %(relists)s relists, "
+                        "%(undelivered)s undelivered events, %(errors)s "
+                        "write errors, client CPU load %(cpu).2f of one "
+                        "core, the latency is client-bound if it's close "
+                        "to 1" % {
+                            "watchers": watchers, "writes": writes,
+                            "rate": rate, "dropped": dropped,
+                            "lagged": len(lagged), "relists": relists,
+                            "undelivered": undelivered,
+                            "errors": len(self._errors), "cpu": cpu_load})
+        per_watcher = sorted((utils.latency_stats(points)
+                              for points in latencies if points),
+                             key=lambda s: s[1])
+        self.add_output(
+            complete={"title": "Delivery latency by watcher",
+                      "description": "Median and 99%ile of delivery latency "
+                                     "of each watcher, sorted by median",
+                      "chart_plugin": "Lines",
+                      "data": [["median", [[i, s[1]] for i, s in
+                                           enumerate(per_watcher)]],
+                               ["99%ile", [[i, s[4]] for i, s in
+                                           enumerate(per_watcher)]]],
+                      "label": "Seconds",
+                      "axis_label": "Watcher"})
@@ -86,6 +86,136 @@ class MapKeysParameterValidator(validation.Validator):
                       % self.param_name)
 
 
+@validation.configure(name="number_list")
+class NumberListValidator(validation.Validator):
+    """Check that parameter is a non-empty list of numbers.
+
+    :param param_name: Name of parameter to validate
+    :param minval: Lower endpoint of valid interval
+    :param integer_only: Only accept integers
+    """
+
+    def __init__(self, param_name, minval=None, integer_only=False):
+        super(NumberListValidator, self).__init__()
+        self.param_name = param_name
+        self.minval = minval
+        self.integer_only = integer_only
+
+    def validate(self, context, config, plugin_cls, plugin_cfg):
+        value = config.get("args", {}).get(self.param_name)
+        types = int if self.integer_only else (int, float)
+        if not isinstance(value, list) or not value:
+            self.fail("'%(name)s' parameter should be a non-empty list, "
+                      "found %(value)s" % {"name": self.param_name,
+                                           "value": value})
+        for item in value:
+            if (isinstance(item, bool) or not isinstance(item, types) or
+                    self.minval is not None and item < self.minval):
+                self.fail(
+                    "'%(name)s' parameter contains %(item)s, which is not "
+                    "%(kind)s%(min)s" % {
+                        "name": self.param_name, "item": item,
+                        "kind": "an integer" if self.integer_only
+                        else "a number",
+                        "min": (" >= %s" % self.minval
+                                if self.minval is not None else "")})
+
+
+@validation.configure(name="indexed_job_completions")
+class IndexedJobCompletionsValidator(validation.Validator):
+    """Check that completions are set for Indexed completion mode of jobs."""
+
+    def validate(self, context, config, plugin_cls, plugin_cfg):
+        args = config.get("args", {})
+        if (args.get("completion_mode") == "Indexed" and
+                args.get("completions") is None):
+            self.fail("'completions' parameter is required for Indexed "
+                      "completion mode")
+
+
+@validation.configure(name="io_benchmark")
+class IOBenchmarkValidator(validation.Validator):
+    """Check values of I/O benchmark parameter of volume scenarios.
+
+    The values are put into the shell command of the benchmark, so only
+    known tools, fio modes and engines and positive integer sizes are
+    allowed.
+
+    :param param_name: Name of parameter to validate
+    """
+
+    ENUMS = {
+        "tool": ["dd", "fio"],
+        "rw": ["read", "write", "randread", "randwrite", "rw", "readwrite",
+               "randrw"],
+        "ioengine": ["sync", "psync", "vsync", "pvsync", "pvsync2", "libaio",
+                     "io_uring", "posixaio", "mmap"]
+    }
+    INTEGERS = ["block_size", "size", "iodepth", "runtime"]
+
+    def __init__(self, param_name="io_benchmark"):
+        super(IOBenchmarkValidator, self).__init__()
+        self.param_name = param_name
+
+    def validate(self, context, config, plugin_cls, plugin_cfg):
+        parameter = config.get("args", {}).get(self.param_name) or {}
+
+        for key in sorted(self.ENUMS):
+            if key in parameter and parameter[key] not in self.ENUMS[key]:
+                self.fail(
+                    "'%(key)s' of '%(name)s' parameter is %(value)s, it "
+                    "should be one of: %(values)s" % {
+                        "key": key, "name": self.param_name,
+                        "value": parameter[key],
+                        "values": ", ".join(self.ENUMS[key])})
+        for key in self.INTEGERS:
+            value = parameter.get(key)
+            if value is not None and (isinstance(value, bool) or
+                                      not isinstance(value, int) or
+                                      value < 1):
+                self.fail(
+                    "'%(key)s' of '%(name)s' parameter is %(value)s, it "
+                    "should be a positive integer" % {
+                        "key": key, "name": self.param_name,
+                        "value": value})
+        timeout = parameter.get("timeout")
+        if timeout is not None and (isinstance(timeout, bool) or
+                                    not isinstance(timeout, (int, float)) or
+                                    timeout <= 0):
+            self.fail("'timeout' of '%(name)s' parameter is %(value)s, it "
+                      "should be a positive number" % {
+                          "name": self.param_name, "value": timeout})
+
+
+@validation.configure(name="single_process_runner")
+class SingleProcessRunnerValidator(validation.Validator):
+    """Check that runner uses one process if any of contexts is used.
+
+    Contexts which keep shared state in memory of the runner process, e.g.
+    a free list, can't be shared by iterations of several processes.
+
+    :param contexts: List of context names
+    """
+
+    def __init__(self, contexts):
+        super(SingleProcessRunnerValidator, self).__init__()
+        self.contexts = contexts
+
+    def validate(self, context, config, plugin_cls, plugin_cfg):
+        used = sorted(set(self.contexts) & set(config.get("contexts") or {}))
+        if not used:
+            return
+        runner = config.get("runner") or {}
+        runner_type = config.get("runner_type") or runner.get("type")
+        if (runner_type == "serial" or runner.get("max_cpu_count") == 1 or
+                runner_type in ("constant", "constant_for_duration") and
+                runner.get("concurrency", 1) == 1):
+            return
+        self.fail("%(contexts)s context requires a single runner process, "
+                  "use serial runner or set max_cpu_count of the runner to "
+                  "1" % {"contexts": ", ".join(used)})
+
+
 if xrally_kubernetes.__rally_version__ < (1, 2):
     @validation.configure(name="map_keys")
     class MapKeysParameterValidatorConfigured(MapKeysParameterValidator):